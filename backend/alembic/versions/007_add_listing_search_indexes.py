@@ -0,0 +1,43 @@
+"""Add keyset pagination and trigram search indexes for listings
+
+Revision ID: 007_add_listing_search_indexes
+Revises: 006_add_social_media_models
+Create Date: 2024-01-22 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007_add_listing_search_indexes'
+down_revision = '006_add_social_media_models'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('idx_product_brand_listing', 'products', '(brand_id, last_updated_at DESC, id DESC)'),
+    ('idx_product_name_trgm', 'products', 'USING gin (name gin_trgm_ops)'),
+    ('idx_product_category_trgm', 'products', 'USING gin (category gin_trgm_ops)'),
+    ('idx_scraping_job_brand_listing', 'scraping_jobs', '(brand_id, created_at DESC, id DESC)'),
+    ('idx_video_project_listing', 'video_projects', '(created_at DESC, id DESC)'),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    
+    # Keyset cursors compare (last_updated_at, id); a NULL sort key would drop rows
+    op.execute("UPDATE products SET last_updated_at = COALESCE(first_seen_at, now()) WHERE last_updated_at IS NULL")
+    
+    # Build without locking the tables against writes
+    with op.get_context().autocommit_block():
+        for name, table, definition in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,48 @@
+"""Convert product document columns to JSONB and index them
+
+Revision ID: 008_convert_product_json_to_jsonb
+Revises: 007_add_listing_search_indexes
+Create Date: 2024-01-29 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008_convert_product_json_to_jsonb'
+down_revision = '007_add_listing_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+DOCUMENT_COLUMNS = ['images', 'variants', 'attributes', 'features', 'tags', 'reviews_data']
+
+INDEXES = [
+    ('idx_product_tags_gin', 'USING gin (tags jsonb_path_ops)'),
+    ('idx_product_attributes_gin', 'USING gin (attributes)'),
+    ('idx_product_category_price', '(category, currency, price)'),
+]
+
+
+def upgrade():
+    # One ALTER TABLE so the table is rewritten once for all columns
+    op.execute(
+        "ALTER TABLE products "
+        + ", ".join(f"ALTER COLUMN {column} TYPE jsonb USING {column}::jsonb" for column in DOCUMENT_COLUMNS)
+    )
+    
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON products {definition}")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    
+    op.execute(
+        "ALTER TABLE products "
+        + ", ".join(f"ALTER COLUMN {column} TYPE json USING {column}::json" for column in DOCUMENT_COLUMNS)
+    )
@@ -0,0 +1,137 @@
+"""Partition price history by month and add daily roll-ups
+
+Revision ID: 009_partition_price_history
+Revises: 008_convert_product_json_to_jsonb
+Create Date: 2024-02-05 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009_partition_price_history'
+down_revision = '008_convert_product_json_to_jsonb'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = """
+    product_id integer NOT NULL REFERENCES products (id),
+    price double precision NOT NULL,
+    original_price double precision,
+    currency varchar(3) NOT NULL,
+    discount_percentage double precision,
+    availability varchar,
+    in_stock boolean,
+    source_url varchar,
+    promotion_info json,
+    recorded_at timestamp with time zone NOT NULL DEFAULT now()
+"""
+
+COLUMN_NAMES = (
+    "id, product_id, price, original_price, currency, discount_percentage, "
+    "availability, in_stock, source_url, promotion_info, recorded_at"
+)
+
+TRACKED_FIELDS = ("price", "original_price", "currency", "discount_percentage", "availability", "in_stock")
+
+
+def upgrade():
+    op.execute("ALTER TABLE product_price_history RENAME TO product_price_history_legacy")
+    op.execute("ALTER TABLE product_price_history_legacy RENAME CONSTRAINT product_price_history_pkey TO product_price_history_legacy_pkey")
+    for index in ('idx_price_history_product_date', 'idx_price_history_price',
+                  'ix_product_price_history_id', 'ix_product_price_history_recorded_at'):
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+    
+    # The partition key has to be part of the primary key
+    op.execute(f"""
+        CREATE TABLE product_price_history (
+            id integer NOT NULL DEFAULT nextval('product_price_history_id_seq'),
+            {COLUMNS},
+            PRIMARY KEY (id, recorded_at)
+        ) PARTITION BY RANGE (recorded_at)
+    """)
+    op.execute("ALTER SEQUENCE product_price_history_id_seq OWNED BY product_price_history.id")
+    op.execute("CREATE INDEX idx_price_history_product_date ON product_price_history (product_id, recorded_at)")
+    op.execute("CREATE INDEX idx_price_history_price ON product_price_history (price, currency)")
+    op.execute("CREATE TABLE product_price_history_default PARTITION OF product_price_history DEFAULT")
+    
+    # Monthly UTC partitions from the oldest row to three months ahead; the
+    # price_history_maintenance task keeps creating them from here on
+    op.execute("""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', coalesce((SELECT min(recorded_at) FROM product_price_history_legacy), now()) AT TIME ZONE 'UTC'),
+                    date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF product_price_history FOR VALUES FROM (%L) TO (%L)',
+                    'product_price_history_' || to_char(month, 'YYYY_MM'),
+                    month::timestamp AT TIME ZONE 'UTC',
+                    (month + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+                );
+            END LOOP;
+        END $$
+    """)
+    
+    # Keep only the rows that change a tracked field
+    op.execute(f"""
+        INSERT INTO product_price_history ({COLUMN_NAMES})
+        SELECT {COLUMN_NAMES}
+        FROM (
+            SELECT {COLUMN_NAMES.replace('recorded_at', 'coalesce(recorded_at, now()) AS recorded_at')},
+                   {', '.join(f'lag({field}) OVER history AS previous_{field}' for field in TRACKED_FIELDS)},
+                   row_number() OVER history AS position
+            FROM product_price_history_legacy
+            WINDOW history AS (PARTITION BY product_id ORDER BY recorded_at, id)
+        ) observations
+        WHERE position = 1
+           OR ({', '.join(TRACKED_FIELDS)}) IS DISTINCT FROM ({', '.join(f'previous_{field}' for field in TRACKED_FIELDS)})
+    """)
+    op.execute("DROP TABLE product_price_history_legacy")
+    
+    op.create_table('product_price_daily',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('min_price', sa.Float(), nullable=False),
+        sa.Column('max_price', sa.Float(), nullable=False),
+        sa.Column('last_price', sa.Float(), nullable=False),
+        sa.Column('last_original_price', sa.Float(), nullable=True),
+        sa.Column('last_availability', sa.String(), nullable=True),
+        sa.Column('changes', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+        sa.PrimaryKeyConstraint('product_id', 'day')
+    )
+
+
+def downgrade():
+    # Daily roll-ups cannot be expanded back into scrapes and are dropped
+    op.drop_table('product_price_daily')
+    
+    op.execute("ALTER TABLE product_price_history RENAME TO product_price_history_partitioned")
+    op.execute("DROP INDEX IF EXISTS idx_price_history_product_date")
+    op.execute("DROP INDEX IF EXISTS idx_price_history_price")
+    op.execute(f"""
+        CREATE TABLE product_price_history (
+            id integer NOT NULL DEFAULT nextval('product_price_history_id_seq'),
+            {COLUMNS.replace('NOT NULL DEFAULT now()', 'DEFAULT now()')},
+            CONSTRAINT product_price_history_pkey_plain PRIMARY KEY (id)
+        )
+    """)
+    op.execute(f"INSERT INTO product_price_history ({COLUMN_NAMES}) SELECT {COLUMN_NAMES} FROM product_price_history_partitioned")
+    op.execute("ALTER SEQUENCE product_price_history_id_seq OWNED BY product_price_history.id")
+    op.execute("DROP TABLE product_price_history_partitioned CASCADE")
+    op.execute("ALTER TABLE product_price_history RENAME CONSTRAINT product_price_history_pkey_plain TO product_price_history_pkey")
+    
+    op.create_index('idx_price_history_product_date', 'product_price_history', ['product_id', 'recorded_at'])
+    op.create_index('idx_price_history_price', 'product_price_history', ['price', 'currency'])
+    op.create_index(op.f('ix_product_price_history_id'), 'product_price_history', ['id'], unique=False)
+    op.create_index(op.f('ix_product_price_history_recorded_at'), 'product_price_history', ['recorded_at'], unique=False)
@@ -0,0 +1,41 @@
+"""Add materialized trend snapshots
+
+Revision ID: 010_add_trend_snapshots
+Revises: 009_partition_price_history
+Create Date: 2024-02-12 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '010_add_trend_snapshots'
+down_revision = '009_partition_price_history'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('trend_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('snapshot_key', sa.String(length=500), nullable=False),
+        sa.Column('platforms', sa.JSON(), nullable=False),
+        sa.Column('industry_keywords', sa.JSON(), nullable=False),
+        sa.Column('platform_trends', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('source_versions', sa.JSON(), nullable=False),
+        sa.Column('trends', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('aggregates', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('build_seconds', sa.Float(), nullable=True),
+        sa.Column('built_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_requested_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('snapshot_key')
+    )
+    op.create_index(op.f('ix_trend_snapshots_id'), 'trend_snapshots', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_trend_snapshots_id'), table_name='trend_snapshots')
+    op.drop_table('trend_snapshots')
@@ -0,0 +1,41 @@
+"""Add checkpoints for streaming Apify dataset ingests
+
+Revision ID: 011_add_tiktok_ingest_checkpoints
+Revises: 010_add_trend_snapshots
+Create Date: 2024-02-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011_add_tiktok_ingest_checkpoints'
+down_revision = '010_add_trend_snapshots'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tiktok_ingest_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('apify_run_id', sa.String(length=100), nullable=False),
+        sa.Column('job_type', sa.String(length=50), nullable=True),
+        sa.Column('next_offset', sa.Integer(), nullable=False),
+        sa.Column('total_items', sa.Integer(), nullable=True),
+        sa.Column('pages_ingested', sa.Integer(), nullable=False),
+        sa.Column('counts', sa.JSON(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('apify_run_id')
+    )
+    op.create_index(op.f('ix_tiktok_ingest_checkpoints_id'), 'tiktok_ingest_checkpoints', ['id'], unique=False)
+    op.create_index(op.f('ix_tiktok_ingest_checkpoints_completed_at'), 'tiktok_ingest_checkpoints', ['completed_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_tiktok_ingest_checkpoints_completed_at'), table_name='tiktok_ingest_checkpoints')
+    op.drop_index(op.f('ix_tiktok_ingest_checkpoints_id'), table_name='tiktok_ingest_checkpoints')
+    op.drop_table('tiktok_ingest_checkpoints')
@@ -1,17 +1,15 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.core.security import verify_token
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.models.user import User
 
 security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user."""
+def _authenticated_user_id(credentials: HTTPAuthorizationCredentials):
     token = credentials.credentials
     user_id = verify_token(token)
     
@@ -22,11 +20,32 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    return user_id
+
+
+def _require_user(user: User) -> User:
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
     
-    return user
\ No newline at end of file
+    return user
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user."""
+    user_id = _authenticated_user_id(credentials)
+    return _require_user(db.query(User).filter(User.id == user_id).first())
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get current authenticated user without blocking the event loop."""
+    user_id = _authenticated_user_id(credentials)
+    return _require_user(await db.scalar(select(User).where(User.id == user_id)))
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Keyset pagination and cached counts for listing endpoints
+
+Listings page on a unique, indexed sort key instead of OFFSET, so fetching a
+deep page costs the same as fetching the first one. The opaque cursor handed
+to clients encodes the sort key of the last row returned and the next page
+starts strictly after it.
+
+Totals are counted up to ``cap`` rows and cached briefly per filter set, so a
+listing never scans more than ``cap`` index entries to report its size.
+"""
+
+import base64
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (int, float, str)) or value is None:
+        return value
+    return str(value)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque cursor for a sort key"""
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> Tuple:
+    """Decode a cursor, converting each key part with the matching parser"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("cursor has the wrong number of key parts")
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {e}")
+
+
+def keyset_after(columns: Sequence, values: Sequence, descending: bool = True):
+    """Row-value filter selecting rows strictly after ``values`` in sort order"""
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
+
+
+def paginate_rows(rows: List[Any], limit: int, key: Callable[[Any], Sequence]) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim a ``limit + 1`` row fetch to one page
+
+    Returns:
+        The page and the cursor of the next page, or None on the last page
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(*key(page[-1]))
+
+
+def select_count(stmt: Select) -> Select:
+    return select(func.count()).select_from(stmt.subquery())
+
+
+class CountCache:
+    """Per-process, short-lived cache of capped listing counts"""
+
+    def __init__(self, ttl: float = 60.0, cap: int = 10000, max_entries: int = 2048):
+        self.ttl = ttl
+        self.cap = cap
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Tuple[int, bool]]]" = OrderedDict()
+
+    async def count(self, db: AsyncSession, ids: Select, key: Hashable) -> Tuple[int, bool]:
+        """
+        Count the rows of ``ids`` (a single-column select), up to ``cap``
+
+        Returns:
+            Tuple of (total, is_estimate); ``is_estimate`` means at least ``total``
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and entry[0] > now:
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        total = await db.scalar(select_count(ids.limit(self.cap + 1)))
+        result = (self.cap, True) if total > self.cap else (total, False)
+
+        self._entries[key] = (now + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return result
+
+    def clear(self):
+        self._entries.clear()
+
+
+def page_response(total: Tuple[int, bool], next_cursor: Optional[str], **items: Any) -> Dict[str, Any]:
+    """Common listing response envelope"""
+    return {
+        "total": total[0],
+        "total_is_estimate": total[1],
+        "next_cursor": next_cursor,
+        **items
+    }
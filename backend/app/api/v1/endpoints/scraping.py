@@ -2,14 +2,20 @@
 API endpoints for web scraping operations.
 """
 
+from datetime import datetime, timedelta, timezone
 from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, HttpUrl
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_async_db, get_current_user, get_current_user_async, get_db
+from app.api.pagination import CountCache, decode_cursor, keyset_after, page_response, paginate_rows
+from app.core.config import settings
 from app.models import User
 from app.models.product import Product, ScrapingJob, CompetitorBrand
+from app.repositories import PriceHistoryRepository, ProductAnalyticsRepository
 from app.tasks.scraping_tasks import (
     enhanced_brand_scraping, product_catalog_scraping,
     competitor_discovery, price_monitoring
@@ -18,6 +24,9 @@ from app.services.scraping.monitoring import scraping_monitor
 
 router = APIRouter()
 
+job_counts = CountCache(ttl=settings.LISTING_COUNT_CACHE_TTL, cap=settings.LISTING_COUNT_CAP)
+product_counts = CountCache(ttl=settings.LISTING_COUNT_CACHE_TTL, cap=settings.LISTING_COUNT_CAP)
+
 
 # Request models
 class BrandScrapingRequest(BaseModel):
@@ -304,36 +313,65 @@ async def get_scraping_job(
 @router.get("/jobs")
 async def list_scraping_jobs(
     limit: int = Query(default=20, le=100),
-    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    offset: int = Query(default=0, ge=0, description="Deprecated, use cursor"),
     job_type: Optional[str] = Query(default=None),
     status: Optional[str] = Query(default=None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
-    List scraping jobs for current user
+    List scraping jobs for current user, newest first
     """
     from app.models import Brand
     
     # Get user's brand IDs
-    user_brand_ids = db.query(Brand.id).filter(Brand.user_id == current_user.id).subquery()
+    user_brand_ids = select(Brand.id).where(Brand.user_id == current_user.id)
     
-    query = db.query(ScrapingJob).filter(
-        ScrapingJob.brand_id.in_(user_brand_ids)
-    )
+    filters = [ScrapingJob.brand_id.in_(user_brand_ids)]
     
     if job_type:
-        query = query.filter(ScrapingJob.job_type == job_type)
+        filters.append(ScrapingJob.job_type == job_type)
     
     if status:
-        query = query.filter(ScrapingJob.status == status)
+        filters.append(ScrapingJob.status == status)
     
-    total = query.count()
-    jobs = query.order_by(ScrapingJob.created_at.desc()).offset(offset).limit(limit).all()
+    total = await job_counts.count(
+        db,
+        select(ScrapingJob.id).where(*filters),
+        key=(current_user.id, job_type, status)
+    )
     
-    return {
-        "total": total,
-        "jobs": [
+    query = (
+        select(
+            ScrapingJob.id,
+            ScrapingJob.job_id,
+            ScrapingJob.job_type,
+            ScrapingJob.status,
+            ScrapingJob.progress,
+            ScrapingJob.created_at,
+            ScrapingJob.completed_at
+        )
+        .where(*filters)
+        .order_by(ScrapingJob.created_at.desc(), ScrapingJob.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        query = query.where(keyset_after(
+            (ScrapingJob.created_at, ScrapingJob.id),
+            decode_cursor(cursor, datetime.fromisoformat, int)
+        ))
+    elif offset:
+        query = query.offset(offset)
+    
+    jobs, next_cursor = paginate_rows(
+        (await db.execute(query)).all(), limit, key=lambda job: (job.created_at, job.id)
+    )
+    
+    return page_response(
+        total,
+        next_cursor,
+        jobs=[
             {
                 "job_id": job.job_id,
                 "job_type": job.job_type,
@@ -344,53 +382,94 @@ async def list_scraping_jobs(
             }
             for job in jobs
         ]
-    }
+    )
 
 
 @router.get("/products")
 async def list_scraped_products(
     brand_id: Optional[int] = Query(default=None),
     limit: int = Query(default=20, le=100),
-    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    offset: int = Query(default=0, ge=0, description="Deprecated, use cursor"),
     category: Optional[str] = Query(default=None),
+    search: Optional[str] = Query(default=None, description="Substring of the product name"),
     availability: Optional[str] = Query(default=None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
-    List scraped products
+    List scraped products, most recently updated first
     """
     from app.models import Brand
     
     # Get user's brand IDs
-    user_brand_ids = db.query(Brand.id).filter(Brand.user_id == current_user.id).subquery()
+    user_brand_ids = select(Brand.id).where(Brand.user_id == current_user.id)
     
-    query = db.query(Product).filter(Product.brand_id.in_(user_brand_ids))
+    filters = [Product.brand_id.in_(user_brand_ids)]
     
     if brand_id:
         # Verify brand ownership
-        brand = db.query(Brand).filter(
-            Brand.id == brand_id,
-            Brand.user_id == current_user.id
-        ).first()
+        brand = await db.scalar(
+            select(Brand.id).where(
+                Brand.id == brand_id,
+                Brand.user_id == current_user.id
+            )
+        )
         
         if not brand:
             raise HTTPException(status_code=404, detail="Brand not found")
         
-        query = query.filter(Product.brand_id == brand_id)
+        filters.append(Product.brand_id == brand_id)
     
+    # Substring filters are served by the trigram indexes
     if category:
-        query = query.filter(Product.category.ilike(f"%{category}%"))
+        filters.append(Product.category.icontains(category, autoescape=True))
+    
+    if search:
+        filters.append(Product.name.icontains(search, autoescape=True))
     
     if availability:
-        query = query.filter(Product.availability == availability)
+        filters.append(Product.availability == availability)
     
-    total = query.count()
-    products = query.order_by(Product.last_updated_at.desc()).offset(offset).limit(limit).all()
+    total = await product_counts.count(
+        db,
+        select(Product.id).where(*filters),
+        key=(current_user.id, brand_id, category, search, availability)
+    )
     
-    return {
-        "total": total,
-        "products": [
+    # Only the listed columns; the JSON detail columns are not needed here
+    query = (
+        select(
+            Product.id,
+            Product.name,
+            Product.price,
+            Product.currency,
+            Product.availability,
+            Product.category,
+            Product.source_url,
+            Product.images,
+            Product.last_updated_at
+        )
+        .where(*filters)
+        .order_by(Product.last_updated_at.desc(), Product.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        query = query.where(keyset_after(
+            (Product.last_updated_at, Product.id),
+            decode_cursor(cursor, datetime.fromisoformat, int)
+        ))
+    elif offset:
+        query = query.offset(offset)
+    
+    products, next_cursor = paginate_rows(
+        (await db.execute(query)).all(), limit, key=lambda product: (product.last_updated_at, product.id)
+    )
+    
+    return page_response(
+        total,
+        next_cursor,
+        products=[
             {
                 "id": product.id,
                 "name": product.name,
@@ -404,6 +483,75 @@ async def list_scraped_products(
             }
             for product in products
         ]
+    )
+
+
+@router.get("/products/analytics")
+async def get_product_analytics(
+    brand_id: Optional[int] = Query(default=None),
+    category: Optional[str] = Query(default=None, description="Restricts the rating histogram"),
+    top_tags: int = Query(default=10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Tag frequencies, rating distribution and price percentiles of scraped products
+    """
+    from app.models import Brand
+    
+    brand_ids = select(Brand.id).where(Brand.user_id == current_user.id)
+    if brand_id:
+        brand_ids = brand_ids.where(Brand.id == brand_id)
+    
+    repository = ProductAnalyticsRepository(db)
+    
+    return {
+        "top_tags": {
+            brand: [{"tag": tag, "products": count} for tag, count in tags]
+            for brand, tags in (await repository.top_tags_by_brand(brand_ids, limit=top_tags)).items()
+        },
+        "rating_histogram": await repository.rating_histogram(brand_ids, category=category),
+        "price_percentiles": await repository.price_percentiles_by_category(brand_ids)
+    }
+
+
+@router.get("/products/price-history")
+async def get_price_history(
+    product_ids: List[int] = Query(..., description="Products to return series for"),
+    start: Optional[datetime] = Query(default=None, description="Defaults to 90 days ago"),
+    end: Optional[datetime] = Query(default=None, description="Defaults to now"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Price series for several products in one call
+    
+    Recent points are individual price changes; points older than the raw
+    retention window are daily min/max/last roll-ups.
+    """
+    from app.models import Brand
+    
+    if len(product_ids) > 100:
+        raise HTTPException(status_code=400, detail="At most 100 products per request")
+    
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=90)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    owned_ids = list(await db.scalars(
+        select(Product.id).where(
+            Product.id.in_(product_ids),
+            Product.brand_id.in_(select(Brand.id).where(Brand.user_id == current_user.id))
+        )
+    ))
+    
+    series = await PriceHistoryRepository(db).price_series(owned_ids, start, end)
+    
+    return {
+        "start": start,
+        "end": end,
+        "series": {str(product_id): points for product_id, points in series.items()}
     }
 
 
@@ -3,15 +3,21 @@ API endpoints for video generation workflows
 """
 
 import logging
+from datetime import datetime
 from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query, UploadFile, File, Form, Header, Request, Response
 from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from enum import Enum
 import uuid
-import aiofiles
+import base64
 import os
 from pathlib import Path
 
+from app.api.pagination import CountCache, decode_cursor, keyset_after, page_response, paginate_rows
+from app.core.config import settings
+from app.db.session import get_async_db
 from app.models.product import Product
 from app.models.brand import Brand
 from app.services.video_generation.orchestrator import (
@@ -21,11 +27,17 @@ from app.services.video_generation.orchestrator import (
 from app.services.video_generation.script_generation import ScriptType, ToneStyle
 from app.services.video_generation.ugc_generation import TestimonialType, AuthenticityLevel
 from app.models.video_project import VideoQualityEnum, VideoStyleEnum
+from app.schemas.video_upload import VideoMetadataResponse
+from app.services.video_processing.streaming_upload import (
+    ResumableUploadManager, UploadOffsetMismatchError, UploadTooLargeError, stream_upload_to_disk
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+uploaded_project_counts = CountCache(ttl=settings.LISTING_COUNT_CACHE_TTL, cap=settings.LISTING_COUNT_CAP)
+
 
 # Request/Response Models
 
@@ -639,35 +651,45 @@ ALLOWED_VIDEO_TYPES = {
 }
 
 MAX_FILE_SIZE = 500 * 1024 * 1024  # 500MB
+TUS_VERSION = "1.0.0"
 
+resumable_uploads = ResumableUploadManager(UPLOAD_DIR / ".resumable", UPLOAD_DIR, MAX_FILE_SIZE)
 
-async def validate_video_file(file: UploadFile) -> dict:
-    """Validate uploaded video file"""
-    if file.content_type not in ALLOWED_VIDEO_TYPES:
+
+def _file_too_large(status_code: int = 400) -> HTTPException:
+    return HTTPException(
+        status_code=status_code,
+        detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB"
+    )
+
+
+def validate_video_type(content_type: Optional[str]) -> str:
+    """Validate a video content type and return its file extension"""
+    if content_type not in ALLOWED_VIDEO_TYPES:
         raise HTTPException(
             status_code=400,
             detail=f"Invalid file type. Allowed types: {list(ALLOWED_VIDEO_TYPES.keys())}"
         )
+    return ALLOWED_VIDEO_TYPES[content_type]
+
+
+async def validate_video_file(file: UploadFile) -> dict:
+    """Validate uploaded video file without reading its content"""
+    extension = validate_video_type(file.content_type)
     
-    # Read file to check size
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB"
-        )
-    
-    # Reset file pointer
-    await file.seek(0)
+    # Reject early when the client declared the size; otherwise it is enforced while streaming
+    declared_size = getattr(file, "size", None)
+    if declared_size is not None and declared_size > MAX_FILE_SIZE:
+        raise _file_too_large()
     
     return {
-        "size": len(content),
-        "extension": ALLOWED_VIDEO_TYPES[file.content_type]
+        "size": declared_size,
+        "extension": extension
     }
 
 
 async def save_uploaded_video(file: UploadFile, project_id: str, segment_number: int = 0) -> dict:
-    """Save uploaded video file to disk"""
+    """Stream uploaded video file to disk in chunks"""
     file_info = await validate_video_file(file)
     
     # Generate unique filename
@@ -675,24 +697,174 @@ async def save_uploaded_video(file: UploadFile, project_id: str, segment_number:
     filename = f"{project_id}_{segment_number}_{file_id}{file_info['extension']}"
     file_path = UPLOAD_DIR / filename
     
-    # Save file
-    async with aiofiles.open(file_path, 'wb') as f:
-        content = await file.read()
-        await f.write(content)
+    try:
+        upload = await stream_upload_to_disk(file, file_path, MAX_FILE_SIZE)
+    except UploadTooLargeError:
+        raise _file_too_large()
     
     return {
         "file_path": str(file_path),
         "filename": filename,
-        "size": file_info["size"],
-        "url": f"/uploads/videos/{filename}"
+        "size": upload.size,
+        "sha256": upload.sha256,
+        "url": f"/uploads/videos/{filename}",
+        "metadata": upload.metadata
+    }
+
+
+def get_completed_upload(upload_id: str) -> dict:
+    """File info for a finished resumable upload, shaped like save_uploaded_video's"""
+    upload = resumable_uploads.get(upload_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if not upload.is_complete:
+        raise HTTPException(status_code=409, detail=f"Upload incomplete: {upload.offset}/{upload.length} bytes")
+    
+    filename = Path(upload.file_path).name
+    return {
+        "file_path": upload.file_path,
+        "filename": filename,
+        "size": upload.length,
+        "sha256": upload.sha256,
+        "url": f"/uploads/videos/{filename}",
+        "metadata": VideoMetadataResponse(**upload.video_metadata) if upload.video_metadata else None
+    }
+
+
+async def resolve_uploaded_video(
+    file: Optional[UploadFile],
+    upload_id: Optional[str],
+    project_id: str,
+    segment_number: int = 0
+) -> dict:
+    """Save a multipart upload, or pick up a completed resumable upload"""
+    if upload_id:
+        return get_completed_upload(upload_id)
+    if file is None:
+        raise HTTPException(status_code=400, detail="Either file or upload_id is required")
+    return await save_uploaded_video(file, project_id, segment_number)
+
+
+def _parse_upload_metadata(header: Optional[str]) -> Dict[str, str]:
+    """Parse a tus Upload-Metadata header (comma-separated "key base64value" pairs)"""
+    metadata = {}
+    if not header:
+        return metadata
+    
+    for pair in header.split(","):
+        parts = pair.strip().split(" ", 1)
+        if not parts[0]:
+            continue
+        try:
+            metadata[parts[0]] = base64.b64decode(parts[1]).decode() if len(parts) > 1 else ""
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPException(status_code=400, detail=f"Invalid Upload-Metadata value for {parts[0]}")
+    return metadata
+
+
+def _tus_headers(upload) -> Dict[str, str]:
+    return {
+        "Tus-Resumable": TUS_VERSION,
+        "Upload-Offset": str(upload.offset),
+        "Upload-Length": str(upload.length),
+        "Cache-Control": "no-store"
     }
 
 
 # Video Upload Endpoints
 
+@router.post("/upload/resumable", status_code=201)
+async def create_resumable_upload(
+    request: Request,
+    upload_length: int = Header(..., alias="Upload-Length"),
+    upload_metadata: Optional[str] = Header(None, alias="Upload-Metadata")
+):
+    """
+    Create a tus-style resumable upload
+    
+    Upload-Metadata must include ``filetype`` (one of the allowed video types).
+    Once all bytes are received, pass the upload ID as ``upload_id`` to the
+    project or clip upload endpoints.
+    """
+    metadata = _parse_upload_metadata(upload_metadata)
+    metadata["extension"] = validate_video_type(metadata.get("filetype"))
+    
+    try:
+        upload = resumable_uploads.create(upload_length, metadata)
+    except UploadTooLargeError:
+        raise _file_too_large(status_code=413)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    location = f"{request.url.path.rstrip('/')}/{upload.upload_id}"
+    return Response(
+        status_code=201,
+        headers={**_tus_headers(upload), "Location": location}
+    )
+
+
+@router.head("/upload/resumable/{upload_id}")
+async def get_resumable_upload_offset(upload_id: str):
+    """Report how many bytes of a resumable upload have been received"""
+    upload = resumable_uploads.get(upload_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return Response(status_code=200, headers=_tus_headers(upload))
+
+
+@router.patch("/upload/resumable/{upload_id}")
+async def append_resumable_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    content_type: Optional[str] = Header(None, alias="Content-Type")
+):
+    """Append the request body to a resumable upload at Upload-Offset"""
+    if content_type != "application/offset+octet-stream":
+        raise HTTPException(status_code=415, detail="Content-Type must be application/offset+octet-stream")
+    
+    try:
+        upload = await resumable_uploads.append(upload_id, upload_offset, request.stream())
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadOffsetMismatchError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UploadTooLargeError:
+        raise HTTPException(status_code=413, detail="Upload exceeds declared Upload-Length")
+    
+    return Response(status_code=204, headers=_tus_headers(upload))
+
+
+@router.get("/upload/resumable/{upload_id}")
+async def get_resumable_upload(upload_id: str):
+    """Get the status of a resumable upload"""
+    upload = resumable_uploads.get(upload_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    
+    return {
+        "upload_id": upload.upload_id,
+        "offset": upload.offset,
+        "length": upload.length,
+        "completed": upload.is_complete,
+        "sha256": upload.sha256,
+        "video_url": f"/uploads/videos/{Path(upload.file_path).name}" if upload.file_path else None,
+        "metadata": upload.video_metadata
+    }
+
+
+@router.delete("/upload/resumable/{upload_id}", status_code=204)
+async def terminate_resumable_upload(upload_id: str):
+    """Terminate an incomplete resumable upload"""
+    if not resumable_uploads.delete(upload_id):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return Response(status_code=204, headers={"Tus-Resumable": TUS_VERSION})
+
+
 @router.post("/upload/project", response_model=VideoUploadResponseModel)
 async def upload_video_project(
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = Form(None),
     product_id: str = Form(...),
     brand_id: Optional[str] = Form(None),
     title: str = Form(...),
@@ -703,6 +875,8 @@ async def upload_video_project(
 ):
     """
     Upload a complete video as a project
+    
+    Send the video as ``file``, or pass ``upload_id`` of a completed resumable upload.
     """
     try:
         from app.models.video_project import VideoProject, VideoProjectTypeEnum, GenerationStatusEnum
@@ -719,10 +893,11 @@ async def upload_video_project(
         project_id = str(uuid.uuid4())
         
         # Save uploaded file
-        file_info = await save_uploaded_video(file, project_id)
+        file_info = await resolve_uploaded_video(file, upload_id, project_id)
         
-        # Get video duration (mock for now - in production use ffprobe)
-        duration = 30.0  # Placeholder
+        # Duration comes from the ffprobe run started while the upload streamed in
+        metadata = file_info["metadata"]
+        duration = metadata.duration if metadata and metadata.duration > 0 else 30.0
         
         # Create database record
         db = SessionLocal()
@@ -769,7 +944,8 @@ async def upload_video_project(
 
 @router.post("/upload/clip")
 async def upload_video_clip(
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = Form(None),
     project_id: str = Form(...),
     clip_title: str = Form(...),
     segment_number: int = Form(...),
@@ -785,12 +961,12 @@ async def upload_video_clip(
         from app.db.session import SessionLocal
         
         # Save uploaded file
-        file_info = await save_uploaded_video(file, project_id, segment_number)
+        file_info = await resolve_uploaded_video(file, upload_id, project_id, segment_number)
         
         # Calculate duration if end_time not provided
         if end_time is None:
-            # Mock duration calculation - in production use ffprobe
-            end_time = start_time + 10.0  # Placeholder
+            metadata = file_info["metadata"]
+            end_time = start_time + (metadata.duration if metadata and metadata.duration > 0 else 10.0)
         
         duration = end_time - start_time
         
@@ -840,62 +1016,74 @@ async def list_uploaded_projects(
     brand_id: Optional[str] = Query(None),
     is_ugc: Optional[bool] = Query(None),
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    offset: int = Query(0, ge=0, description="Deprecated, use cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    List uploaded video projects with filtering options
+    List uploaded video projects with filtering options, newest first
     """
     try:
         from app.models.video_project import VideoProject, VideoProjectTypeEnum
-        from app.db.session import SessionLocal
         
-        db = SessionLocal()
-        try:
-            query = db.query(VideoProject)
-            
-            # Apply filters
-            if product_id:
-                query = query.filter(VideoProject.product_id == product_id)
-            if brand_id:
-                query = query.filter(VideoProject.brand_id == brand_id)
-            if is_ugc is not None:
-                if is_ugc:
-                    query = query.filter(VideoProject.project_type == VideoProjectTypeEnum.UGC_TESTIMONIAL)
-                else:
-                    query = query.filter(VideoProject.project_type != VideoProjectTypeEnum.UGC_TESTIMONIAL)
-            
-            # Filter for uploaded videos only
-            query = query.filter(VideoProject.generation_config.contains({"uploaded": True}))
-            
-            total = query.count()
-            projects = query.offset(offset).limit(limit).all()
-            
-            project_list = []
-            for project in projects:
-                project_list.append({
-                    "id": str(project.id),
-                    "title": project.title,
-                    "description": project.description,
-                    "project_type": project.project_type.value,
-                    "target_platform": project.target_platform,
-                    "duration": project.target_duration,
-                    "status": project.status.value,
-                    "video_url": project.final_video_url,
-                    "thumbnail_url": project.thumbnail_url,
-                    "created_at": project.created_at.isoformat(),
-                    "tags": project.generation_config.get("tags", []) if project.generation_config else []
-                })
-            
-            return {
-                "projects": project_list,
-                "total": total,
-                "limit": limit,
-                "offset": offset
-            }
-            
-        finally:
-            db.close()
+        # Filter for uploaded videos only
+        filters = [VideoProject.generation_config.contains({"uploaded": True})]
+        
+        # Apply filters
+        if product_id:
+            filters.append(VideoProject.product_id == product_id)
+        if brand_id:
+            filters.append(VideoProject.brand_id == brand_id)
+        if is_ugc is not None:
+            if is_ugc:
+                filters.append(VideoProject.project_type == VideoProjectTypeEnum.UGC_TESTIMONIAL)
+            else:
+                filters.append(VideoProject.project_type != VideoProjectTypeEnum.UGC_TESTIMONIAL)
+        
+        total = await uploaded_project_counts.count(
+            db,
+            select(VideoProject.id).where(*filters),
+            key=(product_id, brand_id, is_ugc)
+        )
         
+        query = (
+            select(VideoProject)
+            .where(*filters)
+            .order_by(VideoProject.created_at.desc(), VideoProject.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            query = query.where(keyset_after(
+                (VideoProject.created_at, VideoProject.id),
+                decode_cursor(cursor, datetime.fromisoformat, uuid.UUID)
+            ))
+        elif offset:
+            query = query.offset(offset)
+        
+        projects, next_cursor = paginate_rows(
+            (await db.scalars(query)).all(), limit, key=lambda project: (project.created_at, project.id)
+        )
+        
+        project_list = []
+        for project in projects:
+            project_list.append({
+                "id": str(project.id),
+                "title": project.title,
+                "description": project.description,
+                "project_type": project.project_type.value,
+                "target_platform": project.target_platform,
+                "duration": project.target_duration,
+                "status": project.status.value,
+                "video_url": project.final_video_url,
+                "thumbnail_url": project.thumbnail_url,
+                "created_at": project.created_at.isoformat(),
+                "tags": project.generation_config.get("tags", []) if project.generation_config else []
+            })
+        
+        return page_response(total, next_cursor, projects=project_list, limit=limit)
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to list uploaded projects: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to list uploaded projects: {str(e)}")
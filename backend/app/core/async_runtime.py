@@ -0,0 +1,89 @@
+"""
+Per-process asyncio runtime for Celery workers
+
+Async tasks run their coroutines on one event loop that lives as long as the
+worker process, instead of a loop created and closed around every task.
+Loop-bound state (aiohttp and httpx connection pools, the asyncpg pool, AI
+provider clients held by the service singletons) therefore survives from one
+task to the next, and singletons no longer hold sessions bound to a closed
+loop.
+
+The loop runs on the task's own thread, so ``current_task`` and other
+thread-local Celery state keep working inside coroutines.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_shutdown_callbacks: List[Callable[[], Awaitable[None]]] = []
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """The process's long-lived event loop, created on first use"""
+    global _loop, _loop_pid
+
+    # A forked child must not reuse its parent's loop
+    if _loop is None or _loop.is_closed() or _loop_pid != os.getpid():
+        _loop = asyncio.new_event_loop()
+        _loop_pid = os.getpid()
+        asyncio.set_event_loop(_loop)
+
+    return _loop
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """Run a coroutine to completion on the worker loop from synchronous task code"""
+    loop = get_worker_loop()
+    if loop.is_running():
+        raise RuntimeError("run_async() cannot be called from code already running on the worker loop")
+    return loop.run_until_complete(coro)
+
+
+def on_loop_shutdown(callback: Callable[[], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+    """Register a coroutine function that releases loop-bound resources at shutdown"""
+    if callback not in _shutdown_callbacks:
+        _shutdown_callbacks.append(callback)
+    return callback
+
+
+def start_worker_loop() -> asyncio.AbstractEventLoop:
+    loop = get_worker_loop()
+    logger.info(f"Worker event loop started in process {_loop_pid}")
+    return loop
+
+
+def stop_worker_loop():
+    """Run shutdown callbacks, cancel leftover tasks and close the loop"""
+    global _loop
+
+    if _loop is None or _loop.is_closed() or _loop_pid != os.getpid():
+        return
+
+    loop = _loop
+    try:
+        for callback in reversed(_shutdown_callbacks):
+            try:
+                loop.run_until_complete(callback())
+            except Exception as e:
+                logger.warning(f"Loop shutdown callback {callback.__qualname__} failed: {e}")
+
+        pending = [task for task in asyncio.all_tasks(loop) if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.run_until_complete(loop.shutdown_default_executor())
+    finally:
+        loop.close()
+        _loop = None
+        logger.info("Worker event loop stopped")
@@ -1,10 +1,31 @@
+import logging
+import time
+from typing import Dict
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import (
+    before_task_publish, task_postrun, task_prerun,
+    worker_init, worker_process_init, worker_process_shutdown, worker_shutdown
+)
+from app.core.async_runtime import start_worker_loop, stop_worker_loop
 from app.core.config import settings
+from app.core.result_store import SERIALIZER_NAME, register_result_serializer
+from app.core.metrics import (
+    mark_process_dead, observe_task_queue_wait, observe_task_run, reset_multiprocess_dir, start_metrics_server
+)
+from app.core.task_routing import (
+    DEFAULT_QUEUE, PRIORITY_NORMAL, PRIORITY_STEPS,
+    build_task_annotations, build_task_queues, build_task_routes, queue_for_task
+)
+
+logger = logging.getLogger(__name__)
+
+register_result_serializer()
 
 celery_app = Celery(
     "viralos",
     broker=settings.REDIS_URL,
-    backend=settings.REDIS_URL,
+    backend=f"app.core.result_store:ExternalResultRedisBackend+{settings.REDIS_URL}",
     include=["app.tasks"]
 )
 
@@ -12,12 +33,107 @@ celery_app = Celery(
 celery_app.conf.update(
     task_serializer="json",
     accept_content=["json"],
-    result_serializer="json",
+    result_serializer=SERIALIZER_NAME,
+    result_accept_content=["json", SERIALIZER_NAME],
+    result_expires=settings.CELERY_RESULT_EXPIRES,
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
-    task_time_limit=30 * 60,  # 30 minutes
+    task_time_limit=30 * 60,  # 30 minutes, for tasks without a workload class
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
-)
\ No newline at end of file
+    # Routing: one queue per workload class (see app.core.task_routing)
+    task_queues=build_task_queues(),
+    task_default_queue=DEFAULT_QUEUE,
+    task_routes=build_task_routes(),
+    task_annotations=build_task_annotations(),
+    task_default_priority=PRIORITY_NORMAL,
+    broker_transport_options={
+        "priority_steps": PRIORITY_STEPS,
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
+)
+
+# Periodic tasks
+celery_app.conf.beat_schedule = {
+    "price-history-maintenance": {
+        "task": "price_history_maintenance",
+        "schedule": crontab(hour=3, minute=15),
+    },
+    "result-store-cleanup": {
+        "task": "result_store_cleanup",
+        "schedule": crontab(minute=40),
+    },
+    "refresh-trend-snapshots": {
+        "task": "refresh_trend_snapshots",
+        "schedule": crontab(minute="*/10"),
+    },
+}
+
+
+@worker_init.connect
+def start_worker_metrics_sidecar(**kwargs):
+    """Expose worker metrics for Prometheus from the main worker process"""
+    if not settings.CELERY_METRICS_ENABLED:
+        return
+    if settings.PROMETHEUS_MULTIPROC_DIR:
+        reset_multiprocess_dir()
+    else:
+        logger.warning("PROMETHEUS_MULTIPROC_DIR is not set; metrics of pool processes will not be exported")
+    start_metrics_server(settings.CELERY_METRICS_PORT)
+
+
+@before_task_publish.connect
+def stamp_publish_time(headers=None, **kwargs):
+    """Record when a task was queued, for queue-latency metrics"""
+    if headers is not None:
+        headers.setdefault("published_at", time.time())
+
+
+_task_started: Dict[str, float] = {}
+
+
+@task_prerun.connect
+def observe_task_start(task_id=None, task=None, **kwargs):
+    """Record how long the task waited in its queue"""
+    _task_started[task_id] = time.perf_counter()
+    published_at = getattr(task.request, "published_at", None)
+    if published_at is None:
+        published_at = (getattr(task.request, "headers", None) or {}).get("published_at")
+    if published_at is not None:
+        observe_task_queue_wait(_task_queue(task), task.name, time.time() - published_at)
+
+
+@task_postrun.connect
+def observe_task_finish(task_id=None, task=None, state=None, **kwargs):
+    """Record how long the task ran"""
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        observe_task_run(_task_queue(task), task.name, time.perf_counter() - started, state != "FAILURE")
+
+
+def _task_queue(task) -> str:
+    delivery_info = getattr(task.request, "delivery_info", None) or {}
+    return delivery_info.get("routing_key") or queue_for_task(task.name)
+
+
+@worker_process_init.connect
+def start_worker_event_loop(**kwargs):
+    """One event loop per pool process, reused by every async task it runs"""
+    start_worker_loop()
+
+
+@worker_process_shutdown.connect
+def cleanup_worker_metrics(pid=None, **kwargs):
+    """Drop multiprocess metric files of exited pool processes"""
+    if pid is not None:
+        mark_process_dead(pid)
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def stop_worker_event_loop(**kwargs):
+    """Close loop-bound clients and the loop (solo pools only get worker_shutdown)"""
+    stop_worker_loop()
\ No newline at end of file
@@ -17,6 +17,10 @@ class Settings(BaseSettings):
     DB_POOL_SIZE: int = Field(default=20, env="DB_POOL_SIZE")
     DB_MAX_OVERFLOW: int = Field(default=30, env="DB_MAX_OVERFLOW")
     DB_POOL_RECYCLE: int = Field(default=3600, env="DB_POOL_RECYCLE")
+    # Defaults to DATABASE_URL with the asyncpg driver
+    ASYNC_DATABASE_URL: str = Field(default="", env="ASYNC_DATABASE_URL")
+    LISTING_COUNT_CAP: int = 10000       # Listing totals above this are reported as estimates
+    LISTING_COUNT_CACHE_TTL: int = 60    # Seconds a listing total is reused
     
     # Redis
     REDIS_URL: str = Field(default="redis://localhost:6379", env="REDIS_URL")
@@ -57,6 +61,7 @@ class Settings(BaseSettings):
     MAX_TOKENS_PER_REQUEST: int = 4000
     AI_REQUEST_TIMEOUT: int = 60
     AI_MAX_RETRIES: int = 3
+    AI_MAX_CONCURRENT_REQUESTS: int = 8  # Text generation requests in flight per process
     
     # Content Generation Settings
     VIRAL_SCORE_THRESHOLD: float = 7.0
@@ -98,10 +103,21 @@ class Settings(BaseSettings):
     SCRAPING_MAX_FAILURE_RATE: float = 0.5
     SCRAPING_MAX_RESPONSE_TIME: float = 30.0
     
+    # Price History
+    PRICE_HISTORY_RAW_RETENTION_DAYS: int = 90  # Older months are rolled up to one row per product per day
+    PRICE_HISTORY_PARTITIONS_AHEAD: int = 3     # Monthly partitions created ahead of time
+    
     # Caching
     CACHE_TTL_EMBEDDINGS: int = 86400  # 24 hours
     CACHE_TTL_ANALYSIS: int = 3600     # 1 hour
     CACHE_TTL_TRENDS: int = 1800       # 30 minutes
+    TREND_SNAPSHOT_REFRESH_AGE: int = 900   # Older snapshots are served and refreshed in the background
+    TREND_SNAPSHOT_MAX_AGE: int = 3600      # Older snapshots are rebuilt before serving
+    TREND_SNAPSHOT_IDLE_DAYS: int = 2       # Snapshots not requested for longer stop being refreshed
+    
+    # AI Metrics Store
+    AI_METRICS_DB_PATH: str = "/tmp/viralos_monitoring/ai_metrics.db"
+    AI_METRICS_RETENTION_DAYS: int = 30
     
     # AWS S3
     AWS_ACCESS_KEY_ID: str = ""
@@ -116,6 +132,8 @@ class Settings(BaseSettings):
     APIFY_MAX_RETRIES: int = 3
     APIFY_RATE_LIMIT_REQUESTS: int = 100
     APIFY_RATE_LIMIT_WINDOW: int = 60  # seconds
+    APIFY_DATASET_PAGE_SIZE: int = 1000    # Dataset items per page when streaming results
+    APIFY_DATASET_CONCURRENCY: int = 4     # Pages fetched ahead while earlier pages are ingested
     
     # Analytics & ML Configuration
     ML_MODELS_DIR: str = "app/ml_models"
@@ -148,6 +166,11 @@ class Settings(BaseSettings):
     MAX_IMAGE_SIZE_MB: int = 10   # 10MB max image size
     SUPPORTED_VIDEO_FORMATS: List[str] = ["mp4", "mov", "avi"]
     SUPPORTED_IMAGE_FORMATS: List[str] = ["jpg", "jpeg", "png"]
+    ASSET_ANALYSIS_WORKERS: int = 0  # Image analysis pool size; 0 = one per core
+    ASSET_STORE_DIR: str = "/tmp/viralos_assets/store"
+    ASSET_STORE_MAX_SIZE_MB: int = 5120
+    ASSET_STORE_URL_TTL: int = 604800  # 7 days before a source URL is re-fetched
+    ASSET_PHASH_MAX_DISTANCE: int = 6  # Bits two images may differ by and count as duplicates
     
     # Posting Strategy Configuration
     DEFAULT_POSTING_STRATEGY: str = "optimized"  # simultaneous, sequential, optimized, a_b_test
@@ -170,6 +193,25 @@ class Settings(BaseSettings):
     AUTO_MODERATION_ENABLED: bool = True
     ENGAGEMENT_THRESHOLD_FOR_PROMOTION: float = 5.0  # Minimum engagement rate for promotion
     
+    # Metrics Export
+    CELERY_METRICS_PORT: int = Field(default=9808, env="CELERY_METRICS_PORT")
+    CELERY_METRICS_ENABLED: bool = True
+    # Per-container directory for multiprocess metrics; must be set in the environment
+    # before the worker starts (see app.core.metrics)
+    PROMETHEUS_MULTIPROC_DIR: str = ""
+    
+    # Celery Results
+    CELERY_RESULT_EXPIRES: int = 86400            # Result metadata and blobs are kept for a day
+    CELERY_RESULT_INLINE_MAX_BYTES: int = 16384   # Larger compressed results go to the result store
+    CELERY_RESULT_STORE_DIR: str = "/tmp/viralos_results"  # Must be shared by workers and the API
+    
+    # Media Job Scheduling (host-wide ffmpeg admission control)
+    MEDIA_SCHEDULER_LEDGER_PATH: str = "/tmp/viralos_media/jobs.json"  # Must be shared by workers and the API
+    MEDIA_SCHEDULER_LEASE_SECONDS: int = 30  # Jobs not renewed within this are dropped from the ledger
+    MEDIA_CPU_CAPACITY: int = 0          # 0 = all cores available to the process
+    MEDIA_MEMORY_CAPACITY_MB: int = 0    # 0 = physical memory
+    MEDIA_INTERACTIVE_RESERVED_CPU: int = 1
+    
     # Performance Optimization
     ENABLE_CONTENT_CACHING: bool = True
     CACHE_TTL_SOCIAL_MEDIA: int = 1800  # 30 minutes
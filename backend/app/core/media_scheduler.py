@@ -0,0 +1,346 @@
+"""
+Host-wide media job scheduler
+
+Every ffmpeg/ffprobe run on a node is admitted through a shared ledger file so
+that API processes and Celery workers together stay within the host's CPU and
+memory. Jobs declare a priority class and a CPU/memory estimate; a job starts
+only when its minimum thread count and memory fit, and is granted as many
+encoder threads as are free up to its maximum.
+
+Priority is strict across processes: a job is not admitted while a job of a
+higher class (or an earlier job of the same class) is waiting. Batch work can
+never take the last ``interactive_reserved_cpu`` cores, so thumbnails and
+probes are not stuck behind long renders.
+
+The ledger lives on a volume shared by every container that runs media jobs.
+Process ids are not unique across containers, so each entry records a
+host-unique owner id and holds a lease that its process renews while the job
+waits or runs; entries whose lease lapsed (crashed or killed processes) are
+dropped.
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.core.metrics import observe_ffmpeg_run, observe_media_job
+
+logger = logging.getLogger(__name__)
+
+
+class JobPriority(IntEnum):
+    """Priority classes; lower values are admitted first"""
+    INTERACTIVE = 0  # Thumbnails, probes - a user is waiting
+    STANDARD = 1     # Upload processing
+    BATCH = 2        # Full renders
+
+
+@dataclass
+class MediaJobGrant:
+    """Resources granted to an admitted job"""
+    job_id: str
+    threads: int
+    memory_mb: int
+    queue_wait: float
+
+
+def detect_cpu_capacity() -> int:
+    """Cores available to this process"""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+def detect_memory_capacity_mb() -> int:
+    """Physical memory in MB, or a conservative default if unknown"""
+    try:
+        return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / (1024 * 1024))
+    except (ValueError, OSError, AttributeError):
+        return 4096
+
+
+def estimate_encode_memory_mb(width: int = 1920, height: int = 1080, threads: int = 4) -> int:
+    """Rough x264 working-set estimate: lookahead and reference frames per thread"""
+    frame_mb = width * height * 1.5 / (1024 * 1024)
+    return int(150 + frame_mb * (40 + 4 * threads))
+
+
+class MediaJobScheduler:
+    """Admits media jobs against host-wide CPU and memory budgets"""
+
+    def __init__(
+        self,
+        ledger_path: Union[str, Path],
+        cpu_capacity: Optional[int] = None,
+        memory_capacity_mb: Optional[int] = None,
+        interactive_reserved_cpu: int = 1,
+        poll_interval: float = 0.05,
+        lease_seconds: float = 30.0
+    ):
+        self.ledger_path = Path(ledger_path)
+        self.lock_path = self.ledger_path.with_suffix(".lock")
+        self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.cpu_capacity = cpu_capacity or detect_cpu_capacity()
+        self.memory_capacity_mb = memory_capacity_mb or detect_memory_capacity_mb()
+        self.interactive_reserved_cpu = min(interactive_reserved_cpu, self.cpu_capacity - 1)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = lease_seconds / 3
+        self.owner_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self.stats: Dict[str, int] = {"admitted": 0, "completed": 0, "failed": 0, "cancelled_while_queued": 0}
+
+    def _update_ledger(self, update: Callable[[Dict[str, Dict[str, Any]]], Any]) -> Any:
+        """Apply ``update`` to the job table under an exclusive host-wide lock"""
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    jobs = json.loads(self.ledger_path.read_text())
+                except (OSError, ValueError):
+                    jobs = {}
+
+                self._prune(jobs)
+                result = update(jobs)
+
+                tmp_path = self.ledger_path.with_suffix(".tmp")
+                tmp_path.write_text(json.dumps(jobs))
+                os.replace(tmp_path, self.ledger_path)
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _prune(self, jobs: Dict[str, Dict[str, Any]]):
+        """Drop entries whose lease was not renewed within ``lease_seconds``"""
+        now = time.time()
+        for job_id, job in list(jobs.items()):
+            if now - job.get("heartbeat", job["since"]) > self.lease_seconds:
+                logger.warning(f"Dropping media job {job.get('name')} of {job.get('owner')}: lease expired")
+                del jobs[job_id]
+
+    async def _renew_lease(self, touch: Callable[[Dict[str, Dict[str, Any]]], Any]):
+        """Renew a job's lease every ``heartbeat_interval`` until cancelled"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await asyncio.to_thread(self._update_ledger, touch)
+
+    def _try_admit(
+        self,
+        jobs: Dict[str, Dict[str, Any]],
+        job_id: str,
+        priority: JobPriority,
+        cpu_min: int,
+        cpu_max: int,
+        memory_mb: int
+    ) -> Optional[int]:
+        me = jobs[job_id]
+        queue_position = (me["priority"], me["since"])
+        for other_id, other in jobs.items():
+            if other_id != job_id and other["state"] == "waiting" and (other["priority"], other["since"]) < queue_position:
+                return None
+
+        running = [job for job in jobs.values() if job["state"] == "running"]
+        cpu_limit = self.cpu_capacity
+        if priority != JobPriority.INTERACTIVE:
+            cpu_limit -= self.interactive_reserved_cpu
+
+        free_cpu = cpu_limit - sum(job["threads"] for job in running)
+        free_memory = self.memory_capacity_mb - sum(job["memory_mb"] for job in running)
+
+        # A job larger than the whole budget may still run once the host is idle
+        fits_memory = memory_mb <= free_memory or not running
+        if free_cpu < min(cpu_min, cpu_limit) or not fits_memory:
+            return None
+
+        threads = max(1, min(cpu_max, free_cpu))
+        me.update(state="running", threads=threads, started=time.time())
+        return threads
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        name: str,
+        priority: JobPriority = JobPriority.STANDARD,
+        cpu_min: int = 1,
+        cpu_max: int = 1,
+        memory_mb: int = 256
+    ) -> AsyncIterator[MediaJobGrant]:
+        """
+        Wait for admission, then hold the granted resources for the block
+
+        Args:
+            name: Job kind, for logging
+            priority: Priority class
+            cpu_min: Threads required before the job may start
+            cpu_max: Threads the job can make use of
+            memory_mb: Estimated peak memory
+
+        Yields:
+            MediaJobGrant with the thread count to pass to ffmpeg
+        """
+        job_id = uuid.uuid4().hex
+        cpu_min = max(1, cpu_min)
+        cpu_max = max(cpu_min, cpu_max)
+        enqueued = time.perf_counter()
+
+        entry = {
+            "name": name,
+            "owner": self.owner_id,
+            "priority": int(priority),
+            "state": "waiting",
+            "threads": 0,
+            "memory_mb": memory_mb,
+            "since": time.time()
+        }
+
+        released = False
+
+        def touch(jobs):
+            if released:
+                # A renewal still in its thread must not resurrect a released job
+                return
+            if job_id not in jobs:
+                # The lease lapsed, e.g. while the event loop was blocked
+                logger.warning(f"Media job {name} lost its lease; re-registering")
+            jobs[job_id] = {**jobs.get(job_id, entry), "heartbeat": time.time()}
+
+        def poll(jobs):
+            touch(jobs)
+            return self._try_admit(jobs, job_id, priority, cpu_min, cpu_max, memory_mb)
+
+        def release(jobs):
+            jobs.pop(job_id, None)
+
+        await asyncio.to_thread(self._update_ledger, touch)
+
+        admitted = False
+        lease = None
+        try:
+            delay = self.poll_interval / 5
+            while True:
+                threads = await asyncio.to_thread(self._update_ledger, poll)
+                if threads is not None:
+                    break
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.poll_interval)
+
+            admitted = True
+            entry.update(state="running", threads=threads)
+            lease = asyncio.create_task(self._renew_lease(touch))
+            self.stats["admitted"] += 1
+            grant = MediaJobGrant(
+                job_id=job_id,
+                threads=threads,
+                memory_mb=memory_mb,
+                queue_wait=time.perf_counter() - enqueued
+            )
+            logger.debug(f"Media job {name} admitted with {threads} threads after {grant.queue_wait:.2f}s")
+
+            run_start = time.perf_counter()
+            success = False
+            try:
+                yield grant
+                success = True
+            finally:
+                self.stats["completed" if success else "failed"] += 1
+                observe_media_job(priority.name.lower(), grant.queue_wait, time.perf_counter() - run_start, success)
+        finally:
+            released = True
+            if lease is not None:
+                lease.cancel()
+            if not admitted:
+                self.stats["cancelled_while_queued"] += 1
+            await asyncio.shield(asyncio.to_thread(self._update_ledger, release))
+
+    async def run(
+        self,
+        cmd: Union[List[str], Callable[[int], List[str]]],
+        name: str,
+        priority: JobPriority = JobPriority.STANDARD,
+        cpu_min: int = 1,
+        cpu_max: int = 1,
+        memory_mb: int = 256,
+        timeout: Optional[float] = None
+    ) -> Tuple[int, bytes, bytes]:
+        """
+        Run an ffmpeg/ffprobe command once admitted
+
+        ``cmd`` is either an argument list or a builder called with the granted
+        thread count. A plain ffmpeg argument list without ``-threads`` gets the
+        grant inserted before its (last) output path.
+
+        Returns:
+            Tuple of (returncode, stdout, stderr)
+        """
+        async with self.slot(name, priority, cpu_min, cpu_max, memory_mb) as grant:
+            if callable(cmd):
+                args = cmd(grant.threads)
+            else:
+                args = list(cmd)
+                if os.path.basename(args[0]) == "ffmpeg" and "-threads" not in args:
+                    args[-1:-1] = ["-threads", str(grant.threads)]
+
+            start_time = time.perf_counter()
+            success = False
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *args,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                try:
+                    stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+                except (asyncio.TimeoutError, asyncio.CancelledError):
+                    process.kill()
+                    await process.wait()
+                    raise
+
+                success = process.returncode == 0
+                return process.returncode, stdout, stderr
+            finally:
+                observe_ffmpeg_run(args[0], time.perf_counter() - start_time, success)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Local counters plus a snapshot of the host-wide job table"""
+        jobs = self._update_ledger(lambda jobs: dict(jobs))
+        running = [job for job in jobs.values() if job["state"] == "running"]
+        return {
+            **self.stats,
+            "cpu_capacity": self.cpu_capacity,
+            "memory_capacity_mb": self.memory_capacity_mb,
+            "running_jobs": len(running),
+            "waiting_jobs": len(jobs) - len(running),
+            "threads_in_use": sum(job["threads"] for job in running),
+            "memory_reserved_mb": sum(job["memory_mb"] for job in running)
+        }
+
+
+# Global scheduler instance
+_media_scheduler: Optional[MediaJobScheduler] = None
+
+
+def get_media_scheduler() -> MediaJobScheduler:
+    """Get global media job scheduler instance"""
+    global _media_scheduler
+    if _media_scheduler is None:
+        _media_scheduler = MediaJobScheduler(
+            settings.MEDIA_SCHEDULER_LEDGER_PATH,
+            cpu_capacity=settings.MEDIA_CPU_CAPACITY or None,
+            memory_capacity_mb=settings.MEDIA_MEMORY_CAPACITY_MB or None,
+            interactive_reserved_cpu=settings.MEDIA_INTERACTIVE_RESERVED_CPU,
+            lease_seconds=settings.MEDIA_SCHEDULER_LEASE_SECONDS
+        )
+    return _media_scheduler
@@ -0,0 +1,295 @@
+"""
+Unified Prometheus metrics registry
+
+Single place where hot-path latency histograms and counters are defined for
+LLM calls, embeddings, cache tiers, scraper fetches, ffmpeg runs, media job
+scheduling, Celery queues and DB queries. Histograms use log-linear (HDR-style) buckets so
+p50/p95/p99 can be derived with ``histogram_quantile`` at a bounded relative
+error.
+
+Exposed through ``GET /metrics`` on the API and through a sidecar HTTP server
+started by Celery workers (see ``app.core.celery_app``).
+
+Prefork workers record metrics in their pool processes, which the sidecar in
+the main process cannot see. Worker containers therefore set
+``PROMETHEUS_MULTIPROC_DIR`` (see ``docker-compose.yml``): every process then
+writes its samples to files in that directory and the sidecar aggregates them
+on scrape. The variable must be set before this module is imported, and the
+directory is wiped when a worker starts so samples of a previous run are not
+exported again.
+"""
+
+import os
+from pathlib import Path
+from typing import List, Tuple
+import logging
+
+# Multiprocess samples are written from the first metric update on
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def hdr_buckets(
+    min_value: float = 0.001,
+    max_value: float = 600.0,
+    steps_per_decade: Tuple[float, ...] = (1.0, 1.5, 2.0, 3.0, 5.0, 7.5)
+) -> List[float]:
+    """Log-linear bucket boundaries with a fixed relative precision per decade"""
+    buckets = []
+    decade = min_value
+    while decade <= max_value:
+        for step in steps_per_decade:
+            boundary = round(decade * step, 6)
+            if min_value <= boundary <= max_value:
+                buckets.append(boundary)
+        decade *= 10
+    return sorted(set(buckets))
+
+
+LATENCY_BUCKETS = hdr_buckets()
+DB_LATENCY_BUCKETS = hdr_buckets(min_value=0.0001, max_value=60.0)
+
+
+# AI providers
+LLM_REQUEST_DURATION = Histogram(
+    "viralos_llm_request_duration_seconds",
+    "LLM text generation latency",
+    ["provider", "model", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "viralos_llm_tokens_total",
+    "LLM tokens consumed",
+    ["provider", "model", "direction"],
+)
+LLM_COST = Counter(
+    "viralos_llm_cost_usd_total",
+    "Estimated LLM spend in USD",
+    ["provider", "model"],
+)
+EMBEDDING_REQUEST_DURATION = Histogram(
+    "viralos_embedding_request_duration_seconds",
+    "Embedding request latency",
+    ["provider", "model", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+PROMPT_TOKENS = Counter(
+    "viralos_prompt_tokens_total",
+    "Prompt tokens of compiled templates: all, in the cacheable prefix, and served from the provider cache",
+    ["template", "segment"],
+)
+PROMPT_PREFIX_RENDERS = Counter(
+    "viralos_prompt_prefix_renders_total",
+    "Static prompt prefix renders by local prefix cache result",
+    ["template", "result"],
+)
+
+# Caching
+CACHE_REQUESTS = Counter(
+    "viralos_cache_requests_total",
+    "Cache lookups by tier and result",
+    ["tier", "result"],
+)
+CACHE_LOOKUP_DURATION = Histogram(
+    "viralos_cache_lookup_duration_seconds",
+    "Cache lookup latency by tier",
+    ["tier"],
+    buckets=DB_LATENCY_BUCKETS,
+)
+ASSET_STORE_EVICTIONS = Counter(
+    "viralos_asset_store_evictions_total",
+    "Blobs evicted from the local content-addressed asset store",
+)
+
+# Scraping
+SCRAPER_FETCH_DURATION = Histogram(
+    "viralos_scraper_fetch_duration_seconds",
+    "Scraper page fetch latency including retries",
+    ["scraper", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Media processing
+FFMPEG_RUN_DURATION = Histogram(
+    "viralos_ffmpeg_run_duration_seconds",
+    "ffmpeg/ffprobe process wall-clock time",
+    ["executable", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+MEDIA_JOB_QUEUE_WAIT = Histogram(
+    "viralos_media_job_queue_wait_seconds",
+    "Time media jobs wait for host-wide admission",
+    ["priority"],
+    buckets=LATENCY_BUCKETS,
+)
+MEDIA_JOB_RUN_DURATION = Histogram(
+    "viralos_media_job_run_seconds",
+    "Time media jobs hold their admitted resources",
+    ["priority", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Celery queues
+TASK_QUEUE_WAIT = Histogram(
+    "viralos_task_queue_wait_seconds",
+    "Time Celery tasks wait between publish and start, by workload queue",
+    ["queue", "task"],
+    buckets=LATENCY_BUCKETS,
+)
+TASK_RUN_DURATION = Histogram(
+    "viralos_task_run_seconds",
+    "Celery task execution time, by workload queue",
+    ["queue", "task", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Database
+DB_QUERY_DURATION = Histogram(
+    "viralos_db_query_duration_seconds",
+    "Database statement latency",
+    ["statement"],
+    buckets=DB_LATENCY_BUCKETS,
+)
+
+
+def _outcome(success: bool) -> str:
+    return "success" if success else "error"
+
+
+def observe_llm_call(
+    provider: str,
+    model: str,
+    latency: float,
+    success: bool,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+    cost: float = 0.0
+):
+    """Record a single LLM generation call"""
+    provider = getattr(provider, "value", provider)
+    LLM_REQUEST_DURATION.labels(provider, model, _outcome(success)).observe(latency)
+    if input_tokens:
+        LLM_TOKENS.labels(provider, model, "input").inc(input_tokens)
+    if output_tokens:
+        LLM_TOKENS.labels(provider, model, "output").inc(output_tokens)
+    if cost:
+        LLM_COST.labels(provider, model).inc(cost)
+
+
+def observe_embedding_call(provider: str, model: str, latency: float, success: bool):
+    """Record a single embedding request"""
+    EMBEDDING_REQUEST_DURATION.labels(getattr(provider, "value", provider), model, _outcome(success)).observe(latency)
+
+
+def observe_prompt_tokens(template: str, prompt_tokens: int, cacheable_tokens: int, cached_tokens: int):
+    """Record the prompt token split of one templated request"""
+    PROMPT_TOKENS.labels(template, "total").inc(prompt_tokens)
+    PROMPT_TOKENS.labels(template, "cacheable").inc(cacheable_tokens)
+    PROMPT_TOKENS.labels(template, "cached").inc(cached_tokens)
+
+
+def record_prompt_prefix_render(template: str, hit: bool):
+    """Record whether a static prompt prefix came from the local prefix cache"""
+    PROMPT_PREFIX_RENDERS.labels(template, "hit" if hit else "miss").inc()
+
+
+def record_cache_lookup(tier: str, hit: bool, latency: float = None):
+    """Record a cache lookup against a specific tier"""
+    CACHE_REQUESTS.labels(tier, "hit" if hit else "miss").inc()
+    if latency is not None:
+        CACHE_LOOKUP_DURATION.labels(tier).observe(latency)
+
+
+def record_asset_evictions(count: int):
+    """Record blobs evicted from the asset store"""
+    ASSET_STORE_EVICTIONS.inc(count)
+
+
+def observe_scraper_fetch(scraper: str, latency: float, success: bool):
+    """Record a scraper page fetch"""
+    SCRAPER_FETCH_DURATION.labels(scraper, _outcome(success)).observe(latency)
+
+
+def observe_ffmpeg_run(executable: str, latency: float, success: bool):
+    """Record an ffmpeg/ffprobe invocation"""
+    FFMPEG_RUN_DURATION.labels(os.path.basename(executable), _outcome(success)).observe(latency)
+
+
+def observe_media_job(priority: str, queue_wait: float, run_time: float, success: bool):
+    """Record queue wait and run time of a scheduled media job"""
+    MEDIA_JOB_QUEUE_WAIT.labels(priority).observe(queue_wait)
+    MEDIA_JOB_RUN_DURATION.labels(priority, _outcome(success)).observe(run_time)
+
+
+def observe_task_queue_wait(queue: str, task: str, wait: float):
+    """Record how long a task waited in its queue"""
+    TASK_QUEUE_WAIT.labels(queue, task).observe(max(wait, 0.0))
+
+
+def observe_task_run(queue: str, task: str, run_time: float, success: bool):
+    """Record the execution time of a task"""
+    TASK_RUN_DURATION.labels(queue, task, _outcome(success)).observe(run_time)
+
+
+_STATEMENT_TYPES = ("select", "insert", "update", "delete")
+
+
+def observe_db_query(statement: str, latency: float):
+    """Record a DB statement, labelled by its leading SQL verb"""
+    verb = statement.lstrip()[:6].lower()
+    DB_QUERY_DURATION.labels(verb if verb in _STATEMENT_TYPES else "other").observe(latency)
+
+
+def get_export_registry() -> CollectorRegistry:
+    """Registry to export, aggregating across processes in multiprocess mode"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Render the current metrics in the Prometheus text format"""
+    return generate_latest(get_export_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int, addr: str = "0.0.0.0") -> bool:
+    """Start a standalone metrics HTTP server (used by Celery workers)"""
+    try:
+        start_http_server(port, addr=addr, registry=get_export_registry())
+        logger.info(f"Metrics server listening on {addr}:{port}")
+        return True
+    except OSError as e:
+        logger.warning(f"Failed to start metrics server on port {port}: {e}")
+        return False
+
+
+def reset_multiprocess_dir():
+    """Remove multiprocess metric files left by earlier runs, keeping this process's own"""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return
+    own_suffix = f"_{os.getpid()}.db"
+    for path in Path(directory).glob("*.db"):
+        if not path.name.endswith(own_suffix):
+            path.unlink(missing_ok=True)
+
+
+def mark_process_dead(pid: int):
+    """Clean up multiprocess metric files for an exited worker process"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
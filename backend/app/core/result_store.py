@@ -0,0 +1,167 @@
+"""
+Compact Celery result payloads with external storage for large results
+
+Results are serialized as compressed JSON (zstd when ``zstandard`` is
+installed, zlib otherwise) instead of plain JSON. Successful results whose
+compressed size exceeds ``CELERY_RESULT_INLINE_MAX_BYTES`` are written to a
+content-addressed blob directory; Redis then only keeps a small reference,
+so status polls never move scraped product lists or UGC batches through
+Redis. Blobs expire with the task metadata via the ``result_store_cleanup``
+maintenance task.
+"""
+
+import hashlib
+import logging
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from celery import states
+from celery.backends.redis import RedisBackend
+from kombu.serialization import register
+from kombu.utils.json import dumps as json_dumps, loads as json_loads
+
+from app.core.config import settings
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SERIALIZER_NAME = "zjson"
+CONTENT_TYPE = "application/x-viralos-zjson"
+REFERENCE_KEY = "__external_result__"
+
+# First byte of an encoded payload names its codec
+_ZSTD = b"z"
+_ZLIB = b"d"
+
+
+def encode_payload(obj: Any) -> bytes:
+    """Compressed JSON; datetimes, UUIDs and decimals round-trip like Celery's json"""
+    data = json_dumps(obj).encode("utf-8")
+    if ZSTD_AVAILABLE:
+        return _ZSTD + zstandard.ZstdCompressor(level=3).compress(data)
+    return _ZLIB + zlib.compress(data, 6)
+
+
+def decode_payload(payload: bytes) -> Any:
+    codec, body = payload[:1], payload[1:]
+    if codec == _ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstd-compressed result payload but zstandard is not installed")
+        data = zstandard.ZstdDecompressor().decompress(body)
+    elif codec == _ZLIB:
+        data = zlib.decompress(body)
+    else:
+        raise ValueError(f"Unknown result payload codec {codec!r}")
+    return json_loads(data.decode("utf-8"))
+
+
+def register_result_serializer():
+    register(
+        SERIALIZER_NAME,
+        encode_payload,
+        decode_payload,
+        content_type=CONTENT_TYPE,
+        content_encoding="binary",
+    )
+
+
+class ResultStore:
+    """Content-addressed blob directory for large task results"""
+
+    def __init__(self, root: Union[str, Path], ttl: int = 86400):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.bin"
+
+    def put(self, payload: bytes) -> str:
+        key = hashlib.sha256(payload).hexdigest()
+        path = self._path(key)
+        if path.exists():
+            os.utime(path)  # Restart the TTL of a shared blob
+            return key
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+        return key
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def cleanup(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Delete blobs older than the TTL"""
+        cutoff = (now or time.time()) - self.ttl
+        removed = freed = 0
+        for path in self.root.glob("*/*"):
+            try:
+                stat = path.stat()
+                if stat.st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+                    freed += stat.st_size
+            except FileNotFoundError:
+                continue
+        return {"removed": removed, "bytes_freed": freed}
+
+
+class ExternalResultRedisBackend(RedisBackend):
+    """
+    Redis result backend that keeps large successful results out of Redis
+
+    Select it with a ``app.core.result_store:ExternalResultRedisBackend+redis://``
+    result backend URL.
+    """
+
+    def __init__(self, *args, inline_max_bytes: Optional[int] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.inline_max_bytes = (
+            settings.CELERY_RESULT_INLINE_MAX_BYTES if inline_max_bytes is None else inline_max_bytes
+        )
+        self._store: Optional[ResultStore] = None
+
+    @property
+    def store(self) -> ResultStore:
+        if self._store is None:
+            self._store = get_result_store()
+        return self._store
+
+    def encode_result(self, result, state):
+        result = super().encode_result(result, state)
+        if state != states.SUCCESS or result is None:
+            return result
+
+        payload = encode_payload(result)
+        if len(payload) <= self.inline_max_bytes:
+            return result
+        return {REFERENCE_KEY: self.store.put(payload), "bytes": len(payload)}
+
+    def meta_from_decoded(self, meta):
+        meta = super().meta_from_decoded(meta)
+        result = meta.get("result")
+        if meta.get("status") == states.SUCCESS and isinstance(result, dict) and REFERENCE_KEY in result:
+            payload = self.store.get(result[REFERENCE_KEY])
+            if payload is None:
+                logger.warning(f"Result blob {result[REFERENCE_KEY]} of task {meta.get('task_id')} has expired")
+                meta["result"] = None
+            else:
+                meta["result"] = decode_payload(payload)
+        return meta
+
+
+def get_result_store() -> ResultStore:
+    return ResultStore(settings.CELERY_RESULT_STORE_DIR, ttl=settings.CELERY_RESULT_EXPIRES)
@@ -7,10 +7,13 @@ import logging
 import os
 import re
 import shlex
+import time
 from pathlib import Path
 from typing import List, Optional, Union, Dict, Any
 import tempfile
 
+from app.core.metrics import observe_ffmpeg_run
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,7 +31,8 @@ class SecureSubprocessExecutor:
     SAFE_FFMPEG_ARGS = {
         "-i", "-map", "-c:v", "-c:a", "-preset", "-crf", "-b:a", "-r", "-s",
         "-filter_complex", "-af", "-vf", "-t", "-ss", "-to", "-y", "-f",
-        "-movflags", "-pix_fmt", "-profile:v", "-level", "-maxrate", "-bufsize"
+        "-movflags", "-pix_fmt", "-profile:v", "-level", "-maxrate", "-bufsize",
+        "-threads"
     }
     
     @classmethod
@@ -136,6 +140,8 @@ class SecureSubprocessExecutor:
         
         logger.info(f"Executing secure subprocess: {' '.join(cmd[:5])}...")  # Log first 5 args only
         
+        start_time = time.perf_counter()
+        success = False
         try:
             process = await asyncio.create_subprocess_exec(
                 *cmd,
@@ -155,16 +161,20 @@ class SecureSubprocessExecutor:
                 await process.wait()
                 raise RuntimeError(f"Process timed out after {timeout} seconds")
             
+            success = process.returncode == 0
             return {
                 "returncode": process.returncode,
                 "stdout": stdout.decode() if stdout else "",
                 "stderr": stderr.decode() if stderr else "",
-                "success": process.returncode == 0
+                "success": success
             }
             
         except Exception as e:
             logger.error(f"Subprocess execution failed: {e}")
             raise RuntimeError(f"Subprocess execution failed: {e}")
+        finally:
+            if "ffmpeg" in executable or "ffprobe" in executable:
+                observe_ffmpeg_run(executable, time.perf_counter() - start_time, success)
 
 
 class InputValidator:
@@ -0,0 +1,156 @@
+"""
+Celery queues, routes and per-class execution limits
+
+Tasks are split into workload classes, each with its own queue and its own
+worker deployment, so a 30-minute video assembly or a 2,000-URL catalog scrape
+never sits in front of a few-second script generation a user is waiting on:
+
+- ``interactive``: short AI calls behind a UI action; tight time limits
+- ``scraping``: I/O-bound fetching; each task fans out on the worker's event
+  loop, so a few processes with deeper prefetch keep many requests in flight
+- ``media``: ffmpeg/CPU-bound rendering; one task per core, no prefetch
+- ``maintenance``: periodic housekeeping on a single low-priority process
+
+Within a queue, messages carry a default priority (Redis: 0 is highest), so a
+brand onboarding scrape is served before a nightly price check.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from kombu import Queue
+
+DEFAULT_QUEUE = "interactive"
+
+# Redis emulates priorities with one list per step; priorities round down to a step
+PRIORITY_STEPS = [0, 3, 6, 9]
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 3
+PRIORITY_LOW = 6
+PRIORITY_BACKGROUND = 9
+
+
+@dataclass(frozen=True)
+class WorkloadClass:
+    """A queue together with the limits and worker profile of its tasks"""
+    queue: str
+    time_limit: int
+    soft_time_limit: int
+    pool: str
+    concurrency: int
+    prefetch_multiplier: int
+    max_tasks_per_child: int
+    # Task name -> default priority
+    tasks: Dict[str, int] = field(default_factory=dict)
+
+    def worker_args(self) -> List[str]:
+        """Command-line arguments for a worker dedicated to this class"""
+        return [
+            "-Q", self.queue,
+            "-P", self.pool,
+            "-c", str(self.concurrency),
+            f"--prefetch-multiplier={self.prefetch_multiplier}",
+            f"--max-tasks-per-child={self.max_tasks_per_child}",
+            "-n", f"{self.queue}@%h",
+        ]
+
+
+WORKLOAD_CLASSES: Tuple[WorkloadClass, ...] = (
+    WorkloadClass(
+        queue="interactive",
+        time_limit=3 * 60,
+        soft_time_limit=2 * 60,
+        pool="prefork",
+        concurrency=8,
+        prefetch_multiplier=1,
+        max_tasks_per_child=1000,
+        tasks={
+            "video_generation.generate_script": PRIORITY_HIGH,
+            "generate_ideas": PRIORITY_HIGH,
+            "generate_blueprint": PRIORITY_HIGH,
+            "assimilate_brand": PRIORITY_HIGH,
+            "brand_scraping_failed": PRIORITY_HIGH,
+            "video_generation.product_to_video_workflow": PRIORITY_NORMAL,
+            "video_generation.multi_variant_generation": PRIORITY_NORMAL,
+        },
+    ),
+    WorkloadClass(
+        queue="scraping",
+        time_limit=45 * 60,
+        soft_time_limit=40 * 60,
+        pool="prefork",
+        concurrency=4,
+        prefetch_multiplier=4,
+        max_tasks_per_child=200,
+        tasks={
+            "enhanced_brand_scraping": PRIORITY_HIGH,
+            "competitor_discovery": PRIORITY_NORMAL,
+            "product_catalog_scraping": PRIORITY_LOW,
+            "price_monitoring": PRIORITY_BACKGROUND,
+            "ingest_apify_dataset": PRIORITY_NORMAL,
+            "refresh_trend_snapshots": PRIORITY_LOW,
+        },
+    ),
+    WorkloadClass(
+        queue="media",
+        time_limit=40 * 60,
+        soft_time_limit=35 * 60,
+        pool="prefork",
+        concurrency=2,
+        prefetch_multiplier=1,
+        max_tasks_per_child=50,
+        tasks={
+            "video_generation.process_product_assets": PRIORITY_HIGH,
+            "video_generation.generate_video": PRIORITY_NORMAL,
+            "video_generation.generate_ugc_batch": PRIORITY_NORMAL,
+            "video_generation.assemble_video": PRIORITY_NORMAL,
+            "generate_video": PRIORITY_NORMAL,
+        },
+    ),
+    WorkloadClass(
+        queue="maintenance",
+        time_limit=2 * 60 * 60,
+        soft_time_limit=110 * 60,
+        pool="solo",
+        concurrency=1,
+        prefetch_multiplier=1,
+        max_tasks_per_child=100,
+        tasks={
+            "price_history_maintenance": PRIORITY_BACKGROUND,
+            "result_store_cleanup": PRIORITY_BACKGROUND,
+            "video_generation.cleanup_old_projects": PRIORITY_BACKGROUND,
+            "video_generation.monitor_provider_health": PRIORITY_BACKGROUND,
+        },
+    ),
+)
+
+WORKLOADS: Dict[str, WorkloadClass] = {workload.queue: workload for workload in WORKLOAD_CLASSES}
+
+
+def build_task_queues() -> Tuple[Queue, ...]:
+    return tuple(Queue(workload.queue, routing_key=workload.queue) for workload in WORKLOAD_CLASSES)
+
+
+def build_task_routes() -> Dict[str, Dict[str, Any]]:
+    """Route every known task to its class queue with its default priority"""
+    return {
+        name: {"queue": workload.queue, "routing_key": workload.queue, "priority": priority}
+        for workload in WORKLOAD_CLASSES
+        for name, priority in workload.tasks.items()
+    }
+
+
+def build_task_annotations() -> Dict[str, Dict[str, Any]]:
+    """Per-task time limits taken from the task's class"""
+    return {
+        name: {"time_limit": workload.time_limit, "soft_time_limit": workload.soft_time_limit}
+        for workload in WORKLOAD_CLASSES
+        for name in workload.tasks
+    }
+
+
+def queue_for_task(name: str) -> str:
+    for workload in WORKLOAD_CLASSES:
+        if name in workload.tasks:
+            return workload.queue
+    return DEFAULT_QUEUE
@@ -1,8 +1,14 @@
+from typing import Any, AsyncIterator, Callable, Optional
+
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
+from app.core.async_runtime import on_loop_shutdown
 from app.core.config import settings
+from app.core.metrics import observe_db_query
 import logging
 import time
 
@@ -24,16 +30,21 @@ engine = create_engine(
 )
 
 # Query performance monitoring
-@event.listens_for(engine, "before_cursor_execute")
 def receive_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
     context._query_start_time = time.time()
 
-@event.listens_for(engine, "after_cursor_execute")
 def receive_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
     total = time.time() - context._query_start_time
+    observe_db_query(statement, total)
     if total > 0.5:  # Log slow queries (>500ms)
         logger.warning(f"Slow query detected: {total:.2f}s - {statement[:200]}...")
 
+def _monitor_queries(target_engine):
+    event.listen(target_engine, "before_cursor_execute", receive_before_cursor_execute)
+    event.listen(target_engine, "after_cursor_execute", receive_after_cursor_execute)
+
+_monitor_queries(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -47,4 +58,85 @@ def get_db():
         db.rollback()
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def in_session(operation: Callable[..., Any], *args: Any) -> Any:
+    """Run ``operation(db, *args)`` in a short-lived session, e.g. via ``asyncio.to_thread``"""
+    db = SessionLocal()
+    try:
+        return operation(db, *args)
+    finally:
+        db.close()
+
+
+# Async engine for async endpoints; created on first use so processes that
+# only use the sync engine (Celery workers, scripts) don't need asyncpg
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_database_url() -> str:
+    """ASYNC_DATABASE_URL, or DATABASE_URL with its driver swapped for an async one"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    return url.set(drivername=_ASYNC_DRIVERS.get(url.drivername, url.drivername)).render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    """Get global async engine instance"""
+    global _async_engine
+    if _async_engine is None:
+        url = get_async_database_url()
+        options = {"pool_pre_ping": True, "echo": False}
+        if url.startswith("postgresql"):
+            options.update(
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                connect_args={
+                    "timeout": 10,
+                    "server_settings": {"application_name": "viralos_backend_async"}
+                }
+            )
+        _async_engine = create_async_engine(url, **options)
+        _monitor_queries(_async_engine.sync_engine)
+        on_loop_shutdown(dispose_async_engine)
+    return _async_engine
+
+
+async def dispose_async_engine():
+    """Close pooled async connections; the engine is recreated on next use"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    global _async_session_factory
+    if _async_session_factory is None:
+        # expire_on_commit=False keeps loaded rows readable after commit without a lazy refresh
+        _async_session_factory = async_sessionmaker(
+            get_async_engine(), class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Async session dependency; queries don't block the event loop"""
+    async with get_async_session_factory()() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            await db.rollback()
+            raise
\ No newline at end of file
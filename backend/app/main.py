@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.exc import SQLAlchemyError
 from slowapi.errors import RateLimitExceeded
@@ -11,6 +11,7 @@ from app.core.exceptions import (
 )
 from app.core.rate_limiting import limiter, custom_rate_limit_exceeded_handler
 from app.core.resource_manager import get_resource_manager, cleanup_all_resources
+from app.core.metrics import render_latest
 from app.api.v1.api import api_router
 
 # Set up logging
@@ -67,6 +68,12 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    payload, content_type = render_latest()
+    return Response(content=payload, media_type=content_type)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
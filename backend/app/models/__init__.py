@@ -4,13 +4,15 @@ from .campaign import Campaign
 from .content import Idea, Blueprint, Video
 from .job import Job
 from .product import (
-    Product, ProductPriceHistory, ProductCompetitor,
+    Product, ProductPriceHistory, ProductPriceDaily, ProductCompetitor,
     ScrapingJob, ScrapingSession, CompetitorBrand
 )
 from .tiktok_trend import (
     TikTokTrend, TikTokVideo, TikTokHashtag, TikTokSound,
     TikTokScrapingJob, TikTokAnalytics, TrendStatus, TrendType, ContentCategory
 )
+from .tiktok_ingest import TikTokIngestCheckpoint
+from .trend_snapshot import TrendSnapshot
 from .video_project import (
     VideoProject, VideoSegment, BRollClip, VideoAsset, UGCTestimonial,
     VideoGenerationJob, VideoProviderEnum, VideoQualityEnum, VideoStyleEnum,
@@ -2,11 +2,15 @@
 Product and competitor data models for scraped e-commerce data.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Float, Boolean, Index
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, JSON, Text, Float, Boolean, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
+# JSONB on PostgreSQL (GIN-indexable, aggregated in SQL), plain JSON elsewhere
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Product(Base):
     """Product information scraped from e-commerce sites"""
@@ -41,14 +45,14 @@ class Product(Base):
     platform_type = Column(String, index=True)  # shopify, woocommerce, etc.
     
     # Product data (JSON fields)
-    images = Column(JSON)  # [{"url": "...", "alt": "...", "type": "main"}]
-    variants = Column(JSON)  # [{"name": "color", "options": [...]}]
-    attributes = Column(JSON)  # {"material": "cotton", "size": "large"}
-    features = Column(JSON)  # ["Feature 1", "Feature 2"]
-    tags = Column(JSON)  # ["tag1", "tag2"]
+    images = Column(JSONDocument)  # [{"url": "...", "alt": "...", "type": "main"}]
+    variants = Column(JSONDocument)  # [{"name": "color", "options": [...]}]
+    attributes = Column(JSONDocument)  # {"material": "cotton", "size": "large"}
+    features = Column(JSONDocument)  # ["Feature 1", "Feature 2"]
+    tags = Column(JSONDocument)  # ["tag1", "tag2"]
     
     # Reviews and ratings
-    reviews_data = Column(JSON)  # {"count": 10, "average_rating": 4.5, "ratings": [...]}
+    reviews_data = Column(JSONDocument)  # {"count": 10, "average_rating": 4.5, "ratings": [...]}
     
     # Shipping and seller info
     shipping_info = Column(JSON)  # {"free_shipping": true, "delivery_time": "2-3 days"}
@@ -78,14 +82,28 @@ class Product(Base):
         Index('idx_product_availability', 'availability', 'is_active'),
         Index('idx_product_source', 'source_domain', 'platform_type'),
         Index('idx_product_updated', 'last_updated_at'),
+        # Keyset pagination of listings and substring search (pg_trgm)
+        Index('idx_product_brand_listing', 'brand_id', last_updated_at.desc(), id.desc()),
+        Index('idx_product_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('idx_product_category_trgm', 'category', postgresql_using='gin', postgresql_ops={'category': 'gin_trgm_ops'}),
+        # JSONB containment and database-side analytics
+        Index('idx_product_tags_gin', 'tags', postgresql_using='gin', postgresql_ops={'tags': 'jsonb_path_ops'}),
+        Index('idx_product_attributes_gin', 'attributes', postgresql_using='gin'),
+        Index('idx_product_category_price', 'category', 'currency', 'price'),
     )
 
 
 class ProductPriceHistory(Base):
-    """Price history tracking for products"""
+    """
+    Price history tracking for products
+    
+    A row is written only when a tracked field changes. On PostgreSQL the table
+    is range-partitioned by month on recorded_at (migration 009) and the
+    primary key there is (id, recorded_at).
+    """
     __tablename__ = "product_price_history"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     
     # Price information
@@ -103,7 +121,7 @@ class ProductPriceHistory(Base):
     promotion_info = Column(JSON)  # Sale details, coupon codes, etc.
     
     # Timestamp
-    recorded_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    recorded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
     product = relationship("Product", back_populates="price_history")
@@ -115,6 +133,22 @@ class ProductPriceHistory(Base):
     )
 
 
+class ProductPriceDaily(Base):
+    """Daily roll-up of price history older than the raw retention window"""
+    __tablename__ = "product_price_daily"
+
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    
+    currency = Column(String(3), nullable=False)
+    min_price = Column(Float, nullable=False)  # Including the price carried into the day
+    max_price = Column(Float, nullable=False)
+    last_price = Column(Float, nullable=False)
+    last_original_price = Column(Float)
+    last_availability = Column(String)
+    changes = Column(Integer, default=0)  # Raw rows rolled into this day
+
+
 class ProductCompetitor(Base):
     """Competitor products for comparison"""
     __tablename__ = "product_competitors"
@@ -194,6 +228,7 @@ class ScrapingJob(Base):
     __table_args__ = (
         Index('idx_scraping_job_status', 'status', 'created_at'),
         Index('idx_scraping_job_brand', 'brand_id', 'job_type'),
+        Index('idx_scraping_job_brand_listing', 'brand_id', created_at.desc(), id.desc()),
     )
 
 
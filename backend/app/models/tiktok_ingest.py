@@ -0,0 +1,25 @@
+"""
+Progress of streaming Apify dataset ingests.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class TikTokIngestCheckpoint(Base):
+    """Last fully ingested dataset page of an Apify run, so a crashed ingest resumes there"""
+    __tablename__ = "tiktok_ingest_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    apify_run_id = Column(String(100), nullable=False, unique=True)
+    job_type = Column(String(50))
+
+    next_offset = Column(Integer, nullable=False, default=0)  # First dataset item not yet ingested
+    total_items = Column(Integer)
+    pages_ingested = Column(Integer, nullable=False, default=0)
+    counts = Column(JSON)  # {"items": ..., "videos": ..., "hashtags": ..., "sounds": ..., "skipped": ...}
+
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), index=True)
@@ -0,0 +1,31 @@
+"""
+Materialized trend detection results, per platform set and industry.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON
+from sqlalchemy.sql import func
+from app.db.session import Base
+from app.models.product import JSONDocument
+
+
+class TrendSnapshot(Base):
+    """Detected, consolidated and scored trends served to trend analysis requests"""
+    __tablename__ = "trend_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    snapshot_key = Column(String(500), nullable=False, unique=True)  # "<platforms>|<industry keywords>"
+
+    platforms = Column(JSON, nullable=False)  # ["tiktok", "instagram"]
+    industry_keywords = Column(JSON, nullable=False)
+
+    # Raw per-platform detections, reused for platforms whose data did not change
+    platform_trends = Column(JSONDocument, nullable=False)  # {"tiktok": [trend, ...]}
+    source_versions = Column(JSON, nullable=False)  # {"tiktok": "<watermark>"}
+
+    # Consolidated, analyzed and scored trends plus brand-independent aggregates
+    trends = Column(JSONDocument, nullable=False)
+    aggregates = Column(JSONDocument, nullable=False)
+
+    build_seconds = Column(Float)
+    built_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_requested_at = Column(DateTime(timezone=True), server_default=func.now())
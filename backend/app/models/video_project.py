@@ -5,7 +5,7 @@ Database models for video generation projects
 import uuid
 from datetime import datetime
 from typing import Dict, List, Optional, Any
-from sqlalchemy import Column, String, Text, Float, Integer, DateTime, Boolean, JSON, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, Float, Integer, DateTime, Boolean, JSON, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -122,6 +122,10 @@ class VideoProject(Base):
     broll_clips = relationship("BRollClip", back_populates="project", cascade="all, delete-orphan")
     assets = relationship("VideoAsset", back_populates="project", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        Index('idx_video_project_listing', created_at.desc(), id.desc()),
+    )
+    
     def __repr__(self):
         return f"<VideoProject(id={self.id}, title='{self.title}', status='{self.status}')>"
 
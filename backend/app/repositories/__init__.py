@@ -0,0 +1,8 @@
+"""
+Query layer for aggregations that run in the database
+"""
+
+from .price_history import PriceHistoryRepository
+from .product_analytics import ProductAnalyticsRepository
+
+__all__ = ["PriceHistoryRepository", "ProductAnalyticsRepository"]
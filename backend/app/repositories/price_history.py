@@ -0,0 +1,356 @@
+"""
+Price history storage
+
+Observations are written only when a tracked field changes, into a table
+range-partitioned by month (migration 009). Once a month is older than
+``PRICE_HISTORY_RAW_RETENTION_DAYS`` it is rolled up into one row per product
+per day in ``product_price_daily`` (min/max/last) and its partition dropped,
+so storage grows with the number of price changes and, past the retention
+window, with days rather than scrapes.
+
+A price series is a step function: the change points of recent months
+followed by the daily roll-ups of older ones, which never overlap.
+"""
+
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import DateTime, Select, cast, func, insert, literal, select, text, true, union_all
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.product import ProductPriceDaily, ProductPriceHistory
+
+logger = logging.getLogger(__name__)
+
+# A new row is written when any of these differ from the product's latest row
+TRACKED_FIELDS = ("price", "original_price", "currency", "discount_percentage", "availability", "in_stock")
+
+PARTITION_PATTERN = re.compile(r"^product_price_history_(\d{4})_(\d{2})$")
+
+ROLLUP_SQL = text("""
+    WITH month AS (
+        SELECT product_id, recorded_at, price, original_price, currency, availability,
+               date_trunc('day', recorded_at AT TIME ZONE 'UTC')::date AS day
+        FROM product_price_history
+        WHERE recorded_at >= :start AND recorded_at < :end
+    ),
+    ranked AS (
+        SELECT month.*,
+               lag(price) OVER (PARTITION BY product_id ORDER BY recorded_at) AS previous_price,
+               row_number() OVER (PARTITION BY product_id, day ORDER BY recorded_at) AS first_of_day,
+               row_number() OVER (PARTITION BY product_id, day ORDER BY recorded_at DESC) AS last_of_day
+        FROM month
+    ),
+    carried AS (
+        -- Price in force when the month started, from the previous roll-up
+        SELECT DISTINCT ON (product_id) product_id, last_price
+        FROM product_price_daily
+        WHERE day < CAST(:start AS date) AND product_id IN (SELECT DISTINCT product_id FROM month)
+        ORDER BY product_id, day DESC
+    )
+    INSERT INTO product_price_daily (
+        product_id, day, currency, min_price, max_price, last_price,
+        last_original_price, last_availability, changes
+    )
+    SELECT r.product_id,
+           r.day,
+           max(r.currency) FILTER (WHERE r.last_of_day = 1),
+           least(min(r.price), max(coalesce(r.previous_price, c.last_price)) FILTER (WHERE r.first_of_day = 1)),
+           greatest(max(r.price), max(coalesce(r.previous_price, c.last_price)) FILTER (WHERE r.first_of_day = 1)),
+           max(r.price) FILTER (WHERE r.last_of_day = 1),
+           max(r.original_price) FILTER (WHERE r.last_of_day = 1),
+           max(r.availability) FILTER (WHERE r.last_of_day = 1),
+           count(*)
+    FROM ranked r
+    LEFT JOIN carried c ON c.product_id = r.product_id
+    GROUP BY r.product_id, r.day
+    ON CONFLICT (product_id, day) DO UPDATE SET
+        currency = EXCLUDED.currency,
+        min_price = EXCLUDED.min_price,
+        max_price = EXCLUDED.max_price,
+        last_price = EXCLUDED.last_price,
+        last_original_price = EXCLUDED.last_original_price,
+        last_availability = EXCLUDED.last_availability,
+        changes = EXCLUDED.changes
+""")
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"product_price_history_{month:%Y_%m}"
+
+
+def _utc_bound(month: date) -> str:
+    return f"{month:%Y-%m-%d} 00:00:00+00"
+
+
+def has_changed(previous: Optional[Dict[str, Any]], observation: Dict[str, Any]) -> bool:
+    if previous is None:
+        return True
+    return any(previous.get(field) != observation.get(field) for field in TRACKED_FIELDS)
+
+
+def latest_observations_query(product_ids: Sequence[int], before: Optional[datetime] = None) -> Select:
+    """Latest raw row per product (one index probe per product via LATERAL)"""
+    ids = func.unnest(array(list(product_ids))).table_valued("product_id").render_derived(name="ids")
+
+    latest = select(ProductPriceHistory).where(ProductPriceHistory.product_id == ids.c.product_id)
+    if before is not None:
+        latest = latest.where(ProductPriceHistory.recorded_at < before)
+    latest = latest.order_by(ProductPriceHistory.recorded_at.desc()).limit(1).lateral("latest")
+
+    return select(latest).select_from(ids).join(latest, true())
+
+
+def latest_rollups_query(product_ids: Sequence[int], before: date) -> Select:
+    """Latest daily roll-up per product before ``before``"""
+    ids = func.unnest(array(list(product_ids))).table_valued("product_id").render_derived(name="ids")
+
+    latest = (
+        select(ProductPriceDaily)
+        .where(ProductPriceDaily.product_id == ids.c.product_id, ProductPriceDaily.day < before)
+        .order_by(ProductPriceDaily.day.desc())
+        .limit(1)
+        .lateral("latest")
+    )
+
+    return select(latest).select_from(ids).join(latest, true())
+
+
+def price_series_query(product_ids: Sequence[int], start: datetime, end: datetime) -> Select:
+    """Raw change points and daily roll-ups of ``product_ids`` in [start, end)"""
+    raw = select(
+        ProductPriceHistory.product_id,
+        ProductPriceHistory.recorded_at.label("at"),
+        ProductPriceHistory.price,
+        ProductPriceHistory.price.label("min_price"),
+        ProductPriceHistory.price.label("max_price"),
+        ProductPriceHistory.original_price,
+        ProductPriceHistory.currency,
+        ProductPriceHistory.availability,
+        literal("raw").label("resolution")
+    ).where(
+        ProductPriceHistory.product_id.in_(product_ids),
+        ProductPriceHistory.recorded_at >= start,
+        ProductPriceHistory.recorded_at < end
+    )
+    daily = select(
+        ProductPriceDaily.product_id,
+        func.timezone("UTC", cast(ProductPriceDaily.day, DateTime)).label("at"),  # Roll-up days are UTC
+        ProductPriceDaily.last_price,
+        ProductPriceDaily.min_price,
+        ProductPriceDaily.max_price,
+        ProductPriceDaily.last_original_price,
+        ProductPriceDaily.currency,
+        ProductPriceDaily.last_availability,
+        literal("daily").label("resolution")
+    ).where(
+        ProductPriceDaily.product_id.in_(product_ids),
+        ProductPriceDaily.day >= start.date(),
+        ProductPriceDaily.day < end
+    )
+
+    series = union_all(raw, daily).subquery()
+    return select(series).order_by(series.c.product_id, series.c.at)
+
+
+def record_price_observations(db: Session, observations: Iterable[Dict[str, Any]]) -> int:
+    """
+    Insert the observations that change a product's tracked fields
+
+    Observations are dicts of ProductPriceHistory columns and must include
+    ``product_id``; they are compared against the latest stored row and against
+    earlier observations of the same product in the batch. The caller commits.
+
+    Returns:
+        Number of rows written
+    """
+    observations = list(observations)
+    if not observations:
+        return 0
+
+    product_ids = sorted({observation["product_id"] for observation in observations})
+    latest = {
+        row.product_id: {field: getattr(row, field) for field in TRACKED_FIELDS}
+        for row in db.execute(latest_observations_query(product_ids))
+    }
+
+    changes = []
+    for observation in observations:
+        if has_changed(latest.get(observation["product_id"]), observation):
+            changes.append(observation)
+            latest[observation["product_id"]] = observation
+
+    if changes:
+        db.execute(insert(ProductPriceHistory), changes)
+
+    logger.debug(f"Recorded {len(changes)} of {len(observations)} price observations")
+    return len(changes)
+
+
+def ensure_partitions(db: Session, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """
+    Create the monthly partitions from the current month to ``months_ahead`` ahead
+
+    Rows of a month without a partition sit in the default partition, and
+    creating the partition directly fails while they are there. Missing
+    partitions are therefore created standalone, the month's rows moved out
+    of the default partition into them, and then attached. The caller commits.
+
+    Returns:
+        Names of the partitions covering the months
+    """
+    current = month_start(today or datetime.now(timezone.utc).date())
+    ensured = []
+
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = partition_name(month)
+        ensured.append(name)
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            continue
+
+        bounds = {"start": _utc_bound(month), "end": _utc_bound(add_months(month, 1))}
+        db.execute(text(f"CREATE TABLE {name} (LIKE product_price_history INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        db.execute(
+            text(
+                "WITH moved AS ("
+                "DELETE FROM product_price_history_default "
+                "WHERE recorded_at >= :start AND recorded_at < :end RETURNING *"
+                f") INSERT INTO {name} SELECT * FROM moved"
+            ),
+            bounds
+        )
+        # Attaching builds the parent's indexes and primary key on the partition
+        db.execute(text(
+            f"ALTER TABLE product_price_history ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+        ))
+        logger.info(f"Created price history partition {name}")
+
+    return ensured
+
+
+def roll_up_expired_months(db: Session, retention_days: int, today: Optional[date] = None) -> List[date]:
+    """
+    Roll up whole months older than the retention window and drop their raw rows
+
+    Months are processed oldest first so each one can carry in the last price
+    of the month before it. The caller commits.
+
+    Returns:
+        The months rolled up
+    """
+    cutoff = month_start((today or datetime.now(timezone.utc).date()) - timedelta(days=retention_days))
+
+    partitions = {}
+    for (name,) in db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "WHERE parent.relname = 'product_price_history'"
+    )):
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+
+    # Rows that landed in the default partition (no monthly partition existed yet)
+    stray = {
+        month_start(month) for (month,) in db.execute(
+            text(
+                "SELECT DISTINCT date_trunc('month', recorded_at AT TIME ZONE 'UTC')::date "
+                "FROM product_price_history_default WHERE recorded_at < :cutoff"
+            ),
+            {"cutoff": _utc_bound(cutoff)}
+        )
+    }
+
+    months = sorted({month for month in partitions if month < cutoff} | stray)
+    for month in months:
+        bounds = {"start": _utc_bound(month), "end": _utc_bound(add_months(month, 1))}
+        db.execute(ROLLUP_SQL, bounds)
+
+        if month in partitions:
+            db.execute(text(f"ALTER TABLE product_price_history DETACH PARTITION {partitions[month]}"))
+            db.execute(text(f"DROP TABLE {partitions[month]}"))
+        if month in stray:
+            db.execute(
+                text("DELETE FROM product_price_history_default WHERE recorded_at >= :start AND recorded_at < :end"),
+                bounds
+            )
+        logger.info(f"Rolled up price history for {month:%Y-%m}")
+
+    return months
+
+
+class PriceHistoryRepository:
+    """Price series reads for many products at once"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def price_series(
+        self,
+        product_ids: Sequence[int],
+        start: datetime,
+        end: datetime,
+        include_previous: bool = True
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Price series per product in [start, end)
+
+        With ``include_previous`` each series starts with the last observation
+        before ``start``, so products whose price did not change in the range
+        still report the price in force.
+        """
+        series: Dict[int, List[Dict[str, Any]]] = {product_id: [] for product_id in product_ids}
+        if not product_ids:
+            return series
+
+        if include_previous:
+            previous: Dict[int, Dict[str, Any]] = {}
+            for row in await self.db.execute(latest_rollups_query(product_ids, start.date())):
+                previous[row.product_id] = {
+                    "at": row.day.isoformat(),
+                    "price": row.last_price,
+                    "min_price": row.min_price,
+                    "max_price": row.max_price,
+                    "original_price": row.last_original_price,
+                    "currency": row.currency,
+                    "availability": row.last_availability,
+                    "resolution": "daily",
+                }
+            # Raw rows are always more recent than roll-ups
+            for row in await self.db.execute(latest_observations_query(product_ids, before=start)):
+                previous[row.product_id] = {
+                    "at": row.recorded_at.isoformat(),
+                    "price": row.price,
+                    "min_price": row.price,
+                    "max_price": row.price,
+                    "original_price": row.original_price,
+                    "currency": row.currency,
+                    "availability": row.availability,
+                    "resolution": "raw",
+                }
+            for product_id, point in previous.items():
+                series[product_id].append(point)
+
+        for row in await self.db.execute(price_series_query(product_ids, start, end)):
+            point = dict(row._mapping)
+            product_id = point.pop("product_id")
+            point["at"] = point["at"].isoformat()
+            series[product_id].append(point)
+
+        return series
@@ -0,0 +1,173 @@
+"""
+Product analytics aggregated in PostgreSQL
+
+Tag frequencies, rating distributions and price percentiles are computed over
+the JSONB product columns with SQL aggregates, so only the aggregated rows
+leave the database instead of every matching ORM object.
+
+The ``*_query`` builders return plain ``Select`` statements and can be run on
+the sync session (Celery tasks) as well as through the async repository.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import Float, Select, case, func, select, true, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.product import Product
+
+BrandScope = Optional[Union[Sequence[int], Select]]
+
+DEFAULT_PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+
+
+def _json_number(column, key: str):
+    """``column ->> key`` as float, NULL when the value is missing or not a number"""
+    value = column[key]
+    return case((func.jsonb_typeof(value) == "number", value.as_float()), else_=None)
+
+
+def _json_array(column):
+    """The column when it holds a JSON array, NULL otherwise (expands to no rows)"""
+    return case((func.jsonb_typeof(column) == "array", column), else_=None)
+
+
+def _scope(brand_ids: BrandScope, category: Optional[str] = None) -> List:
+    filters = [Product.is_active.is_(True)]
+    if brand_ids is not None:
+        filters.append(Product.brand_id.in_(brand_ids))
+    if category:
+        filters.append(Product.category == category)
+    return filters
+
+
+def top_tags_query(brand_ids: BrandScope = None, limit: int = 10) -> Select:
+    """Most frequent tags per brand, ``limit`` per brand"""
+    elements = func.jsonb_array_elements_text(_json_array(Product.tags)).table_valued("value").alias("tag")
+    tag = elements.c.value
+
+    counts = (
+        select(Product.brand_id, tag.label("tag"), func.count().label("products"))
+        .select_from(Product)
+        .join(elements, true())
+        .where(*_scope(brand_ids))
+        .group_by(Product.brand_id, tag)
+        .subquery()
+    )
+    ranked = select(
+        counts,
+        func.row_number().over(
+            partition_by=counts.c.brand_id,
+            order_by=(counts.c.products.desc(), counts.c.tag)
+        ).label("rank")
+    ).subquery()
+
+    return (
+        select(ranked.c.brand_id, ranked.c.tag, ranked.c.products)
+        .where(ranked.c.rank <= limit)
+        .order_by(ranked.c.brand_id, ranked.c.rank)
+    )
+
+
+def rating_histogram_query(
+    brand_ids: BrandScope = None,
+    category: Optional[str] = None,
+    bucket_width: float = 0.5
+) -> Select:
+    """Products and reviews per average-rating bucket; unrated products are skipped"""
+    review_count = func.coalesce(
+        _json_number(Product.reviews_data, "count"),
+        _json_number(Product.reviews_data, "total_reviews"),
+        0
+    )
+    ratings = (
+        select(
+            _json_number(Product.reviews_data, "average_rating").label("rating"),
+            review_count.label("reviews")
+        )
+        .where(*_scope(brand_ids, category))
+        .subquery()
+    )
+    bucket = (func.floor(ratings.c.rating / bucket_width) * bucket_width).label("rating")
+
+    return (
+        select(bucket, func.count().label("products"), func.sum(ratings.c.reviews).label("reviews"))
+        .where(ratings.c.rating > 0)
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+
+
+def price_percentiles_query(
+    brand_ids: BrandScope = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES
+) -> Select:
+    """Price distribution per category and currency"""
+    columns = [
+        func.percentile_cont(fraction).within_group(Product.price).label(f"p{round(fraction * 100)}")
+        for fraction in percentiles
+    ]
+
+    return (
+        select(
+            Product.category,
+            Product.currency,
+            func.count().label("products"),
+            func.min(Product.price).label("min"),
+            func.max(Product.price).label("max"),
+            func.avg(Product.price).cast(Float).label("mean"),
+            *columns
+        )
+        .where(*_scope(brand_ids), Product.price.isnot(None), Product.category.isnot(None))
+        .group_by(Product.category, Product.currency)
+        .order_by(Product.category, Product.currency)
+    )
+
+
+def tagged_products_query(tags: Sequence[str], brand_ids: BrandScope = None, limit: int = 50) -> Select:
+    """Ids of products carrying all ``tags`` (served by the tags GIN index)"""
+    return (
+        select(Product.id)
+        .where(*_scope(brand_ids), type_coerce(Product.tags, JSONB).contains(list(tags)))
+        .order_by(Product.id.desc())
+        .limit(limit)
+    )
+
+
+class ProductAnalyticsRepository:
+    """Database-side product aggregations"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def top_tags_by_brand(self, brand_ids: BrandScope = None, limit: int = 10) -> Dict[int, List[Tuple[str, int]]]:
+        rows = await self.db.execute(top_tags_query(brand_ids, limit))
+
+        tags: Dict[int, List[Tuple[str, int]]] = {}
+        for brand_id, tag, products in rows:
+            tags.setdefault(brand_id, []).append((tag, products))
+        return tags
+
+    async def rating_histogram(
+        self,
+        brand_ids: BrandScope = None,
+        category: Optional[str] = None,
+        bucket_width: float = 0.5
+    ) -> List[Dict[str, float]]:
+        rows = await self.db.execute(rating_histogram_query(brand_ids, category, bucket_width))
+        return [
+            {"rating": float(row.rating), "products": row.products, "reviews": int(row.reviews or 0)}
+            for row in rows
+        ]
+
+    async def price_percentiles_by_category(
+        self,
+        brand_ids: BrandScope = None,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES
+    ) -> List[Dict[str, object]]:
+        rows = await self.db.execute(price_percentiles_query(brand_ids, percentiles))
+        return [dict(row._mapping) for row in rows]
+
+    async def find_by_tags(self, tags: Sequence[str], brand_ids: BrandScope = None, limit: int = 50) -> List[int]:
+        return list(await self.db.scalars(tagged_products_query(tags, brand_ids, limit)))
@@ -0,0 +1,209 @@
+"""
+TikTok dataset ingest storage
+
+Each normalized dataset page is written with one multi-row
+``INSERT ... ON CONFLICT`` per table, in the same transaction that advances
+the run's checkpoint, so a page is applied exactly once even when an ingest
+crashes and resumes. Rows are sorted by their conflict key so concurrent
+ingests lock rows in the same order.
+
+Hashtag and sound usage totals only count videos seen for the first time,
+so the same video showing up in later scrapes does not inflate them.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.tiktok_ingest import TikTokIngestCheckpoint
+from app.models.tiktok_trend import TikTokHashtag, TikTokSound, TikTokVideo
+
+logger = logging.getLogger(__name__)
+
+# Refreshed on every scrape of an existing video
+VIDEO_UPDATE_FIELDS = (
+    "title", "description", "duration", "creator_username", "creator_display_name",
+    "creator_follower_count", "creator_verified", "view_count", "like_count", "share_count",
+    "comment_count", "engagement_rate", "hashtags", "mentions", "sounds_used", "tiktok_url",
+    "scraped_at", "scraping_source", "raw_data", "is_active",
+)
+
+SOUND_METADATA_FIELDS = ("title", "artist", "duration", "sound_url", "is_original")
+
+COUNT_KEYS = ("items", "videos", "new_videos", "hashtags", "sounds", "skipped")
+
+
+def _state(checkpoint: TikTokIngestCheckpoint) -> Dict[str, Any]:
+    return {
+        "apify_run_id": checkpoint.apify_run_id,
+        "job_type": checkpoint.job_type,
+        "next_offset": checkpoint.next_offset,
+        "total_items": checkpoint.total_items,
+        "pages_ingested": checkpoint.pages_ingested,
+        "counts": dict(checkpoint.counts or {}),
+        "completed_at": checkpoint.completed_at,
+    }
+
+
+def get_or_create_checkpoint(db: Session, apify_run_id: str, job_type: Optional[str] = None) -> Dict[str, Any]:
+    """Checkpoint state of an ingest, starting a new one at offset 0"""
+    db.execute(
+        insert(TikTokIngestCheckpoint)
+        .values(
+            apify_run_id=apify_run_id, job_type=job_type, next_offset=0,
+            pages_ingested=0, counts={key: 0 for key in COUNT_KEYS}
+        )
+        .on_conflict_do_nothing(index_elements=[TikTokIngestCheckpoint.apify_run_id])
+    )
+    db.commit()
+    checkpoint = db.query(TikTokIngestCheckpoint).filter(TikTokIngestCheckpoint.apify_run_id == apify_run_id).one()
+    return _state(checkpoint)
+
+
+def _upsert_videos(db: Session, videos: List[Dict[str, Any]]) -> Set[str]:
+    """Upsert videos; returns the ids of videos that were not stored before"""
+    if not videos:
+        return set()
+
+    now = datetime.utcnow()
+    rows = [{**video, "created_at": now, "updated_at": now} for video in sorted(videos, key=lambda v: v["video_id"])]
+    statement = insert(TikTokVideo).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[TikTokVideo.video_id],
+        set_={
+            **{name: statement.excluded[name] for name in VIDEO_UPDATE_FIELDS},
+            # Keep the original post time if a later scrape lacks it
+            "posted_at": func.coalesce(statement.excluded.posted_at, TikTokVideo.posted_at),
+            "updated_at": statement.excluded.updated_at,
+        },
+    )
+    # xmax is 0 only for freshly inserted rows
+    returning = statement.returning(TikTokVideo.video_id, literal_column("xmax = 0").label("inserted"))
+    return {row.video_id for row in db.execute(returning) if row.inserted}
+
+
+def _usage(videos: List[Dict[str, Any]], new_video_ids: Set[str], field: str) -> Dict[str, Dict[str, Any]]:
+    """Per hashtag/sound: first post time plus video and view counts over new videos"""
+    usage: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"total_videos": 0, "total_views": 0, "first_seen": None})
+    for video in videos:
+        seen = video["posted_at"] or video["scraped_at"]
+        is_new = video["video_id"] in new_video_ids
+        for key in video[field]:
+            entry = usage[key]
+            if is_new:
+                entry["total_videos"] += 1
+                entry["total_views"] += video["view_count"] or 0
+            if seen and (entry["first_seen"] is None or seen < entry["first_seen"]):
+                entry["first_seen"] = seen
+    return usage
+
+
+def _upsert_hashtags(db: Session, usage: Dict[str, Dict[str, Any]], now: datetime) -> int:
+    if not usage:
+        return 0
+
+    rows = [
+        {
+            "hashtag": hashtag, "normalized_hashtag": hashtag, "is_trending": False,
+            "total_videos": entry["total_videos"], "total_views": entry["total_views"],
+            "first_seen": entry["first_seen"] or now, "created_at": now, "updated_at": now, "last_analyzed": now,
+        }
+        for hashtag, entry in sorted(usage.items())
+    ]
+    statement = insert(TikTokHashtag).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[TikTokHashtag.hashtag],
+        set_={
+            "total_videos": func.coalesce(TikTokHashtag.total_videos, 0) + statement.excluded.total_videos,
+            "total_views": func.coalesce(TikTokHashtag.total_views, 0) + statement.excluded.total_views,
+            "first_seen": func.least(func.coalesce(TikTokHashtag.first_seen, statement.excluded.first_seen), statement.excluded.first_seen),
+            "updated_at": statement.excluded.updated_at,
+            "last_analyzed": statement.excluded.last_analyzed,
+        },
+    ))
+    return len(rows)
+
+
+def _upsert_sounds(db: Session, sounds: Dict[str, Dict[str, Any]], usage: Dict[str, Dict[str, Any]], now: datetime) -> int:
+    if not sounds:
+        return 0
+
+    rows = []
+    for sound_id in sorted(sounds):
+        entry = usage.get(sound_id) or {"total_videos": 0, "total_views": 0, "first_seen": None}
+        rows.append({
+            **sounds[sound_id], "is_trending": False,
+            "total_videos": entry["total_videos"], "total_views": entry["total_views"],
+            "first_detected": entry["first_seen"] or now, "created_at": now, "updated_at": now, "last_analyzed": now,
+        })
+    statement = insert(TikTokSound).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[TikTokSound.sound_id],
+        set_={
+            **{name: func.coalesce(statement.excluded[name], getattr(TikTokSound, name)) for name in SOUND_METADATA_FIELDS},
+            "total_videos": func.coalesce(TikTokSound.total_videos, 0) + statement.excluded.total_videos,
+            "total_views": func.coalesce(TikTokSound.total_views, 0) + statement.excluded.total_views,
+            "first_detected": func.least(func.coalesce(TikTokSound.first_detected, statement.excluded.first_detected), statement.excluded.first_detected),
+            "updated_at": statement.excluded.updated_at,
+            "last_analyzed": statement.excluded.last_analyzed,
+        },
+    ))
+    return len(rows)
+
+
+def write_page(db: Session, apify_run_id: str, offset: int, next_offset: int, total: int, page: Any) -> Dict[str, Any]:
+    """
+    Upsert a normalized page and advance the checkpoint past it, atomically
+
+    A page whose offset does not match the checkpoint was already written
+    (or belongs to a stale, concurrent ingest of the same run) and is
+    skipped.
+    """
+    checkpoint = (
+        db.query(TikTokIngestCheckpoint)
+        .filter(TikTokIngestCheckpoint.apify_run_id == apify_run_id)
+        .with_for_update()
+        .one()
+    )
+    if checkpoint.next_offset != offset:
+        logger.warning(
+            f"Skipping page at offset {offset} of Apify run {apify_run_id}: checkpoint is at {checkpoint.next_offset}"
+        )
+        state = _state(checkpoint)
+        db.rollback()
+        return state
+
+    now = datetime.utcnow()
+    new_video_ids = _upsert_videos(db, page.videos)
+    hashtags = _upsert_hashtags(db, _usage(page.videos, new_video_ids, "hashtags"), now)
+    sounds = _upsert_sounds(db, page.sounds, _usage(page.videos, new_video_ids, "sounds_used"), now)
+
+    counts = {key: 0 for key in COUNT_KEYS}
+    counts.update(checkpoint.counts or {})
+    counts["items"] += next_offset - offset
+    counts["videos"] += len(page.videos)
+    counts["new_videos"] += len(new_video_ids)
+    counts["hashtags"] += hashtags
+    counts["sounds"] += sounds
+    counts["skipped"] += page.skipped
+
+    checkpoint.next_offset = next_offset
+    checkpoint.total_items = total
+    checkpoint.pages_ingested += 1
+    checkpoint.counts = counts
+    db.commit()
+    return _state(checkpoint)
+
+
+def complete_checkpoint(db: Session, apify_run_id: str) -> Dict[str, Any]:
+    """Mark an ingest as finished"""
+    checkpoint = db.query(TikTokIngestCheckpoint).filter(TikTokIngestCheckpoint.apify_run_id == apify_run_id).one()
+    if checkpoint.completed_at is None:
+        checkpoint.completed_at = datetime.now(timezone.utc)
+        db.commit()
+    return _state(checkpoint)
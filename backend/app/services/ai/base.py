@@ -24,6 +24,7 @@ from tenacity import (
 )
 
 from app.core.config import settings
+from app.core.metrics import observe_llm_call
 
 logger = logging.getLogger(__name__)
 
@@ -153,6 +154,40 @@ class RateLimiter:
         return True
 
 
+class ConcurrencyLimiter:
+    """Caps the AI requests in flight across every caller sharing it
+    
+    Callers fanning out many generations (ideas, hook scoring, ...) can
+    gather freely; excess requests wait for a slot instead of tripping
+    provider rate limits.
+    """
+    
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        # A semaphore bound to another (possibly closed) event loop cannot be awaited here
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._loop = loop
+        return self._semaphore
+    
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one request slot for the duration of the block"""
+        semaphore = self._get_semaphore()
+        async with semaphore:
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+
 class BaseAIService(ABC):
     """Abstract base class for all AI services"""
     
@@ -168,12 +203,22 @@ class BaseAIService(ABC):
         """Make the actual API request to the AI provider"""
         pass
     
-    async def validate_input(self, text: str, max_tokens: Optional[int] = None) -> bool:
-        """Validate input before making AI request"""
+    async def validate_input(
+        self,
+        text: str,
+        max_tokens: Optional[int] = None,
+        token_count: Optional[int] = None
+    ) -> bool:
+        """Validate input before making AI request
+        
+        ``token_count`` may be supplied by callers that already know it (e.g.
+        compiled prompt templates) to avoid re-encoding the full prompt.
+        """
         if not text or not text.strip():
             raise AIServiceError("Input text cannot be empty")
         
-        token_count = self.token_counter.count_tokens(text, self.model)
+        if token_count is None:
+            token_count = self.token_counter.count_tokens(text, self.model)
         max_allowed = max_tokens or settings.MAX_TOKENS_PER_REQUEST
         
         if token_count > max_allowed:
@@ -193,17 +238,23 @@ class BaseAIService(ABC):
     )
     async def generate(self, prompt: str, **kwargs) -> AIResponse:
         """Generate content using the AI service with retry logic"""
-        await self.validate_input(prompt)
+        await self.validate_input(prompt, token_count=kwargs.pop("prompt_token_count", None))
         await self.rate_limiter.acquire()
         
         start_time = time.time()
         
         try:
             response = await self._make_request(prompt=prompt, **kwargs)
-            response.usage.latency_ms = int((time.time() - start_time) * 1000)
+            latency = time.time() - start_time
+            response.usage.latency_ms = int(latency * 1000)
             
             # Track usage metrics
             self.usage_metrics.append(response.usage)
+            observe_llm_call(
+                self.provider, self.model, latency, response.success,
+                response.usage.tokens_input, response.usage.tokens_output,
+                response.usage.total_cost
+            )
             
             return response
             
@@ -211,12 +262,15 @@ class BaseAIService(ABC):
             error_msg = f"AI generation failed: {str(e)}"
             logger.error(error_msg, exc_info=True)
             
+            latency = time.time() - start_time
+            observe_llm_call(self.provider, self.model, latency, False)
+            
             return AIResponse(
                 content="",
                 usage=AIUsageMetrics(
                     provider=self.provider,
                     model=self.model,
-                    latency_ms=int((time.time() - start_time) * 1000)
+                    latency_ms=int(latency * 1000)
                 ),
                 metadata={},
                 success=False,
@@ -14,6 +14,7 @@ from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple, Union, Callable
 import logging
 from collections import defaultdict, OrderedDict
+from functools import wraps
 import pickle
 import gzip
 
@@ -21,6 +22,7 @@ import numpy as np
 from diskcache import Cache
 
 from app.core.config import settings
+from app.core.metrics import record_cache_lookup
 
 logger = logging.getLogger(__name__)
 
@@ -111,6 +113,75 @@ class CacheStats:
         }
 
 
+@dataclass
+class RevalidatingValue:
+    """Cached value that may be served stale while a refresh runs"""
+    value: Any
+    fresh_until: float
+    
+    def is_stale(self) -> bool:
+        return time.time() > self.fresh_until
+
+
+class InFlightRegistry:
+    """Deduplicates concurrent identical calls by cache key
+    
+    The first caller for a key starts the work as a separate task; later
+    callers await the same task. Waiters are shielded, so a cancelled or
+    timed-out waiter never cancels the shared work, and an exception raised by
+    the work propagates to every waiter.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats: Dict[str, int] = defaultdict(int)
+    
+    def _get_task(self, key: str) -> Optional[asyncio.Task]:
+        task = self._inflight.get(key)
+        # Tasks from another (possibly closed) event loop cannot be awaited here
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+    
+    def _start(self, key: str, factory: Callable) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda finished: self._finish(key, finished))
+        return task
+    
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["errors"] += 1
+    
+    async def run(self, key: str, factory: Callable, timeout: Optional[float] = None) -> Any:
+        """Run ``factory()`` once per key among concurrent callers"""
+        task = self._get_task(key)
+        if task is None:
+            self.stats["leaders"] += 1
+            task = self._start(key, factory)
+        else:
+            self.stats["followers"] += 1
+        
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+    
+    def refresh_in_background(self, key: str, factory: Callable) -> bool:
+        """Start ``factory()`` unless a call for the key is already running"""
+        if self._get_task(key) is not None:
+            return False
+        self.stats["background_refreshes"] += 1
+        self._start(key, factory)
+        return True
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._inflight), **self.stats}
+
+
 class SemanticCache:
     """Semantic similarity-based caching"""
     
@@ -524,9 +595,15 @@ class MultiLevelCache:
         """Get value using specific strategy"""
         
         if strategy == CacheStrategy.SEMANTIC_SIMILARITY:
-            return await self._get_semantic_match(service_name, operation, inputs)
+            start = time.perf_counter()
+            result = await self._get_semantic_match(service_name, operation, inputs)
+            record_cache_lookup("semantic", result is not None, time.perf_counter() - start)
+            return result
         elif strategy == CacheStrategy.FUZZY_MATCH:
-            return await self._get_fuzzy_match(service_name, operation, inputs)
+            start = time.perf_counter()
+            result = await self._get_fuzzy_match(service_name, operation, inputs)
+            record_cache_lookup("fuzzy", result is not None, time.perf_counter() - start)
+            return result
         else:
             # Exact, normalized, or template-based matching
             cache_key = self._generate_cache_key(service_name, operation, inputs, strategy)
@@ -536,12 +613,15 @@ class MultiLevelCache:
         """Get exact match from cache levels"""
         
         # Try L1 cache first
+        start = time.perf_counter()
         l1_entry = self.l1_cache.get(cache_key)
+        record_cache_lookup(CacheLevel.L1_MEMORY.value, l1_entry is not None, time.perf_counter() - start)
         if l1_entry:
             logger.debug(f"L1 cache hit: {cache_key}")
             return l1_entry.value
         
         # Try L2 cache
+        start = time.perf_counter()
         try:
             if cache_key in self.l2_cache:
                 cached_data = self.l2_cache[cache_key]
@@ -561,11 +641,13 @@ class MultiLevelCache:
                     )
                     
                     self.l1_cache.put(cache_key, entry)
+                    record_cache_lookup(CacheLevel.L2_DISK.value, True, time.perf_counter() - start)
                     logger.debug(f"L2 cache hit, promoted to L1: {cache_key}")
                     return value
         except Exception as e:
             logger.error(f"L2 cache access error: {e}")
         
+        record_cache_lookup(CacheLevel.L2_DISK.value, False, time.perf_counter() - start)
         return None
     
     async def _get_semantic_match(
@@ -793,6 +875,7 @@ class AICacheManager:
     
     def __init__(self):
         self.cache = MultiLevelCache()
+        self.inflight = InFlightRegistry()
         self.hit_counts = defaultdict(int)
         self.miss_counts = defaultdict(int)
         
@@ -865,6 +948,7 @@ class AICacheManager:
             }
         
         stats["service_breakdown"] = service_stats
+        stats["request_deduplication"] = self.inflight.get_stats()
         
         return stats
     
@@ -887,41 +971,76 @@ def cached(
     operation: str,
     strategy: CacheStrategy = CacheStrategy.EXACT_MATCH,
     ttl: Optional[float] = None,
-    estimated_cost: float = 0.0
+    estimated_cost: float = 0.0,
+    dedupe_in_flight: bool = True,
+    inflight_timeout: Optional[float] = None,
+    stale_while_revalidate: Optional[float] = None,
+    bound_method: bool = False
 ):
-    """Decorator for caching function results"""
+    """Decorator for caching function results
+    
+    Concurrent callers that miss the cache for the same key share one
+    execution of the wrapped function (``dedupe_in_flight``); followers wait
+    at most ``inflight_timeout`` seconds before raising ``asyncio.TimeoutError``.
+    
+    With ``stale_while_revalidate`` set, results are kept for that many extra
+    seconds after ``ttl``; a stale hit is returned immediately while a single
+    background refresh replaces it. ``bound_method`` leaves ``self`` out of the
+    cache key.
+    """
     
     def decorator(func):
+        @wraps(func)
         async def wrapper(*args, **kwargs):
             cache_manager = get_cache_manager()
             
             # Prepare inputs for caching
             inputs = {
-                "args": args,
+                "args": args[1:] if bound_method else args,
                 "kwargs": kwargs
             }
             
+            async def compute():
+                # Execute function
+                if asyncio.iscoroutinefunction(func):
+                    result = await func(*args, **kwargs)
+                else:
+                    result = func(*args, **kwargs)
+                
+                # Cache result
+                if stale_while_revalidate and ttl:
+                    await cache_manager.cache_result(
+                        service_name, operation, inputs,
+                        RevalidatingValue(value=result, fresh_until=time.time() + ttl),
+                        strategy, ttl + stale_while_revalidate, estimated_cost
+                    )
+                else:
+                    await cache_manager.cache_result(
+                        service_name, operation, inputs, result,
+                        strategy, ttl, estimated_cost
+                    )
+                
+                return result
+            
             # Try to get cached result
             cached_result = await cache_manager.get_cached_result(
                 service_name, operation, inputs, strategy
             )
             
+            cache_key = cache_manager.cache._generate_cache_key(service_name, operation, inputs, strategy)
+            
+            if isinstance(cached_result, RevalidatingValue):
+                if cached_result.is_stale():
+                    cache_manager.inflight.refresh_in_background(cache_key, compute)
+                return cached_result.value
+            
             if cached_result is not None:
                 return cached_result
             
-            # Execute function
-            if asyncio.iscoroutinefunction(func):
-                result = await func(*args, **kwargs)
-            else:
-                result = func(*args, **kwargs)
-            
-            # Cache result
-            await cache_manager.cache_result(
-                service_name, operation, inputs, result,
-                strategy, ttl, estimated_cost
-            )
+            if not dedupe_in_flight:
+                return await compute()
             
-            return result
+            return await cache_manager.inflight.run(cache_key, compute, timeout=inflight_timeout)
         
         return wrapper
     return decorator
@@ -9,11 +9,11 @@ import asyncio
 import time
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Type, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
 import logging
 from functools import wraps
 import traceback
-from collections import defaultdict, deque
+from collections import Counter, defaultdict, deque
 
 logger = logging.getLogger(__name__)
 
@@ -116,13 +116,36 @@ class CircuitBreakerState(str, Enum):
 class CircuitBreaker:
     """Circuit breaker implementation"""
     
-    def __init__(self, config: CircuitBreakerConfig):
+    def __init__(
+        self,
+        config: CircuitBreakerConfig,
+        name: str = "",
+        on_transition: Optional[Callable[[str, CircuitBreakerState, CircuitBreakerState], None]] = None
+    ):
         self.config = config
+        self.name = name
+        self.on_transition = on_transition
         self.state = CircuitBreakerState.CLOSED
         self.failure_count = 0
         self.success_count = 0
         self.last_failure_time = 0
         self.recent_calls = deque(maxlen=config.window_size)
+        self.recent_failures = 0  # Failures currently inside the sliding window
+    
+    def _transition(self, new_state: CircuitBreakerState):
+        """Change state and notify the transition listener"""
+        old_state = self.state
+        self.state = new_state
+        if self.on_transition and old_state != new_state:
+            self.on_transition(self.name, old_state, new_state)
+    
+    def _append_call(self, success: bool):
+        """Append to the sliding window, keeping the failure count in sync"""
+        if len(self.recent_calls) == self.recent_calls.maxlen and not self.recent_calls[0]:
+            self.recent_failures -= 1
+        self.recent_calls.append(success)
+        if not success:
+            self.recent_failures += 1
     
     def can_execute(self) -> bool:
         """Check if operation can be executed"""
@@ -131,8 +154,8 @@ class CircuitBreaker:
         elif self.state == CircuitBreakerState.OPEN:
             # Check if recovery timeout has passed
             if time.time() - self.last_failure_time > self.config.recovery_timeout:
-                self.state = CircuitBreakerState.HALF_OPEN
                 self.success_count = 0
+                self._transition(CircuitBreakerState.HALF_OPEN)
                 return True
             return False
         elif self.state == CircuitBreakerState.HALF_OPEN:
@@ -142,44 +165,138 @@ class CircuitBreaker:
     
     def record_success(self):
         """Record successful operation"""
-        self.recent_calls.append(True)
+        self._append_call(True)
         
         if self.state == CircuitBreakerState.HALF_OPEN:
             self.success_count += 1
             if self.success_count >= self.config.success_threshold:
-                self.state = CircuitBreakerState.CLOSED
                 self.failure_count = 0
+                self._transition(CircuitBreakerState.CLOSED)
     
     def record_failure(self):
         """Record failed operation"""
-        self.recent_calls.append(False)
+        self._append_call(False)
         self.failure_count += 1
         self.last_failure_time = time.time()
         
         if self.state == CircuitBreakerState.CLOSED:
-            # Check failure rate in recent window
-            recent_failures = sum(1 for call in self.recent_calls if not call)
-            if recent_failures >= self.config.failure_threshold:
-                self.state = CircuitBreakerState.OPEN
+            # Check failure count in recent window
+            if self.recent_failures >= self.config.failure_threshold:
+                self._transition(CircuitBreakerState.OPEN)
         elif self.state == CircuitBreakerState.HALF_OPEN:
-            self.state = CircuitBreakerState.OPEN
+            self._transition(CircuitBreakerState.OPEN)
     
     def get_status(self) -> Dict[str, Any]:
         """Get circuit breaker status"""
+        window = len(self.recent_calls)
         return {
             "state": self.state,
             "failure_count": self.failure_count,
             "success_count": self.success_count,
             "last_failure_time": self.last_failure_time,
-            "recent_success_rate": sum(self.recent_calls) / max(len(self.recent_calls), 1)
+            "recent_success_rate": (window - self.recent_failures) / max(window, 1)
         }
 
 
+@dataclass
+class CircuitBreakerEvent:
+    """Circuit breaker state transition"""
+    circuit: str
+    from_state: CircuitBreakerState
+    to_state: CircuitBreakerState
+    timestamp: float = field(default_factory=time.time)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.circuit,
+            "from_state": self.from_state,
+            "to_state": self.to_state,
+            "timestamp": self.timestamp
+        }
+
+
+@dataclass
+class ErrorBucket:
+    """Error counters for one time bucket, updated at insert time"""
+    start: float
+    total: int = 0
+    by_service: Counter = field(default_factory=Counter)
+    by_type: Counter = field(default_factory=Counter)
+    by_severity: Counter = field(default_factory=Counter)
+    circuit_transitions: Counter = field(default_factory=Counter)
+
+
+class ErrorStore:
+    """Bounded, time-bucketed error store
+    
+    Keeps a ring buffer of recent ErrorRecords for drill-down plus fixed-width
+    time buckets with per-service/type/severity counters, so statistics over a
+    window cost O(buckets) regardless of how many errors were ever recorded.
+    """
+    
+    def __init__(
+        self,
+        max_records: int = 1000,
+        bucket_seconds: int = 60,
+        retention_hours: int = 24,
+        max_events: int = 500
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.records: deque = deque(maxlen=max_records)
+        self.buckets: deque = deque(maxlen=max(1, (retention_hours * 3600) // bucket_seconds))
+        self.events: deque = deque(maxlen=max_events)
+        self.latest_by_service: Dict[str, ErrorRecord] = {}
+        self.total_recorded = 0
+    
+    def _current_bucket(self, timestamp: float) -> ErrorBucket:
+        start = timestamp - (timestamp % self.bucket_seconds)
+        if not self.buckets or self.buckets[-1].start < start:
+            self.buckets.append(ErrorBucket(start=start))
+        return self.buckets[-1]
+    
+    def add(self, record: ErrorRecord):
+        """Insert an error and update the counters of its bucket"""
+        bucket = self._current_bucket(record.timestamp)
+        bucket.total += 1
+        bucket.by_service[record.service_name] += 1
+        bucket.by_type[record.error_type] += 1
+        bucket.by_severity[record.severity] += 1
+        
+        self.records.append(record)
+        self.latest_by_service[record.service_name] = record
+        self.total_recorded += 1
+    
+    def add_event(self, event: CircuitBreakerEvent):
+        """Record a circuit breaker transition"""
+        self.events.append(event)
+        self._current_bucket(event.timestamp).circuit_transitions[event.to_state] += 1
+    
+    def window(self, seconds: float) -> ErrorBucket:
+        """Sum the buckets overlapping the last ``seconds`` into one bucket"""
+        cutoff = time.time() - seconds
+        summary = ErrorBucket(start=cutoff)
+        
+        for bucket in reversed(self.buckets):
+            if bucket.start + self.bucket_seconds <= cutoff:
+                break
+            summary.total += bucket.total
+            summary.by_service.update(bucket.by_service)
+            summary.by_type.update(bucket.by_type)
+            summary.by_severity.update(bucket.by_severity)
+            summary.circuit_transitions.update(bucket.circuit_transitions)
+        
+        return summary
+    
+    def recent_events(self, seconds: float) -> List[CircuitBreakerEvent]:
+        cutoff = time.time() - seconds
+        return [event for event in self.events if event.timestamp >= cutoff]
+
+
 class AIErrorHandler:
     """Main error handling service"""
     
     def __init__(self):
-        self.error_history: List[ErrorRecord] = []
+        self.error_store = ErrorStore()
         self.circuit_breakers: Dict[str, CircuitBreaker] = {}
         self.fallback_handlers: Dict[str, Callable] = {}
         self.error_patterns: Dict[str, int] = defaultdict(int)
@@ -235,7 +352,7 @@ class AIErrorHandler:
         error_type, severity = self.classify_error(error, service_name)
         
         error_record = ErrorRecord(
-            error_id=f"{service_name}_{operation}_{int(time.time())}_{len(self.error_history)}",
+            error_id=f"{service_name}_{operation}_{int(time.time())}_{self.error_store.total_recorded}",
             error_type=error_type,
             severity=severity,
             service_name=service_name,
@@ -245,7 +362,7 @@ class AIErrorHandler:
             metadata=metadata or {}
         )
         
-        self.error_history.append(error_record)
+        self.error_store.add(error_record)
         
         # Update error patterns
         pattern_key = f"{service_name}:{error_type}"
@@ -272,10 +389,29 @@ class AIErrorHandler:
         
         if cb_key not in self.circuit_breakers:
             config = self.circuit_breaker_configs.get(config_type, self.circuit_breaker_configs["default"])
-            self.circuit_breakers[cb_key] = CircuitBreaker(config)
+            self.circuit_breakers[cb_key] = CircuitBreaker(
+                config,
+                name=cb_key,
+                on_transition=self._record_circuit_transition
+            )
         
         return self.circuit_breakers[cb_key]
     
+    def _record_circuit_transition(
+        self,
+        circuit: str,
+        from_state: CircuitBreakerState,
+        to_state: CircuitBreakerState
+    ):
+        """Store circuit breaker transitions alongside errors"""
+        self.error_store.add_event(CircuitBreakerEvent(circuit, from_state, to_state))
+        logger.warning(f"Circuit breaker {circuit}: {from_state.value} -> {to_state.value}")
+    
+    @property
+    def error_history(self) -> List[ErrorRecord]:
+        """Most recent error records (bounded ring buffer)"""
+        return list(self.error_store.records)
+    
     def can_execute(self, service_name: str, operation: str) -> bool:
         """Check if operation can be executed (circuit breaker check)"""
         circuit_breaker = self.get_circuit_breaker(service_name, operation)
@@ -419,52 +555,45 @@ class AIErrorHandler:
     def get_error_statistics(self, hours: int = 24) -> Dict[str, Any]:
         """Get error statistics for time period"""
         
-        cutoff_time = time.time() - (hours * 3600)
-        recent_errors = [e for e in self.error_history if e.timestamp >= cutoff_time]
+        window = self.error_store.window(hours * 3600)
         
-        if not recent_errors:
+        if not window.total:
             return {"total_errors": 0, "error_rate": 0.0}
         
-        # Group by service
-        service_errors = defaultdict(list)
-        error_type_counts = defaultdict(int)
-        severity_counts = defaultdict(int)
-        
-        for error in recent_errors:
-            service_errors[error.service_name].append(error)
-            error_type_counts[error.error_type] += 1
-            severity_counts[error.severity] += 1
-        
         # Most problematic services
-        problematic_services = sorted(
-            service_errors.items(),
-            key=lambda x: len(x[1]),
-            reverse=True
-        )[:5]
+        problematic_services = window.by_service.most_common(5)
         
         return {
             "time_period_hours": hours,
-            "total_errors": len(recent_errors),
-            "error_types": dict(error_type_counts),
-            "severity_distribution": dict(severity_counts),
-            "errors_by_service": {service: len(errors) for service, errors in service_errors.items()},
+            "total_errors": window.total,
+            "error_types": dict(window.by_type),
+            "severity_distribution": dict(window.by_severity),
+            "errors_by_service": dict(window.by_service),
             "most_problematic_services": [
-                {"service": service, "error_count": len(errors), "latest_error": errors[-1].to_dict()}
-                for service, errors in problematic_services
+                {
+                    "service": service,
+                    "error_count": count,
+                    "latest_error": self.error_store.latest_by_service[service].to_dict()
+                }
+                for service, count in problematic_services
             ],
             "circuit_breaker_status": {
                 key: cb.get_status() for key, cb in self.circuit_breakers.items()
-            }
+            },
+            "circuit_breaker_transitions": dict(window.circuit_transitions),
+            "circuit_breaker_events": [
+                event.to_dict() for event in self.error_store.recent_events(hours * 3600)
+            ]
         }
     
     def get_health_status(self) -> Dict[str, Any]:
         """Get overall system health status"""
         
-        recent_errors = [e for e in self.error_history if e.timestamp >= time.time() - 3600]  # Last hour
+        window = self.error_store.window(3600)  # Last hour
         
         # Calculate health score
-        error_count = len(recent_errors)
-        critical_errors = len([e for e in recent_errors if e.severity == ErrorSeverity.CRITICAL])
+        error_count = window.total
+        critical_errors = window.by_severity[ErrorSeverity.CRITICAL]
         
         if critical_errors > 0:
             health_status = "critical"
@@ -489,23 +618,19 @@ class AIErrorHandler:
             "critical_errors_count": critical_errors,
             "open_circuit_breakers": open_circuits,
             "total_circuit_breakers": len(self.circuit_breakers),
+            "circuit_breaker_transitions": dict(window.circuit_transitions),
             "error_patterns": dict(self.error_patterns),
-            "recommendations": self._generate_health_recommendations(recent_errors)
+            "recommendations": self._generate_health_recommendations(window.by_type)
         }
     
-    def _generate_health_recommendations(self, recent_errors: List[ErrorRecord]) -> List[str]:
+    def _generate_health_recommendations(self, error_types: Counter) -> List[str]:
         """Generate health improvement recommendations"""
         
         recommendations = []
         
-        if not recent_errors:
+        if not error_types:
             return ["System is healthy - no recent errors detected"]
         
-        # Error type analysis
-        error_types = defaultdict(int)
-        for error in recent_errors:
-            error_types[error.error_type] += 1
-        
         # Generate recommendations based on error patterns
         if error_types[ErrorType.RATE_LIMIT_ERROR] > 3:
             recommendations.append("Consider implementing rate limiting and request queuing")
@@ -0,0 +1,405 @@
+"""
+AI Metrics Store
+
+Append-only, columnar store for AI service call metrics backed by SQLite on
+local disk. Raw calls are kept for drill-down and pre-aggregated roll-ups are
+maintained per minute, hour and day so dashboard queries over long windows
+read a few thousand aggregate rows instead of rescanning every call.
+
+Writes are queued and flushed in batches by a background thread, so recording
+a call never touches the disk on the request path.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Roll-up resolutions (seconds per bucket)
+ROLLUP_RESOLUTIONS: Dict[str, int] = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+# Calls above this many tokens are tracked as "high token" in the roll-ups
+HIGH_TOKEN_THRESHOLD = 4000
+
+
+@dataclass
+class MetricsRecord:
+    """Flattened call record queued for persistence"""
+    timestamp: float
+    service_name: str
+    model_name: str
+    operation: str
+    prompt_template: str
+    input_tokens: int
+    output_tokens: int
+    total_tokens: int
+    cost: float
+    latency: float
+    success: bool
+
+    def as_row(self) -> Tuple:
+        return (
+            self.timestamp,
+            self.service_name,
+            self.model_name,
+            self.operation,
+            self.prompt_template,
+            self.input_tokens,
+            self.output_tokens,
+            self.total_tokens,
+            self.cost,
+            self.latency,
+            int(self.success),
+        )
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_calls (
+    timestamp REAL NOT NULL,
+    service_name TEXT NOT NULL,
+    model_name TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    prompt_template TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    total_tokens INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    latency REAL NOT NULL,
+    success INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ai_calls_timestamp ON ai_calls (timestamp);
+"""
+
+_ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_{name} (
+    bucket INTEGER NOT NULL,
+    service_name TEXT NOT NULL,
+    model_name TEXT NOT NULL,
+    prompt_template TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    successes INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    total_tokens INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    success_latency REAL NOT NULL,
+    max_latency REAL NOT NULL,
+    high_token_requests INTEGER NOT NULL,
+    high_token_tokens INTEGER NOT NULL,
+    PRIMARY KEY (bucket, service_name, model_name, prompt_template)
+);
+"""
+
+_ROLLUP_UPSERT = """
+INSERT INTO rollup_{name} (
+    bucket, service_name, model_name, prompt_template, requests, successes,
+    cost, total_tokens, input_tokens, output_tokens, success_latency,
+    max_latency, high_token_requests, high_token_tokens
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (bucket, service_name, model_name, prompt_template) DO UPDATE SET
+    requests = requests + excluded.requests,
+    successes = successes + excluded.successes,
+    cost = cost + excluded.cost,
+    total_tokens = total_tokens + excluded.total_tokens,
+    input_tokens = input_tokens + excluded.input_tokens,
+    output_tokens = output_tokens + excluded.output_tokens,
+    success_latency = success_latency + excluded.success_latency,
+    max_latency = MAX(max_latency, excluded.max_latency),
+    high_token_requests = high_token_requests + excluded.high_token_requests,
+    high_token_tokens = high_token_tokens + excluded.high_token_tokens
+"""
+
+_AGGREGATE_COLUMNS = """
+    SUM(requests) AS requests,
+    SUM(successes) AS successes,
+    SUM(cost) AS cost,
+    SUM(total_tokens) AS total_tokens,
+    SUM(success_latency) AS success_latency,
+    MAX(max_latency) AS max_latency,
+    SUM(high_token_requests) AS high_token_requests,
+    SUM(high_token_tokens) AS high_token_tokens
+"""
+
+_GROUP_COLUMNS = {"service_name", "model_name", "prompt_template"}
+
+
+class MetricsStore:
+    """Append-only SQLite metrics store with minute/hour/day roll-ups"""
+
+    def __init__(
+        self,
+        db_path: str,
+        retention_days: int = 30,
+        raw_retention_days: int = 7,
+        minute_retention_hours: int = 48,
+        flush_interval: float = 1.0,
+        batch_size: int = 1000,
+        max_queue_size: int = 100000,
+    ):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.raw_retention_days = raw_retention_days
+        self.minute_retention_hours = minute_retention_hours
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._queue: "queue.Queue[MetricsRecord]" = queue.Queue(maxsize=max_queue_size)
+        self.dropped_records = 0
+        self.written_records = 0
+        self._last_prune = 0.0
+        self._stop = threading.Event()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+            for name in ROLLUP_RESOLUTIONS:
+                conn.executescript(_ROLLUP_SCHEMA.format(name=name))
+        finally:
+            conn.close()
+
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="ai-metrics-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _query(self, sql: str, params: Tuple) -> List[sqlite3.Row]:
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Write path
+    # ------------------------------------------------------------------
+
+    def append(self, record: MetricsRecord) -> bool:
+        """Queue a record for persistence without blocking.
+
+        Returns False (and counts a drop) if the write queue is full.
+        """
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped_records += 1
+            return False
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until every queued record has been written"""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.01)
+        return self._queue.unfinished_tasks == 0
+
+    def close(self):
+        """Flush pending records and stop the writer thread"""
+        self.flush()
+        self._stop.set()
+        self._writer.join(timeout=self.flush_interval * 2)
+
+    def _writer_loop(self):
+        conn = self._connect()
+        try:
+            while not self._stop.is_set():
+                batch = self._drain_batch()
+                if batch:
+                    try:
+                        self._write_batch(conn, batch)
+                        self.written_records += len(batch)
+                    except Exception as e:
+                        logger.error(f"Failed to write {len(batch)} metrics records: {e}")
+                    finally:
+                        for _ in batch:
+                            self._queue.task_done()
+
+                if time.time() - self._last_prune > 3600:
+                    try:
+                        self._prune(conn)
+                    except Exception as e:
+                        logger.error(f"Failed to prune metrics store: {e}")
+                    self._last_prune = time.time()
+        finally:
+            conn.close()
+
+    def _drain_batch(self) -> List[MetricsRecord]:
+        batch: List[MetricsRecord] = []
+        try:
+            batch.append(self._queue.get(timeout=self.flush_interval))
+        except queue.Empty:
+            return batch
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[MetricsRecord]):
+        rollups = {name: self._aggregate(batch, seconds) for name, seconds in ROLLUP_RESOLUTIONS.items()}
+
+        with conn:
+            conn.executemany(
+                "INSERT INTO ai_calls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [record.as_row() for record in batch],
+            )
+            for name, rows in rollups.items():
+                conn.executemany(_ROLLUP_UPSERT.format(name=name), rows)
+
+    @staticmethod
+    def _aggregate(batch: List[MetricsRecord], bucket_seconds: int) -> List[Tuple]:
+        """Pre-aggregate a batch so each bucket/dimension is upserted once"""
+        groups: Dict[Tuple, List[float]] = defaultdict(lambda: [0, 0, 0.0, 0, 0, 0, 0.0, 0.0, 0, 0])
+
+        for record in batch:
+            bucket = int(record.timestamp // bucket_seconds) * bucket_seconds
+            acc = groups[(bucket, record.service_name, record.model_name, record.prompt_template)]
+            acc[0] += 1
+            acc[2] += record.cost
+            acc[3] += record.total_tokens
+            acc[4] += record.input_tokens
+            acc[5] += record.output_tokens
+            if record.success:
+                acc[1] += 1
+                acc[6] += record.latency
+            acc[7] = max(acc[7], record.latency)
+            if record.total_tokens > HIGH_TOKEN_THRESHOLD:
+                acc[8] += 1
+                acc[9] += record.total_tokens
+
+        return [key + tuple(values) for key, values in groups.items()]
+
+    def _prune(self, conn: sqlite3.Connection):
+        now = time.time()
+        with conn:
+            conn.execute(
+                "DELETE FROM ai_calls WHERE timestamp < ?",
+                (now - self.raw_retention_days * 86400,),
+            )
+            conn.execute(
+                "DELETE FROM rollup_minute WHERE bucket < ?",
+                (now - self.minute_retention_hours * 3600,),
+            )
+            conn.execute(
+                "DELETE FROM rollup_hour WHERE bucket < ?",
+                (now - self.retention_days * 86400,),
+            )
+            conn.execute(
+                "DELETE FROM rollup_day WHERE bucket < ?",
+                (now - 365 * 86400,),
+            )
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+
+    def _resolution_for_window(self, window_seconds: float) -> str:
+        """Pick the finest roll-up that is retained for the whole window"""
+        if window_seconds <= min(6 * 3600, self.minute_retention_hours * 3600):
+            return "minute"
+        if window_seconds <= 7 * 86400:
+            return "hour"
+        return "day"
+
+    def aggregate(
+        self,
+        start: float,
+        end: Optional[float] = None,
+        group_by: Optional[str] = None,
+        resolution: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Aggregate roll-ups over [start, end), optionally grouped by a dimension.
+
+        Window edges are aligned to the chosen roll-up's bucket boundaries.
+        """
+        end = end if end is not None else time.time()
+        resolution = resolution or self._resolution_for_window(end - start)
+        bucket_seconds = ROLLUP_RESOLUTIONS[resolution]
+        start_bucket = int(start // bucket_seconds) * bucket_seconds
+
+        if group_by is not None and group_by not in _GROUP_COLUMNS:
+            raise ValueError(f"Unsupported group_by column: {group_by}")
+
+        select_group = f"{group_by} AS dimension," if group_by else ""
+        group_clause = f"GROUP BY {group_by}" if group_by else ""
+
+        rows = self._query(
+            f"SELECT {select_group} {_AGGREGATE_COLUMNS} "
+            f"FROM rollup_{resolution} WHERE bucket >= ? AND bucket < ? {group_clause}",
+            (start_bucket, end),
+        )
+
+        return [dict(row) for row in rows if row["requests"]]
+
+    def time_series(
+        self,
+        start: float,
+        end: Optional[float] = None,
+        bucket_seconds: int = 3600,
+        resolution: Optional[str] = None,
+    ) -> Dict[int, Dict[str, Any]]:
+        """Return per-bucket totals keyed by ``bucket_start // bucket_seconds``"""
+        end = end if end is not None else time.time()
+        resolution = resolution or self._resolution_for_window(end - start)
+        resolution_seconds = ROLLUP_RESOLUTIONS[resolution]
+        if bucket_seconds < resolution_seconds:
+            bucket_seconds = resolution_seconds
+        start_bucket = int(start // resolution_seconds) * resolution_seconds
+
+        rows = self._query(
+            f"SELECT bucket / ? AS slot, {_AGGREGATE_COLUMNS} "
+            f"FROM rollup_{resolution} WHERE bucket >= ? AND bucket < ? "
+            f"GROUP BY slot ORDER BY slot",
+            (bucket_seconds, start_bucket, end),
+        )
+
+        return {int(row["slot"]): dict(row) for row in rows}
+
+    def raw_calls(
+        self,
+        start: float,
+        end: Optional[float] = None,
+        min_tokens: int = 0,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """Return raw call rows for drill-down (bounded by ``limit``)"""
+        end = end if end is not None else time.time()
+        rows = self._query(
+            "SELECT * FROM ai_calls WHERE timestamp >= ? AND timestamp < ? "
+            "AND total_tokens >= ? ORDER BY timestamp DESC LIMIT ?",
+            (start, end, min_tokens, limit),
+        )
+        return [dict(row) for row in rows]
+
+    def get_store_stats(self) -> Dict[str, Any]:
+        """Return write-path health for the store itself"""
+        return {
+            "db_path": self.db_path,
+            "queued_records": self._queue.qsize(),
+            "written_records": self.written_records,
+            "dropped_records": self.dropped_records,
+        }
@@ -18,6 +18,8 @@ import statistics
 from diskcache import Cache
 
 from app.core.config import settings
+from app.services.ai.metrics_store import MetricsRecord, MetricsStore
+from app.services.ai.prompts import get_prompt_registry
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +81,21 @@ class AIServiceCall:
             "timestamp": self.timestamp,
             "metadata": self.metadata
         }
+    
+    def to_metrics_record(self) -> MetricsRecord:
+        return MetricsRecord(
+            timestamp=self.timestamp,
+            service_name=self.service_name,
+            model_name=self.model_name,
+            operation=self.operation,
+            prompt_template=self.prompt_template or "",
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            total_tokens=self.total_tokens,
+            cost=self.cost,
+            latency=self.latency,
+            success=self.success
+        )
 
 
 @dataclass
@@ -195,9 +212,13 @@ class CostOptimization:
 class AIMonitor:
     """Core monitoring system for AI services"""
     
-    def __init__(self, retention_days: int = 30):
+    def __init__(self, retention_days: int = 30, metrics_store: Optional[MetricsStore] = None):
         self.retention_days = retention_days
-        self.call_history: deque = deque(maxlen=10000)  # Keep last 10k calls in memory
+        self.call_history: deque = deque(maxlen=10000)  # Recent calls for inspection only
+        self.metrics_store = metrics_store or MetricsStore(
+            settings.AI_METRICS_DB_PATH,
+            retention_days=retention_days
+        )
         self.metrics_cache: Dict[str, PerformanceMetrics] = {}
         self.alerts: List[Alert] = []
         self.thresholds = self._load_default_thresholds()
@@ -235,9 +256,8 @@ class AIMonitor:
         # Check for alerts
         self._check_alerts(call)
         
-        # Store in cache for persistence
-        cache_key = f"ai_call_{call.call_id}"
-        monitoring_cache.set(cache_key, call.to_dict(), expire=self.retention_days * 24 * 3600)
+        # Queue for the persistent metrics store (flushed in the background)
+        self.metrics_store.append(call.to_metrics_record())
     
     def _update_metrics(self, call: AIServiceCall):
         """Update performance metrics"""
@@ -390,43 +410,38 @@ class AIMonitor:
         monitoring_cache.set(cache_key, alert.to_dict(), expire=7 * 24 * 3600)  # 7 days
     
     def get_metrics(self, time_window_hours: int = 24) -> Dict[str, Any]:
-        """Get performance metrics for time window"""
+        """Get performance metrics for time window from the metrics store roll-ups"""
         
         cutoff_time = time.time() - (time_window_hours * 3600)
         
-        # Filter calls within time window
-        recent_calls = [call for call in self.call_history if call.timestamp >= cutoff_time]
+        totals = self.metrics_store.aggregate(cutoff_time)
         
-        if not recent_calls:
+        if not totals:
             return {"error": "No data available for specified time window"}
         
-        # Calculate metrics
-        total_requests = len(recent_calls)
-        successful_requests = sum(1 for call in recent_calls if call.success)
+        summary = totals[0]
+        total_requests = summary["requests"]
+        successful_requests = summary["successes"]
         failed_requests = total_requests - successful_requests
-        
-        total_cost = sum(call.cost for call in recent_calls)
-        total_tokens = sum(call.total_tokens for call in recent_calls)
-        total_latency = sum(call.latency for call in recent_calls if call.success)
-        
-        # Service breakdown
-        service_breakdown = defaultdict(lambda: {"requests": 0, "cost": 0, "tokens": 0})
-        model_breakdown = defaultdict(lambda: {"requests": 0, "cost": 0, "tokens": 0})
-        
-        for call in recent_calls:
-            service_breakdown[call.service_name]["requests"] += 1
-            service_breakdown[call.service_name]["cost"] += call.cost
-            service_breakdown[call.service_name]["tokens"] += call.total_tokens
-            
-            model_breakdown[call.model_name]["requests"] += 1
-            model_breakdown[call.model_name]["cost"] += call.cost
-            model_breakdown[call.model_name]["tokens"] += call.total_tokens
+        total_cost = summary["cost"]
+        total_tokens = summary["total_tokens"]
+        total_latency = summary["success_latency"]
+        
+        # Service and model breakdown
+        service_breakdown = {
+            row["dimension"]: self._breakdown_entry(row)
+            for row in self.metrics_store.aggregate(cutoff_time, group_by="service_name")
+        }
+        model_breakdown = {
+            row["dimension"]: self._breakdown_entry(row)
+            for row in self.metrics_store.aggregate(cutoff_time, group_by="model_name")
+        }
         
         # Cost trends (hourly breakdown)
-        hourly_costs = defaultdict(float)
-        for call in recent_calls:
-            hour = int(call.timestamp // 3600)
-            hourly_costs[hour] += call.cost
+        hourly_costs = {
+            hour: row["cost"]
+            for hour, row in self.metrics_store.time_series(cutoff_time, bucket_seconds=3600).items()
+        }
         
         return {
             "time_window_hours": time_window_hours,
@@ -440,14 +455,31 @@ class AIMonitor:
                 "average_latency": total_latency / successful_requests if successful_requests > 0 else 0,
                 "average_cost_per_request": total_cost / total_requests if total_requests > 0 else 0
             },
-            "service_breakdown": dict(service_breakdown),
-            "model_breakdown": dict(model_breakdown),
-            "hourly_costs": dict(hourly_costs),
+            "service_breakdown": service_breakdown,
+            "model_breakdown": model_breakdown,
+            "hourly_costs": hourly_costs,
+            "token_usage": {
+                "high_token_requests": summary["high_token_requests"],
+                "high_token_average": (
+                    summary["high_token_tokens"] / summary["high_token_requests"]
+                    if summary["high_token_requests"] else 0
+                )
+            },
             "cache_performance": {
                 "overall_hit_rate": self.metrics_cache.get("overall", PerformanceMetrics()).cache_hit_rate
             }
         }
     
+    @staticmethod
+    def _breakdown_entry(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "requests": row["requests"],
+            "cost": row["cost"],
+            "tokens": row["total_tokens"],
+            "high_token_requests": row["high_token_requests"],
+            "high_token_tokens": row["high_token_tokens"]
+        }
+    
     def get_active_alerts(self) -> List[Alert]:
         """Get active (unresolved) alerts"""
         return [alert for alert in self.alerts if not alert.resolved]
@@ -493,18 +525,22 @@ class CostOptimizer:
                 optimizations.append(self._create_model_optimization(model, stats, model_cost_percentage))
         
         # Token usage optimization
-        high_token_calls = [
-            call for call in self.monitor.call_history 
-            if call.total_tokens > 4000 and call.timestamp >= time.time() - (time_window_hours * 3600)
-        ]
-        
-        if len(high_token_calls) > 10:
-            optimizations.append(self._create_token_optimization(high_token_calls))
+        token_usage = metrics["token_usage"]
+        if token_usage["high_token_requests"] > 10:
+            affected_services = [
+                service for service, stats in metrics["service_breakdown"].items()
+                if stats["high_token_requests"] > 0
+            ]
+            optimizations.append(self._create_token_optimization(
+                token_usage["high_token_requests"],
+                token_usage["high_token_average"],
+                affected_services
+            ))
         
         # Cache optimization
         cache_hit_rate = metrics.get("cache_performance", {}).get("overall_hit_rate", 0)
         if cache_hit_rate < 0.3:  # Less than 30% cache hit rate
-            optimizations.append(self._create_cache_optimization(cache_hit_rate))
+            optimizations.append(self._create_cache_optimization(cache_hit_rate, metrics))
         
         # Prompt optimization
         prompt_inefficiencies = self._analyze_prompt_efficiency()
@@ -514,7 +550,7 @@ class CostOptimizer:
         # Error rate optimization
         error_rate = metrics["summary"]["failed_requests"] / max(metrics["summary"]["total_requests"], 1)
         if error_rate > 0.05:  # More than 5% error rate
-            optimizations.append(self._create_error_rate_optimization(error_rate))
+            optimizations.append(self._create_error_rate_optimization(error_rate, metrics))
         
         # Sort by priority score
         optimizations.sort(key=lambda x: x.priority_score, reverse=True)
@@ -562,22 +598,26 @@ class CostOptimizer:
             priority_score=85.0
         )
     
-    def _create_token_optimization(self, high_token_calls: List[AIServiceCall]) -> CostOptimization:
+    def _create_token_optimization(
+        self,
+        high_token_requests: int,
+        avg_tokens: float,
+        affected_services: List[str]
+    ) -> CostOptimization:
         """Create token usage optimization recommendation"""
         
-        avg_tokens = statistics.mean([call.total_tokens for call in high_token_calls])
         potential_reduction = avg_tokens * 0.25  # 25% token reduction
         
-        potential_cost_savings = len(high_token_calls) * (potential_reduction * 0.002) * 30  # Rough estimate
+        potential_cost_savings = high_token_requests * (potential_reduction * 0.002) * 30  # Rough estimate
         
         return CostOptimization(
             optimization_id=f"token_opt_{int(time.time())}",
             title="Optimize Token Usage",
-            description=f"Found {len(high_token_calls)} high-token requests (avg: {avg_tokens:.0f} tokens). Prompt optimization can reduce token usage.",
+            description=f"Found {high_token_requests} high-token requests (avg: {avg_tokens:.0f} tokens). Prompt optimization can reduce token usage.",
             potential_savings=potential_cost_savings,
             implementation_effort="low",
             impact_on_quality="none",
-            affected_services=list(set([call.service_name for call in high_token_calls])),
+            affected_services=affected_services,
             implementation_steps=[
                 "Analyze prompts with highest token usage",
                 "Remove unnecessary context and examples",
@@ -589,7 +629,7 @@ class CostOptimizer:
             priority_score=75.0
         )
     
-    def _create_cache_optimization(self, current_hit_rate: float) -> CostOptimization:
+    def _create_cache_optimization(self, current_hit_rate: float, metrics: Dict[str, Any]) -> CostOptimization:
         """Create cache optimization recommendation"""
         
         # Estimate potential savings from improved caching
@@ -597,11 +637,11 @@ class CostOptimizer:
         improvement = target_hit_rate - current_hit_rate
         
         # Rough estimate: each cache hit saves average request cost
-        recent_calls = list(self.monitor.call_history)[-1000:]  # Last 1000 calls
-        if recent_calls:
-            avg_cost_per_request = statistics.mean([call.cost for call in recent_calls])
-            monthly_requests = len(recent_calls) * 30  # Rough monthly estimate
-            potential_savings = monthly_requests * improvement * avg_cost_per_request
+        summary = metrics["summary"]
+        if summary["total_requests"]:
+            days = max(metrics["time_window_hours"] / 24, 1)
+            monthly_requests = summary["total_requests"] / days * 30
+            potential_savings = monthly_requests * improvement * summary["average_cost_per_request"]
         else:
             potential_savings = 50.0  # Default estimate
         
@@ -629,31 +669,24 @@ class CostOptimizer:
         
         optimizations = []
         
-        # Analyze recent calls for prompt inefficiencies
-        recent_calls = [
-            call for call in self.monitor.call_history 
-            if call.timestamp >= time.time() - (24 * 3600)  # Last 24 hours
-        ]
-        
-        if not recent_calls:
-            return optimizations
-        
-        # Group by prompt template
-        template_stats = defaultdict(list)
-        for call in recent_calls:
-            if call.prompt_template:
-                template_stats[call.prompt_template].append(call)
+        # Analyze the last 24 hours of calls grouped by prompt template
+        template_stats = self.monitor.metrics_store.aggregate(
+            time.time() - (24 * 3600),
+            group_by="prompt_template"
+        )
         
-        for template, calls in template_stats.items():
-            if len(calls) < 10:  # Skip templates with few calls
+        for stats in template_stats:
+            template = stats["dimension"]
+            request_count = stats["requests"]
+            if not template or request_count < 10:  # Skip untemplated calls and templates with few calls
                 continue
             
-            avg_tokens = statistics.mean([call.total_tokens for call in calls])
-            avg_cost = statistics.mean([call.cost for call in calls])
+            avg_tokens = stats["total_tokens"] / request_count
+            avg_cost = stats["cost"] / request_count
             
             # Check if this template is expensive
             if avg_cost > 0.1:  # $0.10 per request
-                potential_savings = len(calls) * avg_cost * 0.2 * 30  # 20% savings, monthly
+                potential_savings = request_count * avg_cost * 0.2 * 30  # 20% savings, monthly
                 
                 optimizations.append(CostOptimization(
                     optimization_id=f"prompt_opt_{template}_{int(time.time())}",
@@ -676,18 +709,17 @@ class CostOptimizer:
         
         return optimizations
     
-    def _create_error_rate_optimization(self, error_rate: float) -> CostOptimization:
+    def _create_error_rate_optimization(self, error_rate: float, metrics: Dict[str, Any]) -> CostOptimization:
         """Create error rate optimization recommendation"""
         
         # Estimate cost of errors (retries, manual intervention, etc.)
-        recent_calls = list(self.monitor.call_history)[-1000:]
-        if recent_calls:
-            avg_cost_per_request = statistics.mean([call.cost for call in recent_calls])
-            failed_requests = [call for call in recent_calls if not call.success]
+        summary = metrics["summary"]
+        if summary["total_requests"]:
+            days = max(metrics["time_window_hours"] / 24, 1)
             
             # Assume each error leads to 2 retries on average
-            error_cost = len(failed_requests) * avg_cost_per_request * 2
-            potential_savings = error_cost * 30  # Monthly estimate
+            daily_error_cost = summary["failed_requests"] / days * summary["average_cost_per_request"] * 2
+            potential_savings = daily_error_cost * 30  # Monthly estimate
         else:
             potential_savings = 100.0  # Default estimate
         
@@ -797,10 +829,13 @@ class AIMonitoringService:
             "weekly_trends": metrics_7d,
             "cost_optimization": cost_analysis,
             "active_alerts": active_alerts,
+            # Prompt prefix caching of this process; fleet-wide totals are in /metrics
+            "prompt_cache": get_prompt_registry().get_cache_report(),
             "system_health": {
                 "monitoring_status": "healthy",
                 "last_updated": time.time(),
-                "data_retention_days": self.monitor.retention_days
+                "data_retention_days": self.monitor.retention_days,
+                "metrics_store": self.monitor.metrics_store.get_store_stats()
             }
         }
     
@@ -811,17 +846,16 @@ class AIMonitoringService:
     def get_cost_trends(self, days: int = 30) -> Dict[str, Any]:
         """Get cost trends over time"""
         
-        # Get historical data from cache
-        daily_costs = defaultdict(float)
-        daily_requests = defaultdict(int)
-        
+        # Read daily roll-ups from the metrics store
         cutoff_time = time.time() - (days * 24 * 3600)
+        daily_rollups = self.monitor.metrics_store.time_series(
+            cutoff_time,
+            bucket_seconds=24 * 3600,
+            resolution="day"
+        )
         
-        for call in self.monitor.call_history:
-            if call.timestamp >= cutoff_time:
-                day = int(call.timestamp // (24 * 3600))
-                daily_costs[day] += call.cost
-                daily_requests[day] += 1
+        daily_costs = {day: row["cost"] for day, row in daily_rollups.items()}
+        daily_requests = {day: row["requests"] for day, row in daily_rollups.items()}
         
         # Convert to time series
         cost_trend = []
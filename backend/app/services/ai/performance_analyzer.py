@@ -19,6 +19,8 @@ import numpy as np
 from diskcache import Cache
 
 from app.core.config import settings
+from app.services.ai.cache_manager import cached
+from app.services.ai.performance_frame import PerformanceFrame
 from app.services.ai.providers import get_text_service
 from app.services.ai.vector_db import get_vector_service
 from app.services.ai.prompts import get_prompt_template
@@ -201,6 +203,13 @@ class PerformanceAnalyzer:
         if self.vector_service is None:
             self.vector_service = await get_vector_service()
     
+    @cached(
+        "performance_analyzer",
+        "analyze_content_performance",
+        ttl=settings.CACHE_TTL_ANALYSIS,
+        stale_while_revalidate=settings.CACHE_TTL_ANALYSIS,
+        bound_method=True
+    )
     async def analyze_content_performance(
         self,
         performance_data: List[ContentPerformance],
@@ -222,11 +231,14 @@ class PerformanceAnalyzer:
         if not recent_data:
             return {"error": f"No data available for time range: {time_range}"}
         
+        # Load metrics into columns once for the vectorized analyses
+        frame = PerformanceFrame.from_content(recent_data)
+        
         # Calculate aggregate metrics
-        aggregate_metrics = self._calculate_aggregate_metrics(recent_data)
+        aggregate_metrics = frame.aggregate_metrics()
         
         # Identify top performers
-        top_performers = self._identify_top_performers(recent_data)
+        top_performers = frame.top_performers()
         
         # Analyze performance patterns
         patterns = await self._analyze_performance_patterns(recent_data)
@@ -241,10 +253,16 @@ class PerformanceAnalyzer:
         content_type_analysis = self._analyze_content_type_performance(recent_data)
         
         # Hashtag effectiveness  
-        hashtag_analysis = self._analyze_hashtag_effectiveness(recent_data)
+        hashtag_analysis = {**frame.hashtag_effectiveness(), "co_occurrence": frame.hashtag_cooccurrence()}
         
         # Audience insights
-        audience_insights = self._analyze_audience_patterns(recent_data)
+        audience_insights = frame.audience_patterns()
+        
+        # Engagement distribution and daily trajectory
+        engagement_distribution = {
+            "percentiles": frame.engagement_percentiles(),
+            "daily_growth": frame.engagement_growth()
+        }
         
         return {
             "summary": {
@@ -259,7 +277,8 @@ class PerformanceAnalyzer:
             "platform_comparison": platform_comparison,
             "content_type_analysis": content_type_analysis,
             "hashtag_analysis": hashtag_analysis,
-            "audience_insights": audience_insights
+            "audience_insights": audience_insights,
+            "engagement_distribution": engagement_distribution
         }
     
     def _get_time_cutoff(self, time_range: TimeRange) -> float:
@@ -279,49 +298,11 @@ class PerformanceAnalyzer:
     
     def _calculate_aggregate_metrics(self, data: List[ContentPerformance]) -> Dict[str, float]:
         """Calculate aggregate performance metrics"""
-        
-        if not data:
-            return {}
-        
-        # Collect all metric values
-        metric_values = defaultdict(list)
-        
-        for content in data:
-            for metric in content.metrics:
-                metric_values[metric.metric_type].append(metric.value)
-        
-        # Calculate statistics for each metric
-        aggregates = {}
-        
-        for metric_type, values in metric_values.items():
-            if values:
-                aggregates[f"{metric_type}_avg"] = statistics.mean(values)
-                aggregates[f"{metric_type}_median"] = statistics.median(values)
-                aggregates[f"{metric_type}_max"] = max(values)
-                aggregates[f"{metric_type}_min"] = min(values)
-                aggregates[f"{metric_type}_total"] = sum(values)
-        
-        # Calculate derived metrics
-        total_engagement_rate = statistics.mean([c.get_engagement_rate() for c in data])
-        total_roi = statistics.mean([c.get_roi() for c in data if c.get_roi() is not None])
-        
-        aggregates["avg_engagement_rate"] = total_engagement_rate
-        aggregates["avg_roi"] = total_roi
-        aggregates["content_count"] = len(data)
-        
-        return aggregates
+        return PerformanceFrame.from_content(data).aggregate_metrics()
     
     def _identify_top_performers(self, data: List[ContentPerformance], limit: int = 10) -> List[ContentPerformance]:
-        """Identify top performing content"""
-        
-        # Sort by engagement rate, then by reach
-        sorted_data = sorted(
-            data,
-            key=lambda c: (c.get_engagement_rate(), c.get_metric_value(MetricType.REACH) or 0),
-            reverse=True
-        )
-        
-        return sorted_data[:limit]
+        """Identify top performing content by engagement rate, then reach"""
+        return PerformanceFrame.from_content(data).top_performers(limit)
     
     async def _analyze_performance_patterns(self, data: List[ContentPerformance]) -> Dict[str, Any]:
         """Analyze patterns in performance data"""
@@ -481,76 +462,12 @@ class PerformanceAnalyzer:
     
     def _analyze_hashtag_effectiveness(self, data: List[ContentPerformance]) -> Dict[str, Any]:
         """Analyze hashtag effectiveness"""
-        
-        hashtag_performance = defaultdict(list)
-        
-        for content in data:
-            engagement = content.get_engagement_rate()
-            for hashtag in content.hashtags:
-                hashtag_performance[hashtag].append(engagement)
-        
-        # Calculate average performance for each hashtag
-        hashtag_analysis = {}
-        
-        for hashtag, engagements in hashtag_performance.items():
-            if len(engagements) >= 2:  # Only include hashtags used multiple times
-                hashtag_analysis[hashtag] = {
-                    "usage_count": len(engagements),
-                    "avg_engagement": statistics.mean(engagements),
-                    "performance_consistency": 1 - (statistics.stdev(engagements) / statistics.mean(engagements)) if statistics.mean(engagements) > 0 else 0
-                }
-        
-        # Sort by average engagement
-        top_hashtags = sorted(
-            hashtag_analysis.items(),
-            key=lambda x: x[1]["avg_engagement"],
-            reverse=True
-        )[:10]
-        
-        return {
-            "top_performing_hashtags": dict(top_hashtags),
-            "total_unique_hashtags": len(hashtag_performance),
-            "avg_hashtags_per_post": statistics.mean([len(c.hashtags) for c in data]) if data else 0
-        }
+        frame = PerformanceFrame.from_content(data)
+        return {**frame.hashtag_effectiveness(), "co_occurrence": frame.hashtag_cooccurrence()}
     
     def _analyze_audience_patterns(self, data: List[ContentPerformance]) -> Dict[str, Any]:
         """Analyze audience engagement patterns"""
-        
-        if not data:
-            return {}
-        
-        # Aggregate audience demographics
-        total_demographics = defaultdict(int)
-        total_engagement_by_demo = defaultdict(list)
-        
-        for content in data:
-            engagement = content.get_engagement_rate()
-            
-            for demo_key, demo_value in content.audience_demographics.items():
-                if isinstance(demo_value, dict):
-                    for sub_key, count in demo_value.items():
-                        key = f"{demo_key}_{sub_key}"
-                        total_demographics[key] += count
-                        total_engagement_by_demo[key].append(engagement)
-        
-        # Calculate engagement by demographic
-        demo_engagement = {}
-        for demo, engagements in total_engagement_by_demo.items():
-            if engagements:
-                demo_engagement[demo] = statistics.mean(engagements)
-        
-        # Find most engaging demographics
-        top_demographics = sorted(
-            demo_engagement.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
-        
-        return {
-            "top_engaging_demographics": dict(top_demographics),
-            "total_audience_segments": len(total_demographics),
-            "audience_diversity_score": len(total_demographics) / max(total_demographics.values()) if total_demographics else 0
-        }
+        return PerformanceFrame.from_content(data).audience_patterns()
 
 
 class PerformancePredictor:
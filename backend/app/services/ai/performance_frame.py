@@ -0,0 +1,294 @@
+"""
+Columnar performance analytics
+
+``PerformanceFrame`` loads a batch of ``ContentPerformance`` into NumPy
+arrays once: the latest value of every metric per content, engagement rate
+and ROI, and flat (content, code) arrays for hashtag and audience segment
+occurrences. Aggregates, rankings, hashtag and audience statistics,
+percentiles, hashtag co-occurrence and time-bucketed growth are then
+vectorized group-bys over those arrays instead of per-object loops calling
+``get_metric_value``, and match the per-object results of
+``PerformanceAnalyzer``.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Sequence, Tuple
+
+import numpy as np
+
+
+def _encode(keys: Sequence[Hashable]) -> Tuple[List[Hashable], np.ndarray]:
+    """Distinct keys in first-appearance order and the code of each key"""
+    codes: Dict[Hashable, int] = {}
+    encoded = np.fromiter((codes.setdefault(key, len(codes)) for key in keys), dtype=np.int64, count=len(keys))
+    return list(codes), encoded
+
+
+def _group_mean(codes: np.ndarray, values: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-code occurrence counts and means"""
+    counts = np.bincount(codes, minlength=size)
+    sums = np.bincount(codes, weights=values, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return counts, sums / counts
+
+
+def bucketed_growth(timestamps: np.ndarray, values: np.ndarray, bucket_seconds: float) -> List[Dict[str, Any]]:
+    """
+    Mean value per time bucket and its change against the previous bucket
+
+    Empty buckets are left out; growth compares consecutive non-empty
+    buckets and is None for the first one or after a zero mean.
+    """
+    timestamps = np.asarray(timestamps, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if not timestamps.size:
+        return []
+
+    buckets = np.floor(timestamps / bucket_seconds).astype(np.int64)
+    occupied, codes = np.unique(buckets, return_inverse=True)
+    counts, means = _group_mean(codes, values, len(occupied))
+
+    previous = np.concatenate(([np.nan], means[:-1]))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        growth = (means - previous) / previous * 100
+
+    return [
+        {
+            "bucket_start": float(bucket * bucket_seconds),
+            "content_count": int(count),
+            "avg_value": float(mean),
+            "growth_rate": float(rate) if np.isfinite(rate) else None,
+        }
+        for bucket, count, mean, rate in zip(occupied, counts, means, growth)
+    ]
+
+
+@dataclass
+class PerformanceFrame:
+    """Performance metrics of a content batch as columns"""
+    content: List[Any]                  # ContentPerformance, row order
+    published_at: np.ndarray            # (n,)
+    metric_types: List[Any]             # MetricType, first-appearance order
+    metric_codes: np.ndarray            # (m,) per metric observation, index into metric_types
+    metric_values: np.ndarray           # (m,)
+    latest: np.ndarray                  # (n, len(metric_types)) latest value, NaN if missing
+    engagement_rate: np.ndarray         # (n,)
+    roi: np.ndarray                     # (n,)
+    hashtags: List[str]
+    hashtag_rows: np.ndarray            # (h,) per hashtag occurrence
+    hashtag_codes: np.ndarray           # (h,) index into hashtags
+    hashtag_counts: np.ndarray          # (n,) hashtags per post
+    segments: List[str]                 # "{demographic}_{segment}"
+    segment_rows: np.ndarray            # (s,) per segment occurrence
+    segment_codes: np.ndarray           # (s,)
+    segment_sizes: np.ndarray           # (s,) audience count of the occurrence
+
+    @classmethod
+    def from_content(cls, data: Sequence[Any]) -> "PerformanceFrame":
+        # Imported here: performance_analyzer builds frames from this module
+        from app.services.ai.performance_analyzer import MetricType
+
+        content = list(data)
+        metrics = [(row, metric) for row, item in enumerate(content) for metric in item.metrics]
+        metric_types, metric_codes = _encode([metric.metric_type for _, metric in metrics])
+        metric_rows = np.fromiter((row for row, _ in metrics), dtype=np.int64, count=len(metrics))
+        metric_times = np.fromiter((metric.timestamp for _, metric in metrics), dtype=float, count=len(metrics))
+        metric_values = np.fromiter((metric.value for _, metric in metrics), dtype=float, count=len(metrics))
+
+        # Latest observation per (content, metric); the first one wins timestamp ties
+        latest = np.full((len(content), len(metric_types)), np.nan)
+        if metrics:
+            order = np.lexsort((-np.arange(len(metrics)), metric_times, metric_codes, metric_rows))
+            rows, codes = metric_rows[order], metric_codes[order]
+            last = np.ones(len(order), dtype=bool)
+            last[:-1] = (rows[1:] != rows[:-1]) | (codes[1:] != codes[:-1])
+            latest[rows[last], codes[last]] = metric_values[order][last]
+
+        def column(metric_type: MetricType, default: float) -> np.ndarray:
+            if metric_type not in metric_types:
+                return np.full(len(content), default)
+            values = latest[:, metric_types.index(metric_type)]
+            # Mirrors ``get_metric_value(...) or default``
+            return np.where(np.isnan(values) | (values == 0), default, values)
+
+        interactions = column(MetricType.LIKES, 0) + column(MetricType.COMMENTS, 0) + column(MetricType.SHARES, 0)
+        impressions = column(MetricType.IMPRESSIONS, 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            engagement_rate = np.where(impressions > 0, interactions / impressions, 0.0)
+
+        revenue = np.fromiter((item.cost_data.get("revenue_generated", 0) for item in content), dtype=float, count=len(content))
+        cost = np.fromiter((item.cost_data.get("total_cost", 1) for item in content), dtype=float, count=len(content))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            roi = np.where(cost > 0, (revenue - cost) / cost, 0.0)
+
+        tagged = [(row, hashtag) for row, item in enumerate(content) for hashtag in item.hashtags]
+        hashtags, hashtag_codes = _encode([hashtag for _, hashtag in tagged])
+
+        audience = [
+            (row, f"{demo_key}_{sub_key}", size)
+            for row, item in enumerate(content)
+            for demo_key, demo_value in item.audience_demographics.items()
+            if isinstance(demo_value, dict)
+            for sub_key, size in demo_value.items()
+        ]
+        segments, segment_codes = _encode([segment for _, segment, _ in audience])
+
+        return cls(
+            content=content,
+            published_at=np.fromiter((item.published_at for item in content), dtype=float, count=len(content)),
+            metric_types=metric_types,
+            metric_codes=metric_codes,
+            metric_values=metric_values,
+            latest=latest,
+            engagement_rate=engagement_rate,
+            roi=roi,
+            hashtags=hashtags,
+            hashtag_rows=np.fromiter((row for row, _ in tagged), dtype=np.int64, count=len(tagged)),
+            hashtag_codes=hashtag_codes,
+            hashtag_counts=np.fromiter((len(item.hashtags) for item in content), dtype=float, count=len(content)),
+            segments=segments,
+            segment_rows=np.fromiter((row for row, _, _ in audience), dtype=np.int64, count=len(audience)),
+            segment_codes=segment_codes,
+            segment_sizes=np.fromiter((size for _, _, size in audience), dtype=float, count=len(audience)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.content)
+
+    def metric(self, metric_type: Any) -> np.ndarray:
+        """Latest value of a metric per content, NaN where it was not recorded"""
+        if metric_type not in self.metric_types:
+            return np.full(len(self), np.nan)
+        return self.latest[:, self.metric_types.index(metric_type)]
+
+    def aggregate_metrics(self) -> Dict[str, float]:
+        """Statistics over every recorded value of each metric, plus averages"""
+        if not len(self):
+            return {}
+
+        aggregates: Dict[str, float] = {}
+        for code, metric_type in enumerate(self.metric_types):
+            values = self.metric_values[self.metric_codes == code]
+            aggregates[f"{metric_type}_avg"] = float(values.mean())
+            aggregates[f"{metric_type}_median"] = float(np.median(values))
+            aggregates[f"{metric_type}_max"] = float(values.max())
+            aggregates[f"{metric_type}_min"] = float(values.min())
+            aggregates[f"{metric_type}_total"] = float(values.sum())
+
+        aggregates["avg_engagement_rate"] = float(self.engagement_rate.mean())
+        aggregates["avg_roi"] = float(self.roi.mean())
+        aggregates["content_count"] = len(self)
+        return aggregates
+
+    def top_performers(self, limit: int = 10) -> List[Any]:
+        """Content by engagement rate, then reach, best first"""
+        from app.services.ai.performance_analyzer import MetricType
+
+        reach = np.nan_to_num(self.metric(MetricType.REACH))
+        # lexsort is stable, so ties keep their input order like sorted(reverse=True)
+        order = np.lexsort((-reach, -self.engagement_rate))[:limit]
+        return [self.content[row] for row in order]
+
+    def hashtag_effectiveness(self, min_usage: int = 2, limit: int = 10) -> Dict[str, Any]:
+        """Engagement of hashtags used at least ``min_usage`` times"""
+        engagement = self.engagement_rate[self.hashtag_rows]
+        counts, means = _group_mean(self.hashtag_codes, engagement, len(self.hashtags))
+
+        deviations = (engagement - means[self.hashtag_codes]) ** 2
+        squares = np.bincount(self.hashtag_codes, weights=deviations, minlength=len(self.hashtags))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            stdev = np.sqrt(squares / (counts - 1))
+            consistency = np.where(means > 0, 1 - stdev / means, 0)
+
+        eligible = np.flatnonzero(counts >= min_usage)
+        ranked = eligible[np.argsort(-means[eligible], kind="stable")][:limit]
+
+        return {
+            "top_performing_hashtags": {
+                self.hashtags[code]: {
+                    "usage_count": int(counts[code]),
+                    "avg_engagement": float(means[code]),
+                    "performance_consistency": float(consistency[code]),
+                }
+                for code in ranked
+            },
+            "total_unique_hashtags": len(self.hashtags),
+            "avg_hashtags_per_post": float(self.hashtag_counts.mean()) if len(self) else 0,
+        }
+
+    def audience_patterns(self, limit: int = 5) -> Dict[str, Any]:
+        """Mean engagement per audience segment and segment diversity"""
+        if not len(self):
+            return {}
+
+        engagement = self.engagement_rate[self.segment_rows]
+        _, means = _group_mean(self.segment_codes, engagement, len(self.segments))
+        sizes = np.bincount(self.segment_codes, weights=self.segment_sizes, minlength=len(self.segments))
+        ranked = np.argsort(-means, kind="stable")[:limit]
+        largest = sizes.max() if len(self.segments) else 0
+
+        return {
+            "top_engaging_demographics": {self.segments[code]: float(means[code]) for code in ranked},
+            "total_audience_segments": len(self.segments),
+            "audience_diversity_score": len(self.segments) / largest if largest else 0,
+        }
+
+    def engagement_percentiles(self, percentiles: Sequence[float] = (25, 50, 75, 90, 99)) -> Dict[str, float]:
+        """Engagement rate distribution across the batch"""
+        if not len(self):
+            return {}
+        values = np.percentile(self.engagement_rate, percentiles)
+        return {f"p{percentile:g}": float(value) for percentile, value in zip(percentiles, values)}
+
+    def hashtag_cooccurrence(
+        self,
+        limit: int = 10,
+        min_count: int = 2,
+        max_hashtags: int = 200,
+        chunk_rows: int = 10_000
+    ) -> List[Dict[str, Any]]:
+        """
+        Hashtag pairs used together most often
+
+        Counted as the Gram matrix of the post x hashtag incidence matrix,
+        restricted to the ``max_hashtags`` most used hashtags so it stays
+        small for large batches.
+        """
+        if not self.hashtags:
+            return []
+
+        usage = np.bincount(self.hashtag_codes, minlength=len(self.hashtags))
+        kept = np.argsort(-usage, kind="stable")[:max_hashtags]
+        column = np.full(len(self.hashtags), -1)
+        column[kept] = np.arange(len(kept))
+
+        selected = column[self.hashtag_codes] >= 0
+        rows, columns = self.hashtag_rows[selected], column[self.hashtag_codes[selected]]
+
+        # Accumulated over row chunks to bound the dense incidence matrix
+        together = np.zeros((len(kept), len(kept)))
+        engagement = np.zeros((len(kept), len(kept)))
+        for start in range(0, len(self), chunk_rows):
+            in_chunk = (rows >= start) & (rows < start + chunk_rows)
+            incidence = np.zeros((min(chunk_rows, len(self) - start), len(kept)))
+            incidence[rows[in_chunk] - start, columns[in_chunk]] = 1
+            together += incidence.T @ incidence
+            engagement += (incidence * self.engagement_rate[start:start + chunk_rows, None]).T @ incidence
+
+        first, second = np.triu_indices(len(kept), k=1)
+        counts = together[first, second]
+        pairs = np.flatnonzero(counts >= min_count)
+        pairs = pairs[np.argsort(-counts[pairs], kind="stable")][:limit]
+
+        return [
+            {
+                "hashtags": [self.hashtags[kept[first[pair]]], self.hashtags[kept[second[pair]]]],
+                "count": int(counts[pair]),
+                "avg_engagement": float(engagement[first[pair], second[pair]] / counts[pair]),
+            }
+            for pair in pairs
+        ]
+
+    def engagement_growth(self, bucket_seconds: float = 24 * 3600) -> List[Dict[str, Any]]:
+        """Mean engagement rate of content published per time bucket"""
+        return bucketed_growth(self.published_at, self.engagement_rate, bucket_seconds)
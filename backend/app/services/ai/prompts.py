@@ -6,13 +6,17 @@ for consistent and optimized AI interactions across all services.
 """
 
 import json
+import string
 import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
 import logging
 
 from app.core.config import settings
+from app.core.metrics import observe_prompt_tokens, record_prompt_prefix_render
+from app.services.ai.base import AIResponse, TokenCounter
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +44,9 @@ class PromptMetrics:
     average_latency: float = 0.0
     average_cost: float = 0.0
     usage_count: int = 0
+    prompt_tokens: int = 0
+    cacheable_prompt_tokens: int = 0  # Tokens in the static, cache-eligible prefix
+    cached_prompt_tokens: int = 0  # Tokens the provider reported as served from its cache
     last_updated: float = field(default_factory=time.time)
     
     def update(self, success: bool, latency: float, cost: float):
@@ -49,6 +56,20 @@ class PromptMetrics:
         self.average_latency = ((self.average_latency * (self.usage_count - 1)) + latency) / self.usage_count
         self.average_cost = ((self.average_cost * (self.usage_count - 1)) + cost) / self.usage_count
         self.last_updated = time.time()
+    
+    def update_tokens(self, prompt_tokens: int, cacheable_tokens: int, cached_tokens: int):
+        """Accumulate prompt token usage for cache-ratio reporting"""
+        self.prompt_tokens += prompt_tokens
+        self.cacheable_prompt_tokens += cacheable_tokens
+        self.cached_prompt_tokens += cached_tokens
+    
+    @property
+    def cacheable_token_ratio(self) -> float:
+        return self.cacheable_prompt_tokens / max(self.prompt_tokens, 1)
+    
+    @property
+    def cached_token_ratio(self) -> float:
+        return self.cached_prompt_tokens / max(self.prompt_tokens, 1)
 
 
 @dataclass
@@ -66,6 +87,9 @@ class PromptTemplate:
     system_prompt: str = ""
     metrics: PromptMetrics = field(default_factory=PromptMetrics)
     created_at: float = field(default_factory=time.time)
+    _compiled: Dict[FrozenSet[str], "CompiledPromptTemplate"] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
     
     def format(self, **kwargs) -> str:
         """Format template with provided variables"""
@@ -80,6 +104,147 @@ class PromptTemplate:
         if missing_vars:
             raise ValueError(f"Missing required variables: {missing_vars}")
         return True
+    
+    def compile(self, static_variables: Iterable[str] = ()) -> "CompiledPromptTemplate":
+        """Compile into static/dynamic segments (cached per static variable set)"""
+        key = frozenset(static_variables)
+        if key not in self._compiled:
+            self._compiled[key] = CompiledPromptTemplate(self, key)
+        return self._compiled[key]
+
+
+@dataclass
+class RenderedPrompt:
+    """Prompt split into a cacheable static prefix and a per-request suffix"""
+    template_name: str
+    template_version: str
+    system_prompt: str
+    static_prefix: str
+    dynamic_suffix: str
+    static_tokens: int
+    dynamic_tokens: int
+    
+    @property
+    def text(self) -> str:
+        return self.static_prefix + self.dynamic_suffix
+    
+    @property
+    def token_count(self) -> int:
+        return self.static_tokens + self.dynamic_tokens
+    
+    def generation_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for ``BaseAIService.generate``"""
+        return {
+            "system_prompt": self.system_prompt,
+            "prompt_prefix": self.static_prefix,
+            "prompt_token_count": self.token_count
+        }
+
+
+def _escape_literal(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+class CompiledPromptTemplate:
+    """Precompiled prompt template
+    
+    The template is parsed once and split at the first variable that is not
+    in ``static_variables``. Everything before that point (together with the
+    system prompt) is identical for every request sharing the same static
+    values, so it is rendered and token-counted once per value set and placed
+    first in the request, where provider-side prefix caching can reuse it.
+    """
+    
+    def __init__(
+        self,
+        template: PromptTemplate,
+        static_variables: FrozenSet[str],
+        max_cached_prefixes: int = 512
+    ):
+        self.template = template
+        self.static_variables = static_variables
+        self.max_cached_prefixes = max_cached_prefixes
+        self._prefix_cache: "OrderedDict[Tuple, Tuple[str, int]]" = OrderedDict()
+        self._token_counter = TokenCounter()
+        self.prefix_hits = 0
+        self.prefix_misses = 0
+        
+        prefix_parts: List[str] = []
+        suffix_parts: List[str] = []
+        prefix_fields: List[str] = []
+        in_suffix = False
+        
+        for literal, field_name, format_spec, conversion in string.Formatter().parse(template.template):
+            target = suffix_parts if in_suffix else prefix_parts
+            target.append(_escape_literal(literal))
+            
+            if field_name is None:
+                continue
+            
+            if not in_suffix and field_name not in static_variables:
+                in_suffix = True
+                target = suffix_parts
+            
+            placeholder = "{" + field_name
+            if conversion:
+                placeholder += "!" + conversion
+            if format_spec:
+                placeholder += ":" + format_spec
+            target.append(placeholder + "}")
+            
+            if not in_suffix:
+                prefix_fields.append(field_name)
+        
+        self.prefix_template = "".join(prefix_parts)
+        self.suffix_template = "".join(suffix_parts)
+        self.prefix_fields = tuple(dict.fromkeys(prefix_fields))
+    
+    def _render_prefix(self, variables: Dict[str, Any]) -> Tuple[str, int]:
+        cache_key = tuple(str(variables[name]) for name in self.prefix_fields)
+        
+        cached = self._prefix_cache.get(cache_key)
+        if cached is not None:
+            self._prefix_cache.move_to_end(cache_key)
+            self.prefix_hits += 1
+            record_prompt_prefix_render(self.template.name, hit=True)
+            return cached
+        
+        self.prefix_misses += 1
+        record_prompt_prefix_render(self.template.name, hit=False)
+        prefix = self.prefix_template.format(**variables)
+        tokens = self._token_counter.count_tokens(
+            self.template.system_prompt + prefix, self.template.model
+        )
+        
+        self._prefix_cache[cache_key] = (prefix, tokens)
+        if len(self._prefix_cache) > self.max_cached_prefixes:
+            self._prefix_cache.popitem(last=False)
+        
+        return prefix, tokens
+    
+    def render(self, extra_suffix: str = "", **variables) -> RenderedPrompt:
+        """Render the template, reusing the cached static prefix when possible
+        
+        ``extra_suffix`` is appended to the dynamic segment for per-request
+        instructions that are not part of the template itself.
+        """
+        try:
+            prefix, prefix_tokens = self._render_prefix(variables)
+            suffix = self.suffix_template.format(**variables) + extra_suffix
+        except KeyError as e:
+            raise ValueError(f"Missing required variable: {e}")
+        
+        suffix_tokens = self._token_counter.count_tokens(suffix, self.template.model) if suffix else 0
+        
+        return RenderedPrompt(
+            template_name=self.template.name,
+            template_version=self.template.version,
+            system_prompt=self.template.system_prompt,
+            static_prefix=prefix,
+            dynamic_suffix=suffix,
+            static_tokens=prefix_tokens,
+            dynamic_tokens=suffix_tokens
+        )
 
 
 class PromptRegistry:
@@ -254,6 +419,71 @@ Be honest and critical in your assessment.""",
             system_prompt="You are a social media analytics expert who can predict content performance."
         ))
         
+        # Viral Scoring Template (static instructions first so the prefix is cacheable)
+        self.register_template(PromptTemplate(
+            name="viral_scoring",
+            template="""Score the viral potential of a content hook on a scale of 1-10.
+
+Evaluate based on these criteria:
+1. Attention-grabbing power (1-10)
+2. Emotional impact (1-10)
+3. Curiosity/intrigue factor (1-10)
+4. Shareability potential (1-10)
+5. Platform appropriateness (1-10)
+6. Trend alignment (1-10)
+
+Provide:
+- Overall viral score (1-10)
+- Breakdown of each criteria score
+- Key strengths
+- Areas for improvement
+- Suggestions to increase viral potential
+
+Be honest and critical in your assessment.
+
+Platform: {platform}
+Target Audience: {target_audience}
+
+Hook: {hook}""",
+            version="1.1",
+            description="Scores content hooks for viral potential with the hook placed last",
+            variables=["hook", "platform", "target_audience"],
+            max_tokens=500,
+            temperature=0.3,
+            system_prompt="You are a social media analytics expert who can predict content performance."
+        ))
+        
+        # Batch Viral Scoring Template (one request scores every hook of an idea)
+        self.register_template(PromptTemplate(
+            name="viral_batch_scoring",
+            template="""Score the viral potential of each content hook below on a scale of 1-10.
+
+Evaluate each hook based on these criteria:
+1. Attention-grabbing power
+2. Emotional impact
+3. Curiosity/intrigue factor
+4. Shareability potential
+5. Platform appropriateness
+6. Trend alignment
+
+Be honest and critical in your assessment, and score each hook independently.
+
+Respond with only a JSON array containing one object per hook, in the order given:
+[{{"hook": 1, "overall_score": 7.5, "reasoning": "Key strengths and areas for improvement"}}]
+
+Platform: {platform}
+Target Audience: {target_audience}
+
+Hooks:
+{hooks}""",
+            version="1.0",
+            description="Scores several content hooks for viral potential in one request",
+            variables=["hooks", "platform", "target_audience"],
+            max_tokens=1200,
+            temperature=0.3,
+            system_prompt="You are a social media analytics expert who can predict content performance."
+        ))
+        
         # Script Generation Template
         self.register_template(PromptTemplate(
             name="script_generation",
@@ -590,6 +820,43 @@ Generate 5 content concepts that apply these viral patterns while maintaining br
         if template:
             template.metrics.update(success, latency, cost)
     
+    def record_token_usage(self, rendered: RenderedPrompt, response: AIResponse):
+        """
+        Record prompt token usage and provider cache hits for a rendered prompt
+        
+        Totals are kept on the template metrics for ``get_cache_report`` and
+        exported as ``viralos_prompt_tokens_total``, whose cached/total ratio
+        per template is the cached-token ratio across all processes.
+        """
+        template = self.get_template(rendered.template_name, rendered.template_version)
+        if not template:
+            return
+        
+        prompt_tokens = response.usage.tokens_input or rendered.token_count
+        cached_tokens = response.metadata.get("cached_tokens", 0) if response.metadata else 0
+        template.metrics.update_tokens(prompt_tokens, rendered.static_tokens, cached_tokens)
+        observe_prompt_tokens(rendered.template_name, prompt_tokens, rendered.static_tokens, cached_tokens)
+    
+    def get_cache_report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-template prompt caching statistics"""
+        report = {}
+        for name, versions in self.templates.items():
+            for version, template in versions.items():
+                metrics = template.metrics
+                if not metrics.prompt_tokens:
+                    continue
+                compiled = template._compiled.values()
+                report[f"{name}:{version}"] = {
+                    "prompt_tokens": metrics.prompt_tokens,
+                    "cacheable_prompt_tokens": metrics.cacheable_prompt_tokens,
+                    "cached_prompt_tokens": metrics.cached_prompt_tokens,
+                    "cacheable_token_ratio": metrics.cacheable_token_ratio,
+                    "cached_token_ratio": metrics.cached_token_ratio,
+                    "prefix_cache_hits": sum(c.prefix_hits for c in compiled),
+                    "prefix_cache_misses": sum(c.prefix_misses for c in compiled)
+                }
+        return report
+    
     def get_best_performing_template(self, name: str) -> Optional[PromptTemplate]:
         """Get the best performing version of a template"""
         if name not in self.templates:
@@ -631,6 +898,50 @@ async def get_prompt_template(name: str, version: str = None) -> PromptTemplate:
     return template
 
 
+async def render_prompt(
+    name: str,
+    static_variables: Iterable[str] = (),
+    version: str = None,
+    extra_suffix: str = "",
+    **variables
+) -> RenderedPrompt:
+    """Render a compiled prompt template by name"""
+    template = await get_prompt_template(name, version)
+    return template.compile(static_variables).render(extra_suffix=extra_suffix, **variables)
+
+
+async def generate_from_template(
+    text_service,
+    name: str,
+    variables: Dict[str, Any],
+    static_variables: Iterable[str] = (),
+    version: str = None,
+    extra_suffix: str = "",
+    **generation_kwargs
+) -> AIResponse:
+    """Render a compiled template, generate with it and record cache statistics
+    
+    ``static_variables`` names the variables that are shared across requests
+    (brand, platform, audience, ...) and therefore belong in the cached prefix.
+    """
+    registry = get_prompt_registry()
+    rendered = await render_prompt(name, static_variables, version, extra_suffix, **variables)
+    
+    kwargs = rendered.generation_kwargs()
+    kwargs.update(generation_kwargs)
+    
+    start_time = time.time()
+    response = await text_service.generate(rendered.text, **kwargs)
+    
+    registry.update_metrics(
+        rendered.template_name, rendered.template_version,
+        response.success, time.time() - start_time, response.usage.total_cost
+    )
+    registry.record_token_usage(rendered, response)
+    
+    return response
+
+
 class PromptOptimizer:
     """Optimizes prompts through A/B testing and performance analysis"""
     
@@ -16,8 +16,10 @@ from openai import AsyncOpenAI
 from anthropic import AsyncAnthropic
 
 from app.core.config import settings
+from app.core.metrics import observe_embedding_call
 from app.services.ai.base import (
     BaseAIService,
+    ConcurrencyLimiter,
     AIProvider,
     AIResponse,
     AIUsageMetrics,
@@ -55,6 +57,8 @@ class OpenAIService(BaseAIService):
             temperature = kwargs.get('temperature', 0.7)
             system_prompt = kwargs.get('system_prompt', '')
             
+            # Static prefixes are placed first already; OpenAI caches matching
+            # prompt prefixes automatically, so no extra request structure is needed.
             messages = []
             if system_prompt:
                 messages.append({"role": "system", "content": system_prompt})
@@ -67,7 +71,7 @@ class OpenAIService(BaseAIService):
                 max_tokens=max_tokens,
                 temperature=temperature,
                 **{k: v for k, v in kwargs.items() 
-                   if k not in ['max_tokens', 'temperature', 'system_prompt']}
+                   if k not in ['max_tokens', 'temperature', 'system_prompt', 'prompt_prefix']}
             )
             
             # Extract response data
@@ -77,6 +81,8 @@ class OpenAIService(BaseAIService):
             # Calculate cost
             input_tokens = usage.prompt_tokens
             output_tokens = usage.completion_tokens
+            prompt_details = getattr(usage, "prompt_tokens_details", None)
+            cached_tokens = getattr(prompt_details, "cached_tokens", 0) or 0
             cost = CostOptimizer.estimate_cost("openai", self.model, input_tokens, output_tokens)
             
             # Create usage metrics
@@ -94,7 +100,8 @@ class OpenAIService(BaseAIService):
                 usage=usage_metrics,
                 metadata={
                     "finish_reason": response.choices[0].finish_reason,
-                    "model": response.model
+                    "model": response.model,
+                    "cached_tokens": cached_tokens
                 }
             )
             
@@ -108,12 +115,14 @@ class OpenAIService(BaseAIService):
     async def generate_embeddings(self, texts: List[str], model: str = None) -> List[List[float]]:
         """Generate embeddings for text inputs"""
         embedding_model = model or settings.DEFAULT_EMBEDDING_MODEL
+        start_time = time.time()
         
         try:
             response = await self.client.embeddings.create(
                 model=embedding_model,
                 input=texts
             )
+            observe_embedding_call(self.provider, embedding_model, time.time() - start_time, True)
             
             embeddings = [item.embedding for item in response.data]
             
@@ -131,6 +140,7 @@ class OpenAIService(BaseAIService):
             return embeddings
             
         except Exception as e:
+            observe_embedding_call(self.provider, embedding_model, time.time() - start_time, False)
             logger.error(f"Failed to generate embeddings: {e}")
             raise AIServiceError(f"Embedding generation failed: {e}", "openai", embedding_model, e)
 
@@ -155,21 +165,58 @@ class AnthropicService(BaseAIService):
             max_tokens = kwargs.get('max_tokens', 1000)
             temperature = kwargs.get('temperature', 0.7)
             system_prompt = kwargs.get('system_prompt', '')
+            prompt_prefix = kwargs.get('prompt_prefix', '')
             
-            # Anthropic uses a different message format
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                system=system_prompt,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            if prompt_prefix and prompt.startswith(prompt_prefix):
+                # Mark the system prompt and static prefix as cache breakpoints
+                system_blocks = []
+                if system_prompt:
+                    system_blocks.append({
+                        "type": "text",
+                        "text": system_prompt,
+                        "cache_control": {"type": "ephemeral"}
+                    })
+                content_blocks = [{
+                    "type": "text",
+                    "text": prompt_prefix,
+                    "cache_control": {"type": "ephemeral"}
+                }]
+                suffix = prompt[len(prompt_prefix):]
+                if suffix:
+                    content_blocks.append({"type": "text", "text": suffix})
+                
+                response = await self.client.beta.prompt_caching.messages.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    system=system_blocks,
+                    messages=[{"role": "user", "content": content_blocks}]
+                )
+            else:
+                # Anthropic uses a different message format
+                response = await self.client.messages.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    system=system_prompt,
+                    messages=[{"role": "user", "content": prompt}]
+                )
             
             content = response.content[0].text
             
-            # Calculate approximate token usage (Anthropic doesn't always provide exact counts)
-            input_tokens = self.token_counter.count_tokens(prompt + system_prompt, self.model)
-            output_tokens = self.token_counter.count_tokens(content, self.model)
+            usage = getattr(response, "usage", None)
+            cached_tokens = getattr(usage, "cache_read_input_tokens", 0) or 0
+            if usage is not None and getattr(usage, "input_tokens", None) is not None:
+                input_tokens = (
+                    usage.input_tokens
+                    + cached_tokens
+                    + (getattr(usage, "cache_creation_input_tokens", 0) or 0)
+                )
+                output_tokens = usage.output_tokens
+            else:
+                # Calculate approximate token usage when the response carries no counts
+                input_tokens = self.token_counter.count_tokens(prompt + system_prompt, self.model)
+                output_tokens = self.token_counter.count_tokens(content, self.model)
             cost = CostOptimizer.estimate_cost("anthropic", self.model, input_tokens, output_tokens)
             
             usage_metrics = AIUsageMetrics(
@@ -186,7 +233,8 @@ class AnthropicService(BaseAIService):
                 usage=usage_metrics,
                 metadata={
                     "stop_reason": response.stop_reason,
-                    "model": response.model
+                    "model": response.model,
+                    "cached_tokens": cached_tokens
                 }
             )
             
@@ -246,6 +294,8 @@ class MultiProviderService:
         self.primary_provider = primary_provider or settings.DEFAULT_MODEL_PROVIDER
         self.fallback_providers = fallback_providers or ["openai", "anthropic"]
         self.current_service: Optional[BaseAIService] = None
+        # Shared by every service using the global text service
+        self.limiter = ConcurrencyLimiter(settings.AI_MAX_CONCURRENT_REQUESTS)
     
     async def _get_service(self) -> BaseAIService:
         """Get an available AI service with fallback"""
@@ -280,7 +330,8 @@ class MultiProviderService:
     async def generate(self, prompt: str, **kwargs) -> AIResponse:
         """Generate content with automatic provider failover"""
         service = await self._get_service()
-        return await service.generate(prompt, **kwargs)
+        async with self.limiter.slot():
+            return await service.generate(prompt, **kwargs)
     
     async def generate_embeddings(self, texts: List[str], **kwargs) -> List[List[float]]:
         """Generate embeddings (OpenAI only for now)"""
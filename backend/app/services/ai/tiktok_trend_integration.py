@@ -13,8 +13,8 @@ from collections import Counter, defaultdict
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, func, and_, or_
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import desc, func, and_, or_, select
 
 from app.core.config import settings
 from app.db.session import get_db
@@ -26,6 +26,9 @@ from app.services.ai.trend_analyzer import (
     TrendData, TrendSignal, TrendOpportunity, TrendSource, 
     TrendAnalysisService, Platform, get_trend_analysis_service
 )
+from app.services.ai.trend_index import (
+    TrendIndex, TrendTerms, get_tiktok_trend_index, trend_similarity
+)
 from app.services.ai.viral_content import Platform as ViralPlatform
 
 logger = logging.getLogger(__name__)
@@ -57,25 +60,28 @@ class TikTokTrendEnhancer:
         
         logger.info(f"Enhancing {len(existing_trends)} trends with TikTok data")
         
-        # Get active TikTok trends
-        tiktok_trends = self.db.query(TikTokTrend).filter(
-            and_(
-                TikTokTrend.is_active == True,
-                TikTokTrend.viral_score > 30,
-                TikTokTrend.last_scraped > datetime.utcnow() - timedelta(hours=24)
-            )
-        ).order_by(desc(TikTokTrend.viral_score)).all()
+        # Active TikTok trends, indexed by token
+        index = get_tiktok_trend_index(self.db)
         
-        enhanced_trends = []
+        # Best TikTok match per existing trend, scored only against posting-list candidates
+        best_matches = []
+        for trend in existing_trends:
+            matches = index.match(TrendTerms.from_trend_data(trend))
+            best_matches.append(matches[0][0] if matches else None)
+        
+        examples = self._get_tiktok_examples_by_trend(
+            [match for match in best_matches if match is not None], limit=3
+        )
         
         # Enhance existing trends with TikTok data
-        for trend in existing_trends:
-            enhanced_trend = await self._enhance_single_trend(trend, tiktok_trends)
-            enhanced_trends.append(enhanced_trend)
+        enhanced_trends = [
+            self._enhance_single_trend(trend, best_match, examples) if best_match else trend
+            for trend, best_match in zip(existing_trends, best_matches)
+        ]
         
         # Add TikTok-only trends
         tiktok_only_trends = await self._create_tiktok_trends(
-            existing_trends, tiktok_trends, brand_industry, target_audience
+            existing_trends, index, brand_industry, target_audience
         )
         enhanced_trends.extend(tiktok_only_trends)
         
@@ -86,27 +92,13 @@ class TikTokTrendEnhancer:
         
         return enhanced_trends
     
-    async def _enhance_single_trend(
+    def _enhance_single_trend(
         self,
         trend: TrendData,
-        tiktok_trends: List[TikTokTrend]
+        best_match: TikTokTrend,
+        examples: Dict[int, List[Dict[str, Any]]]
     ) -> TrendData:
-        """Enhance a single trend with TikTok data"""
-        
-        # Find matching TikTok trends
-        matching_trends = []
-        
-        for tiktok_trend in tiktok_trends:
-            similarity_score = self._calculate_trend_similarity(trend, tiktok_trend)
-            if similarity_score > 0.3:  # 30% similarity threshold
-                matching_trends.append((tiktok_trend, similarity_score))
-        
-        if not matching_trends:
-            return trend
-        
-        # Sort by similarity
-        matching_trends.sort(key=lambda x: x[1], reverse=True)
-        best_match = matching_trends[0][0]
+        """Enhance a single trend with its best-matching TikTok trend"""
         
         # Enhance trend with TikTok data
         enhanced_trend = TrendData(
@@ -125,15 +117,15 @@ class TikTokTrendEnhancer:
             geographic_data=self._merge_geography(
                 trend.geographic_data, best_match.geographic_data
             ),
-            signals=trend.signals + await self._create_tiktok_signals(best_match),
+            signals=trend.signals + self._create_tiktok_signals(best_match),
             related_trends=list(set(trend.related_trends + (best_match.hashtags or []))),
             keywords=list(set(trend.keywords + (best_match.keywords or []))),
             first_detected=min(trend.first_detected, best_match.first_detected.timestamp()),
             peak_time=trend.peak_time,
             predicted_lifespan=trend.predicted_lifespan,
-            content_examples=trend.content_examples + await self._get_tiktok_examples(best_match),
+            content_examples=trend.content_examples + examples.get(best_match.id, []),
             influencer_adoption=trend.influencer_adoption,
-            brand_opportunities=trend.brand_opportunities + await self._get_tiktok_opportunities(best_match),
+            brand_opportunities=trend.brand_opportunities + self._get_tiktok_opportunities(best_match),
             risk_factors=trend.risk_factors,
             last_updated=datetime.utcnow().timestamp()
         )
@@ -147,33 +139,10 @@ class TikTokTrendEnhancer:
     ) -> float:
         """Calculate similarity between existing trend and TikTok trend"""
         
-        similarity_factors = []
-        
-        # Name similarity
-        name_words = set(existing_trend.name.lower().split())
-        tiktok_words = set(tiktok_trend.normalized_name.split())
-        
-        if name_words and tiktok_words:
-            name_similarity = len(name_words.intersection(tiktok_words)) / len(name_words.union(tiktok_words))
-            similarity_factors.append(name_similarity * 0.4)
-        
-        # Keyword similarity
-        existing_keywords = set([kw.lower() for kw in existing_trend.keywords])
-        tiktok_keywords = set([kw.lower() for kw in (tiktok_trend.keywords or [])])
-        
-        if existing_keywords and tiktok_keywords:
-            keyword_similarity = len(existing_keywords.intersection(tiktok_keywords)) / len(existing_keywords.union(tiktok_keywords))
-            similarity_factors.append(keyword_similarity * 0.3)
-        
-        # Hashtag overlap
-        existing_hashtags = set([tag.lower() for tag in existing_trend.related_trends if tag.startswith('#')])
-        tiktok_hashtags = set([tag.lower() for tag in (tiktok_trend.hashtags or [])])
-        
-        if existing_hashtags and tiktok_hashtags:
-            hashtag_similarity = len(existing_hashtags.intersection(tiktok_hashtags)) / len(existing_hashtags.union(tiktok_hashtags))
-            similarity_factors.append(hashtag_similarity * 0.3)
-        
-        return sum(similarity_factors) if similarity_factors else 0.0
+        return trend_similarity(
+            TrendTerms.from_trend_data(existing_trend),
+            TrendTerms.from_tiktok_trend(tiktok_trend)
+        )
     
     def _map_tiktok_status(self, tiktok_status: str) -> str:
         """Map TikTok trend status to general trend status"""
@@ -246,7 +215,7 @@ class TikTokTrendEnhancer:
         
         return merged_geo
     
-    async def _create_tiktok_signals(self, tiktok_trend: TikTokTrend) -> List[TrendSignal]:
+    def _create_tiktok_signals(self, tiktok_trend: TikTokTrend) -> List[TrendSignal]:
         """Create trend signals from TikTok data"""
         
         signals = []
@@ -298,30 +267,54 @@ class TikTokTrendEnhancer:
         
         return signals
     
-    async def _get_tiktok_examples(self, tiktok_trend: TikTokTrend) -> List[Dict[str, Any]]:
-        """Get example content from TikTok trend"""
-        
-        # Get top videos for this trend
-        videos = self.db.query(TikTokVideo).filter(
-            TikTokVideo.trend_id == tiktok_trend.id
-        ).order_by(desc(TikTokVideo.view_count)).limit(3).all()
-        
-        examples = []
-        for video in videos:
-            examples.append({
-                "title": video.description[:100] if video.description else f"TikTok Video {video.video_id}",
-                "engagement": video.view_count,
-                "author": video.creator_username,
-                "url": video.tiktok_url,
-                "platform": "tiktok",
-                "posted_at": video.posted_at.timestamp() if video.posted_at else video.created_at.timestamp(),
-                "viral_score": getattr(video, 'viral_score', 0),
-                "content_hooks": video.content_hooks if hasattr(video, 'content_hooks') else []
-            })
+    def _top_videos_by_trend(self, trend_ids: List[int], limit: int) -> Dict[int, List[TikTokVideo]]:
+        """Most viewed videos of each trend, fetched in one query"""
+        
+        if not trend_ids:
+            return {}
+        
+        ranked = select(
+            TikTokVideo,
+            func.row_number().over(
+                partition_by=TikTokVideo.trend_id,
+                order_by=desc(TikTokVideo.view_count)
+            ).label("rank")
+        ).where(TikTokVideo.trend_id.in_(set(trend_ids))).subquery()
+        video = aliased(TikTokVideo, ranked)
+        
+        videos = defaultdict(list)
+        for row in self.db.query(video).filter(ranked.c.rank <= limit).order_by(ranked.c.trend_id, ranked.c.rank):
+            videos[row.trend_id].append(row)
+        return videos
+    
+    def _get_tiktok_examples_by_trend(
+        self,
+        tiktok_trends: List[TikTokTrend],
+        limit: int = 3
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """Example content of several TikTok trends, keyed by trend id"""
+        
+        videos_by_trend = self._top_videos_by_trend([trend.id for trend in tiktok_trends], limit)
+        
+        examples = {}
+        for trend_id, videos in videos_by_trend.items():
+            examples[trend_id] = [
+                {
+                    "title": video.description[:100] if video.description else f"TikTok Video {video.video_id}",
+                    "engagement": video.view_count,
+                    "author": video.creator_username,
+                    "url": video.tiktok_url,
+                    "platform": "tiktok",
+                    "posted_at": video.posted_at.timestamp() if video.posted_at else video.created_at.timestamp(),
+                    "viral_score": getattr(video, 'viral_score', 0),
+                    "content_hooks": video.content_hooks if hasattr(video, 'content_hooks') else []
+                }
+                for video in videos
+            ]
         
         return examples
     
-    async def _get_tiktok_opportunities(self, tiktok_trend: TikTokTrend) -> List[str]:
+    def _get_tiktok_opportunities(self, tiktok_trend: TikTokTrend) -> List[str]:
         """Get brand opportunities from TikTok trend"""
         
         opportunities = []
@@ -352,7 +345,7 @@ class TikTokTrendEnhancer:
     async def _create_tiktok_trends(
         self,
         existing_trends: List[TrendData],
-        tiktok_trends: List[TikTokTrend],
+        index: TrendIndex,
         brand_industry: str = None,
         target_audience: str = None
     ) -> List[TrendData]:
@@ -364,37 +357,40 @@ class TikTokTrendEnhancer:
             existing_keywords.update([kw.lower() for kw in trend.keywords])
             existing_keywords.update([name.lower() for name in trend.related_trends])
         
+        # Minimal overlap means a TikTok-specific trend
+        overlaps = index.term_overlaps(existing_keywords)
+        uncovered = [trend for trend, overlap in zip(index.trends, overlaps) if overlap < 2]
+        videos = self._top_videos_by_trend([trend.id for trend in uncovered], limit=5)
+        
         tiktok_only = []
         
-        for tiktok_trend in tiktok_trends:
-            # Check if this TikTok trend is already covered
-            tiktok_keywords = set([kw.lower() for kw in (tiktok_trend.keywords or [])])
-            tiktok_hashtags = set([tag.lower() for tag in (tiktok_trend.hashtags or [])])
-            
-            overlap = len(existing_keywords.intersection(tiktok_keywords | tiktok_hashtags))
+        for tiktok_trend in uncovered:
+            trend_data = await self._convert_tiktok_to_trend_data(
+                tiktok_trend, videos.get(tiktok_trend.id, [])
+            )
             
-            if overlap < 2:  # Minimal overlap, this is a TikTok-specific trend
-                trend_data = await self._convert_tiktok_to_trend_data(tiktok_trend)
-                
-                # Apply relevance filtering
-                if brand_industry or target_audience:
-                    relevance_score = self._calculate_brand_relevance(
-                        trend_data, brand_industry, target_audience
-                    )
-                    if relevance_score > 0.3:  # 30% relevance threshold
-                        tiktok_only.append(trend_data)
-                else:
+            # Apply relevance filtering
+            if brand_industry or target_audience:
+                relevance_score = self._calculate_brand_relevance(
+                    trend_data, brand_industry, target_audience
+                )
+                if relevance_score > 0.3:  # 30% relevance threshold
                     tiktok_only.append(trend_data)
+            else:
+                tiktok_only.append(trend_data)
         
         return tiktok_only
     
-    async def _convert_tiktok_to_trend_data(self, tiktok_trend: TikTokTrend) -> TrendData:
+    async def _convert_tiktok_to_trend_data(
+        self,
+        tiktok_trend: TikTokTrend,
+        videos: Optional[List[TikTokVideo]] = None
+    ) -> TrendData:
         """Convert TikTokTrend to TrendData format"""
         
         # Get associated videos for examples
-        videos = self.db.query(TikTokVideo).filter(
-            TikTokVideo.trend_id == tiktok_trend.id
-        ).order_by(desc(TikTokVideo.view_count)).limit(5).all()
+        if videos is None:
+            videos = self._top_videos_by_trend([tiktok_trend.id], limit=5).get(tiktok_trend.id, [])
         
         content_examples = []
         for video in videos:
@@ -407,10 +403,10 @@ class TikTokTrendEnhancer:
             })
         
         # Create trend signals
-        signals = await self._create_tiktok_signals(tiktok_trend)
+        signals = self._create_tiktok_signals(tiktok_trend)
         
         # Generate brand opportunities
-        brand_opportunities = await self._get_tiktok_opportunities(tiktok_trend)
+        brand_opportunities = self._get_tiktok_opportunities(tiktok_trend)
         
         return TrendData(
             trend_id=f"tiktok_{tiktok_trend.trend_id}",
@@ -604,9 +600,12 @@ class TikTokTrendProvider:
         ).order_by(desc(TikTokTrend.viral_score)).limit(20).all()
         
         # Convert to TrendData format
+        videos = self.enhancer._top_videos_by_trend([trend.id for trend in tiktok_trends], limit=5)
         trend_data_list = []
         for tiktok_trend in tiktok_trends:
-            trend_data = await self.enhancer._convert_tiktok_to_trend_data(tiktok_trend)
+            trend_data = await self.enhancer._convert_tiktok_to_trend_data(
+                tiktok_trend, videos.get(tiktok_trend.id, [])
+            )
             trend_data_list.append(trend_data)
         
         # Use existing opportunity engine
@@ -9,19 +9,22 @@ import asyncio
 import json
 import re
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields as dataclass_fields
 from enum import Enum
 from typing import Any, Dict, List, Optional, Set, Tuple
 import logging
 from collections import defaultdict, Counter
 import statistics
+from datetime import datetime, timezone
 
 import aiohttp
 import numpy as np
 from diskcache import Cache
 
 from app.core.config import settings
+from app.services.ai.cache_manager import InFlightRegistry
 from app.services.ai.providers import get_text_service
+from app.services.ai.trend_consolidation import consolidate_trends
 from app.services.ai.vector_db import get_vector_service
 from app.services.ai.viral_content import Platform
 
@@ -84,6 +87,18 @@ class TrendSignal:
             "detected_at": self.detected_at,
             "metadata": self.metadata
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TrendSignal":
+        return cls(
+            signal_id=data["signal_id"],
+            content=data["content"],
+            signal_strength=data["signal_strength"],
+            platform=Platform(data["platform"]),
+            source=TrendSource(data["source"]),
+            detected_at=data["detected_at"],
+            metadata=data.get("metadata") or {}
+        )
 
 
 @dataclass
@@ -162,6 +177,19 @@ class TrendData:
             "trend_velocity": self.get_trend_velocity(),
             "adoption_stage": self.get_adoption_stage()
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TrendData":
+        """Rebuild a trend from ``to_dict`` output, e.g. cached or snapshotted JSON"""
+        values = {key: value for key, value in data.items() if key in TREND_DATA_FIELDS}
+        values["trend_type"] = TrendType(values["trend_type"])
+        values["platform"] = Platform(values["platform"])
+        values["status"] = TrendStatus(values["status"])
+        values["signals"] = [TrendSignal.from_dict(signal) for signal in values["signals"]]
+        return cls(**values)
+
+
+TREND_DATA_FIELDS = frozenset(f.name for f in dataclass_fields(TrendData))
 
 
 @dataclass
@@ -260,14 +288,25 @@ class TrendDetector:
         
         logger.info(f"Detecting trends across {len(platforms)} platforms")
         
-        all_trends = []
+        platform_trends = await asyncio.gather(*[
+            self._detect_platform_trends(platform, industry_keywords, time_window_hours)
+            for platform in platforms
+        ])
+        all_trends = [trend for trends in platform_trends for trend in trends]
         
-        for platform in platforms:
-            # Get platform-specific trends
-            platform_trends = await self._detect_platform_trends(
-                platform, industry_keywords, time_window_hours
-            )
-            all_trends.extend(platform_trends)
+        return await self.analyze_detected_trends(all_trends)
+    
+    async def detect_platform_trends(
+        self,
+        platform: Platform,
+        industry_keywords: List[str],
+        time_window_hours: int = 24
+    ) -> List[TrendData]:
+        """Raw, unconsolidated trends for one platform"""
+        return await self._detect_platform_trends(platform, industry_keywords, time_window_hours)
+    
+    async def analyze_detected_trends(self, all_trends: List[TrendData]) -> List[TrendData]:
+        """Consolidate, analyze and score raw platform trends, best first"""
         
         # Consolidate cross-platform trends
         consolidated_trends = self._consolidate_trends(all_trends)
@@ -297,8 +336,9 @@ class TrendDetector:
         if cache_key in trend_cache:
             cached_data = trend_cache[cache_key]
             # Validate cache freshness
-            if all(TrendData(**trend).is_fresh() for trend in cached_data):
-                return [TrendData(**trend) for trend in cached_data]
+            cached_trends = [TrendData.from_dict(trend) for trend in cached_data]
+            if all(trend.is_fresh() for trend in cached_trends):
+                return cached_trends
         
         # In production, this would connect to platform APIs
         # For now, generate mock trending data with realistic patterns
@@ -582,34 +622,8 @@ class TrendDetector:
     def _consolidate_trends(self, all_trends: List[TrendData]) -> List[TrendData]:
         """Consolidate similar trends across platforms"""
         
-        if not all_trends:
-            return []
-        
-        # Group similar trends by name similarity
-        consolidated = {}
-        
-        for trend in all_trends:
-            # Find similar existing trends
-            similar_key = None
-            for existing_key in consolidated.keys():
-                if self._calculate_name_similarity(trend.name, existing_key) > 0.7:
-                    similar_key = existing_key
-                    break
-            
-            if similar_key:
-                # Merge with existing trend
-                existing_trend = consolidated[similar_key]
-                existing_trend.volume += trend.volume
-                existing_trend.signals.extend(trend.signals)
-                existing_trend.viral_score = max(existing_trend.viral_score, trend.viral_score)
-                existing_trend.growth_rate = max(existing_trend.growth_rate, trend.growth_rate)
-                existing_trend.related_trends.extend(trend.related_trends)
-                existing_trend.related_trends = list(set(existing_trend.related_trends))  # Remove duplicates
-            else:
-                # Add as new trend
-                consolidated[trend.name] = trend
-        
-        return list(consolidated.values())
+        # Names with word-set Jaccard similarity above 0.7 end up in one trend
+        return consolidate_trends(all_trends, threshold=0.7)
     
     def _calculate_name_similarity(self, name1: str, name2: str) -> float:
         """Calculate similarity between trend names"""
@@ -627,6 +641,7 @@ class TrendDetector:
     async def _analyze_trend_signals(self, trends: List[TrendData]) -> List[TrendData]:
         """Analyze and enhance trend signals with AI"""
         
+        now = time.time()
         for trend in trends:
             # Calculate signal strength
             if trend.signals:
@@ -635,7 +650,7 @@ class TrendDetector:
                 trend.viral_score = min(100, trend.viral_score * (1 + avg_signal_strength))
             
             # Predict trend lifecycle
-            trend.status = await self._predict_trend_status(trend)
+            trend.status = self._trend_status(trend, now)
             
             # Update predicted lifespan based on signals
             if trend.signals:
@@ -647,9 +662,13 @@ class TrendDetector:
     
     async def _predict_trend_status(self, trend: TrendData) -> TrendStatus:
         """Predict trend status using AI and signals"""
+        return self._trend_status(trend, time.time())
+    
+    def _trend_status(self, trend: TrendData, now: float) -> TrendStatus:
+        """Rule-based lifecycle status at ``now``"""
         
         # Simple rule-based prediction (in production, use ML model)
-        age_hours = (time.time() - trend.first_detected) / 3600
+        age_hours = (now - trend.first_detected) / 3600
         
         if trend.growth_rate > 100 and age_hours < 6:
             return TrendStatus.EMERGING
@@ -665,29 +684,29 @@ class TrendDetector:
     def _score_trends(self, trends: List[TrendData]) -> List[TrendData]:
         """Score trends based on multiple factors"""
         
-        for trend in trends:
-            score_factors = []
-            
-            # Volume factor (normalized)
-            max_volume = max([t.volume for t in trends]) if trends else 1
-            volume_score = (trend.volume / max_volume) * 30
-            score_factors.append(volume_score)
-            
-            # Growth rate factor
-            growth_score = min(30, trend.growth_rate / 10)  # Cap at 30
-            score_factors.append(growth_score)
-            
-            # Signal strength factor
-            if trend.signals:
-                signal_score = statistics.mean([s.signal_strength for s in trend.signals]) * 20
-                score_factors.append(signal_score)
-            
-            # Engagement factor
-            engagement_score = trend.engagement_rate * 200  # Scale to 0-20
-            score_factors.append(min(20, engagement_score))
-            
-            # Update viral score
-            trend.viral_score = sum(score_factors)
+        if not trends:
+            return trends
+        
+        volume = np.fromiter((t.volume for t in trends), dtype=float, count=len(trends))
+        growth = np.fromiter((t.growth_rate for t in trends), dtype=float, count=len(trends))
+        engagement = np.fromiter((t.engagement_rate for t in trends), dtype=float, count=len(trends))
+        
+        # Mean signal strength per trend over the flattened signals
+        signal_counts = np.fromiter((len(t.signals) for t in trends), dtype=np.int64, count=len(trends))
+        strengths = np.fromiter((s.signal_strength for t in trends for s in t.signals), dtype=float)
+        signal_sums = np.bincount(np.repeat(np.arange(len(trends)), signal_counts), weights=strengths, minlength=len(trends))
+        
+        # Volume factor (normalized)
+        scores = volume / (volume.max() or 1) * 30
+        # Growth rate factor, capped at 30
+        scores += np.minimum(30, growth / 10)
+        # Signal strength factor, for trends with signals
+        scores += np.divide(signal_sums, signal_counts, out=np.zeros(len(trends)), where=signal_counts > 0) * 20
+        # Engagement factor, scaled to 0-20
+        scores += np.minimum(20, engagement * 200)
+        
+        for trend, score in zip(trends, scores.tolist()):
+            trend.viral_score = score
         
         return trends
 
@@ -718,7 +737,7 @@ class TrendOpportunityEngine:
         
         logger.info(f"Identifying trend opportunities for {brand_name}")
         
-        opportunities = []
+        candidates = []
         
         for trend in trends:
             # Calculate relevance to brand
@@ -727,19 +746,20 @@ class TrendOpportunityEngine:
             )
             
             if relevance_score > 0.3:  # Only consider relevant trends
-                opportunity = await self._create_trend_opportunity(
-                    trend, brand_name, industry, target_audience, 
-                    brand_voice, platforms, relevance_score
-                )
-                opportunities.append(opportunity)
+                impact_score = self._impact_to_score(self._assess_potential_impact(trend, relevance_score))
+                candidates.append((relevance_score, impact_score, trend))
         
-        # Sort by relevance and potential impact
-        opportunities.sort(
-            key=lambda o: (o.relevance_score, self._impact_to_score(o.potential_impact)),
-            reverse=True
-        )
+        # Rank by relevance and potential impact before any LLM call, so
+        # recommendations are only generated for the top 10 opportunities
+        candidates.sort(key=lambda c: (c[0], c[1]), reverse=True)
         
-        return opportunities[:10]  # Return top 10 opportunities
+        return list(await asyncio.gather(*[
+            self._create_trend_opportunity(
+                trend, brand_name, industry, target_audience,
+                brand_voice, platforms, relevance_score
+            )
+            for relevance_score, _, trend in candidates[:10]
+        ]))
     
     async def _calculate_trend_relevance(
         self,
@@ -1249,6 +1269,7 @@ class TrendAnalysisService:
     def __init__(self):
         self.detector = TrendDetector()
         self.opportunity_engine = TrendOpportunityEngine()
+        self._snapshot_builds = InFlightRegistry()
     
     async def comprehensive_trend_analysis(
         self,
@@ -1260,15 +1281,14 @@ class TrendAnalysisService:
         industry_keywords: List[str] = None
     ) -> Dict[str, Any]:
         """Run comprehensive trend analysis"""
+        from app.services.ai.trend_snapshots import snapshot_age
         
         logger.info(f"Running comprehensive trend analysis for {brand_name}")
         
-        # Detect current trends
-        trends = await self.detector.detect_trending_topics(
-            platforms=platforms,
-            industry_keywords=industry_keywords or [],
-            time_window_hours=24
-        )
+        # Detected and scored trends come from the precomputed snapshot
+        snapshot = await self.get_trend_snapshot(platforms, industry_keywords or [])
+        trends = [TrendData.from_dict(trend) for trend in snapshot["trends"]]
+        aggregates = snapshot["aggregates"]
         
         # Identify opportunities
         opportunities = await self.opportunity_engine.identify_opportunities(
@@ -1283,9 +1303,6 @@ class TrendAnalysisService:
         # Filter for still relevant opportunities
         active_opportunities = [opp for opp in opportunities if opp.is_still_relevant()]
         
-        # Categorize trends by status
-        trend_categories = self._categorize_trends(trends)
-        
         # Generate trend insights
         insights = await self._generate_trend_insights(trends, opportunities)
         
@@ -1298,18 +1315,123 @@ class TrendAnalysisService:
             "industry": industry,
             "platforms_analyzed": [p.value for p in platforms],
             "summary": summary,
-            "trends": [t.to_dict() for t in trends],
-            "trend_categories": trend_categories,
+            "trends": snapshot["trends"],
+            "trend_categories": aggregates["trend_categories"],
             "opportunities": [o.to_dict() for o in active_opportunities],
             "insights": insights,
             "recommendations": {
                 "immediate_actions": [o.recommended_actions[0] for o in active_opportunities[:3] if o.recommended_actions],
                 "trending_hashtags": list(set([tag for o in active_opportunities for tag in o.hashtag_recommendations[:3]])),
-                "content_focus": self._identify_content_focus(trends),
-                "platform_priorities": self._prioritize_platforms(trends, platforms)
+                "content_focus": aggregates["content_focus"],
+                "platform_priorities": aggregates["platform_priorities"]
+            },
+            "snapshot": {
+                "built_at": snapshot["built_at"].isoformat(),
+                "age_seconds": snapshot_age(snapshot),
+                "source_versions": snapshot["source_versions"]
             }
         }
     
+    async def get_trend_snapshot(
+        self,
+        platforms: List[Platform],
+        industry_keywords: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Trend snapshot for the platforms and industry, within the freshness bound
+        
+        Snapshots older than ``TREND_SNAPSHOT_REFRESH_AGE`` are served while a
+        refresh runs in the background; missing snapshots and snapshots older
+        than ``TREND_SNAPSHOT_MAX_AGE`` are rebuilt before serving. Concurrent
+        requests share one build per snapshot.
+        """
+        # Deferred so the detector and scoring stay importable without the ORM models
+        from app.db.session import in_session
+        from app.services.ai.trend_snapshots import load_snapshot, snapshot_age, snapshot_key
+        
+        key = snapshot_key(platforms, industry_keywords)
+        snapshot = await asyncio.to_thread(in_session, load_snapshot, key)
+        
+        def rebuild():
+            return self.refresh_trend_snapshot(platforms, industry_keywords, previous=snapshot)
+        
+        if snapshot is None or snapshot_age(snapshot) > settings.TREND_SNAPSHOT_MAX_AGE:
+            return await self._snapshot_builds.run(key, rebuild)
+        
+        if snapshot_age(snapshot) > settings.TREND_SNAPSHOT_REFRESH_AGE:
+            self._snapshot_builds.refresh_in_background(key, rebuild)
+        
+        return snapshot
+    
+    async def refresh_trend_snapshot(
+        self,
+        platforms: List[Platform],
+        industry_keywords: List[str],
+        previous: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build and store the trend snapshot for the platforms and industry
+        
+        Only platforms whose source version changed since ``previous`` (the
+        stored snapshot when not given) are detected again; the others reuse
+        their stored detections.
+        """
+        from app.db.session import in_session
+        from app.services.ai.trend_snapshots import (
+            changed_platforms, load_snapshot, save_snapshot, snapshot_key,
+            snapshot_keywords, snapshot_platforms, source_versions
+        )
+        
+        start = time.perf_counter()
+        key = snapshot_key(platforms, industry_keywords)
+        platform_values = snapshot_platforms(platforms)
+        keywords = snapshot_keywords(industry_keywords)
+        
+        if previous is None:
+            previous = await asyncio.to_thread(in_session, load_snapshot, key, False)
+        versions = await asyncio.to_thread(in_session, source_versions, platform_values)
+        changed = changed_platforms(previous, versions)
+        
+        detected = await asyncio.gather(*[
+            self.detector.detect_platform_trends(Platform(platform), keywords)
+            for platform in changed
+        ])
+        platform_trends = dict(previous["platform_trends"]) if previous else {}
+        for platform, trends in zip(changed, detected):
+            platform_trends[platform] = [trend.to_dict() for trend in trends]
+        platform_trends = {platform: platform_trends[platform] for platform in platform_values}
+        
+        # Statuses and scores depend on the time of analysis, so always rerun the cheap steps
+        trends = await self.detector.analyze_detected_trends([
+            TrendData.from_dict(trend)
+            for platform in platform_values
+            for trend in platform_trends[platform]
+        ])
+        snapshot_platform_enums = [Platform(platform) for platform in platform_values]
+        
+        document = {
+            "snapshot_key": key,
+            "platforms": platform_values,
+            "industry_keywords": keywords,
+            "platform_trends": platform_trends,
+            "source_versions": versions,
+            "trends": [trend.to_dict() for trend in trends],
+            "aggregates": {
+                "trend_categories": self._categorize_trends(trends),
+                "content_focus": self._identify_content_focus(trends),
+                "platform_priorities": self._prioritize_platforms(trends, snapshot_platform_enums)
+            },
+            "build_seconds": time.perf_counter() - start,
+            "built_at": datetime.now(timezone.utc)
+        }
+        await asyncio.to_thread(in_session, save_snapshot, document)
+        
+        logger.info(
+            f"Built trend snapshot {key!r} in {document['build_seconds']:.2f}s "
+            f"({len(changed)}/{len(platform_values)} platforms detected)"
+        )
+        return document
+    
     def _categorize_trends(self, trends: List[TrendData]) -> Dict[str, List[Dict[str, Any]]]:
         """Categorize trends by status and type"""
         
@@ -0,0 +1,152 @@
+"""
+Near-linear consolidation of trends across platforms
+
+Trends whose name token sets have a Jaccard similarity above a threshold are
+merged, transitively, into one trend per cluster. Pairs are found with a
+prefix-filtered token inverted index instead of comparing every trend with
+every consolidated one:
+
+1. Trends with identical token sets collapse into one group up front.
+2. Tokens are ordered rarest first. Two sets with Jaccard >= t must share a
+   token within the first ``|x| - ceil(t * |x|) + 1`` tokens of each, so only
+   those prefix tokens are indexed and probed.
+3. Candidate pairs passing the size filter are verified exactly and joined
+   with union-find.
+
+Clusters and their merged trends do not depend on input order: each
+cluster's representative is its member with the highest volume (ties
+broken by trend id and name), members are merged in that same order, and
+clusters are returned in representative order.
+"""
+
+import math
+from collections import Counter, defaultdict
+from typing import Any, Dict, FrozenSet, List, Sequence, Tuple
+
+DEFAULT_NAME_SIMILARITY = 0.7
+
+
+class UnionFind:
+    """Disjoint sets over ``0..size-1`` with path halving and union by size"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first: int, second: int) -> bool:
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        if self.size[first] < self.size[second] or (self.size[first] == self.size[second] and second < first):
+            first, second = second, first
+        self.parent[second] = first
+        self.size[first] += self.size[second]
+        return True
+
+
+def name_tokens(name: str) -> FrozenSet[str]:
+    return frozenset(name.lower().split())
+
+
+def similar_groups(token_sets: Sequence[FrozenSet[str]], threshold: float = DEFAULT_NAME_SIMILARITY) -> List[List[int]]:
+    """
+    Cluster token sets whose Jaccard similarity exceeds ``threshold``
+
+    Returns:
+        Clusters as lists of input positions; empty sets are never similar
+        to anything, not even to each other
+    """
+    # Identical sets are trivially similar: work on the distinct ones
+    distinct: Dict[FrozenSet[str], int] = {}
+    members: List[List[int]] = []
+    for position, tokens in enumerate(token_sets):
+        if not tokens:
+            members.append([position])
+            continue
+        group = distinct.get(tokens)
+        if group is None:
+            group = distinct[tokens] = len(members)
+            members.append([])
+        members[group].append(position)
+
+    # Rarest tokens first; the token itself breaks ties so prefixes are deterministic
+    frequency = Counter(token for tokens in distinct for token in tokens)
+    ordered = {
+        group: sorted(tokens, key=lambda token: (frequency[token], token))
+        for tokens, group in distinct.items()
+    }
+
+    uf = UnionFind(len(members))
+    index: Dict[str, List[int]] = defaultdict(list)
+
+    # Ascending size, so every indexed set is at most as large as the probe
+    for group in sorted(ordered, key=lambda group: (len(ordered[group]), ordered[group])):
+        tokens = ordered[group]
+        size = len(tokens)
+        prefix = size - math.ceil(threshold * size) + 1
+        min_size = threshold * size
+        token_set = frozenset(tokens)
+
+        seen = set()
+        for token in tokens[:prefix]:
+            for other in index[token]:
+                if other in seen:
+                    continue
+                seen.add(other)
+                other_tokens = ordered[other]
+                if len(other_tokens) < min_size:
+                    continue
+                common = len(token_set.intersection(other_tokens))
+                if common / (size + len(other_tokens) - common) > threshold:
+                    uf.union(group, other)
+            index[token].append(group)
+
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for group, positions in enumerate(members):
+        clusters[uf.find(group)].extend(positions)
+    return [sorted(positions) for positions in clusters.values()]
+
+
+def _member_order(trend: Any) -> Tuple[Any, ...]:
+    return (-trend.volume, str(trend.trend_id), trend.name)
+
+
+def _merge(members: List[Any]) -> Any:
+    """Fold a cluster into its representative, in canonical member order"""
+    members = sorted(members, key=_member_order)
+    merged = members[0]
+    related = set(merged.related_trends)
+
+    for trend in members[1:]:
+        merged.volume += trend.volume
+        merged.signals.extend(trend.signals)
+        merged.viral_score = max(merged.viral_score, trend.viral_score)
+        merged.growth_rate = max(merged.growth_rate, trend.growth_rate)
+        related.update(trend.related_trends)
+
+    merged.related_trends = sorted(related)
+    return merged
+
+
+def consolidate_trends(trends: Sequence[Any], threshold: float = DEFAULT_NAME_SIMILARITY) -> List[Any]:
+    """
+    Merge trends with similar names into one trend per cluster
+
+    Merged trends get the summed volume, all signals, the maximum viral score
+    and growth rate, and the union of related trends. The representative
+    trend object is updated in place and returned.
+    """
+    if not trends:
+        return []
+
+    clusters = similar_groups([name_tokens(trend.name) for trend in trends], threshold)
+    merged = [_merge([trends[position] for position in cluster]) for cluster in clusters]
+    merged.sort(key=_member_order)
+    return merged
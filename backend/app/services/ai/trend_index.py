@@ -0,0 +1,197 @@
+"""
+Inverted index over TikTok trends for trend matching
+
+Each indexed trend keeps its normalized name words, keywords and hashtags as
+frozen sets, built once per index refresh instead of once per comparison.
+Posting lists map every token to the trends containing it, so matching an
+incoming trend only scores the trends that share at least one token with
+it. A trend sharing no token scores 0 under ``trend_similarity`` and can
+never pass a positive threshold, so the results equal a full scan.
+
+The process-wide index is rebuilt when the set of active trends changes,
+i.e. when a scraping run lands (detected through a cheap count/max query),
+or explicitly through ``invalidate_tiktok_trend_index``.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, desc, func
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+NAME_WEIGHT = 0.4
+KEYWORD_WEIGHT = 0.3
+HASHTAG_WEIGHT = 0.3
+
+_FIELDS = ("name_words", "keywords", "hashtags")
+
+
+@dataclass(frozen=True)
+class TrendTerms:
+    """Normalized token sets of a trend"""
+    name_words: FrozenSet[str]
+    keywords: FrozenSet[str]
+    hashtags: FrozenSet[str]
+
+    @classmethod
+    def from_trend_data(cls, trend: Any) -> "TrendTerms":
+        """Terms of an analyzer ``TrendData``; only ``#``-prefixed related trends count as hashtags"""
+        return cls(
+            name_words=frozenset(trend.name.lower().split()),
+            keywords=frozenset(kw.lower() for kw in trend.keywords),
+            hashtags=frozenset(tag.lower() for tag in trend.related_trends if tag.startswith("#")),
+        )
+
+    @classmethod
+    def from_tiktok_trend(cls, trend: Any) -> "TrendTerms":
+        return cls(
+            name_words=frozenset((trend.normalized_name or "").split()),
+            keywords=frozenset(kw.lower() for kw in (trend.keywords or [])),
+            hashtags=frozenset(tag.lower() for tag in (trend.hashtags or [])),
+        )
+
+
+def _jaccard(first: FrozenSet[str], second: FrozenSet[str]) -> Optional[float]:
+    if not first or not second:
+        return None
+    return len(first & second) / len(first | second)
+
+
+def trend_similarity(query: TrendTerms, candidate: TrendTerms) -> float:
+    """Weighted Jaccard similarity over name words, keywords and hashtags"""
+    factors = []
+    for field_name, weight in zip(_FIELDS, (NAME_WEIGHT, KEYWORD_WEIGHT, HASHTAG_WEIGHT)):
+        similarity = _jaccard(getattr(query, field_name), getattr(candidate, field_name))
+        if similarity is not None:
+            factors.append(similarity * weight)
+    return sum(factors) if factors else 0.0
+
+
+class TrendIndex:
+    """Posting lists over a fixed list of TikTok trends"""
+
+    def __init__(self, trends: Iterable[Any], signature: Any = None):
+        self.trends: List[Any] = list(trends)
+        self.signature = signature
+        self.terms: List[TrendTerms] = [TrendTerms.from_tiktok_trend(trend) for trend in self.trends]
+        self._sizes: List[Tuple[int, int, int]] = [
+            tuple(len(getattr(terms, field_name)) for field_name in _FIELDS) for terms in self.terms
+        ]
+
+        self._postings: Dict[str, Dict[str, List[int]]] = {name: defaultdict(list) for name in _FIELDS}
+        # keywords | hashtags, for coverage checks against existing trends
+        self._term_postings: Dict[str, List[int]] = defaultdict(list)
+
+        for position, terms in enumerate(self.terms):
+            for field_name in _FIELDS:
+                postings = self._postings[field_name]
+                for token in getattr(terms, field_name):
+                    postings[token].append(position)
+            for token in terms.keywords | terms.hashtags:
+                self._term_postings[token].append(position)
+
+    def __len__(self) -> int:
+        return len(self.trends)
+
+    def _intersections(self, query: TrendTerms) -> List[Counter]:
+        """Per field, the number of query tokens each candidate shares"""
+        counts = []
+        for field_name in _FIELDS:
+            postings = self._postings[field_name]
+            shared = Counter()
+            for token in getattr(query, field_name):
+                shared.update(postings.get(token, ()))
+            counts.append(shared)
+        return counts
+
+    def candidates(self, query: TrendTerms) -> List[int]:
+        """Positions of trends sharing at least one token with ``query``, in index order"""
+        found: Set[int] = set()
+        for shared in self._intersections(query):
+            found.update(shared)
+        return sorted(found)
+
+    def match(self, query: TrendTerms, threshold: float = 0.3) -> List[Tuple[Any, float]]:
+        """
+        Trends scoring above ``threshold``, best first (ties keep index order)
+
+        Scores are computed from the posting-list intersection counts and the
+        cached set sizes, which gives exactly ``trend_similarity``.
+        """
+        counts = self._intersections(query)
+        query_sizes = [len(getattr(query, field_name)) for field_name in _FIELDS]
+        weights = (NAME_WEIGHT, KEYWORD_WEIGHT, HASHTAG_WEIGHT)
+
+        found: Set[int] = set()
+        for shared in counts:
+            found.update(shared)
+
+        matches = []
+        for position in sorted(found):
+            sizes = self._sizes[position]
+            factors = []
+            for shared, query_size, size, weight in zip(counts, query_sizes, sizes, weights):
+                if query_size and size:
+                    common = shared.get(position, 0)
+                    factors.append(common / (query_size + size - common) * weight)
+            score = sum(factors) if factors else 0.0
+            if score > threshold:
+                matches.append((self.trends[position], score))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+    def term_overlaps(self, terms: Iterable[str]) -> List[int]:
+        """Per trend, how many of ``terms`` appear among its keywords and hashtags"""
+        overlaps = [0] * len(self.trends)
+        for term in set(terms):
+            for position in self._term_postings.get(term, ()):
+                overlaps[position] += 1
+        return overlaps
+
+
+_index: Optional[TrendIndex] = None
+
+
+def active_trend_filter(model, now: datetime):
+    """Trends eligible for matching: active, viral and scraped within a day"""
+    return and_(
+        model.is_active == True,
+        model.viral_score > 30,
+        model.last_scraped > now - timedelta(hours=24)
+    )
+
+
+def get_tiktok_trend_index(db: Session, now: Optional[datetime] = None) -> TrendIndex:
+    """
+    Process-wide index of active TikTok trends
+
+    Rebuilt only when the count or latest scrape time of eligible trends
+    changes, which is when a scraping run lands or trends age out.
+    """
+    from app.models.tiktok_trend import TikTokTrend
+
+    global _index
+
+    eligible = active_trend_filter(TikTokTrend, now or datetime.utcnow())
+    signature = tuple(db.query(func.count(TikTokTrend.id), func.max(TikTokTrend.last_scraped)).filter(eligible).one())
+
+    if _index is None or _index.signature != signature:
+        trends = db.query(TikTokTrend).filter(eligible).order_by(desc(TikTokTrend.viral_score)).all()
+        # Detach so later commits on this session cannot expire cached rows
+        for trend in trends:
+            db.expunge(trend)
+        _index = TrendIndex(trends, signature=signature)
+        logger.info(f"Rebuilt TikTok trend index over {len(_index)} trends")
+
+    return _index
+
+
+def invalidate_tiktok_trend_index():
+    """Force a rebuild on next use (call after ingesting TikTok data)"""
+    global _index
+    _index = None
@@ -0,0 +1,184 @@
+"""
+Materialized trend snapshots
+
+Detected, consolidated and scored trends only depend on platform data, which
+changes when a scraping run lands rather than per request. A snapshot stores
+them, together with the brand-independent aggregates of a trend analysis,
+for one platform set and industry keyword list (``snapshot_key``). Brand
+specific opportunity scoring and insights then run against the snapshot.
+
+Each snapshot also keeps the raw per-platform detections and the source
+version they were detected from. A refresh re-detects only the platforms
+whose version changed and reruns consolidation, signal analysis and scoring
+over the reused and new detections. Source versions are:
+
+- TikTok: count and latest ``updated_at`` of TikTok trends and the latest
+  completed Apify dataset ingest, so new TikTok data invalidates it, plus
+  the hour bucket below
+- other platforms: the hour bucket, matching the detector's one-hour
+  platform cache
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+if TYPE_CHECKING:
+    from app.models.trend_snapshot import TrendSnapshot
+
+logger = logging.getLogger(__name__)
+
+SOURCE_VERSION_WINDOW = 3600  # Seconds per hour bucket
+MAX_KEY_LENGTH = 500
+TOUCH_INTERVAL = timedelta(hours=1)  # Coarse last_requested_at updates keep reads cheap
+
+
+def _value(platform: Any) -> str:
+    return getattr(platform, "value", platform)
+
+
+def snapshot_platforms(platforms: Iterable[Any]) -> List[str]:
+    """Sorted, distinct platform values"""
+    return sorted({_value(platform) for platform in platforms})
+
+
+def snapshot_keywords(industry_keywords: Optional[Iterable[str]]) -> List[str]:
+    """Sorted, distinct, stripped industry keywords"""
+    return sorted({keyword.strip() for keyword in industry_keywords or [] if keyword and keyword.strip()})
+
+
+def snapshot_key(platforms: Iterable[Any], industry_keywords: Optional[Iterable[str]]) -> str:
+    """Snapshot identity; independent of platform and keyword order"""
+    key = f"{','.join(snapshot_platforms(platforms))}|{','.join(snapshot_keywords(industry_keywords))}"
+    if len(key) > MAX_KEY_LENGTH:
+        key = f"sha256:{hashlib.sha256(key.encode()).hexdigest()}"
+    return key
+
+
+def tiktok_source_version(db: Session) -> str:
+    from app.models.tiktok_ingest import TikTokIngestCheckpoint
+    from app.models.tiktok_trend import TikTokTrend
+
+    count, latest = db.query(func.count(TikTokTrend.id), func.max(TikTokTrend.updated_at)).one()
+    ingested = db.query(func.max(TikTokIngestCheckpoint.completed_at)).scalar()
+    return ":".join([str(count)] + [value.isoformat() if value else "" for value in (latest, ingested)])
+
+
+def source_versions(db: Session, platforms: Iterable[Any], now: Optional[float] = None) -> Dict[str, str]:
+    """Current source version of every platform"""
+    now = datetime.now(timezone.utc).timestamp() if now is None else now
+    window = f"h{int(now // SOURCE_VERSION_WINDOW)}"
+
+    versions = {platform: window for platform in snapshot_platforms(platforms)}
+    if "tiktok" in versions:
+        versions["tiktok"] = f"{window}|{tiktok_source_version(db)}"
+    return versions
+
+
+def changed_platforms(previous: Optional[Dict[str, Any]], versions: Dict[str, str]) -> List[str]:
+    """Platforms whose detections cannot be reused from ``previous``"""
+    if previous is None:
+        return sorted(versions)
+    return sorted(
+        platform for platform, version in versions.items()
+        if previous["source_versions"].get(platform) != version or platform not in previous["platform_trends"]
+    )
+
+
+def snapshot_age(snapshot: Dict[str, Any], now: Optional[datetime] = None) -> float:
+    """Seconds since the snapshot was built"""
+    built_at = snapshot["built_at"]
+    if built_at.tzinfo is None:
+        built_at = built_at.replace(tzinfo=timezone.utc)
+    return ((now or datetime.now(timezone.utc)) - built_at).total_seconds()
+
+
+def _to_document(snapshot: "TrendSnapshot") -> Dict[str, Any]:
+    return {
+        "snapshot_key": snapshot.snapshot_key,
+        "platforms": snapshot.platforms,
+        "industry_keywords": snapshot.industry_keywords,
+        "platform_trends": snapshot.platform_trends,
+        "source_versions": snapshot.source_versions,
+        "trends": snapshot.trends,
+        "aggregates": snapshot.aggregates,
+        "build_seconds": snapshot.build_seconds,
+        "built_at": snapshot.built_at,
+    }
+
+
+def load_snapshot(db: Session, key: str, touch: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Stored snapshot for ``key`` as a plain dict
+
+    With ``touch``, records the request so the background refresh keeps the
+    snapshot warm.
+    """
+    from app.models.trend_snapshot import TrendSnapshot
+
+    snapshot = db.query(TrendSnapshot).filter(TrendSnapshot.snapshot_key == key).first()
+    if snapshot is None:
+        return None
+
+    document = _to_document(snapshot)
+    now = datetime.now(timezone.utc)
+    last_requested = snapshot.last_requested_at
+    if last_requested is not None and last_requested.tzinfo is None:
+        last_requested = last_requested.replace(tzinfo=timezone.utc)
+    if touch and (last_requested is None or now - last_requested > TOUCH_INTERVAL):
+        snapshot.last_requested_at = now
+        db.commit()
+    return document
+
+
+def save_snapshot(db: Session, document: Dict[str, Any]) -> None:
+    """Insert or replace the snapshot in ``document``"""
+    from app.models.trend_snapshot import TrendSnapshot
+
+    values = {field: document[field] for field in (
+        "platforms", "industry_keywords", "platform_trends", "source_versions",
+        "trends", "aggregates", "build_seconds", "built_at",
+    )}
+
+    for attempt in range(2):
+        snapshot = db.query(TrendSnapshot).filter(TrendSnapshot.snapshot_key == document["snapshot_key"]).first()
+        if snapshot is None:
+            snapshot = TrendSnapshot(snapshot_key=document["snapshot_key"], last_requested_at=document["built_at"])
+            db.add(snapshot)
+        for field, value in values.items():
+            setattr(snapshot, field, value)
+        try:
+            db.commit()
+            return
+        except IntegrityError:
+            # A concurrent build inserted the same key first; update that row instead
+            db.rollback()
+            if attempt:
+                raise
+
+
+def snapshots_to_refresh(db: Session, idle_days: int, platform: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Identity of snapshots requested within ``idle_days``
+
+    With ``platform``, only snapshots covering that platform are returned.
+    """
+    from app.models.trend_snapshot import TrendSnapshot
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=idle_days)
+    rows = (
+        db.query(TrendSnapshot.snapshot_key, TrendSnapshot.platforms, TrendSnapshot.industry_keywords)
+        .filter(TrendSnapshot.last_requested_at >= cutoff)
+        .order_by(TrendSnapshot.snapshot_key)
+        .all()
+    )
+    return [
+        {"snapshot_key": key, "platforms": platforms, "industry_keywords": keywords}
+        for key, platforms, keywords in rows
+        if platform is None or platform in platforms
+    ]
@@ -11,7 +11,7 @@ import re
 import time
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 import logging
 
 import numpy as np
@@ -20,7 +20,7 @@ from diskcache import Cache
 from app.core.config import settings
 from app.services.ai.providers import get_text_service
 from app.services.ai.vector_db import get_vector_service
-from app.services.ai.prompts import get_prompt_template
+from app.services.ai.prompts import generate_from_template
 
 logger = logging.getLogger(__name__)
 
@@ -376,6 +376,33 @@ class ViralContentGenerator:
         count: int = 5
     ) -> List[ContentIdea]:
         """Generate viral content ideas"""
+        ideas = [
+            idea async for idea in self.stream_content_ideas(
+                brand_name, industry, content_pillars, target_audience, platform, count
+            )
+        ]
+        
+        # Sort by estimated engagement
+        ideas.sort(key=lambda x: x.estimated_engagement, reverse=True)
+        
+        return ideas
+    
+    async def stream_content_ideas(
+        self,
+        brand_name: str,
+        industry: str,
+        content_pillars: List[str],
+        target_audience: str,
+        platform: Platform,
+        count: int = 5
+    ) -> AsyncIterator[ContentIdea]:
+        """Generate viral content ideas concurrently, yielding each one as it completes
+        
+        Pillar x trending topic combinations are tried in order with one
+        generation running per idea still needed; a combination that yields no
+        idea is replaced by the next one. Requests are bounded by the text
+        service's shared limiter.
+        """
         await self._get_services()
         
         logger.info(f"Generating {count} content ideas for {brand_name} on {platform}")
@@ -387,32 +414,44 @@ class ViralContentGenerator:
         # Analyze competitor content
         competitor_analysis = await self.trend_analyzer.analyze_competitor_content(industry)
         
-        ideas = []
-        for pillar in content_pillars[:count]:  # Generate ideas per pillar
-            for trend_topic in trending_topics[:2]:  # Max 2 trends per pillar
-                idea = await self._generate_single_idea(
-                    brand_name=brand_name,
-                    industry=industry,
-                    content_pillar=pillar,
-                    target_audience=target_audience,
-                    platform=platform,
-                    trending_topic=trend_topic,
-                    competitor_patterns=competitor_analysis.get("patterns", [])
-                )
+        # Max 2 trends per pillar
+        combinations = iter([
+            (pillar, trend_topic)
+            for pillar in content_pillars[:count]
+            for trend_topic in trending_topics[:2]
+        ])
+        
+        produced = 0
+        pending = set()
+        try:
+            while produced < count:
+                while len(pending) < count - produced:
+                    combination = next(combinations, None)
+                    if combination is None:
+                        break
+                    pillar, trend_topic = combination
+                    pending.add(asyncio.create_task(self._generate_single_idea(
+                        brand_name=brand_name,
+                        industry=industry,
+                        content_pillar=pillar,
+                        target_audience=target_audience,
+                        platform=platform,
+                        trending_topic=trend_topic,
+                        competitor_patterns=competitor_analysis.get("patterns", [])
+                    )))
                 
-                if idea:
-                    ideas.append(idea)
-                    
-                if len(ideas) >= count:
+                if not pending:
                     break
-            
-            if len(ideas) >= count:
-                break
-        
-        # Sort by estimated engagement
-        ideas.sort(key=lambda x: x.estimated_engagement, reverse=True)
-        
-        return ideas[:count]
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    idea = task.result()
+                    if idea:
+                        produced += 1
+                        yield idea
+        finally:
+            for task in pending:
+                task.cancel()
     
     async def _generate_single_idea(
         self,
@@ -472,25 +511,20 @@ class ViralContentGenerator:
     ) -> List[ViralHook]:
         """Generate viral hooks for content"""
         
-        # Get viral hook generation prompt
-        hook_prompt = await get_prompt_template("viral_hook_generation")
-        
-        # Format prompt with context
-        formatted_prompt = hook_prompt.format(
-            brand_name=brand_name,
-            industry=industry,
-            content_pillar=content_pillar,
-            target_audience=target_audience,
-            platform=platform
-        )
-        
-        # Add trending topic if provided
-        if trending_topic:
-            formatted_prompt += f"\n\nIncorporate this trending topic: {trending_topic}"
-        
-        # Generate hooks with AI
-        response = await self.text_service.generate(
-            formatted_prompt,
+        # Brand/pillar context is shared across requests and forms the cached prefix;
+        # the trending topic is the only per-request part
+        response = await generate_from_template(
+            self.text_service,
+            "viral_hook_generation",
+            variables={
+                "brand_name": brand_name,
+                "industry": industry,
+                "content_pillar": content_pillar,
+                "target_audience": target_audience,
+                "platform": platform
+            },
+            static_variables=("brand_name", "industry", "content_pillar", "target_audience", "platform"),
+            extra_suffix=f"\n\nIncorporate this trending topic: {trending_topic}" if trending_topic else "",
             max_tokens=800,
             temperature=0.8  # Higher creativity for viral content
         )
@@ -504,11 +538,8 @@ class ViralContentGenerator:
         if not hooks:
             raise Exception("AI hook generation returned no valid hooks")
         
-        # Score and enhance each hook
-        enhanced_hooks = []
-        for hook in hooks:
-            scored_hook = await self.score_viral_potential(hook, platform, target_audience)
-            enhanced_hooks.append(scored_hook)
+        # Score and enhance all hooks in one request
+        enhanced_hooks = await self.score_hooks(hooks, platform, target_audience)
         
         # Sort by viral score and return top hooks
         enhanced_hooks.sort(key=lambda h: h.viral_score, reverse=True)
@@ -570,16 +601,16 @@ class ViralContentGenerator:
     ) -> ViralHook:
         """Score viral potential of a hook"""
         
-        # Get viral scoring prompt
-        scoring_prompt = await get_prompt_template("viral_scoring")
-        
-        # Generate detailed scoring
-        response = await self.text_service.generate(
-            scoring_prompt.format(
-                hook=hook.text,
-                platform=platform,
-                target_audience=target_audience
-            ),
+        # Generate detailed scoring; only the hook text varies between calls
+        response = await generate_from_template(
+            self.text_service,
+            "viral_scoring",
+            variables={
+                "hook": hook.text,
+                "platform": platform,
+                "target_audience": target_audience
+            },
+            static_variables=("platform", "target_audience"),
             max_tokens=400,
             temperature=0.3
         )
@@ -587,16 +618,92 @@ class ViralContentGenerator:
         if response.success:
             # Parse AI scoring response
             score_data = self._parse_scoring_response(response.content)
-            hook.viral_score = score_data.get("overall_score", 5.0)
-            hook.reasoning = score_data.get("reasoning", "")
         else:
             raise Exception(f"AI scoring service failed: {response.error if hasattr(response, 'error') else 'Unknown error'}")
         
+        return self._apply_score(hook, score_data)
+    
+    async def score_hooks(
+        self,
+        hooks: List[ViralHook],
+        platform: Platform,
+        target_audience: str
+    ) -> List[ViralHook]:
+        """Score viral potential of several hooks with one structured request
+        
+        Hooks missing from the batch response, or all of them if the batch
+        request fails, are scored individually and concurrently.
+        """
+        if not hooks:
+            return []
+        
+        response = await generate_from_template(
+            self.text_service,
+            "viral_batch_scoring",
+            variables={
+                "hooks": "\n".join(f"{number}. {hook.text}" for number, hook in enumerate(hooks, 1)),
+                "platform": platform,
+                "target_audience": target_audience
+            },
+            static_variables=("platform", "target_audience"),
+            max_tokens=200 + 150 * len(hooks),
+            temperature=0.3
+        )
+        
+        if response.success:
+            scores = self._parse_batch_scoring_response(response.content, len(hooks))
+        else:
+            logger.warning(f"Batch hook scoring failed, scoring hooks individually: {response.error}")
+            scores = {}
+        
+        unscored = []
+        for index, hook in enumerate(hooks):
+            if index in scores:
+                self._apply_score(hook, scores[index])
+            else:
+                unscored.append(hook)
+        
+        if unscored:
+            await asyncio.gather(*[
+                self.score_viral_potential(hook, platform, target_audience) for hook in unscored
+            ])
+        
+        return list(hooks)
+    
+    def _apply_score(self, hook: ViralHook, score_data: Dict[str, Any]) -> ViralHook:
+        hook.viral_score = score_data.get("overall_score", 5.0)
+        hook.reasoning = score_data.get("reasoning", "")
+        
         # Add improvement suggestions
         hook.improvements = self.pattern_analyzer.suggest_improvements(hook.text, hook.pattern)
         
         return hook
     
+    def _parse_batch_scoring_response(self, ai_response: str, hook_count: int) -> Dict[int, Dict[str, Any]]:
+        """Parse a batch scoring response into score data by hook index"""
+        match = re.search(r'\[.*\]', ai_response, re.DOTALL)
+        if not match:
+            return {}
+        
+        try:
+            items = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return {}
+        
+        scores = {}
+        for position, item in enumerate(items if isinstance(items, list) else []):
+            if not isinstance(item, dict):
+                continue
+            try:
+                index = int(item.get("hook", position + 1)) - 1
+                overall_score = float(item["overall_score"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= index < hook_count and index not in scores:
+                scores[index] = {"overall_score": overall_score, "reasoning": str(item.get("reasoning", ""))}
+        
+        return scores
+    
     def _parse_scoring_response(self, ai_response: str) -> Dict[str, Any]:
         """Parse AI scoring response"""
         score_data = {"overall_score": 5.0, "reasoning": ai_response}
@@ -711,13 +818,23 @@ class ViralContentGenerator:
         count: int = 5
     ) -> List[Dict[str, Any]]:
         """Generate viral content ideas based on brand and products"""
+        ideas = [idea async for idea in self.stream_ideas(brand_data, products, count)]
         
-        await self._get_services()
+        # Sort by estimated engagement
+        ideas.sort(key=lambda x: x["estimated_engagement"], reverse=True)
+        
+        return ideas
+    
+    async def stream_ideas(
+        self,
+        brand_data: Dict[str, Any],
+        products: List[Dict[str, Any]],
+        count: int = 5
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Generate viral content ideas based on brand and products, yielding each as it completes"""
         
         brand_name = brand_data.get("name", "Brand")
-        description = brand_data.get("description", "")
         target_audience = brand_data.get("target_audience", {})
-        value_proposition = brand_data.get("value_proposition", "")
         
         # Extract content pillars from products
         content_pillars = []
@@ -726,12 +843,11 @@ class ViralContentGenerator:
                 content_pillars.append(product["name"])
         
         if not content_pillars:
-            content_pillars = ["Product showcase", "Brand story", "Behind the scenes"]
+            content_pillars = brand_data.get("pillars") or ["Product showcase", "Brand story", "Behind the scenes"]
         
-        # Generate content ideas
-        ideas = await self.generate_content_ideas(
+        ideas = self.stream_content_ideas(
             brand_name=brand_name,
-            industry=self._detect_industry(brand_data, products),
+            industry=brand_data.get("industry") or self._detect_industry(brand_data, products),
             content_pillars=content_pillars,
             target_audience=str(target_audience),
             platform=Platform.TIKTOK,  # Default to TikTok
@@ -739,7 +855,8 @@ class ViralContentGenerator:
         )
         
         # Convert to dict format for API response
-        return [idea.to_dict() for idea in ideas]
+        async for idea in ideas:
+            yield idea.to_dict()
     
     async def create_video_outline(
         self,
@@ -10,15 +10,18 @@ import asyncio
 import json
 import time
 import uuid
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Dict, Any, List, Optional, Union, Callable
+from typing import Dict, Any, AsyncIterator, List, Optional, Union, Callable
 
 import aiohttp
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import logging
 
+from app.core.async_runtime import on_loop_shutdown
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -63,6 +66,25 @@ class ApifyJobError(ApifyClientError):
     pass
 
 
+@dataclass
+class DatasetPage:
+    """
+    One page of dataset items, starting at ``offset``
+    
+    Pages are fetched with ``clean``, so Apify leaves out empty and hidden
+    items and ``items`` can be shorter than the ``limit`` dataset slots the
+    page covers.
+    """
+    offset: int
+    limit: int
+    items: List[Dict[str, Any]]
+    total: int
+    
+    @property
+    def next_offset(self) -> int:
+        return self.offset + self.limit
+
+
 class ApifyTikTokClient:
     """
     Apify API client for TikTok trend scraping operations.
@@ -496,6 +518,9 @@ class ApifyTikTokClient:
         """
         Get results from a completed job
         
+        Loads the whole dataset into memory; use ``iter_run_results`` to
+        process large datasets page by page.
+        
         Args:
             run_id: Our internal run ID
             limit: Maximum number of results to return
@@ -504,34 +529,121 @@ class ApifyTikTokClient:
             List of scraped video data
         """
         
+        results = []
+        page_size = min(limit, settings.APIFY_DATASET_PAGE_SIZE) if limit else None
+        async for page in self.iter_run_results(run_id, page_size=page_size):
+            results.extend(page.items)
+            if limit and len(results) >= limit:
+                results = results[:limit]
+                break
+        
+        logger.info(f"Retrieved {len(results)} results for job {run_id}")
+        
+        return results
+    
+    async def iter_run_results(
+        self,
+        run_id: str,
+        start_offset: int = 0,
+        page_size: int = None,
+        concurrency: int = None
+    ) -> AsyncIterator[DatasetPage]:
+        """
+        Stream results of a completed job page by page
+        
+        Args:
+            run_id: Our internal run ID
+            start_offset: First dataset item to fetch
+            page_size: Items per page
+            concurrency: Pages fetched ahead of the consumer
+            
+        Yields:
+            DatasetPage objects in dataset order
+        """
+        
         if run_id not in self.active_runs:
             raise ApifyJobError(f"Unknown run ID: {run_id}")
         
-        run_info = self.active_runs[run_id]
-        apify_run_id = run_info["apify_run_id"]
-        
         # Check if job is completed
         status_info = await self.get_run_status(run_id)
         if status_info["status"] != ApifyJobStatus.SUCCEEDED.value:
             raise ApifyJobError(f"Job {run_id} has not completed successfully. Status: {status_info['status']}")
         
+        async for page in self.iter_dataset_pages(
+            self.active_runs[run_id]["apify_run_id"], start_offset, page_size, concurrency
+        ):
+            yield page
+    
+    async def get_dataset_item_count(self, apify_run_id: str) -> int:
+        """Number of items in the default dataset of an Apify run"""
+        
+        response = await self._make_request("GET", f"/actor-runs/{apify_run_id}/dataset")
+        return int(response["data"].get("itemCount") or 0)
+    
+    async def _get_dataset_page(self, apify_run_id: str, offset: int, limit: int) -> List[Dict[str, Any]]:
         endpoint = f"/actor-runs/{apify_run_id}/dataset/items"
-        params = {"format": "json"}
+        params = {"format": "json", "clean": "true", "offset": offset, "limit": limit}
         
-        if limit:
-            params["limit"] = limit
+        return await self._make_request("GET", endpoint, params=params)
+    
+    async def iter_dataset_pages(
+        self,
+        apify_run_id: str,
+        start_offset: int = 0,
+        page_size: int = None,
+        concurrency: int = None
+    ) -> AsyncIterator[DatasetPage]:
+        """
+        Stream the dataset of a finished Apify run with offset/limit paging
         
-        try:
-            response = await self._make_request("GET", endpoint, params=params)
-            results = response
-            
-            logger.info(f"Retrieved {len(results)} results for job {run_id}")
-            
-            return results
+        Takes the Apify run ID, so an ingest can resume after a restart
+        without our in-memory run tracking. Up to ``concurrency`` pages are
+        requested ahead of the consumer; pages are still yielded in dataset
+        order, so the end of the last yielded page is a safe resume offset.
+        Memory stays bounded by ``concurrency`` pages.
+        
+        Args:
+            apify_run_id: Apify run ID
+            start_offset: First dataset item to fetch, e.g. a checkpoint
+            page_size: Items per page
+            concurrency: Maximum pages in flight
             
+        Yields:
+            DatasetPage objects in dataset order
+        """
+        
+        page_size = page_size or settings.APIFY_DATASET_PAGE_SIZE
+        concurrency = max(1, concurrency or settings.APIFY_DATASET_CONCURRENCY)
+        
+        try:
+            total = await self.get_dataset_item_count(apify_run_id)
         except Exception as e:
-            logger.error(f"Failed to get results for job {run_id}: {e}")
+            logger.error(f"Failed to get dataset size for Apify run {apify_run_id}: {e}")
             raise ApifyJobError(f"Failed to get results: {e}")
+        
+        pending = deque()
+        next_offset = start_offset
+        
+        try:
+            while pending or next_offset < total:
+                while next_offset < total and len(pending) < concurrency:
+                    limit = min(page_size, total - next_offset)
+                    task = asyncio.create_task(self._get_dataset_page(apify_run_id, next_offset, limit))
+                    pending.append((next_offset, limit, task))
+                    next_offset += limit
+                
+                offset, limit, task = pending.popleft()
+                try:
+                    items = await task
+                except Exception as e:
+                    logger.error(f"Failed to get results page at offset {offset} for Apify run {apify_run_id}: {e}")
+                    raise ApifyJobError(f"Failed to get results: {e}")
+                
+                yield DatasetPage(offset=offset, limit=limit, items=items, total=total)
+        finally:
+            # Consumer stopped early or a page failed: drop the prefetched pages
+            for _, _, task in pending:
+                task.cancel()
     
     async def get_run_analytics(self, run_id: str) -> Dict[str, Any]:
         """
@@ -719,6 +831,7 @@ async def get_apify_client() -> ApifyTikTokClient:
     
     if _apify_client is None:
         _apify_client = ApifyTikTokClient()
+        on_loop_shutdown(close_apify_client)
     
     return _apify_client
 
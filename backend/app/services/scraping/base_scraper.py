@@ -18,6 +18,7 @@ from bs4 import BeautifulSoup
 from selectolax.parser import HTMLParser
 
 from app.core.config import settings
+from app.core.metrics import observe_scraper_fetch
 
 logger = logging.getLogger(__name__)
 
@@ -171,6 +172,7 @@ class BaseScraper(ABC):
                     
                     if response.status == 200:
                         self.scraped_urls.add(url)
+                        observe_scraper_fetch(self.__class__.__name__, processing_time, True)
                         
                         # Parse with both BeautifulSoup and selectolax
                         soup = BeautifulSoup(content, 'lxml')
@@ -201,6 +203,7 @@ class BaseScraper(ABC):
         
         # All attempts failed
         processing_time = time.time() - start_time
+        observe_scraper_fetch(self.__class__.__name__, processing_time, False)
         return ScrapingResult(
             url=url,
             success=False,
@@ -0,0 +1,244 @@
+"""
+Streaming ingest of Apify TikTok datasets
+
+Dataset pages are fetched ahead with bounded concurrency
+(``ApifyTikTokClient.iter_dataset_pages``), normalized one page at a time
+and bulk-upserted into ``tiktok_videos``, ``tiktok_hashtags`` and
+``tiktok_sounds`` together with the run's checkpoint, so memory is bounded by
+a few pages and a crashed ingest resumes from the last stored page.
+
+Items from the common TikTok actors are accepted in both their flat
+(``authorMeta``/``musicMeta``/``diggCount``) and nested
+(``author``/``music``/``stats``) shapes.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.db.session import in_session
+from app.repositories.tiktok_ingest import complete_checkpoint, get_or_create_checkpoint, write_page
+from app.services.ai.trend_index import invalidate_tiktok_trend_index
+from app.services.scraping.apify_client import ApifyJobError, ApifyTikTokClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NormalizedPage:
+    """Rows of one dataset page, keyed for upserting"""
+    videos: List[Dict[str, Any]] = field(default_factory=list)
+    sounds: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # sound_id -> sound metadata
+    skipped: int = 0
+
+
+def _first(data: Dict[str, Any], *keys: str) -> Any:
+    for key in keys:
+        value = data.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    """Epoch seconds or ISO 8601 string as a naive UTC datetime"""
+    if value is None:
+        return None
+    try:
+        if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit()):
+            return datetime.fromtimestamp(int(value), tz=timezone.utc).replace(tzinfo=None)
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def normalize_hashtag(value: Any) -> Optional[str]:
+    name = value.get("name") if isinstance(value, dict) else value
+    if not isinstance(name, str):
+        return None
+    name = name.strip().lstrip("#").lower()
+    return name or None
+
+
+def normalize_sound(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    music = item.get("musicMeta") or item.get("music") or {}
+    sound_id = _first(music, "musicId", "id")
+    if sound_id is None:
+        return None
+    return {
+        "sound_id": str(sound_id),
+        "title": _first(music, "musicName", "title"),
+        "artist": _first(music, "musicAuthor", "authorName"),
+        "duration": _int(_first(music, "duration")),
+        "sound_url": _first(music, "playUrl"),
+        "is_original": _first(music, "musicOriginal", "original"),
+    }
+
+
+def normalize_video(item: Dict[str, Any], scraped_at: datetime, source: str = "apify") -> Optional[Dict[str, Any]]:
+    """``tiktok_videos`` row for one dataset item, or None if it has no video id"""
+    video_id = _first(item, "id", "videoId")
+    if video_id is None:
+        return None
+
+    author = item.get("authorMeta") or item.get("author") or {}
+    stats = item.get("stats") or {}
+    video_meta = item.get("videoMeta") or item.get("video") or {}
+
+    def stat(*keys: str) -> Optional[int]:
+        value = _first(item, *keys)
+        return _int(value if value is not None else _first(stats, *keys))
+
+    views = stat("playCount", "viewCount")
+    likes = stat("diggCount", "likeCount")
+    shares = stat("shareCount")
+    comments = stat("commentCount")
+    engagement = (likes or 0) + (shares or 0) + (comments or 0)
+
+    hashtags = []
+    for tag in item.get("hashtags") or []:
+        tag = normalize_hashtag(tag)
+        if tag and tag not in hashtags:
+            hashtags.append(tag)
+
+    sound = normalize_sound(item)
+
+    return {
+        "video_id": str(video_id),
+        "title": item.get("title"),
+        "description": _first(item, "text", "desc", "description"),
+        "duration": _int(_first(video_meta, "duration") or item.get("duration")),
+        "creator_username": _first(author, "name", "uniqueId", "username"),
+        "creator_display_name": _first(author, "nickName", "nickname"),
+        "creator_follower_count": _int(_first(author, "fans", "followerCount")),
+        "creator_verified": bool(author.get("verified", False)),
+        "view_count": views,
+        "like_count": likes,
+        "share_count": shares,
+        "comment_count": comments,
+        "engagement_rate": engagement / views if views else 0.0,
+        "hashtags": hashtags,
+        "mentions": list(item.get("mentions") or []),
+        "sounds_used": [sound["sound_id"]] if sound else [],
+        "tiktok_url": _first(item, "webVideoUrl", "url"),
+        "posted_at": _timestamp(_first(item, "createTimeISO", "createTime")),
+        "scraped_at": scraped_at,
+        "scraping_source": source,
+        "raw_data": item,
+        "is_active": True,
+    }
+
+
+def normalize_dataset_items(
+    items: Iterable[Dict[str, Any]],
+    scraped_at: Optional[datetime] = None,
+    source: str = "apify"
+) -> NormalizedPage:
+    """
+    Normalize one dataset page
+
+    Videos repeated within the page keep their last occurrence; items
+    without a video id are counted as skipped.
+    """
+    scraped_at = scraped_at or datetime.utcnow()
+    page = NormalizedPage()
+    videos: Dict[str, Dict[str, Any]] = {}
+
+    for item in items:
+        video = normalize_video(item, scraped_at, source) if isinstance(item, dict) else None
+        if video is None:
+            page.skipped += 1
+            continue
+        videos[video["video_id"]] = video
+        sound = normalize_sound(item)
+        if sound:
+            page.sounds[sound["sound_id"]] = sound
+
+    page.videos = list(videos.values())
+    return page
+
+
+async def _ingest_pages(
+    client: ApifyTikTokClient,
+    apify_run_id: str,
+    start_offset: int,
+    source: str,
+    page_size: Optional[int],
+    concurrency: Optional[int]
+) -> Optional[Dict[str, Any]]:
+    """Write every page from ``start_offset`` on; returns the last checkpoint state"""
+    checkpoint = None
+    async for page in client.iter_dataset_pages(apify_run_id, start_offset, page_size, concurrency):
+        normalized = normalize_dataset_items(page.items, source=source)
+        checkpoint = await asyncio.to_thread(
+            in_session, write_page, apify_run_id, page.offset, page.next_offset, page.total, normalized
+        )
+        logger.debug(f"Ingested items {page.offset}-{page.next_offset} of {page.total} for Apify run {apify_run_id}")
+    return checkpoint
+
+
+async def ingest_apify_dataset(
+    apify_run_id: str,
+    job_type: str = None,
+    client: ApifyTikTokClient = None,
+    page_size: int = None,
+    concurrency: int = None
+) -> Dict[str, Any]:
+    """
+    Stream an Apify run's dataset into the TikTok tables
+
+    Resumes from the run's checkpoint; a run that was already ingested
+    completely is not fetched again.
+
+    Returns:
+        Checkpoint state: offsets, page count and row counts
+    """
+    checkpoint = await asyncio.to_thread(in_session, get_or_create_checkpoint, apify_run_id, job_type)
+    if checkpoint["completed_at"] is not None:
+        logger.info(f"Apify run {apify_run_id} already ingested")
+        return checkpoint
+
+    if checkpoint["next_offset"]:
+        logger.info(f"Resuming ingest of Apify run {apify_run_id} at item {checkpoint['next_offset']}")
+
+    source = f"apify:{job_type}" if job_type else "apify"
+
+    if client is None:
+        async with ApifyTikTokClient() as client:
+            written = await _ingest_pages(client, apify_run_id, checkpoint["next_offset"], source, page_size, concurrency)
+    else:
+        written = await _ingest_pages(client, apify_run_id, checkpoint["next_offset"], source, page_size, concurrency)
+
+    # Pages skipped as out of order must not be completed over; a retry resumes from the checkpoint
+    if written is not None and written["next_offset"] < written["total_items"]:
+        raise ApifyJobError(
+            f"Ingest of Apify run {apify_run_id} stopped at item {written['next_offset']} of {written['total_items']}"
+        )
+
+    checkpoint = await asyncio.to_thread(in_session, complete_checkpoint, apify_run_id)
+    logger.info(f"Ingested Apify run {apify_run_id}: {checkpoint['counts']}")
+
+    _refresh_trend_data()
+    return checkpoint
+
+
+def _refresh_trend_data():
+    """Rebuild the trend index and the trend snapshots covering TikTok"""
+    from app.tasks.trend_tasks import refresh_trend_snapshots
+
+    invalidate_tiktok_trend_index()
+    try:
+        refresh_trend_snapshots.delay(platform="tiktok")
+    except Exception as e:
+        # The periodic refresh picks the new data up anyway
+        logger.warning(f"Could not queue trend snapshot refresh: {e}")
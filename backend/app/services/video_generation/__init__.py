@@ -18,6 +18,7 @@ from .text_to_speech import ElevenLabsProvider, TTSProvider
 from .video_assembly import VideoAssemblyService
 from .script_generation import ScriptGenerationService
 from .asset_management import AssetManagementService
+from .asset_store import AssetStore
 from .ugc_generation import UGCGenerationService
 from .orchestrator import VideoGenerationOrchestrator
 
@@ -33,6 +34,7 @@ __all__ = [
     "VideoAssemblyService",
     "ScriptGenerationService",
     "AssetManagementService",
+    "AssetStore",
     "UGCGenerationService",
     "VideoGenerationOrchestrator"
 ]
\ No newline at end of file
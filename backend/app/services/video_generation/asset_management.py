@@ -7,7 +7,6 @@ import hashlib
 import logging
 import os
 import tempfile
-import uuid
 from io import BytesIO
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple, Union
@@ -22,6 +21,20 @@ import numpy as np
 from app.core.config import settings
 from app.models.product import Product
 from app.models.brand import Brand
+from app.services.video_generation.asset_store import StoredAsset, get_asset_store
+from app.services.video_generation.image_analysis import (
+    ANALYSIS_MAX_DIMENSION,
+    MIN_USABLE_QUALITY,
+    analyze_and_enhance,
+    analyze_image_bytes,
+    brightness_score,
+    color_palette,
+    enhance_image_bytes,
+    get_analysis_executor,
+    perceptual_hash,
+    quality_value,
+    sharpness_score,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -131,6 +144,9 @@ class AssetManagementService:
         self.temp_dir = Path(tempfile.gettempdir()) / "viral_os_assets"
         self.temp_dir.mkdir(exist_ok=True)
         
+        # Downloads, analyses and processed renditions are shared by content
+        self.asset_store = get_asset_store()
+        
         # Asset storage configuration
         self.storage_config = {
             "local_storage": str(self.temp_dir),
@@ -172,32 +188,45 @@ class AssetManagementService:
             "max_brightness": 0.8
         }
     
-    async def extract_product_assets(self, product: Product) -> List[AssetMetadata]:
+    def _create_download_session(self) -> aiohttp.ClientSession:
+        """HTTP session shared by all downloads of a batch"""
+        return aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=30),
+            connector=aiohttp.TCPConnector(limit=32, limit_per_host=8)
+        )
+    
+    async def _run_cpu_bound(self, func, *args):
+        """Run CPU-bound image work in the shared analysis pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_analysis_executor(), func, *args)
+    
+    async def extract_product_assets(
+        self,
+        product: Product,
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> List[AssetMetadata]:
         """Extract and process assets from product data"""
         
+        if session is None:
+            async with self._create_download_session() as own_session:
+                return await self.extract_product_assets(product, own_session)
+        
         logger.info(f"Extracting assets for product: {product.name}")
         
-        assets = []
-        
-        # Extract product images
-        if product.images:
-            for i, image_url in enumerate(product.images):
-                try:
-                    asset = await self._process_product_image(image_url, product, i)
-                    if asset:
-                        assets.append(asset)
-                except Exception as e:
-                    logger.error(f"Failed to process product image {image_url}: {e}")
-        
-        # Extract images from product description/content
-        description_images = await self._extract_images_from_description(product.description or "")
-        for image_url in description_images:
+        # Product images first, then images found in the description
+        image_urls = list(product.images or [])
+        image_urls += await self._extract_images_from_description(product.description or "")
+        
+        async def process(index: int, image_url: str) -> Optional[AssetMetadata]:
             try:
-                asset = await self._process_product_image(image_url, product, len(assets))
-                if asset:
-                    assets.append(asset)
+                return await self._process_product_image(image_url, product, index, session)
             except Exception as e:
-                logger.error(f"Failed to process description image {image_url}: {e}")
+                logger.error(f"Failed to process product image {image_url}: {e}")
+                return None
+        
+        # Downloads overlap; analysis runs in the process pool
+        results = await asyncio.gather(*[process(i, url) for i, url in enumerate(image_urls)])
+        assets = [asset for asset in results if asset]
         
         # Rank assets by quality
         assets = await self._rank_assets_by_quality(assets)
@@ -206,37 +235,85 @@ class AssetManagementService:
         
         return assets
     
-    async def _process_product_image(self, image_url: str, product: Product, index: int) -> Optional[AssetMetadata]:
+    async def extract_product_assets_batch(
+        self,
+        products: List[Product],
+        max_concurrent_products: int = 8
+    ) -> Dict[str, List[AssetMetadata]]:
+        """
+        Extract assets for many products over one shared HTTP session
+        
+        Args:
+            products: Products to process
+            max_concurrent_products: Products processed at the same time
+            
+        Returns:
+            Mapping of product ID to its ranked assets
+        """
+        semaphore = asyncio.Semaphore(max_concurrent_products)
+        
+        async with self._create_download_session() as session:
+            async def process(product: Product) -> List[AssetMetadata]:
+                async with semaphore:
+                    try:
+                        return await self.extract_product_assets(product, session)
+                    except Exception as e:
+                        logger.error(f"Failed to extract assets for product {product.id}: {e}")
+                        return []
+            
+            results = await asyncio.gather(*[process(product) for product in products])
+        
+        return {str(product.id): assets for product, assets in zip(products, results)}
+    
+    async def _process_product_image(
+        self,
+        image_url: str,
+        product: Product,
+        index: int,
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> Optional[AssetMetadata]:
         """Process a single product image"""
         
-        # Download and analyze image
-        image_data = await self._download_asset(image_url)
-        if not image_data:
+        source = await self._fetch_image(image_url, session)
+        if source is None:
             return None
         
-        # Analyze image quality and properties
-        analysis = await self._analyze_image(image_data, image_url)
-        if analysis["quality_score"] == QualityScore.POOR:
+        analysis = await self._get_cached_analysis(source)
+        rendition = await self._get_rendition(source, "product_image") if analysis else None
+        
+        if analysis is None:
+            # Analyze and enhance in one pool call so the image is shipped and decoded once
+            image_data = await self._read_stored(source)
+            try:
+                raw_analysis, processed_data = await self._run_cpu_bound(
+                    analyze_and_enhance, image_data, self.quality_thresholds
+                )
+            except Exception as e:
+                logger.error(f"Failed to analyze image from {image_url}: {e}")
+                return None
+            
+            analysis = await self._cache_analysis(source, raw_analysis)
+            if processed_data is not None:
+                rendition = await self._store_rendition(source, "product_image", processed_data, ".jpg")
+        
+        if analysis["quality_value"] < MIN_USABLE_QUALITY:
             logger.warning(f"Skipping low-quality image: {image_url}")
             return None
         
-        # Apply basic processing
-        processed_data = await self._apply_basic_processing(image_data, analysis)
-        
-        # Create asset metadata
-        asset_id = f"product_{product.id}_{index}_{uuid.uuid4().hex[:8]}"
+        if rendition is None:
+            # Analysis was cached but the processed copy has been evicted
+            processed_data = await self._apply_basic_processing(await self._read_stored(source), analysis)
+            rendition = await self._store_rendition(source, "product_image", processed_data, ".jpg")
         
-        # Save processed image
-        processed_path = await self._save_processed_asset(processed_data, asset_id, "jpg")
-        processed_url = await self._upload_to_storage(processed_path, asset_id)
+        processed, processed_url = rendition
         
         return AssetMetadata(
-            asset_id=asset_id,
+            asset_id=f"product_{product.id}_{index}_{processed.sha256[:12]}",
             asset_type=AssetType.PRODUCT_IMAGE,
             original_url=image_url,
             processed_url=processed_url,
-            local_path=processed_path,
-            file_size=len(processed_data),
+            local_path=processed.path,
+            file_size=processed.size,
             dimensions=analysis["dimensions"],
             format="jpg",
             quality_score=analysis["quality_score"],
@@ -246,65 +323,154 @@ class AssetManagementService:
             created_at=asyncio.get_event_loop().time()
         )
     
-    async def _download_asset(self, url: str) -> Optional[bytes]:
-        """Download asset from URL"""
+    async def _fetch_image(
+        self,
+        url: str,
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> Optional[StoredAsset]:
+        """
+        Resolve an image URL to stored content
+        
+        Known URLs are served from the store without a request. New downloads are
+        hashed, and a perceptual hash is computed only for content not seen before,
+        so near-duplicates resolve to the image already stored.
+        """
+        stored = await asyncio.to_thread(self.asset_store.lookup_url, url)
+        if stored:
+            return stored
+        
+        image_data = await self._download_asset(url, session)
+        if not image_data:
+            return None
+        
+        sha256 = hashlib.sha256(image_data).hexdigest()
+        stored = await asyncio.to_thread(self.asset_store.lookup_content, sha256)
+        if stored:
+            await asyncio.to_thread(self.asset_store.link_url, url, stored.sha256)
+            return stored
         
         try:
-            timeout = aiohttp.ClientTimeout(total=30)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        content_length = response.headers.get('Content-Length')
-                        if content_length and int(content_length) > self.storage_config["max_file_size"]:
-                            logger.warning(f"Asset too large: {url}")
-                            return None
-                        
-                        data = await response.read()
-                        return data
-                    else:
-                        logger.error(f"Failed to download asset {url}: HTTP {response.status}")
+            phash = await self._run_cpu_bound(perceptual_hash, image_data)
+        except Exception as e:
+            logger.error(f"Failed to decode image from {url}: {e}")
+            return None
+        
+        ext = Path(url.split("?", 1)[0]).suffix.lower()
+        if ext not in self.storage_config["supported_formats"]["images"]:
+            ext = ".img"
+        
+        return await asyncio.to_thread(
+            self.asset_store.put_bytes, image_data, ext, url, phash, sha256
+        )
+    
+    async def _read_stored(self, stored: StoredAsset) -> bytes:
+        async with aiofiles.open(stored.path, 'rb') as f:
+            return await f.read()
+    
+    async def _get_cached_analysis(self, source: StoredAsset) -> Optional[Dict[str, Any]]:
+        """Cached image analysis for stored content, with its quality score"""
+        cached = await asyncio.to_thread(self.asset_store.get_analysis, source.sha256, "image")
+        if cached is None:
+            return None
+        
+        cached["dimensions"] = tuple(cached["dimensions"])
+        return self._with_quality_score(cached)
+    
+    async def _cache_analysis(self, source: StoredAsset, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Cache a successful analysis and return it with its quality score"""
+        if "quality_value" in analysis:
+            payload = {key: value for key, value in analysis.items() if key != "quality_score"}
+            await asyncio.to_thread(self.asset_store.put_analysis, source.sha256, "image", payload)
+        return self._with_quality_score(dict(analysis))
+    
+    async def _get_rendition(self, source: StoredAsset, name: str) -> Optional[Tuple[StoredAsset, str]]:
+        """Previously processed copy of ``source`` and its uploaded URL"""
+        cached = await asyncio.to_thread(self.asset_store.get_analysis, source.sha256, f"rendition:{name}")
+        if cached is None:
+            return None
+        
+        processed = await asyncio.to_thread(self.asset_store.lookup_content, cached["sha256"])
+        return (processed, cached["processed_url"]) if processed else None
+    
+    async def _store_rendition(
+        self,
+        source: StoredAsset,
+        name: str,
+        processed_data: bytes,
+        ext: str
+    ) -> Tuple[StoredAsset, str]:
+        """Store and upload a processed copy of ``source``, once per distinct content"""
+        processed = await asyncio.to_thread(self.asset_store.put_bytes, processed_data, ext)
+        processed_url = await self._upload_to_storage(processed.path, processed.sha256)
+        
+        await asyncio.to_thread(
+            self.asset_store.put_analysis,
+            source.sha256,
+            f"rendition:{name}",
+            {"sha256": processed.sha256, "processed_url": processed_url}
+        )
+        return processed, processed_url
+    
+    async def _download_asset(self, url: str, session: Optional[aiohttp.ClientSession] = None) -> Optional[bytes]:
+        """Download asset from URL, reusing ``session`` when given"""
+        
+        if session is None:
+            async with self._create_download_session() as own_session:
+                return await self._download_asset(url, own_session)
+        
+        max_file_size = self.storage_config["max_file_size"]
+        
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    logger.error(f"Failed to download asset {url}: HTTP {response.status}")
+                    return None
+                
+                content_length = response.headers.get('Content-Length')
+                if content_length and int(content_length) > max_file_size:
+                    logger.warning(f"Asset too large: {url}")
+                    return None
+                
+                # Enforce the limit while reading, since Content-Length may be absent
+                chunks = []
+                received = 0
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    received += len(chunk)
+                    if received > max_file_size:
+                        logger.warning(f"Asset too large: {url}")
                         return None
+                    chunks.append(chunk)
+                
+                return b"".join(chunks)
         
         except Exception as e:
             logger.error(f"Error downloading asset {url}: {e}")
             return None
     
+    @staticmethod
+    def _score_to_quality(score: float) -> QualityScore:
+        """Map an average quality factor score to a QualityScore"""
+        if score >= 0.8:
+            return QualityScore.PERFECT
+        elif score >= 0.7:
+            return QualityScore.EXCELLENT
+        elif score >= 0.5:
+            return QualityScore.GOOD
+        elif score >= 0.3:
+            return QualityScore.FAIR
+        else:
+            return QualityScore.POOR
+    
+    def _with_quality_score(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        analysis["quality_score"] = self._score_to_quality(analysis.get("quality_value", 0.0))
+        return analysis
+    
     async def _analyze_image(self, image_data: bytes, url: str) -> Dict[str, Any]:
         """Analyze image quality and properties"""
         
         try:
-            # Open image with PIL
-            image = Image.open(BytesIO(image_data))
-            
-            # Basic properties
-            width, height = image.size
-            format_type = image.format or "unknown"
-            has_transparency = image.mode in ("RGBA", "LA") or "transparency" in image.info
-            
-            # Convert to RGB for analysis
-            if image.mode != "RGB":
-                rgb_image = image.convert("RGB")
-            else:
-                rgb_image = image
-            
-            # Quality assessment
-            quality_score = await self._assess_image_quality(rgb_image, image_data)
-            
-            # Color palette extraction
-            color_palette = await self._extract_color_palette(rgb_image)
-            
-            # Additional properties
-            file_size = len(image_data)
-            
-            return {
-                "dimensions": (width, height),
-                "format": format_type.lower(),
-                "file_size": file_size,
-                "has_transparency": has_transparency,
-                "quality_score": quality_score,
-                "color_palette": color_palette,
-                "aspect_ratio": width / height if height > 0 else 1.0
-            }
+            analysis = await self._run_cpu_bound(analyze_image_bytes, image_data, self.quality_thresholds)
+            return self._with_quality_score(analysis)
             
         except Exception as e:
             logger.error(f"Failed to analyze image from {url}: {e}")
@@ -318,70 +484,33 @@ class AssetManagementService:
                 "aspect_ratio": 1.0
             }
     
+    def _reduced_array(self, image: Image.Image) -> np.ndarray:
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        if max(image.size) > ANALYSIS_MAX_DIMENSION:
+            image = image.copy()
+            image.thumbnail((ANALYSIS_MAX_DIMENSION, ANALYSIS_MAX_DIMENSION), Image.Resampling.BILINEAR)
+        return np.asarray(image)
+    
     async def _assess_image_quality(self, image: Image.Image, image_data: bytes) -> QualityScore:
         """Assess image quality using multiple metrics"""
         
-        width, height = image.size
-        file_size = len(image_data)
-        
-        score_factors = []
-        
-        # Resolution check
-        min_width, min_height = self.quality_thresholds["min_resolution"]
-        if width >= min_width and height >= min_height:
-            resolution_score = min(1.0, (width * height) / (1920 * 1080))  # Normalize to 1080p
-            score_factors.append(resolution_score)
-        else:
-            score_factors.append(0.3)  # Low score for small images
-        
-        # File size check
-        if file_size >= self.quality_thresholds["min_file_size"]:
-            size_score = min(1.0, file_size / (500 * 1024))  # Normalize to 500KB
-            score_factors.append(size_score)
-        else:
-            score_factors.append(0.2)
-        
-        # Brightness analysis
-        brightness_score = await self._analyze_brightness(image)
-        score_factors.append(brightness_score)
-        
-        # Sharpness analysis
-        sharpness_score = await self._analyze_sharpness(image)
-        score_factors.append(sharpness_score)
-        
-        # Calculate overall score
-        average_score = sum(score_factors) / len(score_factors)
-        
-        if average_score >= 0.8:
-            return QualityScore.PERFECT
-        elif average_score >= 0.7:
-            return QualityScore.EXCELLENT
-        elif average_score >= 0.5:
-            return QualityScore.GOOD
-        elif average_score >= 0.3:
-            return QualityScore.FAIR
-        else:
-            return QualityScore.POOR
+        brightness = await self._analyze_brightness(image)
+        sharpness = await self._analyze_sharpness(image)
+        return self._score_to_quality(
+            quality_value(image.size, len(image_data), brightness, sharpness, self.quality_thresholds)
+        )
     
     async def _analyze_brightness(self, image: Image.Image) -> float:
         """Analyze image brightness"""
         
         try:
-            # Convert to grayscale and calculate mean brightness
-            grayscale = image.convert("L")
-            pixel_values = list(grayscale.getdata())
-            mean_brightness = sum(pixel_values) / len(pixel_values) / 255.0
-            
-            # Score based on optimal brightness range
-            min_brightness = self.quality_thresholds["min_brightness"]
-            max_brightness = self.quality_thresholds["max_brightness"]
-            
-            if min_brightness <= mean_brightness <= max_brightness:
-                return 1.0
-            elif mean_brightness < min_brightness:
-                return mean_brightness / min_brightness
-            else:  # Too bright
-                return max_brightness / mean_brightness
+            gray = cv2.cvtColor(self._reduced_array(image), cv2.COLOR_RGB2GRAY)
+            return brightness_score(
+                gray,
+                self.quality_thresholds["min_brightness"],
+                self.quality_thresholds["max_brightness"]
+            )
                 
         except Exception as e:
             logger.error(f"Failed to analyze brightness: {e}")
@@ -391,23 +520,8 @@ class AssetManagementService:
         """Analyze image sharpness using Laplacian variance"""
         
         try:
-            # Convert PIL image to OpenCV format
-            image_array = np.array(image)
-            
-            # Convert to grayscale
-            if len(image_array.shape) == 3:
-                gray = cv2.cvtColor(image_array, cv2.COLOR_RGB2GRAY)
-            else:
-                gray = image_array
-            
-            # Calculate Laplacian variance
-            laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
-            
-            # Normalize sharpness score
-            # Values typically range from 0-500+, normalize to 0-1
-            normalized_score = min(1.0, laplacian_var / 100.0)
-            
-            return normalized_score
+            gray = cv2.cvtColor(self._reduced_array(image), cv2.COLOR_RGB2GRAY)
+            return sharpness_score(gray)
             
         except Exception as e:
             logger.error(f"Failed to analyze sharpness: {e}")
@@ -417,21 +531,7 @@ class AssetManagementService:
         """Extract dominant colors from image"""
         
         try:
-            # Resize image for faster processing
-            small_image = image.resize((150, 150))
-            
-            # Get colors using quantization
-            quantized = small_image.quantize(colors=8)
-            palette = quantized.getpalette()
-            
-            # Convert palette to hex colors
-            colors = []
-            for i in range(0, len(palette), 3):
-                r, g, b = palette[i:i+3]
-                hex_color = f"#{r:02x}{g:02x}{b:02x}"
-                colors.append(hex_color)
-            
-            return colors[:5]  # Return top 5 colors
+            return color_palette(self._reduced_array(image))
             
         except Exception as e:
             logger.error(f"Failed to extract color palette: {e}")
@@ -441,42 +541,9 @@ class AssetManagementService:
         """Apply basic image processing improvements"""
         
         try:
-            image = Image.open(BytesIO(image_data))
-            
-            # Convert to RGB if needed
-            if image.mode != "RGB":
-                image = image.convert("RGB")
-            
-            # Apply brightness/contrast correction if needed
-            brightness_score = analysis.get("brightness_score", 0.5)
-            if brightness_score < 0.5:
-                # Increase brightness
-                enhancer = ImageEnhance.Brightness(image)
-                image = enhancer.enhance(1.2)
-            
-            # Apply slight sharpening
-            image = image.filter(ImageFilter.UnsharpMask(radius=1, percent=120, threshold=3))
-            
-            # Ensure minimum resolution for video use
-            width, height = image.size
-            min_width, min_height = 1280, 720  # Minimum for video
-            
-            if width < min_width or height < min_height:
-                # Calculate new size maintaining aspect ratio
-                aspect_ratio = width / height
-                if aspect_ratio > min_width / min_height:
-                    new_width = min_width
-                    new_height = int(min_width / aspect_ratio)
-                else:
-                    new_height = min_height
-                    new_width = int(min_height * aspect_ratio)
-                
-                image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Save to bytes
-            output = BytesIO()
-            image.save(output, format="JPEG", quality=90, optimize=True)
-            return output.getvalue()
+            return await self._run_cpu_bound(
+                enhance_image_bytes, image_data, analysis.get("brightness_score", 0.5)
+            )
             
         except Exception as e:
             logger.error(f"Failed to process image: {e}")
@@ -693,8 +760,6 @@ class AssetManagementService:
         """Create asset metadata from stock provider response"""
         
         try:
-            asset_id = f"{provider}_{item_data.get('id', uuid.uuid4().hex)}"
-            
             # Extract URL based on provider
             if provider == "unsplash":
                 url = item_data["urls"]["regular"]
@@ -719,6 +784,8 @@ class AssetManagementService:
             if not url:
                 return None
             
+            asset_id = f"{provider}_{item_data.get('id') or hashlib.sha256(url.encode()).hexdigest()[:16]}"
+            
             # Estimate quality based on resolution
             total_pixels = width * height
             if total_pixels >= 1920 * 1080:
@@ -728,17 +795,23 @@ class AssetManagementService:
             else:
                 quality = QualityScore.FAIR
             
+            # Assets already fetched for an earlier video come with their analysis
+            stored = await asyncio.to_thread(self.asset_store.lookup_url, url)
+            analysis = await self._get_cached_analysis(stored) if stored else None
+            if analysis:
+                quality = analysis["quality_score"]
+            
             return AssetMetadata(
                 asset_id=asset_id,
                 asset_type=asset_type,
                 original_url=url,
                 processed_url=None,
-                local_path=None,
-                file_size=0,  # Unknown for stock assets
+                local_path=stored.path if stored else None,
+                file_size=stored.size if stored else 0,  # Unknown until fetched
                 dimensions=(width, height),
                 format="jpg" if asset_type == AssetType.STOCK_PHOTO else "mp4",
                 quality_score=quality,
-                color_palette=[],
+                color_palette=analysis["color_palette"] if analysis else [],
                 has_transparency=False,
                 processing_applied=[],
                 created_at=asyncio.get_event_loop().time()
@@ -785,30 +858,34 @@ class AssetManagementService:
         """Process brand logo for video use"""
         
         # Download logo
-        logo_data = await self._download_asset(logo_url)
-        if not logo_data:
+        source = await self._fetch_image(logo_url)
+        if source is None:
             return None
         
+        logo_data = None
+        
         # Analyze logo
-        analysis = await self._analyze_image(logo_data, logo_url)
+        analysis = await self._get_cached_analysis(source)
+        if analysis is None:
+            logo_data = await self._read_stored(source)
+            analysis = await self._cache_analysis(source, await self._analyze_image(logo_data, logo_url))
         
         # Process logo for video overlay use
-        processed_data = await self._process_logo_for_overlay(logo_data, analysis)
-        
-        # Create asset metadata
-        asset_id = f"brand_logo_{brand.id}_{uuid.uuid4().hex[:8]}"
+        rendition = await self._get_rendition(source, "logo_overlay")
+        if rendition is None:
+            logo_data = logo_data or await self._read_stored(source)
+            processed_data = await self._process_logo_for_overlay(logo_data, analysis)
+            rendition = await self._store_rendition(source, "logo_overlay", processed_data, ".png")
         
-        # Save processed logo
-        processed_path = await self._save_processed_asset(processed_data, asset_id, "png")
-        processed_url = await self._upload_to_storage(processed_path, asset_id)
+        processed, processed_url = rendition
         
         return AssetMetadata(
-            asset_id=asset_id,
+            asset_id=f"brand_logo_{brand.id}_{processed.sha256[:12]}",
             asset_type=AssetType.LOGO,
             original_url=logo_url,
             processed_url=processed_url,
-            local_path=processed_path,
-            file_size=len(processed_data),
+            local_path=processed.path,
+            file_size=processed.size,
             dimensions=analysis["dimensions"],
             format="png",
             quality_score=analysis["quality_score"],
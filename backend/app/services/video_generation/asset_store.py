@@ -0,0 +1,475 @@
+"""
+Content-addressed asset store
+
+Downloaded and processed assets are kept once on local disk under their
+SHA-256 digest. A SQLite index maps source URLs to content, content to a
+64-bit perceptual hash and to cached analysis results, so a repeated URL is
+served from disk and a known image is never analyzed twice.
+
+Images whose perceptual hashes differ in at most ``phash_max_distance`` bits
+are treated as the same picture: the later copy is recorded as an alias of the
+stored one and shares its analysis and processed renditions. Hashes are split
+into eight 8-bit bands and candidates are looked up by band, which by the
+pigeonhole principle finds every match within 7 bits without a full scan.
+
+The store is bounded by total size; when it grows past ``max_bytes`` the least
+recently used blobs are evicted together with their index entries.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.core.metrics import record_asset_evictions, record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+
+PHASH_BANDS = 8
+PHASH_BAND_BITS = 64 // PHASH_BANDS
+MAX_PHASH_DISTANCE = PHASH_BANDS - 1  # Largest distance the band index always finds
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs (last_access);
+
+CREATE TABLE IF NOT EXISTS aliases (
+    sha256 TEXT PRIMARY KEY,
+    canonical TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_aliases_canonical ON aliases (canonical);
+
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_urls_sha256 ON urls (sha256);
+
+CREATE TABLE IF NOT EXISTS analysis (
+    sha256 TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (sha256, kind)
+);
+
+CREATE TABLE IF NOT EXISTS phashes (
+    sha256 TEXT PRIMARY KEY,
+    phash INTEGER NOT NULL,
+    {band_columns}
+);
+{band_indexes}
+""".format(
+    band_columns=",\n    ".join(f"b{i} INTEGER NOT NULL" for i in range(PHASH_BANDS)),
+    band_indexes="\n".join(
+        f"CREATE INDEX IF NOT EXISTS idx_phashes_b{i} ON phashes (b{i});" for i in range(PHASH_BANDS)
+    )
+)
+
+
+def _phash_bands(phash: int) -> List[int]:
+    mask = (1 << PHASH_BAND_BITS) - 1
+    return [(phash >> (i * PHASH_BAND_BITS)) & mask for i in range(PHASH_BANDS)]
+
+
+def _to_signed(phash: int) -> int:
+    """SQLite integers are signed 64-bit"""
+    return phash - (1 << 64) if phash >= 1 << 63 else phash
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin((a ^ b) & ((1 << 64) - 1)).count("1")
+
+
+@dataclass
+class StoredAsset:
+    """A blob in the store"""
+    sha256: str
+    path: str
+    size: int
+    ext: str
+    near_duplicate: bool = False  # Resolved to a perceptually similar stored image
+
+
+class AssetStore:
+    """Local content-addressed blob store with URL, perceptual-hash and analysis indexes"""
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        max_bytes: int,
+        url_ttl: float = 7 * 86400,
+        phash_max_distance: int = 6,
+        eviction_grace: float = 3600
+    ):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root / "index.db"
+
+        self.max_bytes = max_bytes
+        self.url_ttl = url_ttl
+        self.phash_max_distance = min(phash_max_distance, MAX_PHASH_DISTANCE)
+        # Blobs used this recently are never evicted; their paths may be in use by a render
+        self.eviction_grace = eviction_grace
+
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "url_hits": 0, "url_misses": 0,
+            "content_hits": 0, "content_misses": 0,
+            "similar_hits": 0, "similar_misses": 0,
+            "analysis_hits": 0, "analysis_misses": 0,
+            "blobs_written": 0, "evictions": 0
+        }
+
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _record(self, lookup: str, hit: bool):
+        with self._stats_lock:
+            self.stats[f"{lookup}_{'hits' if hit else 'misses'}"] += 1
+        record_cache_lookup(f"asset_{lookup}", hit)
+
+    def _blob_path(self, sha256: str, ext: str) -> Path:
+        return self.blob_dir / sha256[:2] / f"{sha256}{ext}"
+
+    def _resolve(self, conn: sqlite3.Connection, sha256: str, touch: bool = True) -> Optional[StoredAsset]:
+        """Follow an alias to its stored blob, dropping index rows whose file has gone"""
+        alias = conn.execute("SELECT canonical FROM aliases WHERE sha256 = ?", (sha256,)).fetchone()
+        canonical = alias["canonical"] if alias else sha256
+
+        row = conn.execute("SELECT ext, size FROM blobs WHERE sha256 = ?", (canonical,)).fetchone()
+        if row is None:
+            return None
+
+        path = self._blob_path(canonical, row["ext"])
+        if not path.exists():
+            self._forget(conn, canonical)
+            return None
+
+        if touch:
+            conn.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (time.time(), canonical))
+
+        return StoredAsset(
+            sha256=canonical,
+            path=str(path),
+            size=row["size"],
+            ext=row["ext"],
+            near_duplicate=alias is not None
+        )
+
+    def _forget(self, conn: sqlite3.Connection, sha256: str):
+        conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+        conn.execute("DELETE FROM phashes WHERE sha256 = ?", (sha256,))
+        conn.execute("DELETE FROM urls WHERE sha256 = ?", (sha256,))
+        conn.execute("DELETE FROM analysis WHERE sha256 = ?", (sha256,))
+        conn.execute("DELETE FROM aliases WHERE canonical = ?", (sha256,))
+
+    def _link_url(self, conn: sqlite3.Connection, url: Optional[str], sha256: str):
+        if url:
+            conn.execute(
+                "INSERT OR REPLACE INTO urls (url, sha256, fetched_at) VALUES (?, ?, ?)",
+                (url, sha256, time.time())
+            )
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def lookup_url(self, url: str) -> Optional[StoredAsset]:
+        """Stored content last fetched from ``url``, if still fresh"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT sha256 FROM urls WHERE url = ? AND fetched_at >= ?",
+                (url, time.time() - self.url_ttl)
+            ).fetchone()
+            asset = self._resolve(conn, row["sha256"]) if row else None
+        finally:
+            conn.close()
+
+        self._record("url", asset is not None)
+        return asset
+
+    def lookup_content(self, sha256: str) -> Optional[StoredAsset]:
+        """Stored blob for a content digest, following near-duplicate aliases"""
+        conn = self._connect()
+        try:
+            asset = self._resolve(conn, sha256)
+        finally:
+            conn.close()
+
+        self._record("content", asset is not None)
+        return asset
+
+    def _find_similar(self, conn: sqlite3.Connection, phash: int) -> Optional[str]:
+        bands = _phash_bands(phash)
+        where = " OR ".join(f"b{i} = ?" for i in range(PHASH_BANDS))
+        rows = conn.execute(f"SELECT sha256, phash FROM phashes WHERE {where}", bands).fetchall()
+
+        best: Optional[Tuple[int, str]] = None
+        for row in rows:
+            distance = hamming_distance(phash, row["phash"])
+            if distance <= self.phash_max_distance and (best is None or distance < best[0]):
+                best = (distance, row["sha256"])
+        return best[1] if best else None
+
+    def find_similar(self, phash: int) -> Optional[StoredAsset]:
+        """Closest stored image within ``phash_max_distance`` bits of ``phash``"""
+        conn = self._connect()
+        try:
+            match = self._find_similar(conn, phash)
+            asset = self._resolve(conn, match) if match else None
+        finally:
+            conn.close()
+
+        self._record("similar", asset is not None)
+        return asset
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def link_url(self, url: str, sha256: str):
+        """Record that ``url`` served already-stored content"""
+        conn = self._connect()
+        try:
+            self._link_url(conn, url, sha256)
+        finally:
+            conn.close()
+
+    def put_bytes(
+        self,
+        data: bytes,
+        ext: str,
+        url: Optional[str] = None,
+        phash: Optional[int] = None,
+        sha256: Optional[str] = None
+    ) -> StoredAsset:
+        """
+        Store ``data`` unless it, or a perceptual near-duplicate, is already stored
+
+        Args:
+            data: Blob content
+            ext: File extension including the dot
+            url: Source URL to map to the stored content
+            phash: Perceptual hash for images; enables near-duplicate matching
+            sha256: Digest of ``data`` if already computed
+
+        Returns:
+            The stored asset, which for a near-duplicate is the earlier image
+        """
+        sha256 = sha256 or hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha256, ext)
+
+        def write_blob():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+        return self._put(sha256, ext, len(data), write_blob, url, phash)
+
+    def put_file(self, file_path: Union[str, Path], sha256: str, ext: str, url: Optional[str] = None) -> StoredAsset:
+        """Move a completed download into the store; the file is removed if already stored"""
+        file_path = Path(file_path)
+        path = self._blob_path(sha256, ext)
+
+        def move_blob():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(file_path), str(path))
+
+        try:
+            return self._put(sha256, ext, file_path.stat().st_size, move_blob, url, None)
+        finally:
+            if file_path.exists():
+                file_path.unlink()
+
+    def _put(self, sha256: str, ext: str, size: int, write_blob, url: Optional[str], phash: Optional[int]) -> StoredAsset:
+        conn = self._connect()
+        try:
+            existing = self._resolve(conn, sha256)
+            if existing is None and phash is not None:
+                match = self._find_similar(conn, phash)
+                if match:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO aliases (sha256, canonical) VALUES (?, ?)",
+                        (sha256, match)
+                    )
+                    existing = self._resolve(conn, sha256)
+
+            if existing is not None:
+                self._link_url(conn, url, existing.sha256)
+                return existing
+
+            write_blob()
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO blobs (sha256, ext, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (sha256, ext, size, now, now)
+                )
+                if phash is not None:
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO phashes VALUES ({', '.join('?' * (PHASH_BANDS + 2))})",
+                        (sha256, _to_signed(phash), *_phash_bands(phash))
+                    )
+                self._link_url(conn, url, sha256)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            with self._stats_lock:
+                self.stats["blobs_written"] += 1
+            self._evict(conn)
+
+            return StoredAsset(sha256=sha256, path=str(self._blob_path(sha256, ext)), size=size, ext=ext)
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Analysis cache
+    # ------------------------------------------------------------------
+
+    def get_analysis(self, sha256: str, kind: str) -> Optional[Dict[str, Any]]:
+        """Cached ``kind`` result for stored content"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT payload FROM analysis WHERE sha256 = ? AND kind = ?", (sha256, kind)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        self._record("analysis", row is not None)
+        return json.loads(row["payload"]) if row else None
+
+    def put_analysis(self, sha256: str, kind: str, payload: Dict[str, Any]):
+        """Cache a JSON-serializable ``kind`` result for stored content"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis (sha256, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+                (sha256, kind, json.dumps(payload), time.time())
+            )
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        candidates = conn.execute(
+            "SELECT sha256, ext, size FROM blobs WHERE last_access < ? ORDER BY last_access",
+            (time.time() - self.eviction_grace,)
+        ).fetchall()
+
+        for row in candidates:
+            if total <= self.max_bytes:
+                break
+            self._forget(conn, row["sha256"])
+            try:
+                self._blob_path(row["sha256"], row["ext"]).unlink()
+            except FileNotFoundError:
+                pass
+            total -= row["size"]
+            evicted += 1
+
+        if evicted:
+            with self._stats_lock:
+                self.stats["evictions"] += evicted
+            record_asset_evictions(evicted)
+            logger.info(f"Evicted {evicted} assets from store, {total / (1024 * 1024):.1f}MB remaining")
+
+        return evicted
+
+    def evict(self) -> int:
+        """Evict least recently used blobs until the store fits ``max_bytes``"""
+        conn = self._connect()
+        try:
+            return self._evict(conn)
+        finally:
+            conn.close()
+
+    def owns(self, path: Union[str, Path]) -> bool:
+        """Whether ``path`` is a blob of this store (and must not be deleted by callers)"""
+        try:
+            return Path(path).resolve().is_relative_to(self.blob_dir.resolve())
+        except (OSError, ValueError):
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Lookup counters, hit rates and store size"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            aliases = conn.execute("SELECT COUNT(*) FROM aliases").fetchone()[0]
+        finally:
+            conn.close()
+
+        with self._stats_lock:
+            stats: Dict[str, Any] = dict(self.stats)
+
+        for lookup in ("url", "content", "similar", "analysis"):
+            total = stats[f"{lookup}_hits"] + stats[f"{lookup}_misses"]
+            stats[f"{lookup}_hit_rate"] = stats[f"{lookup}_hits"] / total if total else 0.0
+
+        stats.update(
+            blobs=row[0],
+            total_bytes=row[1],
+            max_bytes=self.max_bytes,
+            near_duplicate_aliases=aliases
+        )
+        return stats
+
+
+# Global store instance
+_asset_store: Optional[AssetStore] = None
+
+
+def get_asset_store() -> AssetStore:
+    """Get global asset store instance"""
+    global _asset_store
+    if _asset_store is None:
+        _asset_store = AssetStore(
+            settings.ASSET_STORE_DIR,
+            max_bytes=settings.ASSET_STORE_MAX_SIZE_MB * 1024 * 1024,
+            url_ttl=settings.ASSET_STORE_URL_TTL,
+            phash_max_distance=settings.ASSET_PHASH_MAX_DISTANCE
+        )
+    return _asset_store
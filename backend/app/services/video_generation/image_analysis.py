@@ -0,0 +1,208 @@
+"""
+Vectorized image analysis for asset management
+
+CPU-bound helpers used by AssetManagementService. Images are decoded at
+reduced size (JPEG draft mode decodes directly at 1/2, 1/4 or 1/8 scale) and
+brightness, sharpness and palette are computed with NumPy/OpenCV on the
+downsampled array. All entry points are top-level functions taking and
+returning plain data so they can run in a process pool.
+"""
+
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter
+
+from app.core.config import settings
+
+
+ANALYSIS_MAX_DIMENSION = 512  # Longest side used for quality metrics
+PALETTE_BITS = 4  # Per-channel precision of palette histogram bins
+MIN_VIDEO_RESOLUTION = (1280, 720)
+MIN_USABLE_QUALITY = 0.3  # Images scoring below this are not enhanced or used
+PHASH_SIZE = 32  # Side of the grayscale image the DCT hash is computed on
+
+
+def open_reduced(image_data: bytes, max_dimension: int = ANALYSIS_MAX_DIMENSION) -> Tuple[Image.Image, Dict[str, Any]]:
+    """Decode an image at reduced size, returning it as RGB plus original properties"""
+    image = Image.open(BytesIO(image_data))
+    info = {
+        "dimensions": image.size,
+        "format": (image.format or "unknown").lower(),
+        "has_transparency": image.mode in ("RGBA", "LA") or "transparency" in image.info
+    }
+
+    # Only JPEG supports draft mode; other formats are decoded fully and then reduced
+    image.draft("RGB", (max_dimension, max_dimension))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.BILINEAR)
+
+    return image, info
+
+
+def brightness_score(gray: np.ndarray, min_brightness: float, max_brightness: float) -> float:
+    """Score mean brightness against the optimal range"""
+    mean_brightness = float(gray.mean()) / 255.0
+
+    if min_brightness <= mean_brightness <= max_brightness:
+        return 1.0
+    elif mean_brightness < min_brightness:
+        return mean_brightness / min_brightness
+    else:  # Too bright
+        return max_brightness / mean_brightness
+
+
+def sharpness_score(gray: np.ndarray) -> float:
+    """Score sharpness by Laplacian variance, normalized to 0-1"""
+    laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
+    return min(1.0, laplacian_var / 100.0)
+
+
+def color_palette(rgb: np.ndarray, colors: int = 5) -> List[str]:
+    """Most frequent colors, as the mean color of the busiest histogram bins"""
+    pixels = rgb.reshape(-1, 3)
+    shift = 8 - PALETTE_BITS
+    binned = (pixels >> shift).astype(np.int32)
+    keys = (binned[:, 0] << (2 * PALETTE_BITS)) | (binned[:, 1] << PALETTE_BITS) | binned[:, 2]
+
+    bin_count = 1 << (3 * PALETTE_BITS)
+    counts = np.bincount(keys, minlength=bin_count)
+    top = np.argsort(counts)[::-1][:colors]
+    top = top[counts[top] > 0]
+
+    means = np.stack([
+        np.bincount(keys, weights=pixels[:, channel], minlength=bin_count)[top]
+        for channel in range(3)
+    ], axis=1) / counts[top, None]
+
+    return [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in np.rint(means).astype(int)]
+
+
+def quality_value(
+    dimensions: Tuple[int, int],
+    file_size: int,
+    brightness: float,
+    sharpness: float,
+    thresholds: Dict[str, Any]
+) -> float:
+    """Average of resolution, file size, brightness and sharpness scores"""
+    width, height = dimensions
+
+    min_width, min_height = thresholds["min_resolution"]
+    if width >= min_width and height >= min_height:
+        resolution = min(1.0, (width * height) / (1920 * 1080))  # Normalize to 1080p
+    else:
+        resolution = 0.3  # Low score for small images
+
+    if file_size >= thresholds["min_file_size"]:
+        size = min(1.0, file_size / (500 * 1024))  # Normalize to 500KB
+    else:
+        size = 0.2
+
+    return (resolution + size + brightness + sharpness) / 4
+
+
+def perceptual_hash(image_data: bytes) -> int:
+    """
+    64-bit DCT perceptual hash
+
+    Each bit says whether one of the 8x8 lowest DCT frequencies of a 32x32
+    grayscale copy is above their median, so re-encoded, resized or lightly
+    edited copies of an image differ in only a few bits.
+    """
+    image, _ = open_reduced(image_data, max_dimension=PHASH_SIZE * 2)
+    gray = image.convert("L").resize((PHASH_SIZE, PHASH_SIZE), Image.Resampling.LANCZOS)
+    low = cv2.dct(np.asarray(gray, dtype=np.float32))[:8, :8].flatten()
+
+    # The DC term only reflects overall brightness, so it is left out of the median
+    bits = low > np.median(low[1:])
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def analyze_image_bytes(image_data: bytes, thresholds: Dict[str, Any]) -> Dict[str, Any]:
+    """Full analysis of an encoded image on a downsampled copy"""
+    image, info = open_reduced(image_data)
+    rgb = np.asarray(image)
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+
+    brightness = brightness_score(gray, thresholds["min_brightness"], thresholds["max_brightness"])
+    sharpness = sharpness_score(gray)
+    width, height = info["dimensions"]
+
+    return {
+        **info,
+        "file_size": len(image_data),
+        "brightness_score": brightness,
+        "sharpness_score": sharpness,
+        "quality_value": quality_value(info["dimensions"], len(image_data), brightness, sharpness, thresholds),
+        "color_palette": color_palette(rgb),
+        "aspect_ratio": width / height if height > 0 else 1.0
+    }
+
+
+def enhance_image_bytes(image_data: bytes, brightness: float) -> bytes:
+    """Brightness fix, light sharpening and upscaling to video resolution, as JPEG"""
+    image = Image.open(BytesIO(image_data))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    if brightness < 0.5:
+        image = ImageEnhance.Brightness(image).enhance(1.2)
+
+    image = image.filter(ImageFilter.UnsharpMask(radius=1, percent=120, threshold=3))
+
+    # Ensure minimum resolution for video use
+    width, height = image.size
+    min_width, min_height = MIN_VIDEO_RESOLUTION
+    if width < min_width or height < min_height:
+        aspect_ratio = width / height
+        if aspect_ratio > min_width / min_height:
+            new_size = (min_width, int(min_width / aspect_ratio))
+        else:
+            new_size = (int(min_height * aspect_ratio), min_height)
+        image = image.resize(new_size, Image.Resampling.LANCZOS)
+
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=90, optimize=True)
+    return output.getvalue()
+
+
+def analyze_and_enhance(
+    image_data: bytes,
+    thresholds: Dict[str, Any],
+    min_quality: float = MIN_USABLE_QUALITY
+) -> Tuple[Dict[str, Any], Optional[bytes]]:
+    """Analyze an image and, if it is usable, enhance it in the same worker call"""
+    analysis = analyze_image_bytes(image_data, thresholds)
+    if analysis["quality_value"] < min_quality:
+        return analysis, None
+
+    try:
+        return analysis, enhance_image_bytes(image_data, analysis["brightness_score"])
+    except Exception:
+        return analysis, image_data  # Use the original if processing fails
+
+
+_executor: Optional[Executor] = None
+
+
+def get_analysis_executor() -> Executor:
+    """Shared pool for CPU-bound image work"""
+    global _executor
+    if _executor is None:
+        workers = settings.ASSET_ANALYSIS_WORKERS or None
+        if multiprocessing.current_process().daemon:
+            # Celery prefork children are daemonic and cannot start process pools;
+            # NumPy/OpenCV/PIL release the GIL for most of the work anyway
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asset-analysis")
+        else:
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("forkserver")
+            )
+    return _executor
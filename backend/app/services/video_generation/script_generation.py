@@ -6,8 +6,9 @@ import asyncio
 import json
 import logging
 import re
-from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass
+import time
+from typing import Awaitable, Dict, Any, List, Optional, Tuple, TypeVar
+from dataclasses import dataclass, field
 from enum import Enum
 
 from app.core.config import settings
@@ -17,6 +18,8 @@ from app.models.brand import Brand
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class ScriptType(Enum):
     """Types of video scripts"""
@@ -108,6 +111,9 @@ class VideoScript:
     viral_potential_score: float
     conversion_likelihood: float
     
+    # Wall-clock seconds per generation stage; not part of the script itself
+    stage_timings: Dict[str, float] = field(default_factory=dict)
+    
     @property
     def total_word_count(self) -> int:
         return sum(segment.word_count for segment in self.segments)
@@ -152,6 +158,7 @@ class ScriptGenerationRequest:
     competing_products: List[str] = None
     seasonal_context: Optional[str] = None
     trending_topics: List[str] = None
+    batch_segments: bool = False  # Generate all segments in one structured LLM call
     
     def __post_init__(self):
         if self.key_messages is None:
@@ -215,31 +222,49 @@ class ScriptGenerationService:
         if self.text_service is None:
             self.text_service = await get_text_service()
     
+    @staticmethod
+    async def _timed(timings: Dict[str, float], stage: str, awaitable: Awaitable[T]) -> T:
+        """Await ``awaitable``, recording its wall-clock time under ``stage``"""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[stage] = time.perf_counter() - start
+    
     async def generate_script(self, request: ScriptGenerationRequest) -> VideoScript:
-        """Generate a complete video script from product data"""
+        """
+        Generate a complete video script from product data
+        
+        Stages run as soon as their inputs are ready: benefits feed the USPs,
+        the insights feed the hook and every segment, and the hook and all
+        segments are generated concurrently since segments do not depend on the
+        hook text. A six-segment script takes three sequential LLM round trips.
+        """
         
         await self._get_text_service()
         
         logger.info(f"Generating {request.script_type.value} script for product: {request.product.name}")
         
-        # Extract product insights
-        product_insights = await self._analyze_product(request.product, request.brand)
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
         
-        # Generate hook
-        hook = await self._generate_hook(request, product_insights)
-        
-        # Generate script segments
-        segments = await self._generate_segments(request, product_insights, hook)
-        
-        # Generate closing CTA
-        closing_cta = await self._generate_closing_cta(request, product_insights)
+        # Extract product insights
+        product_insights = await self._timed(
+            timings, "product_analysis", self._analyze_product(request.product, request.brand, timings)
+        )
         
-        # Generate supporting elements
-        hashtags = await self._generate_hashtags(request, product_insights)
-        music_suggestions = await self._suggest_music(request, product_insights)
+        # Hook, segments and supporting elements only depend on the insights
+        hook, segments, closing_cta, hashtags, music_suggestions = await asyncio.gather(
+            self._timed(timings, "hook", self._generate_hook(request, product_insights)),
+            self._timed(timings, "segments", self._generate_segments(request, product_insights)),
+            self._timed(timings, "closing_cta", self._generate_closing_cta(request, product_insights)),
+            self._timed(timings, "hashtags", self._generate_hashtags(request, product_insights)),
+            self._timed(timings, "music", self._suggest_music(request, product_insights))
+        )
         
         # Calculate engagement scores
         scores = await self._calculate_engagement_scores(request, segments)
+        timings["total"] = time.perf_counter() - start
         
         script = VideoScript(
             title=f"{request.script_type.value.title()} - {request.product.name}",
@@ -255,32 +280,47 @@ class ScriptGenerationService:
             music_suggestions=music_suggestions,
             estimated_engagement_score=scores["engagement"],
             viral_potential_score=scores["viral_potential"],
-            conversion_likelihood=scores["conversion"]
+            conversion_likelihood=scores["conversion"],
+            stage_timings=timings
         )
         
-        logger.info(f"Generated script with {len(segments)} segments, {script.total_word_count} words")
+        logger.info(
+            f"Generated script with {len(segments)} segments, {script.total_word_count} words "
+            f"in {timings['total']:.2f}s"
+        )
+        logger.debug(f"Script stage timings: {timings}")
         
         return script
     
-    async def _analyze_product(self, product: Product, brand: Optional[Brand]) -> Dict[str, Any]:
+    async def _analyze_product(
+        self,
+        product: Product,
+        brand: Optional[Brand],
+        timings: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
         """Analyze product to extract key insights for script generation"""
         
+        timings = timings if timings is not None else {}
+        
         # Extract product features and benefits
         features = self._extract_features(product.description or "")
-        benefits = await self._extract_benefits(product, features)
-        
-        # Determine unique selling propositions
-        usps = await self._identify_usps(product, features, benefits)
         
-        # Extract emotional triggers
-        emotional_triggers = await self._identify_emotional_triggers(product, brand)
+        async def benefits_and_usps() -> Tuple[List[str], List[str]]:
+            benefits = await self._timed(timings, "benefits", self._extract_benefits(product, features))
+            # Determine unique selling propositions
+            usps = await self._timed(timings, "usps", self._identify_usps(product, features, benefits))
+            return benefits, usps
+        
+        # Emotional triggers and audience insights don't wait for the LLM chain
+        (benefits, usps), emotional_triggers, audience_insights = await asyncio.gather(
+            benefits_and_usps(),
+            self._identify_emotional_triggers(product, brand),
+            self._analyze_target_audience(product, brand)
+        )
         
         # Analyze pricing and value proposition
         value_proposition = self._analyze_value_proposition(product)
         
-        # Extract target audience insights
-        audience_insights = await self._analyze_target_audience(product, brand)
-        
         return {
             "features": features,
             "benefits": benefits,
@@ -608,13 +648,32 @@ class ScriptGenerationService:
         self, 
         request: ScriptGenerationRequest, 
         insights: Dict[str, Any], 
-        hook: str
+        hook: Optional[str] = None
     ) -> List[ScriptSegment]:
-        """Generate script segments"""
+        """Generate script segments concurrently, or in one call if ``request.batch_segments``"""
+        
+        plan = self._plan_segments(request, insights)
+        
+        if request.batch_segments:
+            segments = await self._generate_segments_batch(plan, request)
+            if segments:
+                return segments
+            logger.warning("Batched segment generation failed, generating segments individually")
+        
+        return list(await asyncio.gather(*[
+            self._generate_single_segment(prompt, number, start, end, request, insights)
+            for prompt, number, start, end in plan
+        ]))
+    
+    def _plan_segments(
+        self,
+        request: ScriptGenerationRequest,
+        insights: Dict[str, Any]
+    ) -> List[Tuple[str, int, float, float]]:
+        """Prompt, number, start and end time of each segment"""
         
         platform_constraints = self.platform_constraints[request.platform]
         optimal_segments = platform_constraints["optimal_segments"]
-        words_per_minute = platform_constraints["words_per_minute"]
         
         # Calculate timing
         hook_duration = platform_constraints["hook_duration"]
@@ -625,7 +684,7 @@ class ScriptGenerationService:
         if not template:
             template = self.script_templates[ScriptType.PRODUCT_SHOWCASE]
         
-        segments = []
+        plan = []
         current_time = hook_duration
         
         for i in range(optimal_segments):
@@ -641,19 +700,87 @@ class ScriptGenerationService:
                 tone=request.tone_style.value
             )
             
-            segment = await self._generate_single_segment(
-                customized_prompt,
-                i + 1,
-                current_time,
-                current_time + segment_duration,
-                request,
-                insights
-            )
-            
-            segments.append(segment)
+            plan.append((customized_prompt, i + 1, current_time, current_time + segment_duration))
             current_time += segment_duration
         
-        return segments
+        return plan
+    
+    async def _generate_segments_batch(
+        self,
+        plan: List[Tuple[str, int, float, float]],
+        request: ScriptGenerationRequest
+    ) -> Optional[List[ScriptSegment]]:
+        """Generate every planned segment with one structured-output call"""
+        
+        words_per_minute = self.platform_constraints[request.platform]["words_per_minute"]
+        briefs = "\n".join(
+            f"Segment {number} ({end - start:.1f} seconds, about {int((end - start) / 60 * words_per_minute)} words): "
+            f"{prompt.strip()}"
+            for prompt, number, start, end in plan
+        )
+        
+        prompt = f"""
+        Write {len(plan)} consecutive segments of a {request.platform.value} video script.
+        
+        {briefs}
+        
+        Requirements:
+        - Tone: {request.tone_style.value}
+        - Platform: {request.platform.value}
+        - Segments must flow naturally from one to the next
+        
+        For each segment include dialogue, action description, visual cues,
+        emotion to convey and product focus point.
+        
+        Format as a JSON array with one object per segment, in order:
+        [
+            {{
+                "dialogue": "...",
+                "action_description": "...",
+                "visual_cues": ["..."],
+                "emotion": "...",
+                "product_focus": "..."
+            }}
+        ]
+        """
+        
+        try:
+            response = await self.text_service.generate_response(prompt)
+            match = re.search(r"\[.*\]", response, re.DOTALL)
+            items = json.loads(match.group(0) if match else response)
+        except Exception as e:
+            logger.error(f"Failed to generate batched segments: {e}")
+            return None
+        
+        if not isinstance(items, list) or len(items) != len(plan) or not all(isinstance(item, dict) for item in items):
+            return None
+        
+        return [
+            self._build_segment(segment_data, number, start, end, request)
+            for segment_data, (_, number, start, end) in zip(items, plan)
+        ]
+    
+    def _build_segment(
+        self,
+        segment_data: Dict[str, Any],
+        segment_number: int,
+        start_time: float,
+        end_time: float,
+        request: ScriptGenerationRequest
+    ) -> ScriptSegment:
+        return ScriptSegment(
+            segment_number=segment_number,
+            timestamp_start=start_time,
+            timestamp_end=end_time,
+            duration=end_time - start_time,
+            hook_element=self._identify_hook_element(segment_data, request.platform),
+            dialogue=segment_data.get("dialogue", ""),
+            action_description=segment_data.get("action_description", ""),
+            visual_cues=segment_data.get("visual_cues", []),
+            emotion=segment_data.get("emotion", "neutral"),
+            product_focus=segment_data.get("product_focus"),
+            call_to_action=None  # Will be added to final segment
+        )
     
     async def _generate_single_segment(
         self,
@@ -705,19 +832,7 @@ class ScriptGenerationService:
                 # Fallback parsing
                 segment_data = self._parse_segment_response(response)
             
-            return ScriptSegment(
-                segment_number=segment_number,
-                timestamp_start=start_time,
-                timestamp_end=end_time,
-                duration=duration,
-                hook_element=self._identify_hook_element(segment_data, request.platform),
-                dialogue=segment_data.get("dialogue", ""),
-                action_description=segment_data.get("action_description", ""),
-                visual_cues=segment_data.get("visual_cues", []),
-                emotion=segment_data.get("emotion", "neutral"),
-                product_focus=segment_data.get("product_focus"),
-                call_to_action=None  # Will be added to final segment
-            )
+            return self._build_segment(segment_data, segment_number, start_time, end_time, request)
             
         except Exception as e:
             logger.error(f"Failed to generate segment {segment_number}: {e}")
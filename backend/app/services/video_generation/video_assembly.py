@@ -3,6 +3,7 @@ Video assembly service with FFmpeg integration for combining AI-generated segmen
 """
 
 import asyncio
+import hashlib
 import json
 import logging
 import os
@@ -16,8 +17,10 @@ import aiofiles
 import aiohttp
 
 from app.core.config import settings
+from app.core.media_scheduler import JobPriority, estimate_encode_memory_mb, get_media_scheduler
 from app.core.security_utils import SecureSubprocessExecutor, InputValidator
 from app.models.video_project import VideoProject, VideoSegment, BRollClip, VideoAsset
+from .asset_store import get_asset_store
 from .text_to_speech import TTSService, get_tts_service
 
 logger = logging.getLogger(__name__)
@@ -86,6 +89,7 @@ class VideoAssemblyService:
         self.tts_service = get_tts_service()
         self.temp_dir = Path(tempfile.gettempdir()) / "viral_os_video_assembly"
         self.temp_dir.mkdir(exist_ok=True)
+        self.asset_store = get_asset_store()
         
         # Video assembly templates for different platforms
         self.platform_templates = {
@@ -436,10 +440,9 @@ class VideoAssemblyService:
         return transitions
     
     async def _download_assets(self, timeline: Timeline) -> Dict[str, str]:
-        """Download all video and audio assets to local temp files"""
+        """Resolve all video and audio assets to local files"""
         
         assets = {}
-        download_tasks = []
         
         # Collect all URLs that need downloading
         urls_to_download = []
@@ -452,17 +455,19 @@ class VideoAssemblyService:
         
         # Download assets concurrently
         semaphore = asyncio.Semaphore(5)  # Limit concurrent downloads
+        timeout = aiohttp.ClientTimeout(total=300)  # 5 minute timeout for large files
         
-        async def download_asset(asset_type: str, asset_id: str, url: str):
-            async with semaphore:
-                return await self._download_single_asset(asset_type, asset_id, url)
-        
-        download_tasks = [
-            download_asset(asset_type, asset_id, url) 
-            for asset_type, asset_id, url in urls_to_download
-        ]
-        
-        results = await asyncio.gather(*download_tasks, return_exceptions=True)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async def download_asset(asset_type: str, asset_id: str, url: str):
+                async with semaphore:
+                    return await self._download_single_asset(asset_type, asset_id, url, session)
+            
+            download_tasks = [
+                download_asset(asset_type, asset_id, url) 
+                for asset_type, asset_id, url in urls_to_download
+            ]
+            
+            results = await asyncio.gather(*download_tasks, return_exceptions=True)
         
         # Process results
         for i, result in enumerate(results):
@@ -474,28 +479,49 @@ class VideoAssemblyService:
         
         return assets
     
-    async def _download_single_asset(self, asset_type: str, asset_id: str, url: str) -> str:
-        """Download a single asset to temp file"""
+    async def _download_single_asset(
+        self,
+        asset_type: str,
+        asset_id: str,
+        url: str,
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> str:
+        """Resolve a single asset to a file in the asset store, downloading it on a miss"""
+        
+        stored = await asyncio.to_thread(self.asset_store.lookup_url, url)
+        if stored:
+            logger.debug(f"Using stored {asset_type} asset: {asset_id} -> {stored.path}")
+            return stored.path
+        
+        if session is None:
+            timeout = aiohttp.ClientTimeout(total=300)  # 5 minute timeout for large files
+            async with aiohttp.ClientSession(timeout=timeout) as own_session:
+                return await self._download_single_asset(asset_type, asset_id, url, own_session)
         
         # Generate temp file path
         extension = "mp4" if asset_type == "video" else "mp3"
         temp_path = self.temp_dir / f"{asset_id}_{uuid.uuid4().hex}.{extension}"
         
         try:
-            timeout = aiohttp.ClientTimeout(total=300)  # 5 minute timeout for large files
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    
-                    async with aiofiles.open(temp_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            await f.write(chunk)
+            digest = hashlib.sha256()
+            async with session.get(url) as response:
+                response.raise_for_status()
+                
+                async with aiofiles.open(temp_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        digest.update(chunk)
+                        await f.write(chunk)
             
-            logger.info(f"Downloaded {asset_type} asset: {asset_id} -> {temp_path}")
-            return str(temp_path)
+            stored = await asyncio.to_thread(
+                self.asset_store.put_file, temp_path, digest.hexdigest(), f".{extension}", url
+            )
+            logger.info(f"Downloaded {asset_type} asset: {asset_id} -> {stored.path}")
+            return stored.path
             
         except Exception as e:
             logger.error(f"Failed to download {asset_type} asset {asset_id} from {url}: {e}")
+            if temp_path.exists():
+                temp_path.unlink()
             raise
     
     async def _generate_audio_tracks(self, project: VideoProject, timeline: Timeline) -> Dict[str, str]:
@@ -595,12 +621,25 @@ class VideoAssemblyService:
         logger.info(f"Executing FFmpeg command with {len(cmd)} arguments")
         
         try:
-            # Use secure subprocess executor
-            result = await SecureSubprocessExecutor.execute_safe(
-                executable="ffmpeg",
-                args=cmd[1:],  # Skip 'ffmpeg' as it's passed as executable
-                timeout=1800  # 30 minutes timeout for video processing
-            )
+            scheduler = get_media_scheduler()
+            width, height = timeline.resolution
+            
+            # Renders are batch work: admitted host-wide behind interactive jobs
+            async with scheduler.slot(
+                "assemble",
+                JobPriority.BATCH,
+                cpu_min=min(2, scheduler.cpu_capacity),
+                cpu_max=scheduler.cpu_capacity,
+                memory_mb=estimate_encode_memory_mb(width, height)
+            ) as grant:
+                cmd[-1:-1] = ["-threads", str(grant.threads)]
+                
+                # Use secure subprocess executor
+                result = await SecureSubprocessExecutor.execute_safe(
+                    executable="ffmpeg",
+                    args=cmd[1:],  # Skip 'ffmpeg' as it's passed as executable
+                    timeout=1800  # 30 minutes timeout for video processing
+                )
             
             if not result["success"]:
                 error_msg = result["stderr"] or "Unknown FFmpeg error"
@@ -731,12 +770,15 @@ class VideoAssemblyService:
         ]
         
         try:
-            # Use secure subprocess executor
-            result = await SecureSubprocessExecutor.execute_safe(
-                executable="ffmpeg",
-                args=cmd[1:],  # Skip 'ffmpeg' as it's passed as executable
-                timeout=60  # 1 minute timeout for thumbnail generation
-            )
+            async with get_media_scheduler().slot("thumbnail", JobPriority.INTERACTIVE, memory_mb=128) as grant:
+                cmd[-1:-1] = ["-threads", str(grant.threads)]
+                
+                # Use secure subprocess executor
+                result = await SecureSubprocessExecutor.execute_safe(
+                    executable="ffmpeg",
+                    args=cmd[1:],  # Skip 'ffmpeg' as it's passed as executable
+                    timeout=60  # 1 minute timeout for thumbnail generation
+                )
             
             if result["success"]:
                 # Upload thumbnail
@@ -768,12 +810,17 @@ class VideoAssemblyService:
         ]
         
         try:
-            # Use secure subprocess executor
-            result = await SecureSubprocessExecutor.execute_safe(
-                executable="ffmpeg",
-                args=cmd[1:],  # Skip 'ffmpeg' as it's passed as executable
-                timeout=120  # 2 minute timeout for preview generation
-            )
+            async with get_media_scheduler().slot(
+                "preview", JobPriority.STANDARD, cpu_max=2, memory_mb=estimate_encode_memory_mb(threads=2)
+            ) as grant:
+                cmd[-1:-1] = ["-threads", str(grant.threads)]
+                
+                # Use secure subprocess executor
+                result = await SecureSubprocessExecutor.execute_safe(
+                    executable="ffmpeg",
+                    args=cmd[1:],  # Skip 'ffmpeg' as it's passed as executable
+                    timeout=120  # 2 minute timeout for preview generation
+                )
             
             if result["success"]:
                 # Upload preview
@@ -788,9 +835,11 @@ class VideoAssemblyService:
             return ""
     
     async def _cleanup_temp_files(self, file_paths: List[str]):
-        """Clean up temporary files"""
+        """Clean up temporary files, leaving assets owned by the asset store"""
         
         for file_path in file_paths:
+            if self.asset_store.owns(file_path):
+                continue
             try:
                 if os.path.exists(file_path):
                     os.remove(file_path)
@@ -5,6 +5,14 @@ Video processing services for user uploads
 from .upload_processor import VideoUploadProcessor, get_video_upload_processor
 from .metadata_extractor import VideoMetadataExtractor, get_metadata_extractor
 from .thumbnail_generator import ThumbnailGenerator, get_thumbnail_generator
+from .processing_plan import ProcessingPlan, plan_processing
+from .streaming_upload import (
+    ResumableUploadManager,
+    StreamedUpload,
+    UploadOffsetMismatchError,
+    UploadTooLargeError,
+    stream_upload_to_disk
+)
 
 __all__ = [
     "VideoUploadProcessor",
@@ -12,5 +20,12 @@ __all__ = [
     "VideoMetadataExtractor",
     "get_metadata_extractor",
     "ThumbnailGenerator", 
-    "get_thumbnail_generator"
+    "get_thumbnail_generator",
+    "ProcessingPlan",
+    "plan_processing",
+    "ResumableUploadManager",
+    "StreamedUpload",
+    "UploadOffsetMismatchError",
+    "UploadTooLargeError",
+    "stream_upload_to_disk"
 ]
\ No newline at end of file
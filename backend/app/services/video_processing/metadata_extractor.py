@@ -3,11 +3,11 @@ Video metadata extraction service
 """
 
 import logging
-import asyncio
 import json
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+from app.core.media_scheduler import JobPriority, get_media_scheduler
 from app.schemas.video_upload import VideoMetadataResponse
 
 logger = logging.getLogger(__name__)
@@ -40,15 +40,11 @@ class VideoMetadataExtractor:
                 str(video_path)
             ]
             
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            returncode, stdout, stderr = await get_media_scheduler().run(
+                cmd, "ffprobe", JobPriority.INTERACTIVE, memory_mb=64
             )
             
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
+            if returncode != 0:
                 raise Exception(f"ffprobe failed: {stderr.decode()}")
             
             return json.loads(stdout.decode())
@@ -69,49 +65,7 @@ class VideoMetadataExtractor:
         """
         try:
             metadata = await self.extract_full_metadata(video_path)
-            
-            # Extract video stream
-            video_stream = None
-            audio_stream = None
-            
-            for stream in metadata.get("streams", []):
-                if stream.get("codec_type") == "video" and video_stream is None:
-                    video_stream = stream
-                elif stream.get("codec_type") == "audio" and audio_stream is None:
-                    audio_stream = stream
-            
-            if not video_stream:
-                raise Exception("No video stream found")
-            
-            # Parse video information
-            format_info = metadata.get("format", {})
-            duration = float(format_info.get("duration", 0))
-            file_size = int(format_info.get("size", 0))
-            format_name = format_info.get("format_name", "unknown")
-            bitrate = int(format_info.get("bit_rate", 0))
-            
-            # Video stream info
-            width = video_stream.get("width", 0)
-            height = video_stream.get("height", 0)
-            codec = video_stream.get("codec_name", "unknown")
-            
-            # Calculate FPS
-            fps = 0
-            if "r_frame_rate" in video_stream:
-                fps_str = video_stream["r_frame_rate"]
-                if "/" in fps_str:
-                    num, den = fps_str.split("/")
-                    fps = int(float(num) / float(den)) if float(den) != 0 else 0
-            
-            return VideoMetadataResponse(
-                duration=duration,
-                resolution=f"{width}x{height}",
-                fps=fps,
-                file_size=file_size,
-                format=format_name,
-                codec=codec,
-                bitrate=bitrate
-            )
+            return self._parse_video_info(metadata)
             
         except Exception as e:
             logger.error(f"Video info extraction failed: {e}")
@@ -125,6 +79,89 @@ class VideoMetadataExtractor:
                 bitrate=None
             )
     
+    async def probe_header(self, video_path: Path) -> Optional[VideoMetadataResponse]:
+        """
+        Probe a possibly still-growing file for basic video information
+        
+        Used while an upload is in flight: once the container header has been
+        written, stream layout and duration are usually known. Returns None
+        when the header is not (yet) parseable, e.g. MP4 files whose moov atom
+        sits at the end.
+        
+        Args:
+            video_path: Path to the (partial) video file
+            
+        Returns:
+            VideoMetadataResponse, or None if probing failed
+        """
+        cmd = [
+            self.ffprobe_path,
+            "-v", "quiet",
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            str(video_path)
+        ]
+        
+        try:
+            returncode, stdout, _ = await get_media_scheduler().run(
+                cmd, "ffprobe", JobPriority.INTERACTIVE, memory_mb=64
+            )
+            
+            if returncode != 0:
+                return None
+            
+            return self._parse_video_info(json.loads(stdout.decode()))
+            
+        except Exception as e:
+            logger.debug(f"Header probe failed for {video_path}: {e}")
+            return None
+    
+    def _parse_video_info(self, metadata: Dict[str, Any]) -> VideoMetadataResponse:
+        """Build a VideoMetadataResponse from raw ffprobe output"""
+        # Extract video stream
+        video_stream = None
+        audio_stream = None
+        
+        for stream in metadata.get("streams", []):
+            if stream.get("codec_type") == "video" and video_stream is None:
+                video_stream = stream
+            elif stream.get("codec_type") == "audio" and audio_stream is None:
+                audio_stream = stream
+        
+        if not video_stream:
+            raise Exception("No video stream found")
+        
+        # Parse video information
+        format_info = metadata.get("format", {})
+        duration = float(format_info.get("duration", 0))
+        file_size = int(format_info.get("size", 0))
+        format_name = format_info.get("format_name", "unknown")
+        bitrate = int(format_info.get("bit_rate", 0))
+        
+        # Video stream info
+        width = video_stream.get("width", 0)
+        height = video_stream.get("height", 0)
+        codec = video_stream.get("codec_name", "unknown")
+        
+        # Calculate FPS
+        fps = 0
+        if "r_frame_rate" in video_stream:
+            fps_str = video_stream["r_frame_rate"]
+            if "/" in fps_str:
+                num, den = fps_str.split("/")
+                fps = int(float(num) / float(den)) if float(den) != 0 else 0
+        
+        return VideoMetadataResponse(
+            duration=duration,
+            resolution=f"{width}x{height}",
+            fps=fps,
+            file_size=file_size,
+            format=format_name,
+            codec=codec,
+            bitrate=bitrate
+        )
+    
     async def analyze_video_quality(self, video_path: Path) -> Dict[str, Any]:
         """
         Analyze video quality metrics
@@ -0,0 +1,189 @@
+"""
+Single-pass ffmpeg processing planner
+
+Turns ``VideoProcessingOptions`` into one ffmpeg invocation: the source is
+demuxed and decoded once, the decoded video is fanned out with ``split`` to
+one filter branch per requested output, and every encoder runs inside the
+same process. Encoder threads are divided across the host CPU budget in
+proportion to each output's relative cost.
+"""
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.schemas.video_upload import VideoProcessingOptions
+
+
+# Encoding presets shared with the per-output VideoUploadProcessor methods
+OPTIMIZE_QUALITY_SETTINGS = {
+    "low": {"crf": "28", "preset": "fast"},
+    "medium": {"crf": "23", "preset": "medium"},
+    "high": {"crf": "18", "preset": "slow"}
+}
+
+COMPRESSION_SETTINGS = {
+    "low": {"scale": "720:-2", "crf": "30"},
+    "medium": {"scale": "1080:-2", "crf": "26"},
+    "high": {"scale": "1920:-2", "crf": "22"}
+}
+
+THUMBNAIL_OFFSET_SECONDS = 1
+
+# Relative encode cost per x264 preset, used to split encoder threads
+PRESET_COST = {"fast": 0.6, "medium": 1.0, "slow": 1.6}
+
+
+def get_cpu_budget() -> int:
+    """Cores available to this process for media work"""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+@dataclass
+class PlannedOutput:
+    """One output file of a processing plan"""
+    stage: str
+    path: Path
+    output_args: List[str]
+    video_filter: Optional[str] = None  # None for outputs without video
+    map_audio: bool = True
+    encoder_weight: float = 0.0  # Relative CPU cost; 0 for trivial outputs
+    threads: int = 1
+
+
+@dataclass
+class ProcessingPlan:
+    """A set of outputs produced from one decode of ``source``"""
+    source: Path
+    outputs: List[PlannedOutput] = field(default_factory=list)
+
+    @property
+    def video_outputs(self) -> List[PlannedOutput]:
+        return [output for output in self.outputs if output.video_filter is not None]
+
+    def filter_complex(self) -> Optional[str]:
+        """Filter graph fanning the decoded video out to every video output"""
+        video_outputs = self.video_outputs
+        if not video_outputs:
+            return None
+
+        if len(video_outputs) == 1:
+            return f"[0:v]{video_outputs[0].video_filter}[v0]"
+
+        branches = "".join(f"[s{i}]" for i in range(len(video_outputs)))
+        chains = [f"[0:v]split={len(video_outputs)}{branches}"]
+        for i, output in enumerate(video_outputs):
+            chains.append(f"[s{i}]{output.video_filter}[v{i}]")
+        return ";".join(chains)
+
+    def allocate_threads(self, cpu_budget: int):
+        """Split ``cpu_budget`` encoder threads by relative output cost"""
+        total_weight = sum(output.encoder_weight for output in self.outputs)
+        for output in self.outputs:
+            if output.encoder_weight and total_weight:
+                output.threads = max(1, round(cpu_budget * output.encoder_weight / total_weight))
+            else:
+                output.threads = 1
+
+    def build_command(self, ffmpeg_path: str = "ffmpeg") -> List[str]:
+        """Build the single ffmpeg invocation for this plan"""
+        cmd = [ffmpeg_path, "-hide_banner", "-nostdin", "-y", "-i", str(self.source)]
+
+        graph = self.filter_complex()
+        if graph:
+            cmd += ["-filter_complex", graph]
+
+        video_index = 0
+        for output in self.outputs:
+            if output.video_filter is not None:
+                cmd += ["-map", f"[v{video_index}]"]
+                video_index += 1
+            if output.map_audio:
+                # Trailing "?" keeps sources without audio working
+                cmd += ["-map", "0:a:0?"]
+            cmd += output.output_args
+            cmd += ["-threads", str(output.threads), str(output.path)]
+
+        return cmd
+
+
+def plan_processing(
+    video_path: Path,
+    options: VideoProcessingOptions,
+    cpu_budget: Optional[int] = None
+) -> ProcessingPlan:
+    """
+    Plan every requested output of ``options`` as a single ffmpeg pass
+
+    Output paths match those of the per-output VideoUploadProcessor methods.
+    """
+    video_path = Path(video_path)
+    plan = ProcessingPlan(source=video_path)
+
+    if options.generate_thumbnail:
+        plan.outputs.append(PlannedOutput(
+            stage="thumbnail",
+            path=video_path.parent / f"{video_path.stem}_thumbnail.jpg",
+            video_filter=f"trim=start={THUMBNAIL_OFFSET_SECONDS},setpts=PTS-STARTPTS",
+            map_audio=False,
+            output_args=["-frames:v", "1"]
+        ))
+
+    if options.extract_audio:
+        plan.outputs.append(PlannedOutput(
+            stage="audio",
+            path=video_path.parent / f"{video_path.stem}_audio.mp3",
+            output_args=["-vn", "-acodec", "mp3", "-ab", "192k"]
+        ))
+
+    if options.optimize_for_platform:
+        settings = OPTIMIZE_QUALITY_SETTINGS.get(options.target_quality, OPTIMIZE_QUALITY_SETTINGS["medium"])
+        plan.outputs.append(PlannedOutput(
+            stage="optimized",
+            path=video_path.parent / f"{video_path.stem}_optimized.mp4",
+            video_filter="null",
+            output_args=[
+                "-c:v", "libx264",
+                "-crf", settings["crf"],
+                "-preset", settings["preset"],
+                "-c:a", "aac",
+                "-b:a", "128k",
+                "-movflags", "+faststart"
+            ],
+            encoder_weight=PRESET_COST[settings["preset"]]
+        ))
+
+    if options.compress_video:
+        settings = COMPRESSION_SETTINGS.get(options.target_quality, COMPRESSION_SETTINGS["medium"])
+        plan.outputs.append(PlannedOutput(
+            stage="compressed",
+            path=video_path.parent / f"{video_path.stem}_compressed.mp4",
+            video_filter=f"scale={settings['scale']}",
+            output_args=[
+                "-c:v", "libx264",
+                "-crf", settings["crf"],
+                "-preset", "medium",
+                "-c:a", "aac",
+                "-b:a", "96k"
+            ],
+            # Downscaled encodes cost roughly half a full-resolution encode
+            encoder_weight=PRESET_COST["medium"] * 0.5
+        ))
+
+    plan.allocate_threads(cpu_budget or get_cpu_budget())
+    return plan
+
+
+def summarize_outputs(plan: ProcessingPlan) -> Dict[str, Dict[str, int]]:
+    """Per-output thread allocation and resulting file size"""
+    return {
+        output.stage: {
+            "threads": output.threads,
+            "size": output.path.stat().st_size if output.path.exists() else 0
+        }
+        for output in plan.outputs
+    }
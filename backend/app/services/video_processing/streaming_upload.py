@@ -0,0 +1,376 @@
+"""
+Streaming and resumable video upload handling
+
+Uploads are written to disk in fixed-size chunks while being hashed and
+counted, so memory per upload is bounded by the chunk size rather than the
+file size. The size limit is enforced as bytes arrive, and ffprobe starts
+on the partial file as soon as the container header has been written.
+
+Resumable uploads follow the tus 1.0 core protocol: a client creates an upload
+with a declared length, appends chunks at the current offset and can resume
+from the last persisted offset after a dropped connection. Appends to one
+upload are serialized across processes with a file lock, and the running
+SHA-256 is only reused when it covers exactly the persisted offset.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import aiofiles
+
+from app.schemas.video_upload import VideoMetadataResponse
+from app.services.video_processing.metadata_extractor import VideoMetadataExtractor, get_metadata_extractor
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1MB
+HEADER_PROBE_BYTES = 2 * 1024 * 1024  # Enough for the header of most containers
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds its size limit"""
+    pass
+
+
+class UploadOffsetMismatchError(Exception):
+    """Raised when a resumable chunk does not start at the current offset"""
+    pass
+
+
+@dataclass
+class StreamedUpload:
+    """Result of streaming an upload to disk"""
+    file_path: Path
+    size: int
+    sha256: str
+    metadata: Optional[VideoMetadataResponse] = None
+
+
+class ChunkedUploadWriter:
+    """Appends chunks to a file while hashing, counting and probing"""
+
+    def __init__(
+        self,
+        file_path: Path,
+        max_size: int,
+        offset: int = 0,
+        hasher: Optional[Any] = None,
+        extractor: Optional[VideoMetadataExtractor] = None,
+        probe_after: int = HEADER_PROBE_BYTES
+    ):
+        self.file_path = Path(file_path)
+        self.max_size = max_size
+        self.offset = offset
+        self.hasher = hasher or hashlib.sha256()
+        self.extractor = extractor or get_metadata_extractor()
+        self.probe_after = probe_after
+        self.probe_task: Optional[asyncio.Task] = None
+        self._file = None
+
+    async def __aenter__(self) -> "ChunkedUploadWriter":
+        self._file = await aiofiles.open(self.file_path, "ab" if self.offset else "wb")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._file.close()
+
+    async def write(self, chunk: bytes):
+        """Write one chunk, rejecting it if it would exceed the size limit"""
+        if self.offset + len(chunk) > self.max_size:
+            raise UploadTooLargeError(
+                f"Upload exceeds maximum size of {self.max_size} bytes"
+            )
+
+        await self._file.write(chunk)
+        self.hasher.update(chunk)
+        self.offset += len(chunk)
+
+        if self.probe_task is None and self.offset >= self.probe_after:
+            # Flush so ffprobe sees the header bytes we have so far
+            await self._file.flush()
+            self.probe_task = asyncio.create_task(self.extractor.probe_header(self.file_path))
+
+    async def write_stream(self, chunks: AsyncIterator[bytes]):
+        """Write every chunk from an async byte stream"""
+        async for chunk in chunks:
+            if chunk:
+                await self.write(chunk)
+
+    async def finish_probe(self) -> Optional[VideoMetadataResponse]:
+        """Collect the header probe, re-probing the complete file if it failed"""
+        metadata = await self.probe_task if self.probe_task is not None else None
+        if metadata is None:
+            metadata = await self.extractor.probe_header(self.file_path)
+        if metadata is not None:
+            metadata.file_size = self.offset
+        return metadata
+
+
+async def _iter_upload_file(file, chunk_size: int) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def stream_upload_to_disk(
+    file,
+    file_path: Path,
+    max_size: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> StreamedUpload:
+    """
+    Stream an UploadFile to disk in fixed-size chunks
+
+    Args:
+        file: FastAPI/Starlette UploadFile
+        file_path: Destination path
+        max_size: Maximum accepted size in bytes
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        StreamedUpload with size, SHA-256 and probed metadata
+
+    Raises:
+        UploadTooLargeError: The upload exceeded ``max_size``; the partial
+            file is removed
+    """
+    writer = ChunkedUploadWriter(file_path, max_size)
+    try:
+        async with writer:
+            await writer.write_stream(_iter_upload_file(file, chunk_size))
+    except BaseException:
+        if writer.probe_task is not None:
+            writer.probe_task.cancel()
+        Path(file_path).unlink(missing_ok=True)
+        raise
+
+    return StreamedUpload(
+        file_path=Path(file_path),
+        size=writer.offset,
+        sha256=writer.hasher.hexdigest(),
+        metadata=await writer.finish_probe()
+    )
+
+
+@dataclass
+class ResumableUpload:
+    """Persisted state of a resumable upload"""
+    upload_id: str
+    length: int
+    offset: int = 0
+    metadata: Dict[str, str] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    completed_at: Optional[float] = None
+    file_path: Optional[str] = None
+    sha256: Optional[str] = None
+    video_metadata: Optional[Dict[str, Any]] = None
+
+    @property
+    def is_complete(self) -> bool:
+        return self.completed_at is not None
+
+
+class ResumableUploadManager:
+    """Manages tus-style resumable uploads on local disk"""
+
+    def __init__(
+        self,
+        state_dir: Path,
+        destination_dir: Path,
+        max_size: int,
+        expiry_seconds: int = 86400
+    ):
+        self.state_dir = Path(state_dir)
+        self.destination_dir = Path(destination_dir)
+        self.max_size = max_size
+        self.expiry_seconds = expiry_seconds
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+
+        # Per-process hasher state with the offset it covers; rebuilt from disk
+        # when another worker appended in between
+        self._hashers: Dict[str, Tuple[int, Any]] = {}
+        self._probes: Dict[str, asyncio.Task] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _state_path(self, upload_id: str) -> Path:
+        return self.state_dir / f"{upload_id}.json"
+
+    def _data_path(self, upload_id: str) -> Path:
+        return self.state_dir / f"{upload_id}.part"
+
+    def _lock_path(self, upload_id: str) -> Path:
+        return self.state_dir / f"{upload_id}.lock"
+
+    @asynccontextmanager
+    async def _upload_lock(self, upload_id: str) -> AsyncIterator[None]:
+        """Hold the upload exclusively, within this process and across workers"""
+        lock = self._locks.setdefault(upload_id, asyncio.Lock())
+        async with lock:
+            with open(self._lock_path(upload_id), "a") as lock_file:
+                await asyncio.to_thread(fcntl.flock, lock_file, fcntl.LOCK_EX)
+                yield
+
+    def _save(self, upload: ResumableUpload):
+        tmp_path = self._state_path(upload.upload_id).with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(asdict(upload)))
+        os.replace(tmp_path, self._state_path(upload.upload_id))
+
+    def create(self, length: int, metadata: Optional[Dict[str, str]] = None) -> ResumableUpload:
+        """Register a new upload of ``length`` bytes"""
+        if length < 0:
+            raise ValueError("Upload length must be non-negative")
+        if length > self.max_size:
+            raise UploadTooLargeError(
+                f"Upload exceeds maximum size of {self.max_size} bytes"
+            )
+
+        upload = ResumableUpload(upload_id=uuid.uuid4().hex, length=length, metadata=metadata or {})
+        self._data_path(upload.upload_id).touch()
+        self._save(upload)
+        return upload
+
+    def get(self, upload_id: str) -> Optional[ResumableUpload]:
+        """Load upload state, or None if unknown or expired"""
+        # Upload IDs are hex UUIDs; anything else must not reach the filesystem
+        if not upload_id or not all(c in "0123456789abcdef" for c in upload_id):
+            return None
+
+        try:
+            upload = ResumableUpload(**json.loads(self._state_path(upload_id).read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+
+        if not upload.is_complete and time.time() - upload.created_at > self.expiry_seconds:
+            self.delete(upload_id)
+            return None
+
+        return upload
+
+    async def _hasher_for(self, upload: ResumableUpload):
+        cached = self._hashers.get(upload.upload_id)
+        if cached is not None and cached[0] == upload.offset:
+            return cached[1]
+        return await asyncio.to_thread(self._hash_prefix, upload.upload_id, upload.offset)
+
+    def _hash_prefix(self, upload_id: str, offset: int):
+        hasher = hashlib.sha256()
+        with open(self._data_path(upload_id), "rb") as f:
+            remaining = offset
+            while remaining > 0:
+                chunk = f.read(min(DEFAULT_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                remaining -= len(chunk)
+        return hasher
+
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> ResumableUpload:
+        """
+        Append a chunk stream at ``offset``
+
+        Bytes received before a dropped connection are kept, so the client
+        can resume from the returned offset.
+
+        Raises:
+            KeyError: Unknown or expired upload
+            UploadOffsetMismatchError: ``offset`` is not the current offset
+            UploadTooLargeError: More bytes than the declared length
+        """
+        # Validates the ID before it names a lock file
+        if self.get(upload_id) is None:
+            raise KeyError(upload_id)
+
+        async with self._upload_lock(upload_id):
+            upload = self.get(upload_id)
+            if upload is None:
+                raise KeyError(upload_id)
+            if upload.is_complete or offset != upload.offset:
+                raise UploadOffsetMismatchError(
+                    f"Expected offset {upload.offset}, got {offset}"
+                )
+
+            data_path = self._data_path(upload_id)
+            # Drop bytes from an interrupted write that were never acknowledged
+            os.truncate(data_path, upload.offset)
+
+            writer = ChunkedUploadWriter(
+                data_path,
+                max_size=upload.length,
+                offset=upload.offset,
+                hasher=await self._hasher_for(upload),
+                # Probe once the header range arrives, even across several requests
+                probe_after=HEADER_PROBE_BYTES if upload_id not in self._probes else upload.length + 1
+            )
+
+            try:
+                async with writer:
+                    await writer.write_stream(chunks)
+            finally:
+                upload.offset = writer.offset
+                self._hashers[upload_id] = (writer.offset, writer.hasher)
+                if writer.probe_task is not None:
+                    self._probes[upload_id] = writer.probe_task
+                self._save(upload)
+
+            if upload.offset == upload.length:
+                await self._complete(upload, writer)
+
+            return upload
+
+    async def _complete(self, upload: ResumableUpload, writer: ChunkedUploadWriter):
+        extension = upload.metadata.get("extension", "")
+        destination = self.destination_dir / f"upload_{upload.upload_id}{extension}"
+
+        writer.probe_task = self._probes.pop(upload.upload_id, None)
+        metadata = await writer.finish_probe()
+        os.replace(self._data_path(upload.upload_id), destination)
+
+        upload.completed_at = time.time()
+        upload.file_path = str(destination)
+        upload.sha256 = writer.hasher.hexdigest()
+        self._hashers.pop(upload.upload_id, None)
+        upload.video_metadata = metadata.model_dump() if metadata is not None else None
+        self._save(upload)
+        self._locks.pop(upload.upload_id, None)
+
+    def delete(self, upload_id: str) -> bool:
+        """Terminate an upload and remove its partial data"""
+        probe = self._probes.pop(upload_id, None)
+        if probe is not None:
+            probe.cancel()
+        self._hashers.pop(upload_id, None)
+        self._locks.pop(upload_id, None)
+
+        existed = self._state_path(upload_id).exists()
+        self._state_path(upload_id).unlink(missing_ok=True)
+        self._data_path(upload_id).unlink(missing_ok=True)
+        self._lock_path(upload_id).unlink(missing_ok=True)
+        return existed
+
+    def cleanup_expired(self) -> int:
+        """Remove upload state older than the expiry window"""
+        removed = 0
+        cutoff = time.time() - self.expiry_seconds
+        for state_path in self.state_dir.glob("*.json"):
+            try:
+                created_at = json.loads(state_path.read_text())["created_at"]
+            except (OSError, ValueError, KeyError):
+                continue
+            if created_at < cutoff:
+                # Completed files have already been moved out of the state dir
+                self.delete(state_path.stem)
+                removed += 1
+        return removed
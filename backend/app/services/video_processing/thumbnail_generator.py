@@ -3,11 +3,12 @@ Video thumbnail generation service
 """
 
 import logging
-import asyncio
 from typing import Optional, List
 from pathlib import Path
 import uuid
 
+from app.core.media_scheduler import JobPriority, get_media_scheduler
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,15 +50,11 @@ class ThumbnailGenerator:
                 str(output_path)
             ]
             
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            returncode, stdout, stderr = await get_media_scheduler().run(
+                cmd, "thumbnail", JobPriority.INTERACTIVE, memory_mb=128
             )
             
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
+            if returncode != 0:
                 raise Exception(f"Thumbnail generation failed: {stderr.decode()}")
             
             return output_path
@@ -113,15 +110,11 @@ class ThumbnailGenerator:
                     str(thumbnail_path)
                 ]
                 
-                process = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
+                returncode, stdout, stderr = await get_media_scheduler().run(
+                    cmd, "thumbnail", JobPriority.INTERACTIVE, memory_mb=128
                 )
                 
-                stdout, stderr = await process.communicate()
-                
-                if process.returncode == 0 and thumbnail_path.exists():
+                if returncode == 0 and thumbnail_path.exists():
                     thumbnails.append(thumbnail_path)
                 else:
                     logger.warning(f"Failed to generate thumbnail {i+1}: {stderr.decode()}")
@@ -163,15 +156,11 @@ class ThumbnailGenerator:
                 str(output_path)
             ]
             
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            returncode, stdout, stderr = await get_media_scheduler().run(
+                cmd, "animated_thumbnail", JobPriority.INTERACTIVE, memory_mb=192
             )
             
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
+            if returncode != 0:
                 raise Exception(f"Animated thumbnail generation failed: {stderr.decode()}")
             
             return output_path
@@ -209,15 +198,11 @@ class ThumbnailGenerator:
                 str(output_path)
             ]
             
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            returncode, stdout, stderr = await get_media_scheduler().run(
+                cmd, "contact_sheet", JobPriority.STANDARD, cpu_max=2, memory_mb=192
             )
             
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
+            if returncode != 0:
                 raise Exception(f"Contact sheet generation failed: {stderr.decode()}")
             
             return output_path
@@ -237,15 +222,11 @@ class ThumbnailGenerator:
                 str(video_path)
             ]
             
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            returncode, stdout, stderr = await get_media_scheduler().run(
+                cmd, "ffprobe", JobPriority.INTERACTIVE, memory_mb=64
             )
             
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
+            if returncode != 0:
                 raise Exception(f"Duration extraction failed: {stderr.decode()}")
             
             return float(stdout.decode().strip())
@@ -5,12 +5,22 @@ Video upload processing service for handling user-uploaded video files
 import logging
 import subprocess
 import asyncio
+import time
 from typing import Dict, Any, Optional
 from pathlib import Path
 import uuid
 import json
 
+from app.core.media_scheduler import JobPriority, estimate_encode_memory_mb, get_media_scheduler
 from app.schemas.video_upload import VideoProcessingOptions, VideoMetadataResponse
+from app.services.video_processing.processing_plan import (
+    COMPRESSION_SETTINGS,
+    OPTIMIZE_QUALITY_SETTINGS,
+    ProcessingPlan,
+    get_cpu_budget,
+    plan_processing,
+    summarize_outputs,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +31,7 @@ class VideoUploadProcessor:
     def __init__(self):
         self.ffmpeg_path = "ffmpeg"  # Assumes ffmpeg is in PATH
         self.ffprobe_path = "ffprobe"  # Assumes ffprobe is in PATH
+        self.cpu_budget = get_cpu_budget()
         
     async def process_video(
         self, 
@@ -42,38 +53,35 @@ class VideoUploadProcessor:
                 "original_path": str(video_path),
                 "metadata": {},
                 "processed_files": {},
-                "processing_status": "completed"
+                "processing_status": "completed",
+                "stage_timings": {}
             }
+            timings = results["stage_timings"]
             
             # Extract video metadata
+            stage_start = time.perf_counter()
             metadata = await self.extract_metadata(video_path)
             results["metadata"] = metadata
-            
-            # Generate thumbnail if requested
-            if processing_options.generate_thumbnail:
-                thumbnail_path = await self.generate_thumbnail(video_path)
-                results["processed_files"]["thumbnail"] = str(thumbnail_path)
-            
-            # Extract audio if requested
-            if processing_options.extract_audio:
-                audio_path = await self.extract_audio(video_path)
-                results["processed_files"]["audio"] = str(audio_path)
-            
-            # Optimize for platform if requested
-            if processing_options.optimize_for_platform:
-                optimized_path = await self.optimize_for_platform(
-                    video_path, 
-                    processing_options.target_quality
-                )
-                results["processed_files"]["optimized"] = str(optimized_path)
-            
-            # Compress video if requested
-            if processing_options.compress_video:
-                compressed_path = await self.compress_video(
-                    video_path,
-                    processing_options.target_quality
-                )
-                results["processed_files"]["compressed"] = str(compressed_path)
+            timings["probe"] = time.perf_counter() - stage_start
+            
+            # Produce every requested output from a single decode of the source
+            plan = plan_processing(video_path, processing_options, self.cpu_budget)
+            if not plan.outputs:
+                return results
+            
+            stage_start = time.perf_counter()
+            try:
+                await self.run_processing_plan(plan)
+                timings["single_pass"] = time.perf_counter() - stage_start
+                results["decode_passes"] = 1
+            except Exception as e:
+                logger.warning(f"Single-pass processing failed, falling back to per-output encodes: {e}")
+                timings.update(await self._run_outputs_separately(video_path, processing_options, plan))
+                results["decode_passes"] = len(plan.outputs)
+            
+            for output in plan.outputs:
+                results["processed_files"][output.stage] = str(output.path)
+            results["outputs"] = summarize_outputs(plan)
             
             return results
             
@@ -87,6 +95,55 @@ class VideoUploadProcessor:
                 "error": str(e)
             }
     
+    async def run_processing_plan(self, plan: ProcessingPlan):
+        """
+        Execute a processing plan as one ffmpeg invocation
+        
+        Args:
+            plan: Plan built by plan_processing
+        """
+        def build_command(threads: int):
+            # Split whatever the host-wide scheduler granted across the plan's encoders
+            plan.allocate_threads(threads)
+            return plan.build_command(self.ffmpeg_path)
+        
+        encoders = max(1, sum(1 for output in plan.outputs if output.encoder_weight))
+        returncode, stdout, stderr = await get_media_scheduler().run(
+            build_command,
+            "process_upload",
+            JobPriority.STANDARD,
+            cpu_min=min(2, self.cpu_budget),
+            cpu_max=self.cpu_budget,
+            memory_mb=estimate_encode_memory_mb() * encoders
+        )
+        
+        if returncode != 0:
+            raise Exception(f"Single-pass processing failed: {stderr.decode()[-2000:]}")
+    
+    async def _run_outputs_separately(
+        self,
+        video_path: Path,
+        processing_options: VideoProcessingOptions,
+        plan: ProcessingPlan
+    ) -> Dict[str, float]:
+        """Produce each planned output with its own ffmpeg run, concurrently"""
+        stage_methods = {
+            "thumbnail": lambda: self.generate_thumbnail(video_path),
+            "audio": lambda: self.extract_audio(video_path),
+            "optimized": lambda: self.optimize_for_platform(video_path, processing_options.target_quality),
+            "compressed": lambda: self.compress_video(video_path, processing_options.target_quality)
+        }
+        
+        # Each run is admitted by the host-wide media scheduler, which bounds concurrency
+        async def run_stage(stage: str) -> float:
+            stage_start = time.perf_counter()
+            await stage_methods[stage]()
+            return time.perf_counter() - stage_start
+        
+        stages = [output.stage for output in plan.outputs]
+        durations = await asyncio.gather(*[run_stage(stage) for stage in stages])
+        return dict(zip(stages, durations))
+    
     async def extract_metadata(self, video_path: Path) -> VideoMetadataResponse:
         """
         Extract metadata from video file using ffprobe
@@ -108,15 +165,11 @@ class VideoUploadProcessor:
                 str(video_path)
             ]
             
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            returncode, stdout, stderr = await get_media_scheduler().run(
+                cmd, "ffprobe", JobPriority.INTERACTIVE, memory_mb=64
             )
             
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
+            if returncode != 0:
                 raise Exception(f"ffprobe failed: {stderr.decode()}")
             
             metadata = json.loads(stdout.decode())
@@ -185,15 +238,11 @@ class VideoUploadProcessor:
                 str(thumbnail_path)
             ]
             
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            returncode, stdout, stderr = await get_media_scheduler().run(
+                cmd, "thumbnail", JobPriority.INTERACTIVE, memory_mb=128
             )
             
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
+            if returncode != 0:
                 raise Exception(f"Thumbnail generation failed: {stderr.decode()}")
             
             return thumbnail_path
@@ -225,15 +274,11 @@ class VideoUploadProcessor:
                 str(audio_path)
             ]
             
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            returncode, stdout, stderr = await get_media_scheduler().run(
+                cmd, "extract_audio", JobPriority.STANDARD, memory_mb=128
             )
             
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
+            if returncode != 0:
                 raise Exception(f"Audio extraction failed: {stderr.decode()}")
             
             return audio_path
@@ -256,14 +301,7 @@ class VideoUploadProcessor:
         try:
             optimized_path = video_path.parent / f"{video_path.stem}_optimized.mp4"
             
-            # Quality settings
-            quality_settings = {
-                "low": {"crf": "28", "preset": "fast"},
-                "medium": {"crf": "23", "preset": "medium"},
-                "high": {"crf": "18", "preset": "slow"}
-            }
-            
-            settings = quality_settings.get(quality, quality_settings["medium"])
+            settings = OPTIMIZE_QUALITY_SETTINGS.get(quality, OPTIMIZE_QUALITY_SETTINGS["medium"])
             
             cmd = [
                 self.ffmpeg_path,
@@ -278,15 +316,12 @@ class VideoUploadProcessor:
                 str(optimized_path)
             ]
             
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            returncode, stdout, stderr = await get_media_scheduler().run(
+                cmd, "optimize", JobPriority.STANDARD,
+                cpu_min=min(2, self.cpu_budget), cpu_max=self.cpu_budget, memory_mb=estimate_encode_memory_mb()
             )
             
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
+            if returncode != 0:
                 raise Exception(f"Video optimization failed: {stderr.decode()}")
             
             return optimized_path
@@ -309,14 +344,7 @@ class VideoUploadProcessor:
         try:
             compressed_path = video_path.parent / f"{video_path.stem}_compressed.mp4"
             
-            # Compression settings
-            compression_settings = {
-                "low": {"scale": "720:-2", "crf": "30"},
-                "medium": {"scale": "1080:-2", "crf": "26"},
-                "high": {"scale": "1920:-2", "crf": "22"}
-            }
-            
-            settings = compression_settings.get(quality, compression_settings["medium"])
+            settings = COMPRESSION_SETTINGS.get(quality, COMPRESSION_SETTINGS["medium"])
             
             cmd = [
                 self.ffmpeg_path,
@@ -331,15 +359,12 @@ class VideoUploadProcessor:
                 str(compressed_path)
             ]
             
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            returncode, stdout, stderr = await get_media_scheduler().run(
+                cmd, "compress", JobPriority.STANDARD,
+                cpu_min=min(2, self.cpu_budget), cpu_max=self.cpu_budget, memory_mb=estimate_encode_memory_mb()
             )
             
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
+            if returncode != 0:
                 raise Exception(f"Video compression failed: {stderr.decode()}")
             
             return compressed_path
@@ -1,5 +1,11 @@
-from .brand_tasks import assimilate_brand
+from .brand_tasks import assimilate_brand, brand_scraping_failed
 from .content_tasks import generate_ideas, generate_blueprint, generate_video
+from .scraping_tasks import (
+    enhanced_brand_scraping, product_catalog_scraping, competitor_discovery,
+    price_monitoring, price_history_maintenance, ingest_apify_dataset
+)
+from .maintenance_tasks import result_store_cleanup
+from .trend_tasks import refresh_trend_snapshots
 from .social_media_tasks import (
     process_scheduled_posts, sync_all_analytics, sync_brand_analytics,
     retry_failed_posts, process_webhook_event, refresh_account_tokens,
@@ -1,8 +1,8 @@
 import uuid
 import httpx
-import asyncio
 from celery import current_task
 from sqlalchemy.orm import Session
+from app.core.async_runtime import run_async
 from app.core.celery_app import celery_app
 from app.db.session import SessionLocal
 from app.models import Brand, Asset, Job
@@ -13,44 +13,60 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-@celery_app.task(name="assimilate_brand")
-def assimilate_brand(user_id: int, url: str, job_id: str, use_enhanced_scraping: bool = True):
+
+def _update_job(db: Session, job: Job, progress: int, **fields):
+    """Record progress on the job row the API polls"""
+    if job:
+        job.progress = progress
+        for name, value in fields.items():
+            setattr(job, name, value)
+        db.commit()
+
+
+@celery_app.task(name="assimilate_brand", bind=True)
+def assimilate_brand(self, user_id: int, url: str, job_id: str, use_enhanced_scraping: bool = True):
     """
     Background task to assimilate a brand from URL
     Uses enhanced scraping system if available, falls back to original implementation
+    
+    The enhanced path replaces this task with enhanced_brand_scraping rather
+    than waiting for it, so no worker slot is held while scraping runs. If it
+    fails, brand_scraping_failed queues the original implementation.
     """
+    if use_enhanced_scraping:
+        db = SessionLocal()
+        try:
+            job = db.query(Job).filter(Job.job_id == job_id).first()
+            _update_job(db, job, 10, status="processing")
+        finally:
+            db.close()
+        
+        scraping = enhanced_brand_scraping.si(
+            user_id, url, job_id, {"use_playwright": False, "fallback_on_failure": True}
+        )
+        scraping.link_error(brand_scraping_failed.s(user_id, url, job_id))
+        
+        # Continues under this task's id, so the caller's AsyncResult follows it
+        return self.replace(scraping)
+    
     db = SessionLocal()
+    job = None
     try:
         # Update job status to processing
         job = db.query(Job).filter(Job.job_id == job_id).first()
-        if job:
-            job.status = "processing"
-            job.progress = 10
-            db.commit()
-        
-        if use_enhanced_scraping:
-            # Use the new enhanced scraping system
-            try:
-                result = enhanced_brand_scraping.apply_async(
-                    args=[user_id, url, job_id, {"use_playwright": False}]
-                )
-                return result.get()  # Wait for completion
-            except Exception as e:
-                logger.warning(f"Enhanced scraping failed, falling back to original: {e}")
-                # Fall through to original implementation
+        _update_job(db, job, 10, status="processing")
         
-        # Original implementation as fallback
+        # Original implementation
         current_task.update_state(state="PROGRESS", meta={"progress": 25})
+        _update_job(db, job, 25)
         
         # Try to use AI brand assimilation service
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            brand_service = loop.run_until_complete(get_brand_assimilation_service())
-            brand_kit = loop.run_until_complete(brand_service.assimilate_brand(url))
+            brand_service = run_async(get_brand_assimilation_service())
+            brand_kit = run_async(brand_service.assimilate_brand(url))
             
             current_task.update_state(state="PROGRESS", meta={"progress": 60})
+            _update_job(db, job, 60)
             
             # Create brand record from AI analysis
             brand = Brand(
@@ -67,8 +83,6 @@ def assimilate_brand(user_id: int, url: str, job_id: str, use_enhanced_scraping:
                 competitors=brand_kit.competitors
             )
             
-            loop.close()
-            
         except Exception as e:
             logger.warning(f"AI brand assimilation failed, using simple extraction: {e}")
             
@@ -138,4 +152,17 @@ def assimilate_brand(user_id: int, url: str, job_id: str, use_enhanced_scraping:
             
         raise e
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@celery_app.task(name="brand_scraping_failed")
+def brand_scraping_failed(request, exc, traceback, user_id: int, url: str, job_id: str):
+    """
+    Error callback of enhanced brand scraping: queue the original implementation
+    """
+    logger.warning(f"Enhanced scraping failed for {url}, falling back to original: {exc}")
+    
+    assimilate_brand.apply_async(
+        args=[user_id, url, job_id],
+        kwargs={"use_enhanced_scraping": False}
+    )
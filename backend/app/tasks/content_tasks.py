@@ -1,20 +1,30 @@
+import asyncio
 import uuid
-import random
+from typing import Any, Dict, List
 from celery import current_task
 from sqlalchemy.orm import Session
+from app.core.async_runtime import run_async
 from app.core.celery_app import celery_app
-from app.db.session import SessionLocal
-from app.models import Brand, Idea, Blueprint, Video, Job
+from app.db.session import SessionLocal, in_session
+from app.models import Brand, Idea, Blueprint, Video, Job, Product
+from app.services.ai.viral_content import get_viral_content_service
 import logging
 
 logger = logging.getLogger(__name__)
 
+IDEAS_PER_REQUEST = 5
+
 @celery_app.task(name="generate_ideas")
-def generate_ideas(brand_id: int, campaign_id: int, job_id: str):
+def generate_ideas(brand_id: int, campaign_id: int, job_id: str, count: int = IDEAS_PER_REQUEST):
     """
     Background task to generate viral content ideas
+
+    Each idea is stored as soon as it is generated, and the job result and
+    task state carry the ideas so far, so they reach the UI before the whole
+    batch is done.
     """
     db = SessionLocal()
+    job = None
     try:
         # Update job status
         job = db.query(Job).filter(Job.job_id == job_id).first()
@@ -28,32 +38,21 @@ def generate_ideas(brand_id: int, campaign_id: int, job_id: str):
         if not brand:
             raise ValueError("Brand not found")
         
-        current_task.update_state(state="PROGRESS", meta={"progress": 30})
-        
-        # Generate mock ideas (in real implementation, this would use AI)
-        idea_hooks = [
-            f"3 Mistakes Every {brand.name} Customer Makes",
-            f"Why {brand.name} Is Better Than The Competition",
-            f"Behind The Scenes: How {brand.name} Products Are Made",
-            f"Customer Transformation Using {brand.name}",
-            f"The Secret {brand.name} Doesn't Want You To Know"
+        brand_data = {
+            "name": brand.name,
+            "industry": brand.industry,
+            "target_audience": brand.target_audience or {},
+            "value_proposition": brand.unique_value_proposition or "",
+            "pillars": brand.pillars or []
+        }
+        products = [
+            {"name": product.name, "description": product.description}
+            for product in db.query(Product).filter(Product.brand_id == brand_id).limit(5)
         ]
         
-        ideas = []
-        for i, hook in enumerate(idea_hooks):
-            current_task.update_state(state="PROGRESS", meta={"progress": 30 + (i * 10)})
-            
-            idea = Idea(
-                brand_id=brand_id,
-                campaign_id=campaign_id if campaign_id else None,
-                hook=hook,
-                viral_score=round(random.uniform(7.0, 9.9), 1),
-                status="pending"
-            )
-            db.add(idea)
-            ideas.append(idea)
+        current_task.update_state(state="PROGRESS", meta={"progress": 30})
         
-        db.commit()
+        ideas = run_async(_stream_ideas(brand_id, campaign_id, job_id, brand_data, products, count))
         
         # Update job as complete
         if job:
@@ -62,7 +61,7 @@ def generate_ideas(brand_id: int, campaign_id: int, job_id: str):
             job.result = {
                 "message": "Ideas generated successfully.",
                 "ideasGenerated": len(ideas),
-                "ideas": [{"ideaId": idea.id, "hook": idea.hook, "viralScore": idea.viral_score} for idea in ideas]
+                "ideas": ideas
             }
             db.commit()
         
@@ -80,6 +79,61 @@ def generate_ideas(brand_id: int, campaign_id: int, job_id: str):
     finally:
         db.close()
 
+async def _stream_ideas(
+    brand_id: int,
+    campaign_id: int,
+    job_id: str,
+    brand_data: Dict[str, Any],
+    products: List[Dict[str, Any]],
+    count: int
+) -> List[Dict[str, Any]]:
+    """Store and publish ideas in the order they finish generating"""
+    service = await get_viral_content_service()
+    
+    ideas = []
+    async for content_idea in service.stream_ideas(brand_data, products, count):
+        progress = 30 + int(60 * (len(ideas) + 1) / count)
+        idea = await asyncio.to_thread(
+            in_session, _store_idea, brand_id, campaign_id, job_id, content_idea, ideas, progress
+        )
+        ideas.append(idea)
+        current_task.update_state(state="PROGRESS", meta={"progress": progress, "ideas": list(ideas)})
+    
+    return ideas
+
+def _store_idea(
+    db: Session,
+    brand_id: int,
+    campaign_id: int,
+    job_id: str,
+    content_idea: Dict[str, Any],
+    previous: List[Dict[str, Any]],
+    progress: int
+) -> Dict[str, Any]:
+    """Save one generated idea and the job's partial result together"""
+    best_hook = max(content_idea["hooks"], key=lambda hook: hook["viral_score"])
+    idea = Idea(
+        brand_id=brand_id,
+        campaign_id=campaign_id if campaign_id else None,
+        hook=best_hook["text"],
+        viral_score=round(best_hook["viral_score"], 1),
+        status="pending"
+    )
+    db.add(idea)
+    db.flush()
+    
+    summary = {"ideaId": idea.id, "hook": idea.hook, "viralScore": idea.viral_score}
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    if job:
+        job.progress = progress
+        job.result = {
+            "message": "Generating ideas...",
+            "ideasGenerated": len(previous) + 1,
+            "ideas": previous + [summary]
+        }
+    db.commit()
+    return summary
+
 @celery_app.task(name="generate_blueprint")
 def generate_blueprint(idea_id: int, job_id: str):
     """
@@ -0,0 +1,16 @@
+from app.core.celery_app import celery_app
+from app.core.result_store import get_result_store
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="result_store_cleanup")
+def result_store_cleanup():
+    """
+    Delete externally stored task results whose metadata has expired
+    """
+    stats = get_result_store().cleanup()
+    if stats["removed"]:
+        logger.info(f"Removed {stats['removed']} expired task results ({stats['bytes_freed']} bytes)")
+    return stats
@@ -10,17 +10,24 @@ from celery import current_task
 from sqlalchemy.orm import Session
 import logging
 
+from app.core.async_runtime import run_async
 from app.core.celery_app import celery_app
+from app.core.config import settings
 from app.db.session import SessionLocal
 from app.models import Brand, Job
 from app.models.product import (
-    Product, ProductPriceHistory, ScrapingJob, 
+    Product, ScrapingJob, 
     ScrapingSession, CompetitorBrand
 )
+from app.repositories.price_history import (
+    ensure_partitions, record_price_observations, roll_up_expired_months
+)
 from app.services.scraping import (
     BrandScraper, ProductScraper, PlaywrightScraper,
     EcommerceDetector, ProxyManager, AntiDetectionManager
 )
+from app.services.scraping.apify_client import ApifyAuthError
+from app.services.scraping.tiktok_ingest import ingest_apify_dataset as stream_apify_dataset
 
 logger = logging.getLogger(__name__)
 
@@ -29,8 +36,13 @@ logger = logging.getLogger(__name__)
 def enhanced_brand_scraping(user_id: int, url: str, job_id: str, config: Dict[str, Any] = None):
     """
     Enhanced brand scraping with comprehensive data extraction
+    
+    With ``config["fallback_on_failure"]`` a failure leaves the job record
+    processing, because an error callback continues the onboarding.
     """
+    config = config or {}
     db = SessionLocal()
+    job = None
     scraping_job = None
     
     try:
@@ -47,7 +59,7 @@ def enhanced_brand_scraping(user_id: int, url: str, job_id: str, config: Dict[st
             job_id=job_id,
             job_type="enhanced_brand_scraping",
             target_urls=[url],
-            scraping_config=config or {},
+            scraping_config=config,
             status="running",
             progress=10
         )
@@ -55,19 +67,19 @@ def enhanced_brand_scraping(user_id: int, url: str, job_id: str, config: Dict[st
         db.commit()
         
         current_task.update_state(state="PROGRESS", meta={"progress": 15})
+        if job:
+            job.progress = 15
+            db.commit()
         
         # Run scraping asynchronously
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(
-                _run_enhanced_brand_scraping(url, config or {}, scraping_job.id, db)
-            )
-        finally:
-            loop.close()
+        result = run_async(
+            _run_enhanced_brand_scraping(url, config, scraping_job.id, db)
+        )
         
         current_task.update_state(state="PROGRESS", meta={"progress": 80})
+        if job:
+            job.progress = 80
+            db.commit()
         
         # Create or update brand record
         brand = _create_or_update_brand(user_id, url, result, db)
@@ -113,7 +125,7 @@ def enhanced_brand_scraping(user_id: int, url: str, job_id: str, config: Dict[st
             scraping_job.error_message = str(e)
         
         # Update main job
-        if job:
+        if job and not config.get("fallback_on_failure"):
             job.status = "failed"
             job.error = str(e)
         
@@ -149,15 +161,9 @@ def product_catalog_scraping(brand_id: int, urls: List[str], job_id: str, config
         current_task.update_state(state="PROGRESS", meta={"progress": 5})
         
         # Run product scraping
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            results = loop.run_until_complete(
-                _run_product_catalog_scraping(urls, config or {}, scraping_job.id, db)
-            )
-        finally:
-            loop.close()
+        results = run_async(
+            _run_product_catalog_scraping(urls, config or {}, scraping_job.id, db)
+        )
         
         # Process results
         products_created = 0
@@ -236,15 +242,9 @@ def competitor_discovery(brand_id: int, job_id: str, config: Dict[str, Any] = No
         current_task.update_state(state="PROGRESS", meta={"progress": 10})
         
         # Run competitor discovery
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            competitors = loop.run_until_complete(
-                _run_competitor_discovery(brand, config or {}, scraping_job.id, db)
-            )
-        finally:
-            loop.close()
+        competitors = run_async(
+            _run_competitor_discovery(brand, config or {}, scraping_job.id, db)
+        )
         
         # Store competitor data
         competitors_added = 0
@@ -312,35 +312,29 @@ def price_monitoring(product_ids: List[int], job_id: str):
         current_task.update_state(state="PROGRESS", meta={"progress": 10})
         
         # Run price monitoring
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            results = loop.run_until_complete(
-                _run_price_monitoring(products, scraping_job.id, db)
-            )
-        finally:
-            loop.close()
+        results = run_async(
+            _run_price_monitoring(products, scraping_job.id, db)
+        )
         
         # Process results and update price history
         price_updates = 0
+        observations = []
         for result in results:
             if result.get("success") and result.get("price_data"):
                 price_data = result["price_data"]
                 product_id = result["product_id"]
                 
-                # Create price history record
-                price_history = ProductPriceHistory(
-                    product_id=product_id,
-                    price=price_data.get("price"),
-                    original_price=price_data.get("original_price"),
-                    currency=price_data.get("currency", "USD"),
-                    discount_percentage=price_data.get("discount_percentage"),
-                    availability=price_data.get("availability"),
-                    in_stock=price_data.get("availability") == "in_stock",
-                    source_url=price_data.get("source_url")
-                )
-                db.add(price_history)
+                if price_data.get("price") is not None:
+                    observations.append({
+                        "product_id": product_id,
+                        "price": price_data.get("price"),
+                        "original_price": price_data.get("original_price"),
+                        "currency": price_data.get("currency") or "USD",
+                        "discount_percentage": price_data.get("discount_percentage"),
+                        "availability": price_data.get("availability"),
+                        "in_stock": price_data.get("availability") == "in_stock",
+                        "source_url": price_data.get("source_url")
+                    })
                 
                 # Update product with latest price
                 product = db.query(Product).filter(Product.id == product_id).first()
@@ -351,6 +345,9 @@ def price_monitoring(product_ids: List[int], job_id: str):
                 
                 price_updates += 1
         
+        # Only observations that change the stored price state are written
+        price_changes = record_price_observations(db, observations)
+        
         # Update scraping job
         scraping_job.status = "completed"
         scraping_job.progress = 100
@@ -362,7 +359,8 @@ def price_monitoring(product_ids: List[int], job_id: str):
         return {
             "success": True,
             "productsMonitored": len(products),
-            "priceUpdates": price_updates
+            "priceUpdates": price_updates,
+            "priceChanges": price_changes
         }
         
     except Exception as e:
@@ -379,6 +377,64 @@ def price_monitoring(product_ids: List[int], job_id: str):
         db.close()
 
 
+@celery_app.task(name="price_history_maintenance")
+def price_history_maintenance():
+    """
+    Create upcoming price history partitions and roll up expired months
+    """
+    db = SessionLocal()
+    
+    try:
+        partitions = ensure_partitions(db, settings.PRICE_HISTORY_PARTITIONS_AHEAD)
+        db.commit()
+        
+        rolled_up = roll_up_expired_months(db, settings.PRICE_HISTORY_RAW_RETENTION_DAYS)
+        db.commit()
+        
+        return {
+            "success": True,
+            "partitions": partitions,
+            "rolledUpMonths": [month.isoformat() for month in rolled_up]
+        }
+        
+    except Exception as e:
+        logger.error(f"Price history maintenance failed: {str(e)}")
+        db.rollback()
+        raise e
+        
+    finally:
+        db.close()
+
+
+@celery_app.task(name="ingest_apify_dataset", bind=True, max_retries=5)
+def ingest_apify_dataset(self, apify_run_id: str, job_type: str = None):
+    """
+    Stream a finished Apify TikTok run into the TikTok tables
+    
+    Retries resume from the last ingested dataset page.
+    """
+    try:
+        return run_async(_ingest_apify_dataset(apify_run_id, job_type))
+    
+    except ApifyAuthError:
+        raise
+    
+    except Exception as e:
+        logger.error(f"Apify dataset ingest failed for run {apify_run_id}: {str(e)}")
+        raise self.retry(exc=e, countdown=min(60 * 2 ** self.request.retries, 900))
+
+
+async def _ingest_apify_dataset(apify_run_id: str, job_type: str = None) -> Dict[str, Any]:
+    checkpoint = await stream_apify_dataset(apify_run_id, job_type)
+    return {
+        "success": True,
+        "apifyRunId": apify_run_id,
+        "itemsIngested": checkpoint["next_offset"],
+        "pages": checkpoint["pages_ingested"],
+        "counts": checkpoint["counts"]
+    }
+
+
 async def _run_enhanced_brand_scraping(url: str, config: Dict[str, Any], 
                                      job_id: int, db: Session) -> Dict[str, Any]:
     """
@@ -0,0 +1,48 @@
+from typing import Optional
+import logging
+
+from app.core.async_runtime import run_async
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.ai.trend_analyzer import get_trend_analysis_service
+from app.services.ai.trend_snapshots import snapshots_to_refresh
+from app.services.ai.viral_content import Platform
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="refresh_trend_snapshots")
+def refresh_trend_snapshots(platform: Optional[str] = None):
+    """
+    Incrementally rebuild recently requested trend snapshots
+
+    Runs periodically, and after a TikTok/Apify ingest with ``platform`` set
+    so only snapshots covering that platform are rebuilt. Platforms whose
+    source data did not change reuse their stored detections.
+    """
+    db = SessionLocal()
+    try:
+        snapshots = snapshots_to_refresh(db, settings.TREND_SNAPSHOT_IDLE_DAYS, platform)
+    finally:
+        db.close()
+
+    refreshed = []
+    failed = []
+    for snapshot in snapshots:
+        try:
+            run_async(_refresh_snapshot(snapshot["platforms"], snapshot["industry_keywords"]))
+            refreshed.append(snapshot["snapshot_key"])
+        except Exception as e:
+            # One broken snapshot must not keep the others stale
+            logger.error(f"Trend snapshot refresh failed for {snapshot['snapshot_key']!r}: {str(e)}")
+            failed.append(snapshot["snapshot_key"])
+
+    if refreshed:
+        logger.info(f"Refreshed {len(refreshed)} trend snapshots")
+    return {"platform": platform, "refreshed": refreshed, "failed": failed}
+
+
+async def _refresh_snapshot(platforms, industry_keywords):
+    service = await get_trend_analysis_service()
+    await service.refresh_trend_snapshot([Platform(p) for p in platforms], industry_keywords)
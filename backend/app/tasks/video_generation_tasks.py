@@ -2,12 +2,12 @@
 Celery tasks for video generation workflows
 """
 
-import asyncio
 import logging
 import time
 from typing import Dict, Any, List, Optional
 from celery import Task, group, chain, chord
 
+from app.core.async_runtime import run_async
 from app.core.celery_app import celery_app
 from app.services.video_generation.orchestrator import (
     VideoGenerationOrchestrator, VideoGenerationRequest, WorkflowType,
@@ -90,32 +90,25 @@ def generate_video_task(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
         orchestrator = get_video_generation_orchestrator()
         
         # Run async orchestrator in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            # Create request object from data
-            request = create_video_generation_request_from_dict(request_data)
-            
-            # Update progress
-            self.update_state(
-                state="PROGRESS", 
-                meta={"step": "script_generation", "progress": 20}
-            )
-            
-            # Generate video
-            result = loop.run_until_complete(orchestrator.generate_video(request))
-            
-            # Update progress
-            self.update_state(
-                state="PROGRESS",
-                meta={"step": "completed", "progress": 100}
-            )
-            
-            return result.to_dict()
-            
-        finally:
-            loop.close()
+        # Create request object from data
+        request = create_video_generation_request_from_dict(request_data)
+        
+        # Update progress
+        self.update_state(
+            state="PROGRESS", 
+            meta={"step": "script_generation", "progress": 20}
+        )
+        
+        # Generate video
+        result = run_async(orchestrator.generate_video(request))
+        
+        # Update progress
+        self.update_state(
+            state="PROGRESS",
+            meta={"step": "completed", "progress": 100}
+        )
+        
+        return result.to_dict()
     
     except Exception as e:
         logger.error(f"Video generation task {task_id} failed: {e}")
@@ -144,30 +137,23 @@ def generate_script_task(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
         script_service = get_script_generation_service()
         
         # Run async script generation
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            request = create_script_generation_request_from_dict(request_data)
-            
-            self.update_state(
-                state="PROGRESS",
-                meta={"step": "generating_script", "progress": 50}
-            )
-            
-            script_result = loop.run_until_complete(
-                script_service.generate_script(request)
-            )
-            
-            self.update_state(
-                state="PROGRESS",
-                meta={"step": "completed", "progress": 100}
-            )
-            
-            return script_result.to_dict()
-            
-        finally:
-            loop.close()
+        request = create_script_generation_request_from_dict(request_data)
+        
+        self.update_state(
+            state="PROGRESS",
+            meta={"step": "generating_script", "progress": 50}
+        )
+        
+        script_result = run_async(
+            script_service.generate_script(request)
+        )
+        
+        self.update_state(
+            state="PROGRESS",
+            meta={"step": "completed", "progress": 100}
+        )
+        
+        return script_result.to_dict()
     
     except Exception as e:
         logger.error(f"Script generation task {task_id} failed: {e}")
@@ -196,67 +182,60 @@ def generate_ugc_batch_task(self, request_data: Dict[str, Any]) -> Dict[str, Any
         ugc_service = get_ugc_generation_service()
         
         # Run async UGC generation
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            # Parse request data
-            product_data = request_data["product"]
-            reviews_data = request_data["reviews"]
-            batch_config = request_data["batch_config"]
-            
-            # Create review objects
-            review_objects = []
-            for review_dict in reviews_data:
-                review_data = ReviewData(
-                    original_text=review_dict.get("text", ""),
-                    rating=review_dict.get("rating", 5.0),
-                    reviewer_name=review_dict.get("reviewer_name"),
-                    review_source=review_dict.get("source", "manual"),
-                    sentiment=review_dict.get("sentiment", "positive"),
-                    key_points=review_dict.get("key_points", []),
-                    emotions=review_dict.get("emotions", []),
-                    product_benefits_mentioned=review_dict.get("benefits", []),
-                    pain_points_addressed=review_dict.get("pain_points", []),
-                    credibility_score=review_dict.get("credibility_score", 0.0)
-                )
-                review_objects.append(review_data)
-            
-            self.update_state(
-                state="PROGRESS",
-                meta={"step": "generating_testimonials", "progress": 30}
-            )
-            
-            # Generate testimonials
-            from app.models.product import Product
-            product = Product(**product_data)
-            
-            results = loop.run_until_complete(
-                ugc_service.generate_batch_testimonials(
-                    product=product,
-                    reviews=review_objects,
-                    batch_config=batch_config
-                )
+        # Parse request data
+        product_data = request_data["product"]
+        reviews_data = request_data["reviews"]
+        batch_config = request_data["batch_config"]
+        
+        # Create review objects
+        review_objects = []
+        for review_dict in reviews_data:
+            review_data = ReviewData(
+                original_text=review_dict.get("text", ""),
+                rating=review_dict.get("rating", 5.0),
+                reviewer_name=review_dict.get("reviewer_name"),
+                review_source=review_dict.get("source", "manual"),
+                sentiment=review_dict.get("sentiment", "positive"),
+                key_points=review_dict.get("key_points", []),
+                emotions=review_dict.get("emotions", []),
+                product_benefits_mentioned=review_dict.get("benefits", []),
+                pain_points_addressed=review_dict.get("pain_points", []),
+                credibility_score=review_dict.get("credibility_score", 0.0)
             )
-            
-            self.update_state(
-                state="PROGRESS",
-                meta={"step": "completed", "progress": 100}
+            review_objects.append(review_data)
+        
+        self.update_state(
+            state="PROGRESS",
+            meta={"step": "generating_testimonials", "progress": 30}
+        )
+        
+        # Generate testimonials
+        from app.models.product import Product
+        product = Product(**product_data)
+        
+        results = run_async(
+            ugc_service.generate_batch_testimonials(
+                product=product,
+                reviews=review_objects,
+                batch_config=batch_config
             )
-            
-            # Convert results to serializable format
-            testimonials = []
-            for result in results:
-                testimonials.append(result.to_dict())
-            
-            return {
-                "total_generated": len(testimonials),
-                "total_cost": sum(r["cost"] for r in testimonials),
-                "testimonials": testimonials
-            }
-            
-        finally:
-            loop.close()
+        )
+        
+        self.update_state(
+            state="PROGRESS",
+            meta={"step": "completed", "progress": 100}
+        )
+        
+        # Convert results to serializable format
+        testimonials = []
+        for result in results:
+            testimonials.append(result.to_dict())
+        
+        return {
+            "total_generated": len(testimonials),
+            "total_cost": sum(r["cost"] for r in testimonials),
+            "testimonials": testimonials
+        }
     
     except Exception as e:
         logger.error(f"UGC batch generation task {task_id} failed: {e}")
@@ -285,38 +264,31 @@ def process_product_assets_task(self, product_data: Dict[str, Any]) -> Dict[str,
         asset_service = get_asset_management_service()
         
         # Run async asset processing
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            from app.models.product import Product
-            product = Product(**product_data)
-            
-            self.update_state(
-                state="PROGRESS",
-                meta={"step": "analyzing_quality", "progress": 50}
-            )
-            
-            assets = loop.run_until_complete(
-                asset_service.extract_product_assets(product)
-            )
-            
-            self.update_state(
-                state="PROGRESS",
-                meta={"step": "completed", "progress": 100}
-            )
-            
-            # Convert assets to serializable format
-            asset_dicts = [asset.to_dict() for asset in assets]
-            
-            return {
-                "product_id": str(product.id),
-                "total_assets": len(asset_dicts),
-                "assets": asset_dicts
-            }
-            
-        finally:
-            loop.close()
+        from app.models.product import Product
+        product = Product(**product_data)
+        
+        self.update_state(
+            state="PROGRESS",
+            meta={"step": "analyzing_quality", "progress": 50}
+        )
+        
+        assets = run_async(
+            asset_service.extract_product_assets(product)
+        )
+        
+        self.update_state(
+            state="PROGRESS",
+            meta={"step": "completed", "progress": 100}
+        )
+        
+        # Convert assets to serializable format
+        asset_dicts = [asset.to_dict() for asset in assets]
+        
+        return {
+            "product_id": str(product.id),
+            "total_assets": len(asset_dicts),
+            "assets": asset_dicts
+        }
     
     except Exception as e:
         logger.error(f"Product asset processing task {task_id} failed: {e}")
@@ -345,32 +317,25 @@ def assemble_video_task(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
         assembly_service = get_video_assembly_service()
         
         # Run async video assembly
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            # Create project object from data
-            from app.models.video_project import VideoProject
-            project = VideoProject(**project_data)
-            
-            self.update_state(
-                state="PROGRESS",
-                meta={"step": "downloading_assets", "progress": 30}
-            )
-            
-            result = loop.run_until_complete(
-                assembly_service.assemble_video_project(project)
-            )
-            
-            self.update_state(
-                state="PROGRESS",
-                meta={"step": "ffmpeg_processing", "progress": 80}
-            )
-            
-            return result
-            
-        finally:
-            loop.close()
+        # Create project object from data
+        from app.models.video_project import VideoProject
+        project = VideoProject(**project_data)
+        
+        self.update_state(
+            state="PROGRESS",
+            meta={"step": "downloading_assets", "progress": 30}
+        )
+        
+        result = run_async(
+            assembly_service.assemble_video_project(project)
+        )
+        
+        self.update_state(
+            state="PROGRESS",
+            meta={"step": "ffmpeg_processing", "progress": 80}
+        )
+        
+        return result
     
     except Exception as e:
         logger.error(f"Video assembly task {task_id} failed: {e}")
@@ -394,22 +359,15 @@ def cleanup_old_projects_task(self, max_age_hours: int = 24):
         # Clean up orchestrator projects
         orchestrator = get_video_generation_orchestrator()
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        run_async(
+            orchestrator.cleanup_completed_projects(max_age_hours)
+        )
         
-        try:
-            loop.run_until_complete(
-                orchestrator.cleanup_completed_projects(max_age_hours)
-            )
-            
-            # Clean up temporary asset files
-            asset_service = get_asset_management_service()
-            loop.run_until_complete(
-                asset_service.cleanup_temp_assets(max_age_hours)
-            )
-            
-        finally:
-            loop.close()
+        # Clean up temporary asset files
+        asset_service = get_asset_management_service()
+        run_async(
+            asset_service.cleanup_temp_assets(max_age_hours)
+        )
         
         logger.info(f"Cleanup task {task_id} completed")
         return {"status": "completed", "cleaned_hours": max_age_hours}
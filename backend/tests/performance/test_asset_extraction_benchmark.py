@@ -0,0 +1,79 @@
+"""
+Catalog-scale benchmark for product asset extraction.
+
+Reports products-per-minute of the one-product-at-a-time path and of
+extract_product_assets_batch. Network latency is simulated; image analysis
+runs for real in the shared analysis pool, so the gain from batching grows
+with the number of cores. Set ASSET_BENCHMARK_MIN_PPM to enforce a floor.
+"""
+
+import asyncio
+import os
+import time
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.services.video_generation.asset_management import AssetManagementService
+
+PRODUCTS = 12
+IMAGES_PER_PRODUCT = 3
+DOWNLOAD_LATENCY = 0.05
+
+
+def make_catalog():
+    rng = np.random.default_rng(42)
+    images = {}
+    products = []
+    for p in range(PRODUCTS):
+        urls = []
+        for i in range(IMAGES_PER_PRODUCT):
+            url = f"https://cdn.example.com/{p}/{i}.jpg"
+            output = BytesIO()
+            Image.fromarray(rng.integers(60, 200, (1080, 1440, 3), dtype=np.uint8)).save(output, "JPEG", quality=90)
+            images[url] = output.getvalue()
+            urls.append(url)
+        products.append(SimpleNamespace(id=p, name=f"Product {p}", images=urls, description=""))
+    return products, images
+
+
+def products_per_minute(elapsed: float) -> float:
+    return PRODUCTS / elapsed * 60
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_batch_extraction_throughput(tmp_path):
+    products, images = make_catalog()
+    service = AssetManagementService()
+    service.temp_dir = tmp_path
+
+    async def fake_download(url, session=None):
+        await asyncio.sleep(DOWNLOAD_LATENCY)
+        return images[url]
+
+    async def fake_upload(file_path, asset_id):
+        return f"https://storage.example.com/assets/{asset_id}.jpg"
+
+    with patch.object(service, "_download_asset", side_effect=fake_download), \
+            patch.object(service, "_upload_to_storage", side_effect=fake_upload):
+        # Warm up the analysis pool so worker start-up is not measured
+        await service.extract_product_assets(products[0])
+
+        start = time.perf_counter()
+        sequential = [await service.extract_product_assets(product) for product in products]
+        sequential_rate = products_per_minute(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batched = await service.extract_product_assets_batch(products)
+        batch_rate = products_per_minute(time.perf_counter() - start)
+
+    print(f"\nasset extraction: {sequential_rate:.0f} products/min sequential, {batch_rate:.0f} products/min batched")
+
+    assert sum(len(assets) for assets in sequential) == PRODUCTS * IMAGES_PER_PRODUCT
+    assert sum(len(assets) for assets in batched.values()) == PRODUCTS * IMAGES_PER_PRODUCT
+    assert batch_rate >= float(os.environ.get("ASSET_BENCHMARK_MIN_PPM", 0))
@@ -0,0 +1,123 @@
+"""
+Load benchmark for blocking vs async database access in async endpoints.
+
+Serves the same query from two ``async def`` routes: one through the sync
+psycopg2 session (the old pattern, which stalls the event loop for every
+round trip) and one through the asyncpg ``AsyncSession``. Concurrency is
+stepped up and, for each route, the best requests/sec whose p99 latency stays
+within ``DB_BENCHMARK_P99_MS`` is reported.
+
+Needs a PostgreSQL server: set BENCHMARK_DATABASE_URL to a sync
+``postgresql://`` URL to run it.
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+DATABASE_URL = os.environ.get("BENCHMARK_DATABASE_URL")
+P99_BUDGET = float(os.environ.get("DB_BENCHMARK_P99_MS", 100)) / 1000
+CONCURRENCY_LEVELS = (1, 4, 16, 32, 64)
+REQUESTS_PER_LEVEL = 400
+QUERY = text("SELECT pg_sleep(0.005), now()")  # A 5ms query, independent of test data
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="BENCHMARK_DATABASE_URL not set")
+
+
+def build_app() -> Tuple[FastAPI, List]:
+    sync_engine = create_engine(DATABASE_URL, pool_size=20, max_overflow=0)
+    async_url = make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
+    async_engine = create_async_engine(async_url, pool_size=20, max_overflow=0)
+
+    SyncSession = sessionmaker(bind=sync_engine)
+    AsyncSessionFactory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionFactory() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/blocking")
+    async def blocking(db: Session = Depends(get_sync_db)):
+        return {"now": str(db.execute(QUERY).one()[1])}
+
+    @app.get("/async")
+    async def non_blocking(db: AsyncSession = Depends(get_async_db)):
+        return {"now": str((await db.execute(QUERY)).one()[1])}
+
+    return app, [sync_engine, async_engine]
+
+
+async def run_level(client: httpx.AsyncClient, path: str, concurrency: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    remaining = REQUESTS_PER_LEVEL
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "rps": len(latencies) / elapsed,
+        "p99": statistics.quantiles(latencies, n=100)[98],
+    }
+
+
+def best_within_budget(results: List[Dict[str, float]]) -> float:
+    return max((result["rps"] for result in results if result["p99"] <= P99_BUDGET), default=0.0)
+
+
+@pytest.mark.slow
+@pytest.mark.db
+@pytest.mark.asyncio
+async def test_async_session_throughput_at_fixed_p99():
+    app, engines = build_app()
+    results: Dict[str, List[Dict[str, float]]] = {"/blocking": [], "/async": []}
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for path in results:
+                await run_level(client, path, 4)  # Warm up the pools
+                for concurrency in CONCURRENCY_LEVELS:
+                    results[path].append(await run_level(client, path, concurrency))
+    finally:
+        engines[0].dispose()
+        await engines[1].dispose()
+
+    print(f"\nDB access benchmark (p99 budget {P99_BUDGET * 1000:.0f}ms)")
+    for path, levels in results.items():
+        for level in levels:
+            print(f"  {path:10s} c={level['concurrency']:3d}  {level['rps']:7.0f} req/s  p99 {level['p99'] * 1000:6.1f}ms")
+
+    blocking_rps = best_within_budget(results["/blocking"])
+    async_rps = best_within_budget(results["/async"])
+    print(f"  best within budget: blocking {blocking_rps:.0f} req/s, async {async_rps:.0f} req/s")
+
+    assert async_rps > blocking_rps
@@ -0,0 +1,71 @@
+"""
+Columnar performance analytics benchmark over 50k content pieces.
+
+Each synthetic piece carries a handful of metrics with repeated
+observations, Zipf-distributed hashtags and audience segments, roughly what
+a month of TikTok analytics for a larger account looks like.
+"""
+
+import random
+import time
+
+import pytest
+
+from app.services.ai.performance_analyzer import ContentPerformance, MetricType, PerformanceMetric
+from app.services.ai.performance_frame import PerformanceFrame
+from app.services.ai.viral_content import Platform
+
+CONTENT = 50_000
+HASHTAGS = [f"#tag{i}" for i in range(2000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(HASHTAGS))]
+METRICS = [MetricType.LIKES, MetricType.COMMENTS, MetricType.SHARES, MetricType.IMPRESSIONS, MetricType.REACH]
+
+
+@pytest.fixture(scope="module")
+def synthetic_content():
+    rng = random.Random(23)
+    content = []
+    for i in range(CONTENT):
+        metrics = [
+            PerformanceMetric(metric_type, rng.randint(0, 100_000), float(day), Platform.TIKTOK, f"c{i}")
+            for metric_type in METRICS
+            for day in range(3)
+        ]
+        content.append(ContentPerformance(
+            content_id=f"c{i}",
+            title=f"Content {i}",
+            platform=Platform.TIKTOK,
+            published_at=1_700_000_000 + rng.randint(0, 30 * 24 * 3600),
+            metrics=metrics,
+            content_type="video",
+            hashtags=rng.choices(HASHTAGS, weights=WEIGHTS, k=rng.randint(1, 8)),
+            audience_demographics={"age": {"18-24": rng.randint(0, 500), "25-34": rng.randint(0, 500)}},
+            engagement_timeline=[],
+            cost_data={"revenue_generated": rng.uniform(0, 500), "total_cost": 100.0},
+        ))
+    return content
+
+
+@pytest.mark.slow
+def test_analyzes_50k_content_pieces_in_seconds(synthetic_content):
+    start = time.perf_counter()
+    frame = PerformanceFrame.from_content(synthetic_content)
+    loaded = time.perf_counter() - start
+
+    aggregates = frame.aggregate_metrics()
+    top = frame.top_performers()
+    hashtags = frame.hashtag_effectiveness()
+    pairs = frame.hashtag_cooccurrence()
+    percentiles = frame.engagement_percentiles()
+    growth = frame.engagement_growth()
+    elapsed = time.perf_counter() - start
+
+    print(f"\nLoaded {CONTENT} content pieces in {loaded:.2f}s, analyzed in {elapsed - loaded:.2f}s")
+
+    assert aggregates["content_count"] == CONTENT
+    assert len(top) == 10
+    assert hashtags["total_unique_hashtags"] <= len(HASHTAGS)
+    assert pairs and pairs[0]["count"] >= pairs[-1]["count"]
+    assert percentiles["p50"] <= percentiles["p99"]
+    assert 30 <= len(growth) <= 31
+    assert elapsed < 10
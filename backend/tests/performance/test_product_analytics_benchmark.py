@@ -0,0 +1,137 @@
+"""
+Benchmark for database-side product analytics on a synthetic catalogue.
+
+Loads ``PRODUCT_ANALYTICS_ROWS`` (default 1M) synthetic products into a
+scratch schema with the production JSONB layout and indexes, then times top
+tags per brand, the rating histogram and per-category price percentiles
+computed by ``ProductAnalyticsRepository`` against fetching the same columns
+and aggregating them in Python.
+
+Needs a PostgreSQL server: set BENCHMARK_DATABASE_URL to a sync
+``postgresql://`` URL to run it.
+"""
+
+import os
+import statistics
+import time
+from collections import Counter, defaultdict
+from typing import Tuple
+
+import numpy as np
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models.product import Product
+from app.repositories.product_analytics import ProductAnalyticsRepository
+
+DATABASE_URL = os.environ.get("BENCHMARK_DATABASE_URL")
+ROWS = int(os.environ.get("PRODUCT_ANALYTICS_ROWS", 1_000_000))
+SCHEMA = "product_analytics_bench"
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="BENCHMARK_DATABASE_URL not set")
+
+SETUP = [
+    f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE",
+    f"CREATE SCHEMA {SCHEMA}",
+    f"""
+    CREATE TABLE {SCHEMA}.products (
+        id integer PRIMARY KEY,
+        brand_id integer NOT NULL,
+        category varchar,
+        price double precision,
+        currency varchar(3),
+        is_active boolean,
+        tags jsonb,
+        reviews_data jsonb
+    )
+    """,
+    f"""
+    INSERT INTO {SCHEMA}.products
+    SELECT
+        n,
+        n % 500,
+        'category-' || (n % 40),
+        round((5 + random() * 495)::numeric, 2),
+        'USD',
+        true,
+        jsonb_build_array('tag-' || (n % 97), 'tag-' || (n % 13), 'tag-' || ((n / 7) % 211)),
+        jsonb_build_object('average_rating', round((1 + random() * 4)::numeric, 1), 'count', (random() * 500)::int)
+    FROM generate_series(1, {ROWS}) AS n
+    """,
+    f"CREATE INDEX ON {SCHEMA}.products USING gin (tags jsonb_path_ops)",
+    f"CREATE INDEX ON {SCHEMA}.products (category, currency, price)",
+    f"ANALYZE {SCHEMA}.products",
+]
+
+
+async def aggregate_in_python(db: AsyncSession):
+    rows = await db.execute(
+        select(Product.brand_id, Product.category, Product.price, Product.tags, Product.reviews_data)
+        .where(Product.is_active.is_(True))
+    )
+
+    tags = defaultdict(Counter)
+    histogram = Counter()
+    prices = defaultdict(list)
+    for brand_id, category, price, product_tags, reviews in rows:
+        tags[brand_id].update(product_tags or [])
+        rating = (reviews or {}).get("average_rating")
+        if rating:
+            histogram[float(np.floor(rating / 0.5) * 0.5)] += 1
+        if price is not None and category:
+            prices[category].append(price)
+
+    top_tags = {brand_id: counter.most_common(10) for brand_id, counter in tags.items()}
+    percentiles = {
+        category: np.percentile(values, [25, 50, 75, 90]) for category, values in prices.items()
+    }
+    return top_tags, histogram, percentiles
+
+
+async def aggregate_in_sql(db: AsyncSession):
+    repository = ProductAnalyticsRepository(db)
+    return (
+        await repository.top_tags_by_brand(limit=10),
+        await repository.rating_histogram(),
+        await repository.price_percentiles_by_category(),
+    )
+
+
+async def best_of(runs: int, fn, db: AsyncSession) -> Tuple[float, float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn(db)
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+@pytest.mark.slow
+@pytest.mark.db
+@pytest.mark.asyncio
+async def test_sql_aggregation_beats_python_aggregation():
+    engine = create_async_engine(
+        make_url(DATABASE_URL).set(drivername="postgresql+asyncpg"),
+        connect_args={"server_settings": {"search_path": SCHEMA}},
+    )
+
+    try:
+        async with engine.begin() as connection:
+            for statement in SETUP:
+                await connection.execute(text(statement))
+
+        async with AsyncSession(engine) as db:
+            sql_best, sql_median = await best_of(3, aggregate_in_sql, db)
+            python_best, python_median = await best_of(1, aggregate_in_python, db)
+
+        print(f"\nProduct analytics over {ROWS:,} products")
+        print(f"  SQL aggregation     best {sql_best:7.2f}s  median {sql_median:7.2f}s")
+        print(f"  Python aggregation  best {python_best:7.2f}s  median {python_median:7.2f}s")
+
+        assert sql_best < python_best
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
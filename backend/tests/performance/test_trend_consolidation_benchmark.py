@@ -0,0 +1,63 @@
+"""
+Trend consolidation benchmark over 100k raw trend signals.
+
+The synthetic fixture draws 20k base topics from a Zipf-like vocabulary and
+emits each one several times across platforms: verbatim, re-cased, with an
+extra word or with a word dropped, much like the same trend reported by
+different scrapers.
+"""
+
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.ai.trend_consolidation import consolidate_trends
+
+SIGNALS = 100_000
+BASE_TOPICS = 20_000
+VOCABULARY = [f"term{i}" for i in range(8000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+PLATFORMS = ("tiktok", "instagram", "youtube", "twitter")
+
+
+@pytest.fixture(scope="module")
+def synthetic_trend_signals():
+    rng = random.Random(17)
+    topics = [rng.choices(VOCABULARY, weights=WEIGHTS, k=rng.randint(2, 6)) for _ in range(BASE_TOPICS)]
+
+    signals = []
+    for i in range(SIGNALS):
+        words = list(rng.choice(topics))
+        variant = rng.random()
+        if variant < 0.2:
+            words.append(rng.choice(VOCABULARY))
+        elif variant < 0.3 and len(words) > 2:
+            words.pop(rng.randrange(len(words)))
+        name = " ".join(words)
+        signals.append(SimpleNamespace(
+            trend_id=f"{rng.choice(PLATFORMS)}_{i}",
+            name=name.title() if rng.random() < 0.5 else name,
+            volume=rng.randint(10, 100_000),
+            viral_score=rng.uniform(0, 100),
+            growth_rate=rng.uniform(0, 300),
+            signals=[],
+            related_trends=[f"#{words[0]}"],
+        ))
+    return signals
+
+
+@pytest.mark.slow
+def test_consolidates_100k_signals_in_seconds(synthetic_trend_signals):
+    total_volume = sum(signal.volume for signal in synthetic_trend_signals)
+
+    start = time.perf_counter()
+    consolidated = consolidate_trends(synthetic_trend_signals)
+    elapsed = time.perf_counter() - start
+
+    print(f"\nConsolidated {SIGNALS} signals into {len(consolidated)} trends in {elapsed:.2f}s")
+
+    assert len(consolidated) < SIGNALS / 2
+    assert sum(trend.volume for trend in consolidated) == total_volume
+    assert elapsed < 10
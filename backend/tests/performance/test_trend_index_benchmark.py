@@ -0,0 +1,72 @@
+"""
+Trend matching benchmark: full scan vs the inverted index.
+
+Matches a batch of analyzer trends against tens of thousands of synthetic
+TikTok trends drawn from a Zipf-like vocabulary. The full scan rebuilds
+every TikTok trend's token sets per comparison, as the enhancer used to;
+the index builds them once and only scores posting-list candidates.
+"""
+
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.ai.trend_index import TrendIndex, TrendTerms, trend_similarity
+
+TIKTOK_TRENDS = 20000
+EXISTING_TRENDS = 50
+VOCABULARY = [f"token{i}" for i in range(5000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+
+def words(rng: random.Random, count: int):
+    return rng.choices(VOCABULARY, weights=WEIGHTS, k=count)
+
+
+def synthetic_corpus(seed: int = 11):
+    rng = random.Random(seed)
+    tiktok_trends = [
+        SimpleNamespace(
+            id=i,
+            normalized_name=" ".join(words(rng, 3)),
+            keywords=words(rng, 5),
+            hashtags=[f"#{word}" for word in words(rng, 3)],
+        )
+        for i in range(TIKTOK_TRENDS)
+    ]
+    existing = [
+        SimpleNamespace(name=" ".join(words(rng, 3)), keywords=words(rng, 5), related_trends=[f"#{w}" for w in words(rng, 2)])
+        for _ in range(EXISTING_TRENDS)
+    ]
+    return tiktok_trends, existing
+
+
+@pytest.mark.slow
+def test_index_matches_faster_than_full_scan():
+    tiktok_trends, existing = synthetic_corpus()
+
+    start = time.perf_counter()
+    scanned = []
+    for trend in existing:
+        query = TrendTerms.from_trend_data(trend)
+        scores = [(t.id, trend_similarity(query, TrendTerms.from_tiktok_trend(t))) for t in tiktok_trends]
+        scanned.append(sorted((s for s in scores if s[1] > 0.3), key=lambda s: s[1], reverse=True))
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = TrendIndex(tiktok_trends)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [[(t.id, s) for t, s in index.match(TrendTerms.from_trend_data(trend))] for trend in existing]
+    match_time = time.perf_counter() - start
+
+    print(f"\nTrend matching ({EXISTING_TRENDS} trends x {TIKTOK_TRENDS} TikTok trends)")
+    print(f"  full scan        {scan_time * 1000:8.1f}ms")
+    print(f"  index build      {build_time * 1000:8.1f}ms (once per scraping run)")
+    print(f"  indexed matching {match_time * 1000:8.1f}ms")
+
+    assert indexed == scanned
+    assert match_time < scan_time / 5
@@ -0,0 +1,119 @@
+"""
+Per-task overhead of a fresh event loop per task vs the worker loop.
+
+Simulates the async part of a Celery task that makes one HTTP call to a local
+aiohttp server. The old pattern creates a loop and a client session per task
+and closes both afterwards; the new one runs on the process loop from
+``app.core.async_runtime`` with a session that stays open between tasks, so
+connections are reused.
+"""
+
+import asyncio
+import statistics
+import threading
+import time
+from typing import Callable, List
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from app.core.async_runtime import on_loop_shutdown, run_async, stop_worker_loop
+
+TASKS = 300
+
+
+async def ok(request: web.Request) -> web.Response:
+    return web.json_response({"ok": True})
+
+
+class LocalServer:
+    def __init__(self):
+        self.url = None
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get("/", ok)
+        runner = web.AppRunner(app)
+        self._loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/"
+        self._ready.set()
+        self._loop.run_forever()
+
+    def __enter__(self):
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def __exit__(self, *exc):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+
+def measure(task: Callable[[], None]) -> List[float]:
+    timings = []
+    for _ in range(TASKS):
+        start = time.perf_counter()
+        task()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+@pytest.mark.slow
+def test_worker_loop_reduces_per_task_overhead():
+    with LocalServer() as server:
+
+        def loop_per_task():
+            async def call():
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(server.url) as response:
+                        await response.json()
+
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(call())
+            finally:
+                loop.close()
+
+        session = None
+
+        async def shared_session():
+            nonlocal session
+            if session is None:
+                session = aiohttp.ClientSession()
+
+                @on_loop_shutdown
+                async def close_session():
+                    await session.close()
+            return session
+
+        def worker_loop():
+            async def call():
+                async with (await shared_session()).get(server.url) as response:
+                    await response.json()
+
+            run_async(call())
+
+        try:
+            before = measure(loop_per_task)
+            after = measure(worker_loop)
+        finally:
+            stop_worker_loop()
+
+    print(f"\nPer-task overhead over {TASKS} tasks (one local HTTP call each)")
+    for name, timings in (("loop per task", before), ("worker loop", after)):
+        print(
+            f"  {name:14s} mean {statistics.mean(timings) * 1000:6.2f}ms  "
+            f"p50 {statistics.median(timings) * 1000:6.2f}ms  "
+            f"p99 {statistics.quantiles(timings, n=100)[98] * 1000:6.2f}ms"
+        )
+
+    assert statistics.median(after) < statistics.median(before)
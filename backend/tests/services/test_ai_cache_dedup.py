@@ -0,0 +1,114 @@
+"""
+Unit tests for in-flight request deduplication and stale-while-revalidate
+in the AI cache decorator.
+"""
+
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from app.services.ai.cache_manager import InFlightRegistry, RevalidatingValue, cached, get_cache_manager
+
+
+class TestInFlightRegistry:
+    """Test sharing of concurrent identical calls."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_execution(self):
+        registry = InFlightRegistry()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "result"
+
+        results = await asyncio.gather(*[registry.run("key", work) for _ in range(10)])
+
+        assert results == ["result"] * 10
+        assert calls == 1
+        assert registry.get_stats()["followers"] == 9
+        assert registry.get_stats()["in_flight"] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_waiters(self):
+        registry = InFlightRegistry()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("provider failed")
+
+        results = await asyncio.gather(*[registry.run("key", work) for _ in range(3)], return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert registry.get_stats()["errors"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_waiter_timeout_does_not_cancel_shared_work(self):
+        registry = InFlightRegistry()
+
+        async def work():
+            await asyncio.sleep(0.1)
+            return "done"
+
+        leader = asyncio.ensure_future(registry.run("key", work))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await registry.run("key", work, timeout=0.01)
+
+        assert await leader == "done"
+        assert registry.get_stats()["timeouts"] == 1
+
+
+class TestCachedDecorator:
+    """Test the cached decorator end to end."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_identical_misses_call_function_once(self):
+        calls = 0
+
+        @cached("test_service", f"dedup_{uuid.uuid4().hex}", ttl=60)
+        async def analyze(value):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"value": value}
+
+        results = await asyncio.gather(*[analyze("same") for _ in range(5)])
+
+        assert results == [{"value": "same"}] * 5
+        assert calls == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshing(self):
+        calls = 0
+        operation = f"swr_{uuid.uuid4().hex}"
+
+        @cached("test_service", operation, ttl=60, stale_while_revalidate=60)
+        async def analyze(value):
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await analyze("x") == 1
+
+        # Age the cached envelope past its freshness window
+        manager = get_cache_manager()
+        inputs = {"args": ("x",), "kwargs": {}}
+        await manager.cache_result(
+            "test_service", operation, inputs,
+            RevalidatingValue(value=1, fresh_until=time.time() - 1), ttl=120
+        )
+
+        assert await analyze("x") == 1
+        await asyncio.sleep(0.05)
+        assert calls == 2
+        assert await analyze("x") == 2
@@ -0,0 +1,104 @@
+"""
+Unit tests for AI error handling: bounded error store, windowed statistics
+and circuit breaker transitions.
+"""
+
+import time
+
+import pytest
+
+from app.services.ai.error_handler import (
+    AIErrorHandler,
+    CircuitBreakerState,
+    ErrorRecord,
+    ErrorSeverity,
+    ErrorStore,
+    ErrorType,
+)
+
+
+def record(service="openai", error_type=ErrorType.API_ERROR, timestamp=None):
+    return ErrorRecord(
+        error_id="test",
+        error_type=error_type,
+        severity=ErrorSeverity.MEDIUM,
+        service_name=service,
+        operation="generate",
+        error_message="boom",
+        stack_trace="",
+        timestamp=timestamp or time.time(),
+    )
+
+
+class TestErrorStore:
+    """Test the ring-buffer/time-bucketed error store."""
+
+    @pytest.mark.unit
+    def test_records_are_bounded(self):
+        store = ErrorStore(max_records=10)
+        for _ in range(100):
+            store.add(record())
+
+        assert len(store.records) == 10
+        assert store.total_recorded == 100
+        assert store.window(3600).total == 100
+
+    @pytest.mark.unit
+    def test_window_counters(self):
+        store = ErrorStore(bucket_seconds=60)
+        now = time.time()
+        store.add(record(service="openai", timestamp=now - 7200))
+        store.add(record(service="openai", timestamp=now - 10))
+        store.add(record(service="anthropic", error_type=ErrorType.TIMEOUT_ERROR, timestamp=now))
+
+        window = store.window(3600)
+        assert window.total == 2
+        assert window.by_service == {"openai": 1, "anthropic": 1}
+        assert window.by_type[ErrorType.TIMEOUT_ERROR] == 1
+        assert store.window(3 * 3600).total == 3
+
+
+class TestAIErrorHandler:
+    """Test statistics and circuit breaker integration."""
+
+    def _fail(self, handler, times, message="connection reset"):
+        for _ in range(times):
+            try:
+                raise Exception(message)
+            except Exception as e:
+                handler.record_error(e, "openai", "generate")
+
+    @pytest.mark.unit
+    def test_circuit_transitions_are_recorded(self):
+        handler = AIErrorHandler()
+        breaker = handler.get_circuit_breaker("openai", "generate")
+
+        self._fail(handler, breaker.config.failure_threshold)
+
+        assert breaker.state == CircuitBreakerState.OPEN
+        stats = handler.get_error_statistics(hours=1)
+        assert stats["total_errors"] == breaker.config.failure_threshold
+        assert stats["circuit_breaker_transitions"] == {CircuitBreakerState.OPEN: 1}
+        assert stats["circuit_breaker_events"][0]["circuit"] == "openai:generate"
+
+    @pytest.mark.unit
+    def test_sliding_window_failure_count(self):
+        handler = AIErrorHandler()
+        breaker = handler.get_circuit_breaker("openai", "generate")
+
+        for _ in range(breaker.config.window_size):
+            breaker.record_success()
+        self._fail(handler, 2)
+
+        assert breaker.recent_failures == 2
+        assert breaker.get_status()["recent_success_rate"] == pytest.approx(0.98)
+
+    @pytest.mark.unit
+    def test_health_status(self):
+        handler = AIErrorHandler()
+        assert handler.get_health_status()["health_status"] == "healthy"
+
+        self._fail(handler, 12)
+        health = handler.get_health_status()
+        assert health["health_status"] == "degraded"
+        assert health["recent_errors_count"] == 12
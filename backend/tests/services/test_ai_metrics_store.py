@@ -0,0 +1,97 @@
+"""
+Unit tests for the AI metrics store: batched writes, roll-up aggregation
+and time-series queries.
+"""
+
+import time
+
+import pytest
+
+from app.services.ai.metrics_store import MetricsRecord, MetricsStore, HIGH_TOKEN_THRESHOLD
+
+
+def make_record(timestamp, service="openai", model="gpt-4-turbo", template="hook",
+                tokens=100, cost=0.01, latency=1.0, success=True):
+    return MetricsRecord(
+        timestamp=timestamp,
+        service_name=service,
+        model_name=model,
+        operation="text_generation",
+        prompt_template=template,
+        input_tokens=tokens // 2,
+        output_tokens=tokens - tokens // 2,
+        total_tokens=tokens,
+        cost=cost,
+        latency=latency,
+        success=success,
+    )
+
+
+class TestMetricsStore:
+    """Test the append-only metrics store and its roll-ups."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = MetricsStore(str(tmp_path / "metrics.db"), flush_interval=0.05)
+        yield store
+        store.close()
+
+    @pytest.mark.unit
+    def test_append_and_aggregate(self, store):
+        now = time.time()
+        for i in range(50):
+            store.append(make_record(now - i, success=i % 10 != 0))
+        assert store.flush()
+
+        totals = store.aggregate(now - 3600)[0]
+        assert totals["requests"] == 50
+        assert totals["successes"] == 45
+        assert totals["cost"] == pytest.approx(0.5)
+        assert totals["success_latency"] == pytest.approx(45.0)
+
+    @pytest.mark.unit
+    def test_group_by_dimension(self, store):
+        now = time.time()
+        store.append(make_record(now, service="openai"))
+        store.append(make_record(now, service="openai"))
+        store.append(make_record(now, service="anthropic", model="claude-3"))
+        store.flush()
+
+        by_service = {row["dimension"]: row for row in store.aggregate(now - 60, group_by="service_name")}
+        assert by_service["openai"]["requests"] == 2
+        assert by_service["anthropic"]["requests"] == 1
+
+        with pytest.raises(ValueError):
+            store.aggregate(now - 60, group_by="cost; DROP TABLE ai_calls")
+
+    @pytest.mark.unit
+    def test_long_window_is_not_truncated(self, store):
+        now = time.time()
+        # 30 days of calls, far beyond the old 10k in-memory window
+        for day in range(30):
+            for _ in range(500):
+                store.append(make_record(now - day * 86400, cost=0.002))
+        store.flush()
+
+        daily = store.time_series(now - 30 * 86400, bucket_seconds=86400, resolution="day")
+        assert sum(row["requests"] for row in daily.values()) == 15000
+        assert store.aggregate(now - 31 * 86400)[0]["cost"] == pytest.approx(30.0)
+
+    @pytest.mark.unit
+    def test_high_token_tracking(self, store):
+        now = time.time()
+        store.append(make_record(now, tokens=HIGH_TOKEN_THRESHOLD + 1000))
+        store.append(make_record(now, tokens=100))
+        store.flush()
+
+        totals = store.aggregate(now - 60)[0]
+        assert totals["high_token_requests"] == 1
+        assert totals["high_token_tokens"] == HIGH_TOKEN_THRESHOLD + 1000
+
+    @pytest.mark.unit
+    def test_append_never_blocks_when_queue_full(self, tmp_path):
+        store = MetricsStore(str(tmp_path / "full.db"), max_queue_size=1, flush_interval=10)
+        store._stop.set()
+        accepted = [store.append(make_record(time.time())) for _ in range(5)]
+        assert accepted.count(False) >= 3
+        assert store.get_store_stats()["dropped_records"] >= 3
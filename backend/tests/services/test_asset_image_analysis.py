@@ -0,0 +1,91 @@
+"""
+Unit tests for vectorized asset image analysis.
+"""
+
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.services.video_generation.image_analysis import (
+    ANALYSIS_MAX_DIMENSION,
+    analyze_and_enhance,
+    analyze_image_bytes,
+    brightness_score,
+    color_palette,
+    open_reduced,
+)
+
+THRESHOLDS = {
+    "min_resolution": (800, 600),
+    "min_file_size": 50 * 1024,
+    "min_sharpness": 0.5,
+    "min_brightness": 0.2,
+    "max_brightness": 0.8,
+}
+
+
+def encode(image: Image.Image, format: str = "JPEG") -> bytes:
+    output = BytesIO()
+    image.save(output, format=format, quality=95)
+    return output.getvalue()
+
+
+def noisy_image(width: int, height: int, seed: int = 0) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+
+
+class TestImageAnalysis:
+    """Test NumPy image metrics and reduced-size decoding."""
+
+    @pytest.mark.unit
+    def test_brightness_matches_pixel_mean(self):
+        image = noisy_image(64, 48).convert("L")
+        gray = np.asarray(image)
+        expected_mean = sum(image.getdata()) / (64 * 48) / 255.0
+
+        score = brightness_score(gray, 0.0, 1.0)
+        assert score == 1.0
+        assert brightness_score(gray, expected_mean + 0.1, 1.0) == pytest.approx(expected_mean / (expected_mean + 0.1))
+
+    @pytest.mark.unit
+    def test_palette_ranks_dominant_colors_first(self):
+        rgb = np.zeros((100, 100, 3), dtype=np.uint8)
+        rgb[:, :70] = (200, 30, 30)
+        rgb[:, 70:] = (20, 20, 220)
+
+        assert color_palette(rgb) == ["#c81e1e", "#1414dc"]
+
+    @pytest.mark.unit
+    def test_large_jpeg_decoded_at_reduced_size(self):
+        image_data = encode(noisy_image(3000, 2000))
+
+        reduced, info = open_reduced(image_data)
+
+        assert info["dimensions"] == (3000, 2000)
+        assert max(reduced.size) <= ANALYSIS_MAX_DIMENSION
+
+        analysis = analyze_image_bytes(image_data, THRESHOLDS)
+        assert analysis["dimensions"] == (3000, 2000)
+        assert analysis["format"] == "jpeg"
+        assert 0 <= analysis["quality_value"] <= 1
+
+    @pytest.mark.unit
+    def test_transparency_detected_before_conversion(self):
+        image_data = encode(Image.new("RGBA", (32, 32), (0, 0, 0, 0)), format="PNG")
+
+        assert analyze_image_bytes(image_data, THRESHOLDS)["has_transparency"] is True
+
+    @pytest.mark.unit
+    def test_poor_images_are_not_enhanced(self):
+        dark_thumbnail = encode(Image.new("RGB", (40, 40), (0, 0, 0)))
+
+        analysis, processed = analyze_and_enhance(dark_thumbnail, THRESHOLDS)
+
+        assert analysis["quality_value"] < 0.3
+        assert processed is None
+
+        analysis, processed = analyze_and_enhance(encode(noisy_image(1920, 1080)), THRESHOLDS)
+        assert Image.open(BytesIO(processed)).size == (1920, 1080)
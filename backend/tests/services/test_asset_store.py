@@ -0,0 +1,129 @@
+"""
+Unit tests for the content-addressed asset store.
+"""
+
+import hashlib
+import os
+import time
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.services.video_generation.asset_store import AssetStore, hamming_distance
+from app.services.video_generation.image_analysis import perceptual_hash
+
+
+def encode(image: Image.Image, quality: int = 95) -> bytes:
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
+
+def gradient_image(width: int = 320, height: int = 240, seed: int = 0) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    blobs = sum(
+        np.sin(x / rng.uniform(10, 60) + rng.uniform(0, 6)) * np.cos(y / rng.uniform(10, 60))
+        for _ in range(4)
+    )
+    gray = ((blobs - blobs.min()) / np.ptp(blobs) * 255).astype(np.uint8)
+    return Image.fromarray(np.dstack([gray, 255 - gray, gray // 2]))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AssetStore(tmp_path / "store", max_bytes=10 * 1024 * 1024, eviction_grace=0)
+
+
+class TestPerceptualHash:
+    """Test that the DCT hash tolerates re-encoding but separates images."""
+
+    @pytest.mark.unit
+    def test_reencoded_copy_is_close(self):
+        image = gradient_image()
+        original = perceptual_hash(encode(image))
+        resized = perceptual_hash(encode(image.resize((160, 120)), quality=60))
+
+        assert hamming_distance(original, resized) <= 4
+
+    @pytest.mark.unit
+    def test_different_images_are_far_apart(self):
+        first = perceptual_hash(encode(gradient_image(seed=1)))
+        second = perceptual_hash(encode(gradient_image(seed=2)))
+
+        assert hamming_distance(first, second) > 10
+
+
+class TestAssetStore:
+    """Test content addressing, near-duplicate resolution and eviction."""
+
+    @pytest.mark.unit
+    def test_identical_content_is_stored_once(self, store):
+        data = encode(gradient_image())
+
+        first = store.put_bytes(data, ".jpg", url="https://cdn.a/product.jpg")
+        second = store.put_bytes(data, ".jpg", url="https://cdn.b/same.jpg")
+
+        assert first.sha256 == second.sha256 == hashlib.sha256(data).hexdigest()
+        assert store.lookup_url("https://cdn.b/same.jpg").path == first.path
+        assert store.get_stats()["blobs"] == 1
+
+    @pytest.mark.unit
+    def test_near_duplicate_shares_stored_image_and_analysis(self, store):
+        image = gradient_image()
+        original = encode(image)
+        variant = encode(image.resize((300, 225)), quality=70)
+
+        stored = store.put_bytes(original, ".jpg", phash=perceptual_hash(original))
+        store.put_analysis(stored.sha256, "image", {"color_palette": ["#ffffff"]})
+
+        duplicate = store.put_bytes(variant, ".jpg", url="https://brand/logo.jpg", phash=perceptual_hash(variant))
+
+        assert duplicate.near_duplicate
+        assert duplicate.sha256 == stored.sha256
+        assert store.get_analysis(duplicate.sha256, "image") == {"color_palette": ["#ffffff"]}
+        assert store.lookup_content(hashlib.sha256(variant).hexdigest()).sha256 == stored.sha256
+        assert store.get_stats()["blobs"] == 1
+
+    @pytest.mark.unit
+    def test_least_recently_used_blobs_are_evicted(self, tmp_path):
+        store = AssetStore(tmp_path / "store", max_bytes=2500, eviction_grace=0)
+
+        old = store.put_bytes(b"a" * 1000, ".bin", url="https://x/old")
+        time.sleep(0.01)
+        kept = store.put_bytes(b"b" * 1000, ".bin")
+        time.sleep(0.01)
+        store.lookup_content(old.sha256)  # Touch: "kept" is now least recently used
+        time.sleep(0.01)
+        store.put_bytes(b"c" * 1000, ".bin")
+
+        assert store.lookup_content(kept.sha256) is None
+        assert not os.path.exists(kept.path)
+        assert store.lookup_url("https://x/old").sha256 == old.sha256
+        assert store.get_stats()["evictions"] == 1
+
+    @pytest.mark.unit
+    def test_put_file_moves_download_into_store(self, store, tmp_path):
+        download = tmp_path / "clip.mp4"
+        download.write_bytes(b"video-bytes")
+        sha256 = hashlib.sha256(b"video-bytes").hexdigest()
+
+        stored = store.put_file(download, sha256, ".mp4", url="https://cdn/clip.mp4")
+
+        assert not download.exists()
+        assert store.owns(stored.path)
+        assert not store.owns(download)
+        assert store.lookup_url("https://cdn/clip.mp4").sha256 == sha256
+
+    @pytest.mark.unit
+    def test_stats_report_hit_rates(self, store):
+        store.put_bytes(b"data", ".bin", url="https://x/a")
+
+        store.lookup_url("https://x/a")
+        store.lookup_url("https://x/missing")
+
+        stats = store.get_stats()
+        assert stats["url_hits"] == 1
+        assert stats["url_hit_rate"] == 0.5
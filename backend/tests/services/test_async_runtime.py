@@ -0,0 +1,84 @@
+"""
+Unit tests for the per-process worker event loop.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core import async_runtime
+from app.core.async_runtime import get_worker_loop, on_loop_shutdown, run_async, stop_worker_loop
+
+
+@pytest.fixture(autouse=True)
+def fresh_runtime():
+    stop_worker_loop()
+    async_runtime._shutdown_callbacks.clear()
+    yield
+    stop_worker_loop()
+    async_runtime._shutdown_callbacks.clear()
+
+
+async def running_loop():
+    return asyncio.get_running_loop()
+
+
+class TestWorkerLoop:
+    """Test that tasks share one loop per process."""
+
+    @pytest.mark.unit
+    def test_consecutive_tasks_share_the_loop(self):
+        first = run_async(running_loop())
+        second = run_async(running_loop())
+
+        assert first is second is get_worker_loop()
+        assert not first.is_closed()
+
+    @pytest.mark.unit
+    def test_loop_bound_state_survives_between_tasks(self):
+        queue = run_async(_make_queue())
+
+        run_async(queue.put("warm"))
+
+        assert run_async(queue.get()) == "warm"
+
+    @pytest.mark.unit
+    def test_shutdown_runs_callbacks_and_closes_loop(self):
+        closed = []
+
+        @on_loop_shutdown
+        async def close_client():
+            closed.append(asyncio.get_running_loop())
+
+        loop = run_async(running_loop())
+        stop_worker_loop()
+
+        assert closed == [loop]
+        assert loop.is_closed()
+        assert run_async(running_loop()) is not loop
+
+    @pytest.mark.unit
+    def test_shutdown_cancels_leftover_tasks(self):
+        async def start_background():
+            return asyncio.create_task(asyncio.sleep(60))
+
+        background = run_async(start_background())
+        stop_worker_loop()
+
+        assert background.cancelled()
+
+    @pytest.mark.unit
+    def test_nested_run_is_rejected(self):
+        async def nested():
+            coro = running_loop()
+            try:
+                run_async(coro)
+            finally:
+                coro.close()
+
+        with pytest.raises(RuntimeError):
+            run_async(nested())
+
+
+async def _make_queue():
+    return asyncio.Queue()
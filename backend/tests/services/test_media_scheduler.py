@@ -0,0 +1,113 @@
+"""
+Unit tests for the host-wide media job scheduler.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.media_scheduler import JobPriority, MediaJobScheduler
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    return MediaJobScheduler(
+        tmp_path / "jobs.json",
+        cpu_capacity=4,
+        memory_capacity_mb=1000,
+        interactive_reserved_cpu=1,
+        poll_interval=0.01,
+    )
+
+
+class TestMediaJobScheduler:
+    """Test admission control and priority ordering."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_threads_granted_from_free_cores(self, scheduler):
+        async with scheduler.slot("render", JobPriority.BATCH, cpu_min=2, cpu_max=8) as grant:
+            # One core stays reserved for interactive work
+            assert grant.threads == 3
+
+            async with scheduler.slot("thumbnail", JobPriority.INTERACTIVE) as thumb:
+                assert thumb.threads == 1
+                assert scheduler.get_stats()["threads_in_use"] == 4
+
+        assert scheduler.get_stats()["running_jobs"] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_interactive_jobs_admitted_before_waiting_batch_jobs(self, scheduler):
+        order = []
+        release = asyncio.Event()
+
+        async def job(name, priority, cpu):
+            async with scheduler.slot(name, priority, cpu_min=cpu, cpu_max=cpu):
+                order.append(name)
+                if name == "first_render":
+                    await release.wait()
+
+        first = asyncio.create_task(job("first_render", JobPriority.BATCH, 3))
+        await asyncio.sleep(0.05)
+        queued = [
+            asyncio.create_task(job("second_render", JobPriority.BATCH, 3)),
+        ]
+        await asyncio.sleep(0.05)
+        queued.append(asyncio.create_task(job("thumbnail", JobPriority.INTERACTIVE, 1)))
+        await asyncio.sleep(0.05)
+
+        # The reserved core lets the thumbnail run while the render holds the rest
+        assert order == ["first_render", "thumbnail"]
+
+        release.set()
+        await asyncio.gather(first, *queued)
+        assert order == ["first_render", "thumbnail", "second_render"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_memory_budget_limits_admission(self, scheduler):
+        admitted = asyncio.Event()
+
+        async with scheduler.slot("encode", JobPriority.STANDARD, memory_mb=800):
+            waiter = asyncio.create_task(self._hold(scheduler, admitted, memory_mb=400))
+            await asyncio.sleep(0.05)
+            assert not admitted.is_set()
+
+        await waiter
+        assert admitted.is_set()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_entries_with_expired_lease_are_pruned(self, scheduler):
+        def add_orphan(jobs):
+            jobs["orphan"] = {
+                "name": "render", "owner": "other-host:1:0", "priority": 2, "state": "running",
+                "threads": 4, "memory_mb": 1000, "since": 0, "heartbeat": 0,
+            }
+
+        scheduler._update_ledger(add_orphan)
+
+        async with scheduler.slot("thumbnail", JobPriority.INTERACTIVE) as grant:
+            assert grant.threads == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_running_jobs_renew_their_lease(self, tmp_path):
+        ledger = tmp_path / "jobs.json"
+        scheduler = MediaJobScheduler(ledger, cpu_capacity=4, memory_capacity_mb=1000, lease_seconds=0.1)
+        # Another container sharing the ledger volume
+        other = MediaJobScheduler(ledger, cpu_capacity=4, memory_capacity_mb=1000, lease_seconds=0.1)
+
+        async with scheduler.slot("render", JobPriority.BATCH, cpu_min=3):
+            await asyncio.sleep(0.3)
+            jobs = other._update_ledger(dict)
+            assert [job["owner"] for job in jobs.values()] == [scheduler.owner_id]
+            assert other.owner_id != scheduler.owner_id
+
+        assert other._update_ledger(dict) == {}
+
+    @staticmethod
+    async def _hold(scheduler, admitted, memory_mb):
+        async with scheduler.slot("encode", JobPriority.STANDARD, memory_mb=memory_mb):
+            admitted.set()
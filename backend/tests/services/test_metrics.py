@@ -0,0 +1,147 @@
+"""
+Unit tests for the Prometheus metrics registry and exporter.
+"""
+
+import os
+
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY, Counter, values
+
+from app.core import metrics
+from app.core.metrics import (
+    DB_LATENCY_BUCKETS,
+    LATENCY_BUCKETS,
+    get_export_registry,
+    hdr_buckets,
+    observe_db_query,
+    reset_multiprocess_dir,
+)
+
+
+def sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestHdrBuckets:
+    """Test log-linear bucket boundaries."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("buckets, low, high", [
+        (LATENCY_BUCKETS, 0.001, 600.0),
+        (DB_LATENCY_BUCKETS, 0.0001, 60.0),
+    ])
+    def test_sorted_unique_and_in_range(self, buckets, low, high):
+        assert buckets == sorted(set(buckets))
+        assert buckets[0] == low
+        assert all(low <= boundary <= high for boundary in buckets)
+
+    @pytest.mark.unit
+    def test_relative_precision(self):
+        buckets = hdr_buckets(0.001, 1000.0)
+
+        # Neighbouring boundaries are never more than 5/3 apart, so a quantile
+        # interpolated inside a bucket is off by well under 67%
+        ratios = [upper / lower for lower, upper in zip(buckets, buckets[1:])]
+        assert max(ratios) == pytest.approx(5 / 3)
+        assert min(ratios) == pytest.approx(4 / 3)
+        # Six boundaries per decade, with the steps landing on round values
+        assert len([b for b in buckets if 1 <= b < 10]) == 6
+        assert [b for b in buckets if 0.01 <= b < 0.1] == [0.01, 0.015, 0.02, 0.03, 0.05, 0.075]
+
+    @pytest.mark.unit
+    def test_custom_steps(self):
+        assert hdr_buckets(1.0, 100.0, steps_per_decade=(1.0, 2.0, 5.0)) == [1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0]
+
+
+class TestObserveDbQuery:
+    """Test DB statement labelling by SQL verb."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("statement, label", [
+        ("SELECT * FROM products", "select"),
+        ("  \n insert INTO products VALUES (1)", "insert"),
+        ("Update products SET price = 1", "update"),
+        ("DELETE FROM products", "delete"),
+        ("WITH moved AS (DELETE FROM t RETURNING *) SELECT 1", "other"),
+        ("BEGIN", "other"),
+        ("", "other"),
+    ])
+    def test_statement_verb_label(self, statement, label):
+        name = "viralos_db_query_duration_seconds_count"
+        before = sample(name, {"statement": label})
+
+        observe_db_query(statement, 0.002)
+
+        assert sample(name, {"statement": label}) == before + 1
+
+
+class TestMultiprocessExport:
+    """Test export registries and multiprocess file handling."""
+
+    @pytest.mark.unit
+    def test_single_process_mode_exports_default_registry(self, monkeypatch):
+        monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+        assert get_export_registry() is REGISTRY
+
+    @pytest.mark.unit
+    def test_multiprocess_mode_aggregates_process_files(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+        # Metrics created now write to per-process files, as in a pool process
+        for pid in (101, 102):
+            monkeypatch.setattr(values, "ValueClass", values.MultiProcessValue(lambda pid=pid: pid))
+            Counter("viralos_test_jobs", "Test counter", ["queue"], registry=None).labels("media").inc(pid)
+
+        registry = get_export_registry()
+
+        assert registry is not REGISTRY
+        assert sorted(os.listdir(tmp_path)) == ["counter_101.db", "counter_102.db"]
+        assert registry.get_sample_value("viralos_test_jobs_total", {"queue": "media"}) == 203
+
+    @pytest.mark.unit
+    def test_reset_keeps_own_files(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+        own = [f"counter_{os.getpid()}.db", f"histogram_{os.getpid()}.db"]
+        stale = ["counter_1.db", f"histogram_{os.getpid()}1.db", "gauge_livesum_7.db"]
+        for name in own + stale + ["notes.txt"]:
+            (tmp_path / name).write_bytes(b"")
+
+        reset_multiprocess_dir()
+
+        assert sorted(os.listdir(tmp_path)) == sorted(own + ["notes.txt"])
+
+    @pytest.mark.unit
+    def test_reset_without_multiprocess_dir_is_a_no_op(self, monkeypatch):
+        monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+        reset_multiprocess_dir()
+
+
+class TestMetricsEndpoint:
+    """Test the Prometheus scrape endpoint of the API."""
+
+    @pytest.fixture
+    def api(self):
+        from app.main import app
+        return app
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_serves_prometheus_text_format(self, api, monkeypatch):
+        monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+        metrics.observe_llm_call("openai", "gpt-4-turbo", 0.42, True, input_tokens=10)
+        metrics.observe_task_run("default", "tasks.refresh_trends", 1.2, True)
+        observe_db_query("SELECT 1", 0.001)
+
+        async with AsyncClient(app=api, base_url="http://test") as client:
+            response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert "# TYPE viralos_llm_request_duration_seconds histogram" in body
+        assert 'viralos_llm_request_duration_seconds_bucket{le="0.5",model="gpt-4-turbo",outcome="success",provider="openai"}' in body
+        assert "# TYPE viralos_db_query_duration_seconds histogram" in body
+        assert "# TYPE viralos_media_job_queue_wait_seconds histogram" in body
+        assert 'viralos_task_run_seconds_count{outcome="success",queue="default",task="tasks.refresh_trends"}' in body
@@ -0,0 +1,99 @@
+"""
+Unit tests for keyset pagination helpers and capped listing counts.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, select
+from sqlalchemy.dialects import postgresql
+
+from app.api.pagination import CountCache, decode_cursor, encode_cursor, keyset_after, paginate_rows
+
+items = Table(
+    "items", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("created_at", DateTime(timezone=True)),
+)
+
+
+class FakeSession:
+    def __init__(self, total: int):
+        self.total = total
+        self.statements = []
+
+    async def scalar(self, statement):
+        self.statements.append(statement)
+        return self.total
+
+
+class TestCursors:
+    """Test cursor encoding and keyset filters."""
+
+    @pytest.mark.unit
+    def test_cursor_round_trip(self):
+        created_at = datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+        cursor = encode_cursor(created_at, 42)
+
+        assert decode_cursor(cursor, datetime.fromisoformat, int) == (created_at, 42)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(1), encode_cursor("yesterday", 1)])
+    def test_invalid_cursor_is_rejected(self, cursor):
+        with pytest.raises(HTTPException) as error:
+            decode_cursor(cursor, datetime.fromisoformat, int)
+
+        assert error.value.status_code == 400
+
+    @pytest.mark.unit
+    def test_keyset_filter_uses_row_comparison(self):
+        query = select(items.c.id).where(
+            keyset_after((items.c.created_at, items.c.id), (datetime(2024, 3, 1), 42))
+        )
+
+        sql = str(query.compile(dialect=postgresql.dialect()))
+
+        assert "(items.created_at, items.id) < (" in sql
+
+    @pytest.mark.unit
+    def test_paginate_rows_walks_all_pages(self):
+        rows = [(day, day) for day in range(25, 0, -1)]
+        seen, cursor = [], None
+
+        while True:
+            after = decode_cursor(cursor, int, int) if cursor else None
+            remaining = [row for row in rows if after is None or row < after]
+            page, cursor = paginate_rows(remaining[:11], 10, key=lambda row: row)
+            seen.extend(page)
+            if cursor is None:
+                break
+
+        assert seen == rows
+
+
+class TestCountCache:
+    """Test that listing totals are capped and cached."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_counts_are_cached_per_key(self):
+        cache = CountCache(ttl=60, cap=100)
+        db = FakeSession(total=7)
+
+        assert await cache.count(db, select(items.c.id), key="a") == (7, False)
+        assert await cache.count(db, select(items.c.id), key="a") == (7, False)
+        assert len(db.statements) == 1
+
+        await cache.count(db, select(items.c.id), key="b")
+        assert len(db.statements) == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_large_counts_are_capped(self):
+        cache = CountCache(ttl=60, cap=100)
+        db = FakeSession(total=101)
+
+        assert await cache.count(db, select(items.c.id), key="a") == (100, True)
+        assert "LIMIT" in str(db.statements[0])
@@ -0,0 +1,269 @@
+"""
+Equivalence tests for the columnar performance analytics.
+
+The reference functions are the per-object implementations that
+``PerformanceAnalyzer`` and ``TrendDetector`` used before scoring was
+vectorized.
+"""
+
+import random
+import statistics
+from collections import defaultdict
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.ai.performance_analyzer import ContentPerformance, MetricType, PerformanceMetric
+from app.services.ai.performance_frame import PerformanceFrame, bucketed_growth
+from app.services.ai.trend_analyzer import TrendDetector
+from app.services.ai.viral_content import Platform
+
+HASHTAGS = [f"#tag{i}" for i in range(25)]
+AGE_GROUPS = ["13-17", "18-24", "25-34", "35-44", "45+"]
+
+
+def make_content(rng: random.Random, index: int) -> ContentPerformance:
+    metrics = []
+    for metric_type in rng.sample(list(MetricType), rng.randint(0, 8)):
+        # Several observations per metric, some sharing a timestamp
+        for _ in range(rng.randint(1, 3)):
+            metrics.append(PerformanceMetric(
+                metric_type=metric_type,
+                value=rng.choice([0, rng.randint(1, 5000), rng.uniform(0, 100)]),
+                timestamp=float(rng.randint(0, 5)),
+                platform=Platform.TIKTOK,
+                content_id=f"c{index}",
+            ))
+    rng.shuffle(metrics)
+
+    return ContentPerformance(
+        content_id=f"c{index}",
+        title=f"Content {index}",
+        platform=Platform.TIKTOK,
+        published_at=1_700_000_000 + rng.randint(0, 14 * 24 * 3600),
+        metrics=metrics,
+        content_type=rng.choice(["video", "image"]),
+        hashtags=rng.choices(HASHTAGS, k=rng.randint(0, 6)),
+        audience_demographics={
+            "age": {group: rng.randint(0, 500) for group in rng.sample(AGE_GROUPS, rng.randint(0, 5))},
+            "gender": {"female": rng.randint(0, 300), "male": rng.randint(0, 300)},
+            "total": rng.randint(0, 1000),
+        },
+        engagement_timeline=[],
+        cost_data=rng.choice([{}, {"revenue_generated": rng.uniform(0, 500), "total_cost": rng.choice([0, 50, 120.5])}]),
+    )
+
+
+def reference_aggregate_metrics(data):
+    metric_values = defaultdict(list)
+    for content in data:
+        for metric in content.metrics:
+            metric_values[metric.metric_type].append(metric.value)
+
+    aggregates = {}
+    for metric_type, values in metric_values.items():
+        aggregates[f"{metric_type}_avg"] = statistics.mean(values)
+        aggregates[f"{metric_type}_median"] = statistics.median(values)
+        aggregates[f"{metric_type}_max"] = max(values)
+        aggregates[f"{metric_type}_min"] = min(values)
+        aggregates[f"{metric_type}_total"] = sum(values)
+
+    aggregates["avg_engagement_rate"] = statistics.mean([c.get_engagement_rate() for c in data])
+    aggregates["avg_roi"] = statistics.mean([c.get_roi() for c in data])
+    aggregates["content_count"] = len(data)
+    return aggregates
+
+
+def reference_top_performers(data, limit=10):
+    return sorted(
+        data,
+        key=lambda c: (c.get_engagement_rate(), c.get_metric_value(MetricType.REACH) or 0),
+        reverse=True
+    )[:limit]
+
+
+def reference_hashtag_effectiveness(data):
+    hashtag_performance = defaultdict(list)
+    for content in data:
+        engagement = content.get_engagement_rate()
+        for hashtag in content.hashtags:
+            hashtag_performance[hashtag].append(engagement)
+
+    hashtag_analysis = {}
+    for hashtag, engagements in hashtag_performance.items():
+        if len(engagements) >= 2:
+            mean = statistics.mean(engagements)
+            hashtag_analysis[hashtag] = {
+                "usage_count": len(engagements),
+                "avg_engagement": mean,
+                "performance_consistency": 1 - (statistics.stdev(engagements) / mean) if mean > 0 else 0
+            }
+
+    top_hashtags = sorted(hashtag_analysis.items(), key=lambda x: x[1]["avg_engagement"], reverse=True)[:10]
+    return {
+        "top_performing_hashtags": dict(top_hashtags),
+        "total_unique_hashtags": len(hashtag_performance),
+        "avg_hashtags_per_post": statistics.mean([len(c.hashtags) for c in data]) if data else 0
+    }
+
+
+def reference_audience_patterns(data):
+    total_demographics = defaultdict(int)
+    total_engagement_by_demo = defaultdict(list)
+    for content in data:
+        engagement = content.get_engagement_rate()
+        for demo_key, demo_value in content.audience_demographics.items():
+            if isinstance(demo_value, dict):
+                for sub_key, count in demo_value.items():
+                    key = f"{demo_key}_{sub_key}"
+                    total_demographics[key] += count
+                    total_engagement_by_demo[key].append(engagement)
+
+    demo_engagement = {demo: statistics.mean(engagements) for demo, engagements in total_engagement_by_demo.items()}
+    top_demographics = sorted(demo_engagement.items(), key=lambda x: x[1], reverse=True)[:5]
+    return {
+        "top_engaging_demographics": dict(top_demographics),
+        "total_audience_segments": len(total_demographics),
+        "audience_diversity_score": len(total_demographics) / max(total_demographics.values()) if total_demographics else 0
+    }
+
+
+def reference_trend_scores(trends):
+    max_volume = max(t.volume for t in trends)
+    scores = []
+    for trend in trends:
+        score = (trend.volume / max_volume) * 30 + min(30, trend.growth_rate / 10)
+        if trend.signals:
+            score += statistics.mean([s.signal_strength for s in trend.signals]) * 20
+        scores.append(score + min(20, trend.engagement_rate * 200))
+    return scores
+
+
+@pytest.fixture(params=[3, 11, 29])
+def content(request):
+    rng = random.Random(request.param)
+    return [make_content(rng, i) for i in range(rng.randint(40, 200))]
+
+
+class TestPerformanceFrameEquivalence:
+    """Test the vectorized analyses against the per-object implementations."""
+
+    @pytest.mark.unit
+    def test_latest_metric_values(self, content):
+        frame = PerformanceFrame.from_content(content)
+
+        for metric_type in MetricType:
+            expected = [c.get_metric_value(metric_type) for c in content]
+            actual = [None if value != value else value for value in frame.metric(metric_type).tolist()]
+            assert actual == pytest.approx(expected)
+        assert frame.engagement_rate.tolist() == pytest.approx([c.get_engagement_rate() for c in content])
+        assert frame.roi.tolist() == pytest.approx([c.get_roi() for c in content])
+
+    @pytest.mark.unit
+    def test_aggregate_metrics(self, content):
+        expected = reference_aggregate_metrics(content)
+        actual = PerformanceFrame.from_content(content).aggregate_metrics()
+
+        assert list(actual) == list(expected)
+        assert actual == pytest.approx(expected)
+
+    @pytest.mark.unit
+    def test_top_performers(self, content):
+        expected = reference_top_performers(content)
+
+        assert PerformanceFrame.from_content(content).top_performers() == expected
+
+    @pytest.mark.unit
+    def test_hashtag_effectiveness(self, content):
+        expected = reference_hashtag_effectiveness(content)
+        actual = PerformanceFrame.from_content(content).hashtag_effectiveness()
+
+        assert list(actual["top_performing_hashtags"]) == list(expected["top_performing_hashtags"])
+        for hashtag, stats in expected["top_performing_hashtags"].items():
+            assert actual["top_performing_hashtags"][hashtag] == pytest.approx(stats)
+        assert actual["total_unique_hashtags"] == expected["total_unique_hashtags"]
+        assert actual["avg_hashtags_per_post"] == pytest.approx(expected["avg_hashtags_per_post"])
+
+    @pytest.mark.unit
+    def test_audience_patterns(self, content):
+        expected = reference_audience_patterns(content)
+        actual = PerformanceFrame.from_content(content).audience_patterns()
+
+        assert list(actual["top_engaging_demographics"]) == list(expected["top_engaging_demographics"])
+        assert actual["top_engaging_demographics"] == pytest.approx(expected["top_engaging_demographics"])
+        assert actual["total_audience_segments"] == expected["total_audience_segments"]
+        assert actual["audience_diversity_score"] == pytest.approx(expected["audience_diversity_score"])
+
+    @pytest.mark.unit
+    def test_empty_batch(self):
+        frame = PerformanceFrame.from_content([])
+
+        assert frame.aggregate_metrics() == {}
+        assert frame.audience_patterns() == {}
+        assert frame.hashtag_cooccurrence() == []
+        assert frame.engagement_growth() == []
+        assert frame.hashtag_effectiveness()["total_unique_hashtags"] == 0
+
+
+class TestPerformanceFrameAnalytics:
+    """Test the analyses that have no per-object counterpart."""
+
+    @pytest.mark.unit
+    def test_hashtag_cooccurrence(self, content):
+        pairs = defaultdict(list)
+        for c in content:
+            tags = list(dict.fromkeys(c.hashtags))
+            for i, first in enumerate(tags):
+                for second in tags[i + 1:]:
+                    pairs[frozenset((first, second))].append(c.get_engagement_rate())
+
+        actual = PerformanceFrame.from_content(content).hashtag_cooccurrence(limit=5)
+
+        top_count = max(len(rates) for rates in pairs.values())
+        assert actual[0]["count"] == top_count
+        for pair in actual:
+            rates = pairs[frozenset(pair["hashtags"])]
+            assert pair["count"] == len(rates)
+            assert pair["avg_engagement"] == pytest.approx(statistics.mean(rates))
+
+    @pytest.mark.unit
+    def test_engagement_percentiles(self):
+        content = [make_content(random.Random(i), i) for i in range(101)]
+        frame = PerformanceFrame.from_content(content)
+        rates = sorted(c.get_engagement_rate() for c in content)
+
+        percentiles = frame.engagement_percentiles((0, 50, 100))
+
+        assert percentiles == pytest.approx({"p0": rates[0], "p50": rates[50], "p100": rates[-1]})
+
+    @pytest.mark.unit
+    def test_bucketed_growth(self):
+        growth = bucketed_growth([0, 10, 100, 250, 260], [1.0, 3.0, 0.0, 4.0, 2.0], bucket_seconds=100)
+
+        assert [bucket["bucket_start"] for bucket in growth] == [0.0, 100.0, 200.0]
+        assert [bucket["content_count"] for bucket in growth] == [2, 1, 2]
+        assert [bucket["avg_value"] for bucket in growth] == [2.0, 0.0, 3.0]
+        assert [bucket["growth_rate"] for bucket in growth] == [None, -100.0, None]
+
+
+class TestTrendScoring:
+    """Test vectorized trend scoring against the per-trend formula."""
+
+    @pytest.mark.unit
+    def test_scores_match_per_trend_formula(self):
+        rng = random.Random(5)
+        trends = [
+            SimpleNamespace(
+                volume=rng.randint(0, 100_000),
+                growth_rate=rng.uniform(0, 500),
+                engagement_rate=rng.uniform(0, 0.2),
+                signals=[SimpleNamespace(signal_strength=rng.random()) for _ in range(rng.randint(0, 4))],
+                viral_score=0.0,
+            )
+            for _ in range(300)
+        ]
+        expected = reference_trend_scores(trends)
+
+        scored = TrendDetector._score_trends(None, trends)
+
+        assert [trend.viral_score for trend in scored] == pytest.approx(expected)
@@ -0,0 +1,138 @@
+"""
+Unit tests for change-only price history writes and partition helpers.
+"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.repositories.price_history import (
+    add_months,
+    ensure_partitions,
+    has_changed,
+    partition_name,
+    record_price_observations,
+)
+
+
+class FakeSession:
+    """Returns ``latest`` for the latest-row query and records inserts"""
+
+    def __init__(self, latest=(), tables=()):
+        self.latest = list(latest)
+        self.tables = set(tables)
+        self.statements = []
+        self.inserted = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        if "to_regclass" in str(statement):
+            return SimpleNamespace(scalar=lambda: params["name"] if params["name"] in self.tables else None)
+        if isinstance(params, list):
+            self.inserted.extend(params)
+            return None
+        if "LATERAL" in str(statement):
+            return iter(self.latest)
+        return iter(())
+
+
+def observation(product_id: int, price: float, **fields):
+    return {
+        "product_id": product_id,
+        "price": price,
+        "original_price": fields.get("original_price"),
+        "currency": fields.get("currency", "USD"),
+        "discount_percentage": None,
+        "availability": fields.get("availability", "in_stock"),
+        "in_stock": fields.get("availability", "in_stock") == "in_stock",
+    }
+
+
+def stored(product_id: int, price: float, **fields):
+    return SimpleNamespace(**observation(product_id, price, **fields))
+
+
+class TestChangeOnlyWrites:
+    """Test that unchanged observations are not stored."""
+
+    @pytest.mark.unit
+    def test_unchanged_prices_are_skipped(self):
+        db = FakeSession(latest=[stored(1, 19.99), stored(2, 5.0)])
+
+        written = record_price_observations(db, [
+            observation(1, 19.99),
+            observation(2, 4.5),
+            observation(3, 12.0),
+        ])
+
+        assert written == 2
+        assert [row["product_id"] for row in db.inserted] == [2, 3]
+
+    @pytest.mark.unit
+    def test_availability_change_is_recorded(self):
+        db = FakeSession(latest=[stored(1, 19.99)])
+
+        written = record_price_observations(db, [observation(1, 19.99, availability="out_of_stock")])
+
+        assert written == 1
+
+    @pytest.mark.unit
+    def test_repeats_within_a_batch_are_collapsed(self):
+        db = FakeSession()
+
+        written = record_price_observations(db, [
+            observation(1, 10.0),
+            observation(1, 10.0),
+            observation(1, 11.0),
+        ])
+
+        assert written == 2
+        assert [row["price"] for row in db.inserted] == [10.0, 11.0]
+
+    @pytest.mark.unit
+    def test_empty_batch_skips_the_database(self):
+        db = FakeSession()
+
+        assert record_price_observations(db, []) == 0
+        assert db.statements == []
+
+    @pytest.mark.unit
+    def test_first_observation_always_counts_as_change(self):
+        assert has_changed(None, observation(1, 1.0))
+        assert not has_changed(observation(1, 1.0), observation(1, 1.0))
+
+
+class TestPartitions:
+    """Test monthly partition naming and creation."""
+
+    @pytest.mark.unit
+    def test_month_arithmetic_crosses_years(self):
+        assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+        assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+        assert partition_name(date(2024, 2, 1)) == "product_price_history_2024_02"
+
+    @pytest.mark.unit
+    def test_partitions_are_created_ahead_with_utc_bounds(self):
+        db = FakeSession()
+
+        created = ensure_partitions(db, months_ahead=2, today=date(2024, 12, 17))
+
+        assert created == [
+            "product_price_history_2024_12",
+            "product_price_history_2025_01",
+            "product_price_history_2025_02",
+        ]
+        assert "FROM ('2024-12-01 00:00:00+00') TO ('2025-01-01 00:00:00+00')" in db.statements[3]
+
+    @pytest.mark.unit
+    def test_default_partition_rows_move_before_attach(self):
+        db = FakeSession(tables={"product_price_history_2024_12"})
+
+        ensure_partitions(db, months_ahead=1, today=date(2024, 12, 17))
+
+        statements = db.statements[2:]
+        assert statements[0].startswith("CREATE TABLE product_price_history_2025_01 (LIKE")
+        assert "DELETE FROM product_price_history_default" in statements[1]
+        assert "INSERT INTO product_price_history_2025_01" in statements[1]
+        assert statements[2].startswith("ALTER TABLE product_price_history ATTACH PARTITION product_price_history_2025_01")
@@ -0,0 +1,69 @@
+"""
+Unit tests for the single-pass ffmpeg processing planner.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from app.schemas.video_upload import VideoProcessingOptions
+from app.services.video_processing.processing_plan import plan_processing
+
+
+class TestProcessingPlan:
+    """Test planning of processing options into one ffmpeg invocation."""
+
+    @pytest.mark.unit
+    def test_all_outputs_share_one_decode(self):
+        options = VideoProcessingOptions(
+            generate_thumbnail=True,
+            extract_audio=True,
+            optimize_for_platform=True,
+            compress_video=True,
+        )
+
+        plan = plan_processing(Path("/uploads/clip.mp4"), options, cpu_budget=8)
+        cmd = plan.build_command()
+
+        assert cmd.count("-i") == 1
+        assert [output.stage for output in plan.outputs] == ["thumbnail", "audio", "optimized", "compressed"]
+        graph = cmd[cmd.index("-filter_complex") + 1]
+        assert graph.startswith("[0:v]split=3[s0][s1][s2]")
+        assert "[s2]scale=1080:-2[v2]" in graph
+        assert cmd[-1] == "/uploads/clip_compressed.mp4"
+
+    @pytest.mark.unit
+    def test_threads_follow_encoder_cost(self):
+        options = VideoProcessingOptions(
+            generate_thumbnail=True,
+            optimize_for_platform=True,
+            compress_video=True,
+        )
+
+        plan = plan_processing(Path("clip.mp4"), options, cpu_budget=12)
+        threads = {output.stage: output.threads for output in plan.outputs}
+
+        assert threads["thumbnail"] == 1
+        assert threads["optimized"] == 8
+        assert threads["compressed"] == 4
+
+    @pytest.mark.unit
+    def test_single_video_output_skips_split(self):
+        options = VideoProcessingOptions(generate_thumbnail=False, optimize_for_platform=True)
+
+        plan = plan_processing(Path("clip.mp4"), options, cpu_budget=4)
+
+        assert plan.filter_complex() == "[0:v]null[v0]"
+
+    @pytest.mark.unit
+    def test_audio_only_plan_has_no_filter_graph(self):
+        options = VideoProcessingOptions(
+            generate_thumbnail=False,
+            extract_audio=True,
+            optimize_for_platform=False,
+        )
+
+        cmd = plan_processing(Path("clip.mp4"), options).build_command()
+
+        assert "-filter_complex" not in cmd
+        assert "-vn" in cmd
@@ -0,0 +1,52 @@
+"""
+Unit tests for the database-side product analytics queries.
+"""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.product_analytics import (
+    price_percentiles_query,
+    rating_histogram_query,
+    tagged_products_query,
+    top_tags_query,
+)
+
+
+def render(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+class TestProductAnalyticsQueries:
+    """Test that aggregations are expressed in SQL rather than Python."""
+
+    @pytest.mark.unit
+    def test_top_tags_expand_jsonb_arrays_and_rank_per_brand(self):
+        sql = render(top_tags_query([1, 2], limit=5))
+
+        assert "jsonb_array_elements_text(CASE WHEN (jsonb_typeof(products.tags)" in sql
+        assert "row_number() OVER (PARTITION BY" in sql
+        assert "GROUP BY products.brand_id, tag.value" in sql
+
+    @pytest.mark.unit
+    def test_rating_histogram_ignores_non_numeric_ratings(self):
+        sql = render(rating_histogram_query(category="shoes", bucket_width=1.0))
+
+        assert "jsonb_typeof((products.reviews_data ->" in sql
+        assert "floor(" in sql
+        assert "GROUP BY" in sql
+
+    @pytest.mark.unit
+    def test_price_percentiles_use_ordered_set_aggregates(self):
+        query = price_percentiles_query(percentiles=(0.1, 0.5, 0.95))
+        sql = render(query)
+
+        assert sql.count("WITHIN GROUP (ORDER BY products.price)") == 3
+        assert [column.name for column in query.selected_columns][-3:] == ["p10", "p50", "p95"]
+        assert "GROUP BY products.category, products.currency" in sql
+
+    @pytest.mark.unit
+    def test_tag_lookup_uses_jsonb_containment(self):
+        sql = render(tagged_products_query(["vegan", "organic"]))
+
+        assert "products.tags @>" in sql
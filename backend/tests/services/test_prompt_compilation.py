@@ -0,0 +1,236 @@
+"""
+Unit tests for compiled prompt templates and prompt cache accounting.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.services.ai import prompts
+from app.services.ai.base import AIResponse, AIUsageMetrics
+from app.services.ai.prompts import PromptRegistry, PromptTemplate, generate_from_template
+from app.services.ai.providers import AnthropicService
+
+
+def word_count(text: str, model: str = "gpt-4-turbo") -> int:
+    return len(text.split())
+
+
+def make_template(**overrides) -> PromptTemplate:
+    fields = {
+        "name": "compiled_test",
+        "template": "Brand: {brand}\nPlatform: {platform}\nScore this hook: {hook!r}\nReturn {{\"score\": 0}}",
+        "version": "1.0",
+        "description": "Test template",
+        "variables": ["brand", "platform", "hook"],
+        "system_prompt": "You score hooks.",
+    }
+    fields.update(overrides)
+    return PromptTemplate(**fields)
+
+
+@pytest.fixture
+def template(monkeypatch):
+    monkeypatch.setattr(prompts.TokenCounter, "count_tokens", lambda self, text, model="gpt-4-turbo": word_count(text))
+    return make_template()
+
+
+@pytest.fixture
+def registry(monkeypatch, template):
+    registry = PromptRegistry()
+    registry.register_template(template)
+    monkeypatch.setattr(prompts, "_prompt_registry", registry)
+    return registry
+
+
+class FakeTextService:
+    """Returns a fixed response and records generation calls"""
+
+    def __init__(self, cached_tokens=0, tokens_input=0):
+        self.cached_tokens = cached_tokens
+        self.tokens_input = tokens_input
+        self.calls = []
+
+    async def generate(self, prompt, **kwargs):
+        self.calls.append((prompt, kwargs))
+        return AIResponse(
+            content="8",
+            usage=AIUsageMetrics(provider="anthropic", model="test", tokens_input=self.tokens_input, total_cost=0.01),
+            metadata={"cached_tokens": self.cached_tokens},
+        )
+
+
+class TestCompiledPromptTemplate:
+    """Test static/dynamic segment splitting and prefix caching."""
+
+    @pytest.mark.unit
+    def test_splits_at_first_dynamic_variable(self, template):
+        compiled = template.compile({"brand", "platform"})
+
+        assert compiled.prefix_template == "Brand: {brand}\nPlatform: {platform}\nScore this hook: "
+        assert compiled.suffix_template == "{hook!r}\nReturn {{\"score\": 0}}"
+        assert compiled.prefix_fields == ("brand", "platform")
+
+    @pytest.mark.unit
+    def test_static_variable_after_a_dynamic_one_stays_in_suffix(self, template):
+        compiled = template.compile({"brand", "hook"})
+
+        assert compiled.prefix_template == "Brand: {brand}\nPlatform: "
+        assert compiled.suffix_template.startswith("{platform}\nScore this hook: {hook!r}")
+
+    @pytest.mark.unit
+    def test_render_matches_plain_format(self, template):
+        variables = {"brand": "Acme", "platform": "tiktok", "hook": "Wait for it"}
+
+        rendered = template.compile({"brand", "platform"}).render(**variables)
+
+        assert rendered.text == template.format(**variables)
+        assert rendered.static_prefix == "Brand: Acme\nPlatform: tiktok\nScore this hook: "
+        assert rendered.system_prompt == "You score hooks."
+
+    @pytest.mark.unit
+    def test_compiled_once_per_static_variable_set(self, template):
+        assert template.compile(["brand", "platform"]) is template.compile({"platform", "brand"})
+        assert template.compile({"brand"}) is not template.compile({"brand", "platform"})
+
+    @pytest.mark.unit
+    def test_prefix_cache_hits_and_token_counts(self, template):
+        compiled = template.compile({"brand", "platform"})
+
+        first = compiled.render(brand="Acme", platform="tiktok", hook="One")
+        second = compiled.render(brand="Acme", platform="tiktok", hook="Two words")
+        other = compiled.render(brand="Acme", platform="instagram", hook="One")
+
+        assert (compiled.prefix_hits, compiled.prefix_misses) == (1, 2)
+        # The system prompt is sent ahead of the prefix and counted with it
+        static_tokens = word_count("You score hooks." + first.static_prefix)
+        assert first.static_tokens == second.static_tokens == static_tokens
+        assert other.static_tokens == word_count("You score hooks." + other.static_prefix)
+        assert first.dynamic_tokens == word_count(first.dynamic_suffix)
+        assert second.token_count == static_tokens + word_count(second.dynamic_suffix)
+        assert first.generation_kwargs() == {
+            "system_prompt": "You score hooks.",
+            "prompt_prefix": first.static_prefix,
+            "prompt_token_count": first.token_count,
+        }
+
+    @pytest.mark.unit
+    def test_prefix_cache_is_bounded(self, template):
+        compiled = prompts.CompiledPromptTemplate(template, frozenset({"brand"}), max_cached_prefixes=2)
+
+        for brand in ("a", "b", "c", "a"):
+            compiled.render(brand=brand, platform="tiktok", hook="x")
+
+        assert len(compiled._prefix_cache) == 2
+        assert (compiled.prefix_hits, compiled.prefix_misses) == (0, 4)
+
+    @pytest.mark.unit
+    def test_missing_variable(self, template):
+        with pytest.raises(ValueError, match="platform"):
+            template.compile({"brand"}).render(brand="Acme", hook="x")
+
+
+class TestAnthropicCacheControl:
+    """Test cache breakpoints in the Anthropic request."""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", "test-key")
+        service = AnthropicService(model="claude-3-haiku-20240307")
+        requests = []
+
+        async def create(**kwargs):
+            requests.append(kwargs)
+            return SimpleNamespace(
+                content=[SimpleNamespace(text="8")],
+                usage=SimpleNamespace(input_tokens=5, output_tokens=1, cache_read_input_tokens=40, cache_creation_input_tokens=0),
+                stop_reason="end_turn",
+                model=service.model,
+            )
+
+        service.client = SimpleNamespace(
+            messages=SimpleNamespace(create=create),
+            beta=SimpleNamespace(prompt_caching=SimpleNamespace(messages=SimpleNamespace(create=create))),
+        )
+        service.requests = requests
+        return service
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_system_prompt_and_prefix_are_cache_breakpoints(self, service, template):
+        rendered = template.compile({"brand", "platform"}).render(brand="Acme", platform="tiktok", hook="Wait")
+
+        response = await service._make_request(rendered.text, **rendered.generation_kwargs())
+
+        request = service.requests[0]
+        assert request["system"] == [
+            {"type": "text", "text": "You score hooks.", "cache_control": {"type": "ephemeral"}}
+        ]
+        assert request["messages"][0]["content"] == [
+            {"type": "text", "text": rendered.static_prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": rendered.dynamic_suffix},
+        ]
+        assert response.metadata["cached_tokens"] == 40
+        assert response.usage.tokens_input == 45
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_plain_prompt_has_no_cache_control(self, service):
+        await service._make_request("Just a prompt", system_prompt="System")
+
+        request = service.requests[0]
+        assert request["system"] == "System"
+        assert request["messages"] == [{"role": "user", "content": "Just a prompt"}]
+
+
+class TestCacheAccounting:
+    """Test cached-token ratios recorded from provider responses."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_cached_token_ratio_from_response_metadata(self, registry, template):
+        before = REGISTRY.get_sample_value(
+            "viralos_prompt_tokens_total", {"template": "compiled_test", "segment": "cached"}
+        ) or 0
+        service = FakeTextService(cached_tokens=30, tokens_input=40)
+        variables = {"brand": "Acme", "platform": "tiktok", "hook": "Wait"}
+
+        for _ in range(2):
+            response = await generate_from_template(service, "compiled_test", variables, static_variables=("brand", "platform"))
+
+        assert response.content == "8"
+        prompt, kwargs = service.calls[0]
+        assert prompt == template.format(**variables)
+        assert kwargs["prompt_prefix"] == "Brand: Acme\nPlatform: tiktok\nScore this hook: "
+
+        static_tokens = word_count("You score hooks." + kwargs["prompt_prefix"])
+        metrics = template.metrics
+        assert metrics.usage_count == 2
+        assert metrics.prompt_tokens == 80
+        assert metrics.cacheable_prompt_tokens == 2 * static_tokens
+        assert metrics.cached_prompt_tokens == 60
+        assert metrics.cached_token_ratio == pytest.approx(0.75)
+        assert metrics.cacheable_token_ratio == pytest.approx(2 * static_tokens / 80)
+
+        report = registry.get_cache_report()["compiled_test:1.0"]
+        assert report["cached_token_ratio"] == pytest.approx(0.75)
+        assert (report["prefix_cache_hits"], report["prefix_cache_misses"]) == (1, 1)
+        assert REGISTRY.get_sample_value(
+            "viralos_prompt_tokens_total", {"template": "compiled_test", "segment": "cached"}
+        ) == before + 60
+
+    @pytest.mark.unit
+    def test_missing_usage_falls_back_to_rendered_count(self, registry, template):
+        rendered = template.compile({"brand", "platform"}).render(brand="Acme", platform="tiktok", hook="x")
+        response = AIResponse(content="", usage=AIUsageMetrics(provider="openai", model="test"), metadata={})
+
+        registry.record_token_usage(rendered, response)
+
+        assert template.metrics.prompt_tokens == rendered.token_count
+        assert template.metrics.cached_prompt_tokens == 0
+
+    @pytest.mark.unit
+    def test_unused_templates_are_left_out_of_the_report(self, registry):
+        assert registry.get_cache_report() == {}
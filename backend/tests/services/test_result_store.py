@@ -0,0 +1,115 @@
+"""
+Unit tests for compact Celery result payloads and the external result store.
+"""
+
+import os
+import time
+from datetime import datetime, timezone
+
+import pytest
+from celery import Celery, states
+
+from app.core.result_store import (
+    REFERENCE_KEY,
+    ExternalResultRedisBackend,
+    ResultStore,
+    decode_payload,
+    encode_payload,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(tmp_path / "results", ttl=3600)
+
+
+@pytest.fixture
+def backend(store):
+    backend = ExternalResultRedisBackend(app=Celery("test"), url="redis://localhost:6379/0", inline_max_bytes=256)
+    backend._store = store
+    return backend
+
+
+def product_batch(count: int):
+    return {
+        "success": True,
+        "products": [
+            {"name": f"Product {i}", "price": 10.0 + i, "description": "Lightweight travel kettle " * 4}
+            for i in range(count)
+        ],
+    }
+
+
+class TestPayloadCodec:
+    """Test compressed JSON round trips."""
+
+    @pytest.mark.unit
+    def test_round_trip_keeps_types(self):
+        value = {"count": 3, "ratio": 0.5, "tags": ["a", "b"], "at": datetime(2024, 5, 1, tzinfo=timezone.utc)}
+
+        assert decode_payload(encode_payload(value)) == value
+
+    @pytest.mark.unit
+    def test_repetitive_results_compress(self):
+        result = product_batch(200)
+
+        assert len(encode_payload(result)) < len(repr(result)) / 5
+
+    @pytest.mark.unit
+    def test_unknown_codec_is_rejected(self):
+        with pytest.raises(ValueError):
+            decode_payload(b"?not-a-payload")
+
+
+class TestResultStore:
+    """Test content addressing and TTL cleanup of stored blobs."""
+
+    @pytest.mark.unit
+    def test_identical_payloads_share_a_blob(self, store):
+        first = store.put(b"payload")
+        second = store.put(b"payload")
+
+        assert first == second
+        assert store.get(first) == b"payload"
+        assert len(list(store.root.glob("*/*"))) == 1
+
+    @pytest.mark.unit
+    def test_cleanup_removes_expired_blobs(self, store):
+        old = store.put(b"old result")
+        fresh = store.put(b"fresh result")
+        expired = time.time() - 7200
+        os.utime(store._path(old), (expired, expired))
+
+        stats = store.cleanup()
+
+        assert stats == {"removed": 1, "bytes_freed": len(b"old result")}
+        assert store.get(old) is None
+        assert store.get(fresh) == b"fresh result"
+
+
+class TestExternalResultBackend:
+    """Test that large results leave only a reference in Redis."""
+
+    @pytest.mark.unit
+    def test_small_results_stay_inline(self, backend):
+        assert backend.encode_result({"success": True}, states.SUCCESS) == {"success": True}
+
+    @pytest.mark.unit
+    def test_large_results_are_stored_externally(self, backend, store):
+        result = product_batch(200)
+
+        reference = backend.encode_result(result, states.SUCCESS)
+        meta = backend.decode_result(backend.encode({"status": states.SUCCESS, "result": reference, "task_id": "t1"}))
+
+        assert set(reference) == {REFERENCE_KEY, "bytes"}
+        assert len(backend.encode(reference)) < 256
+        assert meta["result"] == result
+
+    @pytest.mark.unit
+    def test_expired_blob_resolves_to_none(self, backend, store):
+        reference = backend.encode_result(product_batch(200), states.SUCCESS)
+        store.cleanup(now=time.time() + 7200)
+
+        meta = backend.decode_result(backend.encode({"status": states.SUCCESS, "result": reference, "task_id": "t1"}))
+
+        assert meta["result"] is None
@@ -0,0 +1,121 @@
+"""
+Unit tests for the concurrent script generation pipeline.
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.video_generation.script_generation import (
+    PlatformOptimization,
+    ScriptGenerationRequest,
+    ScriptGenerationService,
+    VideoScript,
+)
+
+ROUND_TRIP = 0.05
+
+
+class FakeTextService:
+    """Answers each prompt kind after a fixed delay and tracks concurrency"""
+
+    def __init__(self):
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_response(self, prompt: str) -> str:
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(ROUND_TRIP)
+        finally:
+            self.in_flight -= 1
+
+        if "customer benefits" in prompt:
+            return "- Saves time every morning\n- Lasts all day"
+        if "unique selling propositions" in prompt:
+            return "1. Twice the battery of rivals\n2. Folds flat for travel\n3. Lifetime warranty included"
+        if "hook" in prompt:
+            return '"Stop scrolling - this changes mornings"'
+        segment = {
+            "dialogue": "Look how fast this is",
+            "action_description": "Show the product in use",
+            "visual_cues": ["close-up"],
+            "emotion": "excited",
+            "product_focus": "speed",
+        }
+        if "JSON array" in prompt:
+            count = int(prompt.split("Write ", 1)[1].split(" ", 1)[0])
+            return json.dumps([segment] * count)
+        return json.dumps(segment)
+
+
+@pytest.fixture
+def service():
+    service = ScriptGenerationService()
+    service.text_service = FakeTextService()
+    return service
+
+
+def make_request(**overrides) -> ScriptGenerationRequest:
+    product = SimpleNamespace(
+        name="Travel Kettle",
+        description="Includes fold-flat design\n- Fast boil",
+        category="home",
+        price=49.0,
+        discount=None,
+    )
+    return ScriptGenerationRequest(product=product, platform=PlatformOptimization.YOUTUBE, **overrides)
+
+
+class TestScriptGenerationPipeline:
+    """Test dependency-aware concurrency of generate_script."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_segments_and_hook_run_concurrently(self, service):
+        start = time.perf_counter()
+        script = await service.generate_script(make_request(target_duration=120.0))
+        elapsed = time.perf_counter() - start
+
+        assert isinstance(script, VideoScript)
+        assert [segment.segment_number for segment in script.segments] == [1, 2, 3, 4, 5, 6]
+        assert script.hook == "Stop scrolling - this changes mornings"
+        # benefits -> usps -> (hook + six segments): three round trips instead of nine
+        assert service.text_service.calls == 9
+        assert service.text_service.max_in_flight == 7
+        assert elapsed < ROUND_TRIP * 6
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_segment_timestamps_are_contiguous(self, service):
+        script = await service.generate_script(make_request(target_duration=120.0))
+
+        for previous, segment in zip(script.segments, script.segments[1:]):
+            assert segment.timestamp_start == pytest.approx(previous.timestamp_end)
+        assert script.segments[0].timestamp_start == 10
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_batch_segments_use_one_call(self, service):
+        script = await service.generate_script(make_request(batch_segments=True))
+
+        assert len(script.segments) == 6
+        assert script.segments[-1].dialogue == "Look how fast this is"
+        # benefits, usps, hook and one batched segment call
+        assert service.text_service.calls == 4
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_stage_timings_are_reported(self, service):
+        script = await service.generate_script(make_request())
+
+        for stage in ("product_analysis", "benefits", "usps", "hook", "segments", "total"):
+            assert stage in script.stage_timings
+        assert script.stage_timings["total"] >= script.stage_timings["product_analysis"]
+        assert "stage_timings" not in script.to_dict()
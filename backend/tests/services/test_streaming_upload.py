@@ -0,0 +1,133 @@
+"""
+Unit tests for streaming and resumable video uploads.
+"""
+
+import hashlib
+import io
+
+import pytest
+
+from app.services.video_processing.streaming_upload import (
+    ResumableUploadManager,
+    UploadOffsetMismatchError,
+    UploadTooLargeError,
+    stream_upload_to_disk,
+)
+
+
+class FakeUploadFile:
+    """Minimal async UploadFile stand-in that records read sizes."""
+
+    def __init__(self, data: bytes):
+        self._buffer = io.BytesIO(data)
+        self.read_sizes = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.read_sizes.append(size)
+        return self._buffer.read(size)
+
+
+async def byte_stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+class TestStreamUploadToDisk:
+    """Test chunked streaming of multipart uploads."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_streams_in_bounded_chunks(self, tmp_path):
+        data = b"x" * (3 * 1024 + 17)
+        upload_file = FakeUploadFile(data)
+
+        result = await stream_upload_to_disk(upload_file, tmp_path / "video.mp4", max_size=10_000, chunk_size=1024)
+
+        assert result.size == len(data)
+        assert result.sha256 == hashlib.sha256(data).hexdigest()
+        assert (tmp_path / "video.mp4").read_bytes() == data
+        assert set(upload_file.read_sizes) == {1024}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_size_limit_enforced_incrementally(self, tmp_path):
+        upload_file = FakeUploadFile(b"x" * 5000)
+
+        with pytest.raises(UploadTooLargeError):
+            await stream_upload_to_disk(upload_file, tmp_path / "big.mp4", max_size=2048, chunk_size=1024)
+
+        assert not (tmp_path / "big.mp4").exists()
+        # Reading stops at the chunk that crossed the limit
+        assert len(upload_file.read_sizes) == 3
+
+
+class TestResumableUploadManager:
+    """Test tus-style resumable uploads."""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        return ResumableUploadManager(tmp_path / "state", tmp_path, max_size=10_000)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_resume_after_interrupted_request(self, manager, tmp_path):
+        data = b"a" * 1000 + b"b" * 1000
+        upload = manager.create(len(data), {"extension": ".mp4"})
+
+        async def dropped_connection():
+            yield data[:1000]
+            raise ConnectionError("client went away")
+
+        with pytest.raises(ConnectionError):
+            await manager.append(upload.upload_id, 0, dropped_connection())
+        assert manager.get(upload.upload_id).offset == 1000
+
+        with pytest.raises(UploadOffsetMismatchError):
+            await manager.append(upload.upload_id, 0, byte_stream(data))
+
+        # A fresh manager has no in-memory hasher and must rebuild it from disk
+        resumed = ResumableUploadManager(tmp_path / "state", tmp_path, max_size=10_000)
+        upload = await resumed.append(upload.upload_id, 1000, byte_stream(data[1000:]))
+
+        assert upload.is_complete
+        assert upload.sha256 == hashlib.sha256(data).hexdigest()
+        assert (tmp_path / f"upload_{upload.upload_id}.mp4").read_bytes() == data
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_workers_alternating_on_one_upload(self, manager, tmp_path):
+        data = bytes(range(256)) * 8
+        upload = manager.create(len(data))
+        other = ResumableUploadManager(tmp_path / "state", tmp_path, max_size=10_000)
+
+        await manager.append(upload.upload_id, 0, byte_stream(data[:500]))
+        await other.append(upload.upload_id, 500, byte_stream(data[500:1200]))
+        # The first worker's hasher only covers 500 bytes and must not be reused
+        upload = await manager.append(upload.upload_id, 1200, byte_stream(data[1200:]))
+
+        assert upload.sha256 == hashlib.sha256(data).hexdigest()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_rejects_bytes_beyond_declared_length(self, manager):
+        upload = manager.create(100)
+
+        with pytest.raises(UploadTooLargeError):
+            await manager.append(upload.upload_id, 0, byte_stream(b"x" * 101))
+
+        with pytest.raises(UploadTooLargeError):
+            manager.create(10_001)
+
+    @pytest.mark.unit
+    def test_unknown_and_malformed_ids(self, manager):
+        assert manager.get("0" * 32) is None
+        assert manager.get("../../etc/passwd") is None
+        assert manager.delete("0" * 32) is False
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_append_to_malformed_id_touches_no_files(self, manager, tmp_path):
+        with pytest.raises(KeyError):
+            await manager.append("../escape", 0, byte_stream(b"x"))
+
+        assert not (tmp_path / "escape.lock").exists()
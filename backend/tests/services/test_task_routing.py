@@ -0,0 +1,79 @@
+"""
+Unit tests for Celery workload routing.
+"""
+
+import ast
+from pathlib import Path
+
+import pytest
+
+from app.core.task_routing import (
+    DEFAULT_QUEUE,
+    PRIORITY_STEPS,
+    WORKLOAD_CLASSES,
+    WORKLOADS,
+    build_task_annotations,
+    build_task_routes,
+    queue_for_task,
+)
+
+TASKS_DIR = Path(__file__).resolve().parents[2] / "app" / "tasks"
+
+
+def declared_task_names():
+    """Names passed to ``@celery_app.task(name=...)`` across app/tasks"""
+    names = set()
+    for path in TASKS_DIR.glob("*.py"):
+        for node in ast.walk(ast.parse(path.read_text())):
+            if isinstance(node, ast.Call) and getattr(node.func, "attr", None) == "task":
+                for keyword in node.keywords:
+                    if keyword.arg == "name":
+                        names.add(keyword.value.value)
+    return names
+
+
+class TestTaskRouting:
+    """Test that every task lands on exactly one workload queue."""
+
+    @pytest.mark.unit
+    def test_every_declared_task_is_routed(self):
+        routes = build_task_routes()
+
+        assert declared_task_names() - set(routes) == set()
+
+    @pytest.mark.unit
+    def test_tasks_belong_to_one_class(self):
+        names = [name for workload in WORKLOAD_CLASSES for name in workload.tasks]
+
+        assert len(names) == len(set(names))
+
+    @pytest.mark.unit
+    def test_routes_carry_queue_priority_and_limits(self):
+        routes = build_task_routes()
+        annotations = build_task_annotations()
+
+        assert routes["video_generation.generate_script"]["queue"] == "interactive"
+        assert routes["video_generation.assemble_video"]["queue"] == "media"
+        assert routes["product_catalog_scraping"]["queue"] == "scraping"
+        assert routes["enhanced_brand_scraping"]["priority"] < routes["price_monitoring"]["priority"]
+        assert all(route["priority"] in PRIORITY_STEPS for route in routes.values())
+        assert annotations["video_generation.generate_script"]["time_limit"] < \
+            annotations["video_generation.assemble_video"]["time_limit"]
+
+    @pytest.mark.unit
+    def test_soft_limit_fires_before_hard_limit(self):
+        for workload in WORKLOAD_CLASSES:
+            assert workload.soft_time_limit < workload.time_limit
+
+    @pytest.mark.unit
+    def test_unknown_tasks_use_default_queue(self):
+        assert queue_for_task("not.a.task") == DEFAULT_QUEUE
+        assert queue_for_task("price_history_maintenance") == "maintenance"
+
+    @pytest.mark.unit
+    def test_worker_args_consume_only_their_queue(self):
+        args = WORKLOADS["media"].worker_args()
+
+        assert args[args.index("-Q") + 1] == "media"
+        assert args[args.index("-P") + 1] == "prefork"
+        assert "--prefetch-multiplier=1" in args
@@ -0,0 +1,257 @@
+"""
+Unit tests for streaming Apify dataset ingestion.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.services.scraping import tiktok_ingest
+from app.services.scraping.apify_client import ApifyJobError, ApifyTikTokClient
+from app.services.scraping.tiktok_ingest import normalize_dataset_items
+
+
+def dataset_item(index: int):
+    return {
+        "id": str(7000 + index),
+        "text": f"Video {index} #Fitness #morningRoutine",
+        "createTime": 1700000000 + index,
+        "authorMeta": {"name": f"creator{index % 7}", "nickName": "Creator", "fans": 1200, "verified": index % 2 == 0},
+        "musicMeta": {"musicId": f"m{index % 3}", "musicName": "Original sound", "musicAuthor": "DJ", "musicOriginal": True},
+        "videoMeta": {"duration": 15},
+        "playCount": 1000,
+        "diggCount": 100,
+        "shareCount": 10,
+        "commentCount": 40,
+        "hashtags": [{"name": "Fitness"}, {"name": "morningroutine"}],
+        "webVideoUrl": f"https://www.tiktok.com/@creator/video/{7000 + index}",
+    }
+
+
+class FakeApifyClient(ApifyTikTokClient):
+    """Serves a dataset from memory and records requests in flight"""
+
+    def __init__(self, items, fail_at_offset=None, hidden=()):
+        super().__init__(api_token="test-token")
+        self.items = items
+        self.fail_at_offset = fail_at_offset
+        self.hidden = set(hidden)  # Left out of pages like empty items with clean=true
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requested_offsets = []
+
+    async def _make_request(self, method, endpoint, data=None, params=None):
+        if endpoint.endswith("/dataset"):
+            return {"data": {"itemCount": len(self.items)}}
+
+        self.requested_offsets.append(params["offset"])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if params["offset"] == self.fail_at_offset:
+                raise ConnectionError("connection reset")
+            return [
+                item for index, item in enumerate(self.items[params["offset"]:params["offset"] + params["limit"]], params["offset"])
+                if index not in self.hidden
+            ]
+        finally:
+            self.in_flight -= 1
+
+
+class TestNormalizeDatasetItems:
+    """Test mapping of actor items to TikTok rows."""
+
+    @pytest.mark.unit
+    def test_flat_item(self):
+        page = normalize_dataset_items([dataset_item(1)], scraped_at=datetime(2024, 2, 1))
+
+        video = page.videos[0]
+        assert video["video_id"] == "7001"
+        assert video["hashtags"] == ["fitness", "morningroutine"]
+        assert video["sounds_used"] == ["m1"]
+        assert video["view_count"] == 1000
+        assert video["engagement_rate"] == pytest.approx(0.15)
+        assert video["posted_at"] == datetime(2023, 11, 14, 22, 13, 21)
+        assert page.sounds["m1"]["artist"] == "DJ"
+
+    @pytest.mark.unit
+    def test_nested_item_with_zero_counts(self):
+        item = {
+            "videoId": 42,
+            "desc": "Nested",
+            "createTimeISO": "2024-01-05T10:00:00Z",
+            "author": {"uniqueId": "someone", "followerCount": 5},
+            "music": {"id": "s9", "title": "Song"},
+            "stats": {"playCount": 500, "diggCount": 5, "shareCount": 0, "commentCount": 0},
+            "playCount": 0,
+            "hashtags": ["#Travel", "travel", ""],
+        }
+
+        video = normalize_dataset_items([item]).videos[0]
+
+        assert video["video_id"] == "42"
+        assert video["creator_username"] == "someone"
+        assert video["view_count"] == 0
+        assert video["engagement_rate"] == 0.0
+        assert video["hashtags"] == ["travel"]
+        assert video["posted_at"] == datetime(2024, 1, 5, 10, 0)
+
+    @pytest.mark.unit
+    def test_duplicates_and_items_without_id(self):
+        page = normalize_dataset_items([dataset_item(1), {"text": "no id"}, "garbage", dataset_item(1)])
+
+        assert len(page.videos) == 1
+        assert page.skipped == 2
+
+
+class TestIterDatasetPages:
+    """Test offset/limit paging with bounded read-ahead."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_pages_arrive_in_order_with_bounded_concurrency(self):
+        client = FakeApifyClient([dataset_item(i) for i in range(95)])
+
+        pages = [page async for page in client.iter_dataset_pages("run", page_size=10, concurrency=3)]
+
+        assert [page.offset for page in pages] == list(range(0, 95, 10))
+        assert [item["id"] for page in pages for item in page.items] == [str(7000 + i) for i in range(95)]
+        assert pages[-1].next_offset == 95
+        assert client.max_in_flight == 3
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_starts_at_offset(self):
+        client = FakeApifyClient([dataset_item(i) for i in range(30)])
+
+        pages = [page async for page in client.iter_dataset_pages("run", start_offset=20, page_size=8)]
+
+        assert [(page.offset, len(page.items)) for page in pages] == [(20, 8), (28, 2)]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_short_page_still_covers_its_whole_range(self):
+        client = FakeApifyClient([dataset_item(i) for i in range(30)], hidden={3, 4})
+
+        pages = [page async for page in client.iter_dataset_pages("run", page_size=10, concurrency=3)]
+
+        assert [len(page.items) for page in pages] == [8, 10, 10]
+        assert [page.next_offset for page in pages] == [10, 20, 30]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failed_page_raises_and_cancels_read_ahead(self):
+        client = FakeApifyClient([dataset_item(i) for i in range(100)], fail_at_offset=20)
+
+        received = []
+        with pytest.raises(ApifyJobError):
+            async for page in client.iter_dataset_pages("run", page_size=10, concurrency=4):
+                received.append(page.offset)
+
+        assert received == [0, 10]
+        await asyncio.sleep(0.05)
+        assert client.in_flight == 0
+        assert max(client.requested_offsets) < 60
+
+
+class TestIngestApifyDataset:
+    """Test checkpointed ingestion and resuming after a failure."""
+
+    @pytest.fixture
+    def store(self, monkeypatch):
+        store = {"checkpoint": None, "video_ids": [], "refreshed": 0}
+
+        def get_or_create_checkpoint(db, apify_run_id, job_type=None):
+            if store["checkpoint"] is None:
+                store["checkpoint"] = {
+                    "apify_run_id": apify_run_id, "next_offset": 0, "total_items": None, "pages_ingested": 0,
+                    "counts": {}, "completed_at": None,
+                }
+            return dict(store["checkpoint"])
+
+        def write_page(db, apify_run_id, offset, next_offset, total, page):
+            # Out-of-order pages are skipped, like the repository does
+            if offset == store["checkpoint"]["next_offset"]:
+                store["video_ids"].extend(video["video_id"] for video in page.videos)
+                store["checkpoint"].update(
+                    next_offset=next_offset, total_items=total,
+                    pages_ingested=store["checkpoint"]["pages_ingested"] + 1
+                )
+            return dict(store["checkpoint"])
+
+        def complete_checkpoint(db, apify_run_id):
+            store["checkpoint"]["completed_at"] = datetime.utcnow()
+            return dict(store["checkpoint"])
+
+        monkeypatch.setattr(tiktok_ingest, "in_session", lambda operation, *args: operation(None, *args))
+        monkeypatch.setattr(tiktok_ingest, "get_or_create_checkpoint", get_or_create_checkpoint)
+        monkeypatch.setattr(tiktok_ingest, "write_page", write_page)
+        monkeypatch.setattr(tiktok_ingest, "complete_checkpoint", complete_checkpoint)
+        monkeypatch.setattr(tiktok_ingest, "_refresh_trend_data", lambda: store.__setitem__("refreshed", store["refreshed"] + 1))
+        return store
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_resumes_from_last_ingested_page(self, store):
+        items = [dataset_item(i) for i in range(50)]
+
+        with pytest.raises(ApifyJobError):
+            await tiktok_ingest.ingest_apify_dataset("run", client=FakeApifyClient(items, fail_at_offset=30), page_size=10)
+        assert store["checkpoint"]["next_offset"] == 30
+        assert store["refreshed"] == 0
+
+        resumed = FakeApifyClient(items)
+        checkpoint = await tiktok_ingest.ingest_apify_dataset("run", client=resumed, page_size=10)
+
+        assert min(resumed.requested_offsets) == 30
+        assert checkpoint["next_offset"] == 50
+        assert store["video_ids"] == [str(7000 + i) for i in range(50)]
+        assert store["refreshed"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_pages_after_a_short_page_are_written(self, store):
+        items = [dataset_item(i) for i in range(40)]
+
+        checkpoint = await tiktok_ingest.ingest_apify_dataset(
+            "run", client=FakeApifyClient(items, hidden={12, 13, 14}), page_size=10, concurrency=4
+        )
+
+        assert checkpoint["next_offset"] == 40
+        assert checkpoint["pages_ingested"] == 4
+        assert checkpoint["completed_at"] is not None
+        assert store["video_ids"] == [str(7000 + i) for i in range(40) if i not in {12, 13, 14}]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_skipped_pages_leave_the_run_incomplete(self, store, monkeypatch):
+        items = [dataset_item(i) for i in range(30)]
+        write_page = tiktok_ingest.write_page
+
+        def skip_second_page(db, apify_run_id, offset, next_offset, total, page):
+            if offset == 10:
+                return dict(store["checkpoint"])
+            return write_page(db, apify_run_id, offset, next_offset, total, page)
+
+        monkeypatch.setattr(tiktok_ingest, "write_page", skip_second_page)
+
+        with pytest.raises(ApifyJobError):
+            await tiktok_ingest.ingest_apify_dataset("run", client=FakeApifyClient(items), page_size=10)
+
+        assert store["checkpoint"]["next_offset"] == 10
+        assert store["checkpoint"]["completed_at"] is None
+        assert store["refreshed"] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_completed_run_is_not_fetched_again(self, store):
+        items = [dataset_item(i) for i in range(5)]
+        await tiktok_ingest.ingest_apify_dataset("run", client=FakeApifyClient(items))
+
+        again = FakeApifyClient(items)
+        await tiktok_ingest.ingest_apify_dataset("run", client=again)
+
+        assert again.requested_offsets == []
+        assert store["refreshed"] == 1
@@ -0,0 +1,110 @@
+"""
+Unit tests for prefix-filtered trend consolidation.
+"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.ai.trend_consolidation import UnionFind, consolidate_trends, name_tokens, similar_groups
+
+WORDS = [f"w{i}" for i in range(40)]
+
+
+def make_trend(trend_id: str, name: str, volume: int = 100, viral_score: float = 50.0, related=None):
+    return SimpleNamespace(
+        trend_id=trend_id,
+        name=name,
+        volume=volume,
+        viral_score=viral_score,
+        growth_rate=volume / 10,
+        signals=[f"signal-{trend_id}"],
+        related_trends=list(related or [f"#{trend_id}"]),
+    )
+
+
+def brute_force_groups(token_sets, threshold):
+    uf = UnionFind(len(token_sets))
+    for i, first in enumerate(token_sets):
+        for j in range(i + 1, len(token_sets)):
+            second = token_sets[j]
+            if first and second and len(first & second) / len(first | second) > threshold:
+                uf.union(i, j)
+    groups = {}
+    for position in range(len(token_sets)):
+        groups.setdefault(uf.find(position), []).append(position)
+    return sorted(groups.values())
+
+
+class TestSimilarGroups:
+    """Test that prefix filtering finds every similar pair."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("threshold", [0.5, 0.7, 0.8])
+    def test_groups_equal_brute_force(self, threshold):
+        rng = random.Random(3)
+        bases = [rng.sample(WORDS, rng.randint(1, 6)) for _ in range(60)]
+        token_sets = []
+        for _ in range(400):
+            words = list(rng.choice(bases))
+            if rng.random() < 0.5:
+                words.append(rng.choice(WORDS))
+            if rng.random() < 0.3 and len(words) > 1:
+                words.pop(rng.randrange(len(words)))
+            token_sets.append(frozenset(words))
+        token_sets.append(frozenset())
+
+        assert sorted(similar_groups(token_sets, threshold)) == brute_force_groups(token_sets, threshold)
+
+    @pytest.mark.unit
+    def test_empty_names_stay_separate(self):
+        groups = similar_groups([name_tokens(""), name_tokens("  "), name_tokens("a b")])
+
+        assert sorted(groups) == [[0], [1], [2]]
+
+
+class TestConsolidateTrends:
+    """Test merged trend contents and order independence."""
+
+    @pytest.mark.unit
+    def test_similar_trends_merge_into_highest_volume(self):
+        trends = [
+            make_trend("tiktok_1", "Morning Routine Hacks", volume=100, related=["#routine"]),
+            make_trend("ig_1", "morning routine hacks", volume=300, viral_score=40, related=["#hacks"]),
+            make_trend("yt_1", "Budget Travel", volume=50),
+        ]
+
+        consolidated = consolidate_trends(trends)
+
+        assert [trend.trend_id for trend in consolidated] == ["ig_1", "yt_1"]
+        merged = consolidated[0]
+        assert merged.volume == 400
+        assert merged.viral_score == 50.0
+        assert merged.related_trends == ["#hacks", "#routine"]
+        assert merged.signals == ["signal-ig_1", "signal-tiktok_1"]
+
+    @pytest.mark.unit
+    def test_result_does_not_depend_on_input_order(self):
+        rng = random.Random(5)
+        specs = [
+            (f"t{i}", " ".join(rng.sample(WORDS[:12], rng.randint(2, 4))), rng.randint(1, 1000))
+            for i in range(200)
+        ]
+
+        def run(order):
+            trends = [make_trend(trend_id, name, volume) for trend_id, name, volume in order]
+            return [
+                (t.trend_id, t.volume, t.viral_score, tuple(t.signals), tuple(t.related_trends))
+                for t in consolidate_trends(trends)
+            ]
+
+        expected = run(specs)
+        for _ in range(3):
+            shuffled = list(specs)
+            rng.shuffle(shuffled)
+            assert run(shuffled) == expected
+
+    @pytest.mark.unit
+    def test_no_trends(self):
+        assert consolidate_trends([]) == []
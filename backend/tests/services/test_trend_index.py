@@ -0,0 +1,99 @@
+"""
+Unit tests for the TikTok trend inverted index.
+"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.ai.trend_index import TrendIndex, TrendTerms, trend_similarity
+
+VOCABULARY = [f"word{i}" for i in range(60)]
+
+
+def tiktok_trend(rng: random.Random, trend_id: int):
+    return SimpleNamespace(
+        id=trend_id,
+        normalized_name=" ".join(rng.sample(VOCABULARY, rng.randint(1, 4))),
+        keywords=[word.upper() for word in rng.sample(VOCABULARY, rng.randint(0, 5))],
+        hashtags=[f"#{word}" for word in rng.sample(VOCABULARY, rng.randint(0, 4))],
+    )
+
+
+def existing_trend(rng: random.Random):
+    return SimpleNamespace(
+        name=" ".join(rng.sample(VOCABULARY, rng.randint(1, 4))).title(),
+        keywords=rng.sample(VOCABULARY, rng.randint(0, 5)),
+        related_trends=[f"#{word}" for word in rng.sample(VOCABULARY, rng.randint(0, 3))] + ["plain-related"],
+    )
+
+
+def full_scan(trend, tiktok_trends, threshold=0.3):
+    """The pre-index matching: score every TikTok trend"""
+    query = TrendTerms.from_trend_data(trend)
+    matches = []
+    for candidate in tiktok_trends:
+        score = trend_similarity(query, TrendTerms.from_tiktok_trend(candidate))
+        if score > threshold:
+            matches.append((candidate, score))
+    matches.sort(key=lambda match: match[1], reverse=True)
+    return matches
+
+
+@pytest.fixture
+def corpus():
+    rng = random.Random(7)
+    tiktok_trends = [tiktok_trend(rng, i) for i in range(400)]
+    existing = [existing_trend(rng) for _ in range(80)]
+    return tiktok_trends, existing
+
+
+class TestTrendIndex:
+    """Test that posting-list candidates give the same matches as a full scan."""
+
+    @pytest.mark.unit
+    def test_matches_equal_full_scan(self, corpus):
+        tiktok_trends, existing = corpus
+        index = TrendIndex(tiktok_trends)
+
+        for trend in existing:
+            expected = full_scan(trend, tiktok_trends)
+            actual = index.match(TrendTerms.from_trend_data(trend))
+
+            assert [(t.id, round(s, 12)) for t, s in actual] == [(t.id, round(s, 12)) for t, s in expected]
+
+    @pytest.mark.unit
+    def test_candidates_share_a_token(self, corpus):
+        tiktok_trends, existing = corpus
+        index = TrendIndex(tiktok_trends)
+        query = TrendTerms.from_trend_data(existing[0])
+
+        for position in index.candidates(query):
+            terms = index.terms[position]
+            assert (query.name_words & terms.name_words) or (query.keywords & terms.keywords) \
+                or (query.hashtags & terms.hashtags)
+
+    @pytest.mark.unit
+    def test_unrelated_trend_has_no_candidates(self, corpus):
+        index = TrendIndex(corpus[0])
+        query = TrendTerms.from_trend_data(SimpleNamespace(name="Completely New", keywords=["nothing"], related_trends=[]))
+
+        assert index.candidates(query) == []
+        assert index.match(query) == []
+
+    @pytest.mark.unit
+    def test_term_overlaps_equal_set_intersections(self, corpus):
+        tiktok_trends, existing = corpus
+        index = TrendIndex(tiktok_trends)
+        existing_keywords = set()
+        for trend in existing[:5]:
+            existing_keywords.update(kw.lower() for kw in trend.keywords)
+            existing_keywords.update(name.lower() for name in trend.related_trends)
+
+        expected = [
+            len(existing_keywords & ({kw.lower() for kw in t.keywords} | {tag.lower() for tag in t.hashtags}))
+            for t in tiktok_trends
+        ]
+
+        assert index.term_overlaps(existing_keywords) == expected
@@ -0,0 +1,199 @@
+"""
+Unit tests for materialized trend snapshots and their incremental refresh.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.db import session
+from app.services.ai import trend_snapshots
+from app.services.ai.trend_analyzer import (
+    TrendAnalysisService, TrendData, TrendSignal, TrendSource, TrendStatus, TrendType
+)
+from app.services.ai.trend_snapshots import changed_platforms, snapshot_age, snapshot_key
+from app.services.ai.viral_content import Platform
+
+
+def make_trend(platform: Platform, name: str, volume: int = 1000) -> TrendData:
+    now = time.time()
+    return TrendData(
+        trend_id=f"{platform.value}_{name.replace(' ', '_')}",
+        name=name,
+        trend_type=TrendType.TOPIC,
+        platform=platform,
+        status=TrendStatus.RISING,
+        viral_score=50.0,
+        growth_rate=80.0,
+        volume=volume,
+        engagement_rate=0.05,
+        demographic_data={"age_groups": {"18-24": 40}},
+        geographic_data={"US": 60},
+        signals=[TrendSignal(
+            signal_id=f"sig_{name}",
+            content=name,
+            signal_strength=0.8,
+            platform=platform,
+            source=TrendSource.SOCIAL_PLATFORMS,
+            detected_at=now,
+        )],
+        related_trends=[f"#{name.split()[0]}"],
+        keywords=name.split(),
+        first_detected=now - 3600,
+        peak_time=None,
+        predicted_lifespan=48.0,
+        content_examples=[],
+        influencer_adoption=[],
+        brand_opportunities=[],
+        risk_factors=[],
+    )
+
+
+class FakeSnapshotStore:
+    """In-memory stand-in for the trend_snapshots table"""
+
+    def __init__(self):
+        self.snapshots = {}
+        self.versions = {}
+
+    def install(self, monkeypatch):
+        monkeypatch.setattr(session, "in_session", lambda operation, *args: operation(None, *args))
+        monkeypatch.setattr(trend_snapshots, "load_snapshot", lambda db, key, touch=True: self.snapshots.get(key))
+        monkeypatch.setattr(trend_snapshots, "save_snapshot", lambda db, document: self.snapshots.__setitem__(document["snapshot_key"], document))
+        monkeypatch.setattr(trend_snapshots, "source_versions", lambda db, platforms: {p: self.versions[p] for p in platforms})
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = FakeSnapshotStore()
+    store.install(monkeypatch)
+    return store
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = TrendAnalysisService()
+    service.detections = []
+
+    async def detect_platform_trends(platform, industry_keywords, time_window_hours=24):
+        service.detections.append(platform.value)
+        return [make_trend(platform, f"{platform.value} morning routine"), make_trend(platform, "budget travel tips", 500)]
+
+    monkeypatch.setattr(service.detector, "detect_platform_trends", detect_platform_trends)
+    return service
+
+
+class TestSnapshotIdentity:
+    """Test snapshot keys and source version comparison."""
+
+    @pytest.mark.unit
+    def test_key_ignores_order_and_duplicates(self):
+        first = snapshot_key([Platform.TIKTOK, Platform.INSTAGRAM], ["fitness", " beauty", "fitness"])
+        second = snapshot_key(["instagram", "tiktok"], ["beauty", "fitness"])
+
+        assert first == second == "instagram,tiktok|beauty,fitness"
+
+    @pytest.mark.unit
+    def test_only_changed_platforms_are_redetected(self):
+        previous = {
+            "source_versions": {"tiktok": "h1|10:a", "instagram": "h1"},
+            "platform_trends": {"tiktok": [], "instagram": []},
+        }
+
+        assert changed_platforms(None, {"tiktok": "x", "instagram": "y"}) == ["instagram", "tiktok"]
+        assert changed_platforms(previous, {"tiktok": "h1|11:b", "instagram": "h1"}) == ["tiktok"]
+        assert changed_platforms(previous, {"tiktok": "h1|10:a", "instagram": "h1", "youtube": "h1"}) == ["youtube"]
+
+
+class TestTrendSerialization:
+    """Test that snapshotted trends round-trip through JSON-like dicts."""
+
+    @pytest.mark.unit
+    def test_round_trip(self):
+        trend = make_trend(Platform.TIKTOK, "morning routine hacks")
+
+        restored = TrendData.from_dict(trend.to_dict())
+
+        assert restored == trend
+        assert isinstance(restored.signals[0], TrendSignal)
+        assert restored.signals[0].source is TrendSource.SOCIAL_PLATFORMS
+
+    @pytest.mark.unit
+    def test_accepts_plain_string_values(self):
+        document = json.loads(json.dumps(make_trend(Platform.YOUTUBE_SHORTS, "budget travel").to_dict()))
+
+        restored = TrendData.from_dict(document)
+
+        assert restored.platform is Platform.YOUTUBE_SHORTS
+        assert restored.status is TrendStatus.RISING
+
+
+class TestSnapshotRefresh:
+    """Test incremental snapshot builds and the freshness bound."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_refresh_reuses_unchanged_platforms(self, service, store):
+        platforms = [Platform.TIKTOK, Platform.INSTAGRAM]
+        store.versions = {"tiktok": "h1|10:a", "instagram": "h1"}
+
+        first = await service.refresh_trend_snapshot(platforms, ["fitness"])
+        assert sorted(service.detections) == ["instagram", "tiktok"]
+
+        # A TikTok ingest changes only the TikTok source version
+        store.versions["tiktok"] = "h1|25:b"
+        second = await service.refresh_trend_snapshot(platforms, ["fitness"])
+
+        assert sorted(service.detections) == ["instagram", "tiktok", "tiktok"]
+        assert second["platform_trends"]["instagram"] is first["platform_trends"]["instagram"]
+        assert second["source_versions"] == store.versions
+        # "budget travel tips" is consolidated across both platforms
+        assert len(second["trends"]) == 3
+        assert set(second["aggregates"]) == {"trend_categories", "content_focus", "platform_priorities"}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_fresh_snapshot_is_served_without_detection(self, service, store):
+        store.versions = {"tiktok": "h1|10:a"}
+        built = await service.refresh_trend_snapshot([Platform.TIKTOK], [])
+        service.detections.clear()
+
+        served = await service.get_trend_snapshot([Platform.TIKTOK], [])
+
+        assert served is built
+        assert service.detections == []
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_is_served_and_refreshed_in_background(self, service, store):
+        store.versions = {"tiktok": "h1|10:a"}
+        built = await service.refresh_trend_snapshot([Platform.TIKTOK], [])
+        built["built_at"] -= timedelta(seconds=settings.TREND_SNAPSHOT_REFRESH_AGE + 1)
+        store.versions["tiktok"] = "h1|11:b"
+
+        served = await service.get_trend_snapshot([Platform.TIKTOK], [])
+        assert served is built
+
+        await asyncio.sleep(0.05)
+        refreshed = store.snapshots[built["snapshot_key"]]
+        assert refreshed is not built
+        assert refreshed["source_versions"] == {"tiktok": "h1|11:b"}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_expired_snapshot_is_rebuilt_once_for_concurrent_requests(self, service, store):
+        store.versions = {"tiktok": "h1|10:a"}
+        built = await service.refresh_trend_snapshot([Platform.TIKTOK], [])
+        built["built_at"] -= timedelta(seconds=settings.TREND_SNAPSHOT_MAX_AGE + 1)
+        store.versions["tiktok"] = "h1|11:b"
+        service.detections.clear()
+
+        served = await asyncio.gather(*[service.get_trend_snapshot([Platform.TIKTOK], []) for _ in range(5)])
+
+        assert service.detections == ["tiktok"]
+        assert all(snapshot is served[0] for snapshot in served)
+        assert snapshot_age(served[0], datetime.now(timezone.utc)) < 5
@@ -0,0 +1,229 @@
+"""
+Unit tests for concurrent idea generation and batched hook scoring.
+"""
+
+import asyncio
+import json
+import re
+
+import pytest
+
+from app.services.ai.base import AIResponse, AIUsageMetrics, ConcurrencyLimiter
+from app.services.ai.viral_content import (
+    ContentIdea, Platform, TrendData, ViralContentGenerator, ViralHook, ViralPattern
+)
+
+
+def make_hook(text: str) -> ViralHook:
+    return ViralHook(
+        text=text,
+        pattern=ViralPattern.CURIOSITY_GAP,
+        viral_score=0.0,
+        emotion="curiosity",
+        platform=Platform.TIKTOK,
+        reasoning=""
+    )
+
+
+def make_response(content: str, success: bool = True) -> AIResponse:
+    return AIResponse(
+        content=content,
+        usage=AIUsageMetrics(provider="openai", model="test"),
+        metadata={},
+        success=success,
+        error=None if success else "provider unavailable"
+    )
+
+
+class FakeTextService:
+    """Answers batch and single scoring prompts, recording each call"""
+
+    def __init__(self, batch_response=None):
+        self.batch_response = batch_response
+        self.prompts = []
+
+    async def generate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        if "Hooks:" in prompt:
+            if self.batch_response is not None:
+                return self.batch_response
+            hooks = re.findall(r"^(\d+)\. (.+)$", prompt.split("Hooks:")[1], re.MULTILINE)
+            return make_response(json.dumps([
+                {"hook": int(number), "overall_score": len(text) / 2, "reasoning": f"batch {number}"}
+                for number, text in hooks
+            ]))
+        return make_response("Overall viral score: 6.5")
+
+
+@pytest.fixture
+def generator():
+    generator = ViralContentGenerator()
+    generator.text_service = FakeTextService()
+    generator.vector_service = object()
+    return generator
+
+
+class TestScoreHooks:
+    """Test scoring several hooks with one structured request."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_one_request_scores_every_hook(self, generator):
+        hooks = [make_hook("The truth about sleep"), make_hook("3 mistakes you make"), make_hook("Why")]
+
+        scored = await generator.score_hooks(hooks, Platform.TIKTOK, "students")
+
+        assert len(generator.text_service.prompts) == 1
+        assert [hook.viral_score for hook in scored] == [10.5, 9.5, 1.5]
+        assert scored[2].reasoning == "batch 3"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_hooks_missing_from_response_are_scored_individually(self, generator):
+        generator.text_service.batch_response = make_response(
+            'Scores:\n```json\n[{"hook": 2, "overall_score": 8, "reasoning": "strong"}, {"hook": 9, "overall_score": 1}]\n```'
+        )
+        hooks = [make_hook("First"), make_hook("Second"), make_hook("Third")]
+
+        scored = await generator.score_hooks(hooks, Platform.TIKTOK, "students")
+
+        assert [hook.viral_score for hook in scored] == [6.5, 8.0, 6.5]
+        assert len(generator.text_service.prompts) == 3
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_failed_batch_falls_back_to_single_scoring(self, generator):
+        generator.text_service.batch_response = make_response("", success=False)
+
+        scored = await generator.score_hooks([make_hook("First"), make_hook("Second")], Platform.TIKTOK, "students")
+
+        assert [hook.viral_score for hook in scored] == [6.5, 6.5]
+
+    @pytest.mark.unit
+    def test_unparseable_batch_response(self, generator):
+        assert generator._parse_batch_scoring_response("no scores here", 3) == {}
+        assert generator._parse_batch_scoring_response("[not json]", 3) == {}
+        assert generator._parse_batch_scoring_response('[{"overall_score": "high"}, {"overall_score": 4}]', 3) == {
+            1: {"overall_score": 4.0, "reasoning": ""}
+        }
+
+
+class TestStreamContentIdeas:
+    """Test concurrent fan-out of pillar x trend idea generation."""
+
+    @pytest.fixture
+    def ideas(self, generator, monkeypatch):
+        state = {"in_flight": 0, "max_in_flight": 0, "started": [], "cancelled": 0, "empty": set()}
+
+        async def get_trending_topics(platform, limit=20):
+            return [
+                TrendData(topic=f"trend{i}", platform=platform, engagement_score=1.0, growth_rate=0.1,
+                          keywords=[], sentiment="positive", first_seen=0.0)
+                for i in range(5)
+            ]
+
+        async def analyze_competitor_content(industry, limit=50):
+            return {"patterns": []}
+
+        async def generate_single_idea(brand_name, industry, content_pillar, target_audience, platform,
+                                       trending_topic, competitor_patterns):
+            state["started"].append((content_pillar, trending_topic))
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            try:
+                # Later pillars finish first
+                await asyncio.sleep(0.05 - 0.01 * int(content_pillar[-1]))
+            except asyncio.CancelledError:
+                state["cancelled"] += 1
+                raise
+            finally:
+                state["in_flight"] -= 1
+            if (content_pillar, trending_topic) in state["empty"]:
+                return None
+            return ContentIdea(
+                title=f"{content_pillar} x {trending_topic}", hooks=[], content_pillar=content_pillar,
+                target_audience=target_audience, estimated_engagement=int(content_pillar[-1]) / 10,
+                content_type="video", keywords=[], trending_topics=[trending_topic]
+            )
+
+        monkeypatch.setattr(generator.trend_analyzer, "get_trending_topics", get_trending_topics)
+        monkeypatch.setattr(generator.trend_analyzer, "analyze_competitor_content", analyze_competitor_content)
+        monkeypatch.setattr(generator, "_generate_single_idea", generate_single_idea)
+        return state
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_ideas_stream_in_completion_order(self, generator, ideas):
+        pillars = ["pillar1", "pillar2", "pillar3"]
+
+        streamed = [
+            idea.title async for idea in generator.stream_content_ideas("Brand", "fitness", pillars, "students", Platform.TIKTOK, 3)
+        ]
+
+        assert ideas["started"] == [("pillar1", "trend0"), ("pillar1", "trend1"), ("pillar2", "trend0")]
+        assert streamed[0] == "pillar2 x trend0"
+        assert sorted(streamed[1:]) == ["pillar1 x trend0", "pillar1 x trend1"]
+        assert ideas["max_in_flight"] == 3
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_empty_results_are_replaced_by_next_combination(self, generator, ideas):
+        ideas["empty"] = {("pillar1", "trend1")}
+
+        result = await generator.generate_content_ideas(
+            "Brand", "fitness", ["pillar1", "pillar2", "pillar3"], "students", Platform.TIKTOK, 3
+        )
+
+        assert sorted(idea.title for idea in result[:2]) == ["pillar2 x trend0", "pillar2 x trend1"]
+        assert result[2].title == "pillar1 x trend0"
+        assert len(ideas["started"]) == 4
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_closing_stream_cancels_pending_generations(self, generator, ideas):
+        stream = generator.stream_content_ideas("Brand", "fitness", ["pillar1", "pillar2"], "students", Platform.TIKTOK, 3)
+
+        first = await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0)
+
+        assert first.title == "pillar2 x trend0"
+        assert ideas["cancelled"] == 2
+        assert ideas["in_flight"] == 0
+
+
+class TestConcurrencyLimiter:
+    """Test the shared cap on AI requests in flight."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_caps_requests_in_flight(self):
+        limiter = ConcurrencyLimiter(3)
+        observed = []
+
+        async def request():
+            async with limiter.slot():
+                observed.append(limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[request() for _ in range(10)])
+
+        assert max(observed) == 3
+        assert limiter.in_flight == 0
+
+    @pytest.mark.unit
+    def test_usable_from_successive_event_loops(self):
+        limiter = ConcurrencyLimiter(1)
+
+        async def requests():
+            async def request():
+                async with limiter.slot():
+                    await asyncio.sleep(0)
+            await asyncio.gather(request(), request())
+
+        for _ in range(2):
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(requests())
+            finally:
+                loop.close()
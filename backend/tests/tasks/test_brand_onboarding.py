@@ -0,0 +1,53 @@
+"""
+Tests for non-blocking brand onboarding: assimilate_brand hands off to
+enhanced scraping with Task.replace and never waits on a result.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.tasks import brand_tasks
+from app.tasks.brand_tasks import assimilate_brand, brand_scraping_failed
+
+
+@pytest.fixture
+def job():
+    job = SimpleNamespace(status="pending", progress=0)
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = job
+    with patch.object(brand_tasks, "SessionLocal", return_value=db):
+        yield job
+
+
+class TestBrandOnboarding:
+    """Test the replace/link_error continuation of assimilate_brand."""
+
+    @pytest.mark.celery
+    def test_enhanced_path_replaces_task_instead_of_waiting(self, job):
+        with patch.object(assimilate_brand, "replace", side_effect=lambda sig: sig) as replace, \
+                patch("celery.result.AsyncResult.get") as blocking_get:
+            signature = assimilate_brand.run(1, "https://brand.example", "job-1")
+
+        replace.assert_called_once()
+        blocking_get.assert_not_called()
+        assert signature.task == "enhanced_brand_scraping"
+        assert signature.immutable
+        assert signature.args[3]["fallback_on_failure"] is True
+        assert [errback.task for errback in signature.options["link_error"]] == ["brand_scraping_failed"]
+        assert job.status == "processing"
+        assert job.progress == 10
+
+    @pytest.mark.celery
+    def test_failed_scraping_queues_original_implementation(self):
+        with patch.object(assimilate_brand, "apply_async") as apply_async:
+            brand_scraping_failed.run(
+                SimpleNamespace(id="scrape-1"), RuntimeError("blocked"), None,
+                1, "https://brand.example", "job-1"
+            )
+
+        apply_async.assert_called_once_with(
+            args=[1, "https://brand.example", "job-1"],
+            kwargs={"use_enhanced_scraping": False}
+        )